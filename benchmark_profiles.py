@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🎮 NEURO-OS GAME PROFILE SERIALIZATION BENCHMARK
+=================================================
+Carga y guardado de una biblioteca sintética de 10.000 perfiles:
+- Antiguo: dataclass + asdict (copia recursiva) y from_dict(cls(**data))
+- Nuevo: GameProfile con __slots__ y to_dict/from_dict escritos a mano
+- Binario: profiles_to_bytes/profiles_from_bytes (struct, sin JSON)
+Los dos JSON se miden sobre el mismo texto (indent=2, como se guarda): al
+cargar manda json.loads y from_dict apenas cambia el total, la mejora está
+en el guardado y en la memoria por objeto.
+Comprueba además ida y vuelta, compatibilidad con perfiles v1, versiones
+desconocidas y que from_dict no modifica el diccionario de entrada.
+"""
+
+import io
+import json
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from game_profile_manager import (  # noqa: E402
+    CPU_PRIORITIES, PROFILE_SCHEMA_VERSION, GameCategory, GameProfile, profiles_from_bytes,
+    profiles_to_bytes)
+
+# Fix UTF-8 encoding for Windows
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+PROFILES = 10000
+
+
+@dataclass
+class LegacyProfile:
+    """GameProfile tal como era antes (referencia del benchmark)"""
+    name: str
+    category: GameCategory
+    target_fps: int = 60
+    render_scale: float = 1.0
+    cpu_priority: str = "high"
+    gpu_priority: int = 8
+    ram_cleanup_before_launch: bool = True
+    aggressive_ram_cleanup: bool = False
+    network_optimization: bool = False
+    close_bandwidth_hogs: bool = False
+    disable_overlays: bool = False
+    disable_recording: bool = False
+    last_fps: Optional[float] = None
+    avg_fps: Optional[float] = None
+    min_fps: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data['category'] = self.category.value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LegacyProfile':
+        data['category'] = GameCategory(data['category'])
+        return cls(**data)
+
+
+def make_profiles(count: int, seed: int = 7) -> Dict[str, GameProfile]:
+    rng = random.Random(seed)
+    categories = list(GameCategory)
+    profiles = {}
+    for i in range(count):
+        name = f"Game {i} {rng.choice(['Remastered', 'GOTY', '™', 'Édition', ''])}".strip()
+        measured = rng.random() < 0.7
+        profiles[name] = GameProfile(
+            name, rng.choice(categories), target_fps=rng.choice([30, 60, 144, 240]),
+            render_scale=rng.choice([0.5, 0.75, 1.0]), cpu_priority=rng.choice(CPU_PRIORITIES),
+            gpu_priority=rng.randint(0, 8), ram_cleanup_before_launch=rng.random() < 0.8,
+            aggressive_ram_cleanup=rng.random() < 0.3, network_optimization=rng.random() < 0.5,
+            close_bandwidth_hogs=rng.random() < 0.2, disable_overlays=rng.random() < 0.5,
+            disable_recording=rng.random() < 0.5,
+            last_fps=round(rng.uniform(20, 300), 1) if measured else None,
+            avg_fps=round(rng.uniform(20, 300), 1) if measured else None,
+            min_fps=round(rng.uniform(10, 120), 1) if measured else None)
+    return profiles
+
+
+def timed(func, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def check(profiles: Dict[str, GameProfile]) -> int:
+    failures = 0
+    originals = list(profiles.values())
+
+    document = json.loads(json.dumps({n: p.to_dict() for n, p in profiles.items()}))
+    before = json.dumps(document)
+    if [GameProfile.from_dict(d) for d in document.values()] != originals:
+        failures += 1
+        print("  ❌ JSON round-trip")
+    if json.dumps(document) != before:
+        failures += 1
+        print("  ❌ from_dict modified its input")
+
+    blob = profiles_to_bytes(originals)
+    if profiles_from_bytes(blob) != originals:
+        failures += 1
+        print("  ❌ binary round-trip")
+
+    # Versiones futuras y prioridades desconocidas: error, no datos inventados
+    future_blob = blob[:3] + bytes([PROFILE_SCHEMA_VERSION + 1]) + blob[4:]
+    future_dict = dict(document[originals[0].name], v=PROFILE_SCHEMA_VERSION + 1)
+    bad_priority = GameProfile("Odd Game", GameCategory.RPG, cpu_priority="turbo")
+    for label, func in (("future binary version", lambda: profiles_from_bytes(future_blob)),
+                        ("future JSON version", lambda: GameProfile.from_dict(future_dict)),
+                        ("unknown cpu_priority", lambda: profiles_to_bytes([bad_priority]))):
+        try:
+            func()
+        except ValueError:
+            continue
+        failures += 1
+        print(f"  ❌ {label} accepted")
+
+    # Perfil v1 (guardado por el dataclass antiguo, sin 'v') y con un campo desconocido
+    legacy = LegacyProfile("Old Game", GameCategory.RPG, avg_fps=55.5).to_dict()
+    legacy['future_field'] = 1
+    if GameProfile.from_dict(legacy) != GameProfile("Old Game", GameCategory.RPG, avg_fps=55.5):
+        failures += 1
+        print("  ❌ v1 profile migration")
+    return failures
+
+
+def benchmark(profiles: Dict[str, GameProfile]):
+    legacy = {n: LegacyProfile(**{s: getattr(p, s) for s in GameProfile.__slots__})
+              for n, p in profiles.items()}
+    # Mismo formato para los dos: indent=2, como lo guarda GameProfileManager (el antiguo sin 'v')
+    legacy_text = json.dumps({n: p.to_dict() for n, p in legacy.items()}, indent=2)
+    text = json.dumps({n: p.to_dict() for n, p in profiles.items()}, indent=2)
+    blob = profiles_to_bytes(profiles.values())
+
+    def legacy_load():
+        return {n: LegacyProfile.from_dict(d) for n, d in json.loads(legacy_text).items()}
+
+    def load():
+        return {n: GameProfile.from_dict(d) for n, d in json.loads(text).items()}
+
+    print(f"\n💾 Save {len(profiles)} profiles (JSON indent=2):")
+    print(f"   • asdict (legacy)    : {timed(lambda: [p.to_dict() for p in legacy.values()]):7.1f} ms "
+          f"+ json {timed(lambda: json.dumps({n: p.to_dict() for n, p in legacy.items()}, indent=2)):7.1f} ms")
+    print(f"   • hand-written       : {timed(lambda: [p.to_dict() for p in profiles.values()]):7.1f} ms "
+          f"+ json {timed(lambda: json.dumps({n: p.to_dict() for n, p in profiles.items()}, indent=2)):7.1f} ms")
+    print(f"   • binary             : {timed(lambda: profiles_to_bytes(profiles.values())):7.1f} ms total")
+
+    print(f"\n📂 Load {len(profiles)} profiles (json.loads alone: {timed(lambda: json.loads(text), 7):.1f} ms):")
+    print(f"   • legacy JSON        : {timed(legacy_load, 7):7.1f} ms")
+    print(f"   • hand-written JSON  : {timed(load, 7):7.1f} ms")
+    print(f"   • binary             : {timed(lambda: profiles_from_bytes(blob), 7):7.1f} ms")
+
+    print(f"\n📏 Size: JSON indent=2 {len(text.encode()) / 1024:.0f} KB | binary {len(blob) / 1024:.0f} KB")
+    legacy_size = sys.getsizeof(next(iter(legacy.values()))) + sys.getsizeof(next(iter(legacy.values())).__dict__)
+    print(f"🧠 Per-object memory: dataclass {legacy_size} B | __slots__ "
+          f"{sys.getsizeof(next(iter(profiles.values())))} B")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("GAME PROFILE SERIALIZATION BENCHMARK")
+    print("=" * 60)
+
+    library = make_profiles(PROFILES)
+    failures = check(library)
+    print(f"🧪 Checks: {failures} failures")
+    benchmark(library)
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧾 NEURO-OS VDF PARSER FUZZ & BENCHMARK
+========================================
+Manifiestos sintéticos de Steam para comprobar y medir src/vdf_parser.py:
+- Fuzz: ida y vuelta dumps/loads, cortes de bloque arbitrarios, documentos
+  mutados (sólo puede fallar con VDFError) y VDF binario con todos los tipos
+  (0x00-0x07, 0x0A) leído entero y truncado en cada posición
+- Benchmark: ACF (parser antiguo por líneas vs loads vs find_keys),
+  libraryfolders.vdf con miles de entradas y appinfo.vdf v28/v29
+"""
+
+import io
+import random
+import struct
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import vdf_parser  # noqa: E402
+
+# Fix UTF-8 encoding for Windows
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+ALPHABET = "abcdefghijklmnopqrstuvwxyz ABCXYZ0123456789_-./:\\\"{}\t\n"
+
+
+def random_text(rng: random.Random, max_len: int = 12) -> str:
+    return ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, max_len)))
+
+
+def random_document(rng: random.Random, depth: int = 0) -> dict:
+    doc = {}
+    for _ in range(rng.randint(1, 6)):
+        key = random_text(rng) or "k"
+        if depth < 4 and rng.random() < 0.3:
+            doc[key] = random_document(rng, depth + 1)
+        else:
+            doc[key] = random_text(rng, 30)
+    return doc
+
+
+def make_acf(appid: int, rng: random.Random) -> str:
+    depots = ''.join(f'\t\t"{appid + d}"\n\t\t{{\n\t\t\t"manifest"\t\t"{rng.getrandbits(63)}"\n'
+                     f'\t\t\t"size"\t\t"{rng.getrandbits(36)}"\n\t\t}}\n' for d in range(rng.randint(1, 4)))
+    return (f'"AppState"\n{{\n\t"appid"\t\t"{appid}"\n\t"Universe"\t\t"1"\n'
+            f'\t"name"\t\t"Synthetic \\"Game\\" {appid}"\n\t"StateFlags"\t\t"4"\n'
+            f'\t"installdir"\t\t"Game {appid}"\n\t"LastUpdated"\t\t"{rng.getrandbits(31)}"\n'
+            f'\t"SizeOnDisk"\t\t"{rng.getrandbits(36)}"\n'
+            f'\t"InstalledDepots" // depots\n\t{{\n{depots}\t}}\n'
+            f'\t"UserConfig"\n\t{{\n\t\t"language"\t\t"english"\n\t}}\n}}\n')
+
+
+def legacy_parse(content: str) -> dict:
+    """El parser anterior de game_scanner (split por líneas)"""
+    result = {}
+    for line in content.split('\n'):
+        if '"name"' in line:
+            result['name'] = line.split('"')[3]
+        elif '"appid"' in line:
+            result['appid'] = line.split('"')[3]
+        elif '"installdir"' in line:
+            result['installdir'] = line.split('"')[3]
+    return result
+
+
+def random_binary(rng: random.Random, depth: int = 0):
+    """
+    Bloque VDF binario con todos los tipos y el dict esperado (binary_dumps
+    sólo escribe mapa/cadena/int32; aquí se escriben a mano los demás)
+    """
+    out, doc = bytearray(), {}
+    kinds = [0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07, 0x0A] + ([0x00] if depth < 3 else [])
+    for _ in range(rng.randint(1, 5)):
+        key = random_text(rng) or "k"
+        kind = rng.choice(kinds)
+        out += bytes([kind]) + key.encode() + b'\0'
+        if kind == 0x00:
+            block, doc[key] = random_binary(rng, depth + 1)
+            out += block + b'\x08'
+        elif kind == 0x01:
+            doc[key] = random_text(rng, 30)
+            out += doc[key].encode() + b'\0'
+        elif kind in (0x02, 0x04, 0x06):
+            doc[key] = rng.randint(-2**31, 2**31 - 1)
+            out += struct.pack('<i', doc[key])
+        elif kind == 0x03:
+            packed = struct.pack('<f', rng.uniform(-1e6, 1e6))
+            doc[key] = struct.unpack('<f', packed)[0]
+            out += packed
+        elif kind == 0x05:
+            doc[key] = ''.join(rng.choice("abcñ€😀 ") for _ in range(rng.randint(0, 8)))
+            out += doc[key].encode('utf-16-le') + b'\0\0'
+        elif kind == 0x07:
+            doc[key] = rng.getrandbits(64)
+            out += struct.pack('<Q', doc[key])
+        else:
+            doc[key] = rng.randint(-2**63, 2**63 - 1)
+            out += struct.pack('<q', doc[key])
+    return bytes(out), doc
+
+
+def write_appinfo(apps: dict, version: int) -> bytes:
+    """appinfo.vdf sintético (v28: claves en línea, v29: tabla de cadenas)"""
+    keys = []
+    index = {}
+
+    def blob(block: dict) -> bytes:
+        out = bytearray()
+        for key, value in block.items():
+            if version >= 29:
+                if key not in index:
+                    index[key] = len(keys)
+                    keys.append(key)
+                bkey = struct.pack('<i', index[key])
+            else:
+                bkey = key.encode() + b'\0'
+            if isinstance(value, dict):
+                out += b'\x00' + bkey + blob(value) + b'\x08'
+            elif isinstance(value, int):
+                out += b'\x02' + bkey + struct.pack('<i', value)
+            else:
+                out += b'\x01' + bkey + value.encode() + b'\0'
+        return bytes(out)
+
+    body = bytearray()
+    for appid, data in apps.items():
+        payload = blob(data) + b'\x08'
+        header = struct.pack('<IIQ', 2, 0, 0) + bytes(20) + struct.pack('<I', 1) + bytes(20)
+        body += struct.pack('<II', appid, len(header) + len(payload)) + header + payload
+    body += struct.pack('<I', 0)
+
+    magic = 0x07564429 if version >= 29 else 0x07564428
+    if version < 29:
+        return struct.pack('<II', magic, 1) + bytes(body)
+    table_offset = 16 + len(body)
+    table = struct.pack('<I', len(keys)) + b''.join(k.encode() + b'\0' for k in keys)
+    return struct.pack('<IIq', magic, 1, table_offset) + bytes(body) + table
+
+
+def fuzz(iterations: int = 2000, seed: int = 1234) -> int:
+    """Devuelve el número de fallos"""
+    rng = random.Random(seed)
+    failures = 0
+    for i in range(iterations):
+        doc = random_document(rng)
+        text = vdf_parser.dumps(doc)
+
+        # 1. Ida y vuelta
+        if vdf_parser.loads(text) != doc:
+            failures += 1
+            print(f"  ❌ round-trip #{i}: {doc!r}")
+            continue
+
+        # 2. Cortes de bloque arbitrarios (tokens partidos entre lecturas)
+        step = rng.randint(1, 9)
+        chunks = [text[j:j + step] for j in range(0, len(text), step)]
+        if vdf_parser._parse(vdf_parser.iter_tokens(chunks)) != doc:
+            failures += 1
+            print(f"  ❌ chunking #{i} (step {step})")
+
+        # 3. Mutaciones: sólo se admite VDFError
+        mutated = list(text)
+        for _ in range(rng.randint(1, 4)):
+            pos = rng.randrange(len(mutated) + 1)
+            if rng.random() < 0.5 and mutated:
+                del mutated[min(pos, len(mutated) - 1)]
+            else:
+                mutated.insert(pos, rng.choice('{}"\\/[] \n'))
+        try:
+            vdf_parser.loads(''.join(mutated))
+        except vdf_parser.VDFError:
+            pass
+        except Exception as e:
+            failures += 1
+            print(f"  ❌ mutation #{i}: {type(e).__name__}: {e}")
+
+        # 4. Binario: ida y vuelta y truncado
+        shortcuts = {'shortcuts': {str(n): {'appid': rng.randint(-2**31, 2**31 - 1),
+                                            'AppName': random_text(rng).replace('\0', ''),
+                                            'Exe': f'"/games/{n}/run"'} for n in range(rng.randint(0, 5))}}
+        blob = vdf_parser.binary_dumps(shortcuts)
+        if vdf_parser.binary_loads(blob)[0] != shortcuts:
+            failures += 1
+            print(f"  ❌ binary round-trip #{i}")
+        try:
+            vdf_parser.binary_loads(blob[:rng.randrange(len(blob))])
+        except vdf_parser.VDFError:
+            pass
+        except Exception as e:
+            failures += 1
+            print(f"  ❌ binary truncation #{i}: {type(e).__name__}: {e}")
+
+        # 5. Binario con todos los tipos (puntero, cadena ancha, color, uint64, int64...)
+        block, expected = random_binary(rng)
+        blob = block + b'\x08'
+        if vdf_parser.binary_loads(blob)[0] != expected:
+            failures += 1
+            print(f"  ❌ binary all-types #{i}: {expected!r}")
+        # Truncado en cada posición: siempre VDFError, nunca bucle infinito ni otra excepción
+        for cut in range(len(blob)):
+            try:
+                vdf_parser.binary_loads(blob[:cut])
+                failures += 1
+                print(f"  ❌ binary all-types #{i}: truncated at {cut} accepted")
+            except vdf_parser.VDFError:
+                pass
+            except Exception as e:
+                failures += 1
+                print(f"  ❌ binary all-types #{i} truncated at {cut}: {type(e).__name__}: {e}")
+    return failures
+
+
+def timed(func, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def benchmark():
+    rng = random.Random(42)
+    acfs = [make_acf(appid, rng) for appid in range(10000, 12000)]
+
+    for acf in acfs[:50]:
+        expected = legacy_parse(acf)
+        expected['name'] = vdf_parser.loads(acf)['AppState']['name']  # El antiguo no des-escapa
+        assert vdf_parser.find_keys(acf, ['appid', 'name', 'installdir']) == expected
+
+    print(f"\n📄 {len(acfs)} ACF manifests:")
+    print(f"   • legacy line split : {timed(lambda: [legacy_parse(a) for a in acfs]):7.1f} ms "
+          "(breaks on escaped quotes)")
+    print(f"   • loads (full tree) : {timed(lambda: [vdf_parser.loads(a) for a in acfs]):7.1f} ms")
+    print(f"   • find_keys (3 keys): "
+          f"{timed(lambda: [vdf_parser.find_keys(a, ['appid', 'name', 'installdir']) for a in acfs]):7.1f} ms")
+
+    library = {'libraryfolders': {str(i): {
+        'path': f'D:\\SteamLibrary{i}', 'label': '', 'contentid': str(rng.getrandbits(63)),
+        'apps': {str(100000 + i * 100 + j): str(rng.getrandbits(36)) for j in range(25)}}
+        for i in range(200)}}
+    text = vdf_parser.dumps(library)
+    assert vdf_parser.loads(text) == library
+    print(f"\n📚 libraryfolders.vdf, 200 libraries / 5000 apps ({len(text) / 1024:.0f} KB): "
+          f"{timed(lambda: vdf_parser.loads(text)):.1f} ms")
+
+    apps = {appid: {'appinfo': {'appid': appid, 'common': {'name': f'App {appid}', 'type': 'Game'},
+                                'config': {'installdir': f'App{appid}', 'launch': {
+                                    '0': {'executable': f'app{appid}.exe', 'type': 'default'}}}}}
+            for appid in range(1, 5001)}
+    import tempfile
+    for version in (28, 29):
+        with tempfile.NamedTemporaryFile(suffix=".vdf", delete=False) as f:
+            f.write(write_appinfo(apps, version))
+            path = f.name
+        everything = vdf_parser.read_appinfo(path)
+        assert everything[4242]['appinfo']['common']['name'] == 'App 4242'
+        assert len(everything) == len(apps)
+        print(f"\n🗃️ appinfo.vdf v{version} (5000 apps): full {timed(lambda: vdf_parser.read_appinfo(path)):.1f} ms"
+              f" | 10 apps {timed(lambda: vdf_parser.read_appinfo(path, app_ids=range(4990, 5000))):.1f} ms")
+        Path(path).unlink()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("VDF PARSER FUZZ & BENCHMARK")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    failures = fuzz()
+    print(f"🧪 Fuzz: 2000 documents, {failures} failures ({time.perf_counter() - start:.1f} s)")
+    benchmark()
+    sys.exit(1 if failures else 0)
@@ -19,8 +19,17 @@ if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
+# Perfilador del arranque: lo primero, para medir también los imports (NEURO_OS_STARTUP_PROFILE=1)
+from startup_profiler import (get_startup_profiler, lazy_module,
+                              STARTUP_REPORT_ENV, STARTUP_EXIT_ENV)
+startup = get_startup_profiler()
+_imports_phase = startup.start("module imports")
+
+import os
 import random
 import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from PySide6.QtWidgets import (QApplication, QMainWindow, QLineEdit, QPushButton, QVBoxLayout, 
@@ -28,19 +37,22 @@ from PySide6.QtWidgets import (QApplication, QMainWindow, QLineEdit, QPushButton
                              QFrame, QComboBox, QCheckBox, QGridLayout, QProgressBar, QTextEdit,
                              QTabWidget, QTableWidget, QTableWidgetItem, QMessageBox, QListWidget, QListWidgetItem, QMenu)
 from PySide6.QtGui import QPixmap, QPainter, QColor, QFont, QLinearGradient, QRadialGradient, QPen
-from PySide6.QtCore import Qt, QTimer, QPoint, QDir
-
-# Config Manager
-from config_manager import ConfigManager
+from PySide6.QtCore import Qt, QTimer, QPoint, QDir, QFileSystemWatcher
 
-# Web Browser
-from web_browser import WebBrowserWindow
+# Config Manager (global: los cambios avisan a todos los widgets suscritos)
+from config_manager import get_config_manager
 
-# Window Capture
-from window_capture import CapturedAppWindow
+# Intervalos de muestreo adaptativos (compartidos por status bar y radar)
+from adaptive_scheduler import AdaptiveInterval, get_system_activity
 
-# Settings Window
-from settings_window import SettingsWindow
+# Subsistemas pesados (lanzamiento, catálogo de juegos, vinculación de perfiles, captura
+# de ventanas): sólo los usa Neuro-GFX, así que se importan al primer uso y la carga queda medida.
+# WebBrowserWindow y SettingsWindow se definen más abajo en este mismo fichero.
+process_supervisor = lazy_module("process_supervisor")
+process_footprint = lazy_module("process_footprint")
+game_catalog = lazy_module("game_catalog")
+profile_binding = lazy_module("profile_binding")
+window_capture = lazy_module("window_capture")
 
 # ============================================================
 # ⚙️ CONFIGURACIÓN Y ESTADOS
@@ -49,6 +61,11 @@ STATE_BOOT = 0
 STATE_LOGIN = 1
 STATE_DESKTOP = 2
 
+# Animación de arranque: el trabajo real ya terminó al construir la ventana, las líneas
+# son sólo estética (antes 1 s por línea + 1 s: ~7 s hasta el login)
+BOOT_LINE_MS = 120
+BOOT_HOLD_MS = 300
+
 # ============================================================
 # 📂 EXPLORADOR DE ARCHIVOS (MODERNO)
 # ============================================================
@@ -214,12 +231,26 @@ class SystemStatusBar(QFrame):
         self.style_icon(btn_user)
         layout.addWidget(btn_user)
         
-        # Timer para actualizar datos (modo extremo: 60s, modo normal: 30s)
+        # Timer adaptativo (base: modo extremo 60s, modo normal 30s)
+        # Con juego/carga baja a 10s; en reposo u oculto hace back-off exponencial
+        config = get_config_manager()
+        self.sampling = AdaptiveInterval(base=self.base_interval(config.get('extreme_optimization')),
+                                         min_interval=10.0, max_interval=120.0,
+                                         hidden_max_interval=600.0, name="status_bar")
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_status)
-        update_interval = 60000 if hasattr(self.parent(), 'extreme_mode') and self.parent().extreme_mode else 30000
-        self.timer.start(update_interval)  # Modo extremo: cada 60s para CPU idle ~4%
+        self.timer.start(self.sampling.current_ms)
         self.update_status() # Primera ejecución
+        # Cambiar el modo extremo re-ajusta la cadencia sin reiniciar
+        config.subscribe('extreme_optimization', self.on_extreme_mode_changed)
+
+    @staticmethod
+    def base_interval(extreme_mode):
+        return 60.0 if extreme_mode else 30.0
+
+    def on_extreme_mode_changed(self, key, enabled, old):
+        self.sampling.set_base(self.base_interval(enabled))
+        self.timer.setInterval(self.sampling.current_ms)
 
     def style_icon(self, btn):
         btn.setFixedSize(30, 30)
@@ -245,6 +276,7 @@ class SystemStatusBar(QFrame):
             cpu_color = "#00ff88" if cpu < 30 else ("#ffaa00" if cpu < 60 else "#ff5555")
             ram_color = "#00ff88" if ram < 50 else ("#ffaa00" if ram < 75 else "#ff5555")
             
+            get_system_activity().report_cpu(cpu)
             self.cpu_lbl.setText(f"CPU: {cpu:.0f}%")
             self.cpu_lbl.setStyleSheet(f"color: {cpu_color}; font-family: 'Consolas'; font-size: 11px; margin-right: 10px;")
             
@@ -280,6 +312,27 @@ class SystemStatusBar(QFrame):
             color = "cyan" if online else "#555"
             self.net_icon.setStyleSheet(f"color: {color}; border: none; background: transparent; font-size: 16px;")
         except: pass
+        
+        self.reschedule()
+
+    def is_on_screen(self):
+        """Visible y con la ventana principal no minimizada"""
+        return self.isVisible() and not self.window().isMinimized()
+
+    def reschedule(self):
+        """Recalcular el intervalo del timer según actividad y visibilidad"""
+        activity = get_system_activity()
+        interval = self.sampling.update(cpu_percent=activity.recent_cpu(),
+                                        game_active=activity.game_active,
+                                        visible=self.is_on_screen())
+        self.timer.setInterval(int(interval * 1000))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Al volver a ser visible, refrescar ya y reiniciar la cadencia
+        if self.sampling.reason == "hidden":
+            self.sampling.reset()
+            self.update_status()
 
 class NeuroMaster(QMainWindow):
     def __init__(self):
@@ -293,10 +346,15 @@ class NeuroMaster(QMainWindow):
         self.setUpdatesEnabled(True)  # Pero permitir updates manuales
         
         # --- CONFIG MANAGER ---
-        self.config = ConfigManager()
+        with startup.phase("config"):
+            self.config = get_config_manager()
+            # Ediciones externas de config.json: se aplican en vivo (os.replace cambia el inodo: re-vigilar)
+            self.config_watcher = QFileSystemWatcher([str(self.config.config_file)], self)
+            self.config_watcher.fileChanged.connect(self.on_config_file_changed)
         
         # --- MODO EXTREMO DE OPTIMIZACIÓN ---
-        self.extreme_mode = self.config.get('extreme_optimization', True)  # Activado por defecto
+        self.extreme_mode = self.config.get('extreme_optimization')  # Activado por defecto
+        self.config.subscribe('extreme_optimization', self.on_extreme_mode_changed)
         
         # --- CARGA DE ASSETS ---
         base_dir = Path(__file__).parent.parent
@@ -314,8 +372,7 @@ class NeuroMaster(QMainWindow):
         self.assets_dir = assets_dir
         
         # Estrellas (modo extremo: 50, modo normal: 150)
-        star_count = 50 if self.extreme_mode else 150
-        self.stars = [(random.randint(0, 3000), random.randint(0, 2000), random.randint(100, 255)) for _ in range(star_count)]
+        self.stars = self.make_stars()
         
         # --- VARIABLES DE ESTADO ---
         # Boot
@@ -338,7 +395,8 @@ class NeuroMaster(QMainWindow):
         self.user_session = None
         
         # --- UI ELEMENTS (FLOTANTES) ---
-        self.init_ui_overlays()
+        with startup.phase("ui overlays"):
+            self.init_ui_overlays()
         
         # --- TIMERS ---
         # Game loop deshabilitado (no necesario, solo repinta cuando hay eventos)
@@ -348,7 +406,7 @@ class NeuroMaster(QMainWindow):
         
         self.boot_timer = QTimer(self)
         self.boot_timer.timeout.connect(self.process_boot)
-        self.boot_timer.start(1000) # 1s para reducir CPU durante boot
+        self.boot_timer.start(BOOT_LINE_MS)  # Un repintado por línea: el coste no depende del intervalo
 
     def init_ui_overlays(self):
         """Inicializa widgets nativos que se superponen al renderizado"""
@@ -508,7 +566,7 @@ class NeuroMaster(QMainWindow):
             self.update() # Forzar repintado
         else:
             self.boot_timer.stop()
-            QTimer.singleShot(1000, self.switch_to_login)
+            QTimer.singleShot(BOOT_HOLD_MS, self.switch_to_login)
 
     def switch_to_login(self):
         self.current_state = STATE_LOGIN
@@ -516,6 +574,17 @@ class NeuroMaster(QMainWindow):
         self.login_widget.show()
         if hasattr(self, 'pass_input'): self.pass_input.setFocus()
         self.update()
+        # Hito: tras procesar el repintado, el login ya acepta entrada
+        QTimer.singleShot(0, self.on_login_interactive)
+
+    def on_login_interactive(self):
+        ms = startup.mark("login_interactive")
+        print(f"[Startup] Login interactive in {ms:.0f} ms")
+        report_path = os.environ.get(STARTUP_REPORT_ENV)
+        if report_path:
+            startup.save(report_path)
+        if os.environ.get(STARTUP_EXIT_ENV) == "1":
+            QApplication.quit()
 
     def attempt_login(self):
         u = self.user_input.text()
@@ -534,6 +603,38 @@ class NeuroMaster(QMainWindow):
         if hasattr(self, 'status_bar'): self.status_bar.show()
         self.center_dock()
         self.update()
+        # Servicios de fondo tras el login: fuera del camino del arranque
+        QTimer.singleShot(0, self.start_background_services)
+
+    def start_background_services(self):
+        """Protección anti-crash guiada por PSI (Linux) y servicio de IA (historial y perfiles)"""
+        if getattr(self, 'protection', None) is not None: return
+        from crash_protection import CrashProtection
+        self.protection = CrashProtection()
+        if sys.platform.startswith('linux') and self.protection.start_psi_backend():
+            print(f"[Protection] PSI backend active: {self.protection.psi.get_status()['triggers']}")
+
+        if self.config.get('performance.ai_service'):
+            from game_profile_manager import get_game_profile_manager
+            from neuro_ai_service import start_ai_service
+            self.profile_manager = get_game_profile_manager()
+            self.ai_service = start_ai_service()
+            self.ai_service.attach_profile_manager(self.profile_manager)
+            self.ai_service.set_auto_optimize(self.config.get('performance.ai_auto_optimize'))
+
+    def stop_background_services(self):
+        if getattr(self, 'protection', None) is not None:
+            self.protection.stop_psi_backend()
+            self.protection = None
+        if getattr(self, 'ai_service', None) is not None:
+            from neuro_ai_service import stop_ai_service
+            stop_ai_service()
+            self.ai_service = None
+            self.profile_manager.save_profiles()
+
+    def closeEvent(self, event):
+        self.stop_background_services()
+        super().closeEvent(event)
 
     # --- GAME LOOP (PAINT EVENT) ---
     def paintEvent(self, event):
@@ -555,6 +656,20 @@ class NeuroMaster(QMainWindow):
         elif self.current_state == STATE_DESKTOP:
             self.draw_desktop_screen(p)
 
+    def make_stars(self):
+        star_count = 50 if self.extreme_mode else 150
+        return [(random.randint(0, 3000), random.randint(0, 2000), random.randint(100, 255)) for _ in range(star_count)]
+
+    def on_extreme_mode_changed(self, key, enabled, old):
+        self.extreme_mode = enabled
+        self.stars = self.make_stars()
+        self.update()
+
+    def on_config_file_changed(self, path):
+        self.config.reload_if_changed()
+        if path not in self.config_watcher.files() and Path(path).exists():
+            self.config_watcher.addPath(path)
+
     def draw_background(self, p):
         # Modo extremo: fondo simple sin cache
         if hasattr(self, 'extreme_mode') and self.extreme_mode:
@@ -657,13 +772,15 @@ class NeuroMaster(QMainWindow):
     # --- ACCIONES DEL SISTEMA ---
     def open_files(self):
         print("📂 Abriendo Explorador de Archivos...")
-        self.files_app = FileExplorerWindow(self)
+        with startup.window("FileExplorerWindow"):
+            self.files_app = FileExplorerWindow(self)
         self.files_app.show()
 
     def open_net(self):
         print("🌐 Abriendo Navegador Integrado...")
         # Usar navegador integrado de Neuro-OS (dentro del desktop)
-        self.browser_app = WebBrowserWindow(self)
+        with startup.window("WebBrowserWindow"):
+            self.browser_app = WebBrowserWindow(self)
         self.browser_app.show()
         
         # Feedback visual en Dock
@@ -672,12 +789,14 @@ class NeuroMaster(QMainWindow):
 
     def open_terminal(self):
         print("💻 Abriendo Terminal...")
-        self.term_app = TerminalWindow(self)
+        with startup.window("TerminalWindow"):
+            self.term_app = TerminalWindow(self)
         self.term_app.show()
 
     def open_music(self):
         print("🎵 Abriendo Reproductor Neural...")
-        self.music_app = MusicPlayerWindow(self)
+        with startup.window("MusicPlayerWindow"):
+            self.music_app = MusicPlayerWindow(self)
         self.music_app.show()
 
     def open_gfx(self):
@@ -699,12 +818,14 @@ class NeuroMaster(QMainWindow):
         """))
         
         # Abrir Monitor Real
-        self.gfx_app = GFXOptimizerWindow(self)
+        with startup.window("GFXOptimizerWindow"):
+            self.gfx_app = GFXOptimizerWindow(self)
         self.gfx_app.show()
 
     def open_settings(self):
         print("⚙️ Abriendo Configuración...")
-        self.settings_app = SettingsWindow(self)
+        with startup.window("SettingsWindow"):
+            self.settings_app = SettingsWindow(self, config_manager=self.config)
         self.settings_app.show()
 
     # --- UTILIDADES ---
@@ -977,16 +1098,23 @@ class GFXOptimizerWindow(QWidget):
         try:
             import psutil
             self.psutil = psutil
+            self.stats_sampling = AdaptiveInterval(base=2.0, min_interval=1.0, max_interval=10.0,
+                                                   hidden_max_interval=60.0, name="gfx_stats")
             self.timer = QTimer(self)
             self.timer.timeout.connect(self.update_stats)
-            self.timer.start(2000) # Actualizar cada 2s
+            self.timer.start(self.stats_sampling.current_ms) # Base 2s, adaptativo
             self.log("System Monitor: ONLINE (psutil detected)")
             
-            # Auto-Start Radar Service (intervalo muy largo para bajo consumo)
+            # Auto-Start Radar Service (adaptativo: 2s buscando/jugando, hasta 60s en reposo)
+            self.radar_sampling = AdaptiveInterval(base=10.0, min_interval=2.0, max_interval=60.0,
+                                                   hidden_max_interval=120.0, name="radar")
             self.monitor_timer = QTimer(self)
             self.monitor_timer.timeout.connect(self.detect_running_game)
-            self.monitor_timer.start(10000) # Scan every 10s - Ultra optimizado
-            self.log("🛡️ BACKGROUND RADAR: Active (Low Power Mode)")
+            config = get_config_manager()
+            self.on_radar_setting_changed("performance.enable_radar", config.get("performance.enable_radar"), None)
+            config.subscribe("performance.enable_radar", self.on_radar_setting_changed)
+            # Catálogo de juegos instalados: el radar reconoce sus procesos aunque no pesen
+            game_catalog.get_game_catalog().refresh_async()
         except ImportError:
             self.log("System Monitor: OFFLINE (psutil missing)")
 
@@ -1120,6 +1248,37 @@ class GFXOptimizerWindow(QWidget):
         ram = self.psutil.virtual_memory().percent
         self.cpu_label.setText(f"CPU: {cpu}%")
         self.ram_label.setText(f"RAM: {ram}%")
+        
+        activity = get_system_activity()
+        activity.report_cpu(cpu)
+        interval = self.stats_sampling.update(cpu_percent=cpu, game_active=activity.game_active,
+                                              visible=self.is_on_screen())
+        self.timer.setInterval(int(interval * 1000))
+
+    def is_on_screen(self):
+        return self.isVisible() and not self.isMinimized()
+
+    def on_radar_setting_changed(self, key, enabled, old):
+        """Activar/parar el radar de fondo en vivo desde la configuración"""
+        if enabled:
+            self.monitor_timer.start(self.radar_sampling.current_ms)
+            self.log("🛡️ BACKGROUND RADAR: Active (Adaptive Low Power Mode)")
+        elif "SCANNING" not in self.btn_launch.text():
+            # Un lanzamiento en curso sigue buscando su proceso (start_radar)
+            self.monitor_timer.stop()
+            self.log("🛡️ BACKGROUND RADAR: Disabled in settings")
+
+    def reschedule_radar(self, scanning=False):
+        """Recalcular la cadencia del radar tras cada pasada"""
+        activity = get_system_activity()
+        if scanning:
+            # Esperando a que aparezca el juego lanzado: mantener ráfaga
+            interval = self.radar_sampling.tighten("scanning")
+        else:
+            interval = self.radar_sampling.update(cpu_percent=activity.recent_cpu(),
+                                                  game_active=activity.game_active,
+                                                  visible=self.is_on_screen())
+        self.monitor_timer.setInterval(int(interval * 1000))
 
     def log(self, text):
         self.log_area.append(f"> {text}")
@@ -1145,9 +1304,10 @@ class GFXOptimizerWindow(QWidget):
         self.btn_launch.setStyleSheet("background: #444400; color: #ff0; border: 1px solid #ff0;")
         
         self.search_retries = 0
-        self.monitor_timer = QTimer(self)
-        self.monitor_timer.timeout.connect(self.detect_running_game)
-        self.monitor_timer.start(2000) # Check every 2s
+        # Reutilizar el timer del radar en modo ráfaga (2s) en vez de crear otro
+        if not hasattr(self, 'radar_sampling'): return
+        self.radar_sampling.tighten("scanning")
+        self.monitor_timer.start(self.radar_sampling.current_ms)
 
     def detect_running_game(self):
         """Servicio constante de detección y optimización de juegos"""
@@ -1165,12 +1325,19 @@ class GFXOptimizerWindow(QWidget):
         try:
             # Buscar procesos pesados nuevos
             current_pids = set()
-            for p in self.psutil.process_iter(['pid', 'name', 'memory_info']):
+            footprints = process_footprint.get_footprint_sampler().begin_pass()
+            binder = profile_binding.get_profile_binder()
+            catalog = binder.catalog
+            for p in self.psutil.process_iter(['pid', 'name', 'exe', 'create_time', 'memory_info']):
                 try:
                     pid = p.info['pid']
                     current_pids.add(pid)
                     
                     if pid in self.optimized_pids: continue # Ya optimizado
+                    if process_supervisor.get_process_supervisor().owns(pid):
+                        # Lanzado por el supervisor: nació con los ajustes aplicados
+                        self.optimized_pids.add(pid)
+                        continue
                     
                     name = p.info['name'].lower()
                     # Filtro rápido
@@ -1178,15 +1345,29 @@ class GFXOptimizerWindow(QWidget):
                     if "service" in name or "helper" in name or "host" in name or "nvidia" in name: continue
                     
                     # Heurística: Memoria > 250MB (Juegos gordos)
+                    # PSS <= RSS: sólo se mide (con presupuesto y caché) lo que ya pasa el umbral en RSS
                     mem_mb = p.info['memory_info'].rss / (1024 * 1024)
+                    if mem_mb > 250:
+                        mem_mb = footprints.footprint_of(p).mb
                     
                     is_heavy = mem_mb > 250
                     is_target = self.txt_path.text() and Path(self.txt_path.text()).name.lower() in name
+                    # Sólo se vinculan candidatos: el LRU del vinculador no da vueltas con cada proceso
+                    if not (is_heavy or is_target or catalog.by_exe(p.info['exe'], p.info['name']) is not None):
+                        continue
+                    # Juego y perfil del proceso (caché por exe + create_time: una consulta por pasada)
+                    binding, _ = binder.bind(p.info)
+                    game = binding.game
                     
-                    if is_heavy or is_target:
-                        self.log(f"⚡ AUTO-DETECT: {p.info['name']} ({int(mem_mb)}MB)")
-                        self.optimize_process(p)
+                    # Pesado no basta: el perfil de juego (prioridad alta, afinidad, slice) sólo
+                    # para juegos confirmados (catálogo, perfil propio o el objetivo lanzado)
+                    if is_target or game is not None or binding.profile is not None:
+                        label = f"{game.name} [{game.launcher}]" if game else p.info['name']
+                        self.log(f"⚡ AUTO-DETECT: {label} ({int(mem_mb)}MB)")
                         self.optimized_pids.add(pid)
+                        # Antes de optimizar: el juego ya cuenta como juego para reclaim y limitadores
+                        get_system_activity().set_game_active(True, p.info['name'], pid)
+                        self.optimize_process(p, binding)
                         
                         # Actualizar botón si estábamos esperando
                         if is_target or "SCANNING" in self.btn_launch.text() or "WAITING" in self.btn_launch.text():
@@ -1198,16 +1379,131 @@ class GFXOptimizerWindow(QWidget):
             
             # Limpiar PIDs muertos del set
             self.optimized_pids.intersection_update(current_pids)
+            binder.forget_dead(current_pids)
+            activity = get_system_activity()
+            if not self.optimized_pids and activity.game_active:
+                activity.set_game_active(False)
+                self.restore_self_affinity()
+                # El juego terminó: devolver los procesos en segundo plano a su cgroup
+                if sys.platform.startswith('linux'):
+                    from cgroup_partition import get_partition_manager
+                    partitions = get_partition_manager()
+                    if partitions.is_claimed("game"):
+                        partitions.restore(owner="game")
+                        self.log("🧱 Background limits released (game closed)")
                     
         except Exception: 
             pass
+        
+        if hasattr(self, 'radar_sampling'):
+            self.reschedule_radar(scanning="SCANNING" in self.btn_launch.text())
 
-    def optimize_process(self, proc):
+    def optimize_process(self, proc, binding=None):
+        """
+        Aplicar el perfil del juego (o el de por defecto) en un solo lote, en
+        un hilo aparte: con muchos hilos en el juego tarda y el radar corre en
+        el timer de la interfaz. El resultado se registra en finish_optimizations
+        """
+        binder = profile_binding.get_profile_binder()
         try:
-            proc.nice(self.psutil.HIGH_PRIORITY_CLASS)
-            self.log(f"⚡ OPTIMIZATION APPLIED: High Priority set for {proc.name()}")
+            if binding is None:
+                binding, _ = binder.bind(proc.as_dict(['pid', 'name', 'exe', 'create_time']))
         except Exception as e:
             self.log(f"⚠️ Optimization Error: {e}")
+            return
+        if not hasattr(self, 'optimize_executor'):
+            self.optimize_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ProfileApply")
+            self.optimize_done = deque()  # Rellenada por el hilo, vaciada en el de la interfaz
+            self.optimize_pending = 0
+            self.optimize_poll = QTimer(self)
+            self.optimize_poll.timeout.connect(self.finish_optimizations)
+        future = self.optimize_executor.submit(binder.apply, binding)
+        future.add_done_callback(lambda f, proc=proc, binding=binding: self.optimize_done.append((proc, binding, f)))
+        self.optimize_pending += 1
+        if not self.optimize_poll.isActive():
+            self.optimize_poll.start(100)
+
+    def finish_optimizations(self):
+        """Registrar los perfiles aplicados por el hilo (en el hilo de la interfaz)"""
+        while self.optimize_done:
+            proc, binding, future = self.optimize_done.popleft()
+            self.optimize_pending -= 1
+            try:
+                future.result()
+            except Exception as e:
+                self.log(f"⚠️ Optimization Error: {e}")
+                continue
+            self.report_optimization(proc, binding)
+        if self.optimize_pending <= 0:
+            self.optimize_poll.stop()
+
+    def report_optimization(self, proc, binding):
+        """Registrar el perfil aplicado y reservar núcleos para Neuro-OS según su plan"""
+        self.log(f"⚡ OPTIMIZATION APPLIED: {binding.summary()} ({binding.apply_ms:.0f} ms)")
+        for error in binding.errors:
+            self.log(f"⚠️ Optimization Error: {error}")
+        plan = binding.plan
+        if plan is not None and plan.game_cpus != plan.neuro_cpus:
+            try:
+                self.reserve_self_cpus(plan)
+            except Exception as e:
+                self.log(f"⚠️ Affinity Error: {e}")
+        self.learn_cache_manifest(proc)
+
+    def learn_cache_manifest(self, proc):
+        """Primer arranque detectado: aprender qué ficheros lee para precargarlos la próxima vez"""
+        try:
+            from cache_warmer import get_cache_warmer
+            exe = proc.exe()
+            warmer = get_cache_warmer()
+            if exe and not warmer.has_manifest(exe) and warmer.record_async(exe, proc.pid):
+                self.log(f"🔥 CACHE: learning startup reads of {Path(exe).name}")
+        except Exception:
+            pass
+
+    def reserve_self_cpus(self, plan):
+        """Mover Neuro-OS a los núcleos que el plan deja libres"""
+        me = self.psutil.Process()
+        if not hasattr(self, 'saved_self_affinity'):
+            self.saved_self_affinity = me.cpu_affinity()
+        me.cpu_affinity(plan.neuro_cpus)
+        self.log(f"🧩 AFFINITY: game → CPUs {plan.game_cpus} | Neuro-OS → {plan.neuro_cpus} ({plan.reason})")
+
+    def game_spawn_settings(self):
+        """Ajustes con los que nace el juego (prioridad, afinidad, E/S, cgroup) y su plan de CPU"""
+        plan = None
+        try:
+            from cpu_topology import get_affinity_planner
+            plan = get_affinity_planner().plan()
+        except Exception as e:
+            self.log(f"⚠️ Affinity Error: {e}")
+        return process_supervisor.SpawnSettings.for_game("high", plan=plan), plan
+
+    def adopt_spawned_game(self, tree, plan):
+        """El juego ya nació optimizado: el radar no debe volver a tocarlo"""
+        if not hasattr(self, 'optimized_pids'): self.optimized_pids = set()
+        self.optimized_pids.update(tree.pids)
+        self.log(f"⚡ SPAWNED OPTIMIZED: {', '.join(tree.applied) or 'default settings'}")
+        for error in tree.errors:
+            self.log(f"⚠️ Spawn: {error}")
+        if plan is not None and plan.game_cpus != plan.neuro_cpus:
+            try:
+                self.reserve_self_cpus(plan)
+            except Exception as e:
+                self.log(f"⚠️ Affinity Error: {e}")
+        get_system_activity().set_game_active(True, Path(tree.argv[0]).name, tree.pid)
+        try:
+            self.learn_cache_manifest(self.psutil.Process(tree.pid))
+        except self.psutil.Error:
+            pass
+
+    def restore_self_affinity(self):
+        if hasattr(self, 'saved_self_affinity'):
+            try:
+                self.psutil.Process().cpu_affinity(self.saved_self_affinity)
+            except Exception:
+                pass
+            del self.saved_self_affinity
 
     def launch_engine(self):
         target = self.txt_path.text().strip()
@@ -1233,8 +1529,12 @@ class GFXOptimizerWindow(QWidget):
             if target.startswith("steam://"):
                  self.log(f"Launching Steam App ID: {target.split('/')[-1]}")
                  self.log("⚠️ Steam apps cannot be captured yet. Opening externally...")
-                 import os
-                 os.startfile(target)
+                 if sys.platform == 'win32':
+                     import os
+                     os.startfile(target)
+                 else:
+                     import subprocess
+                     subprocess.Popen(["xdg-open", target])
                  self.log("Steam command sent. Game should start momentarily.")
                  self.start_radar()
                  return
@@ -1245,10 +1545,16 @@ class GFXOptimizerWindow(QWidget):
             # Extraer nombre de la aplicación
             app_name = Path(target).stem
             
+            # Prioridad, afinidad, E/S y cgroup aplicados en el propio lanzamiento
+            settings, plan = self.game_spawn_settings()
+            
             # Crear ventana de captura
             try:
-                self.captured_app = CapturedAppWindow(target, app_name, parent=self)
+                self.captured_app = window_capture.CapturedAppWindow(target, app_name, parent=self,
+                                                                     spawn_settings=settings)
                 self.captured_app.show()
+                if self.captured_app.process is not None:
+                    self.adopt_spawned_game(self.captured_app.process, plan)
                 self.log(f"✅ {app_name} launched in Neuro-OS Container!")
                 self.log("📡 Window capture active. App will appear inside Neuro-OS.")
             except Exception as e:
@@ -1256,9 +1562,10 @@ class GFXOptimizerWindow(QWidget):
                 self.log("Falling back to external launch...")
                 
                 # Fallback: Lanzar externamente
-                import subprocess
                 try:
-                    subprocess.Popen([target], shell=True, cwd=str(Path(target).parent))
+                    external = process_supervisor.get_process_supervisor().spawn([target], cwd=str(Path(target).parent),
+                                                              settings=settings)
+                    self.adopt_spawned_game(external, plan)
                     self.log("Target launched externally (not captured).")
                 except Exception as e2:
                     self.log(f"CRITICAL: Could not launch target. {e2}")
@@ -1718,6 +2025,10 @@ class SettingsWindow(QWidget):
         self.chk_radar.setChecked(self.config.get("performance.enable_radar", True) if self.config else True)
         neuro_layout.addWidget(self.chk_radar)
         
+        self.chk_extreme = QCheckBox("Extreme Optimization Mode (fewer effects, slower refresh)")
+        self.chk_extreme.setChecked(self.config.get("extreme_optimization", True) if self.config else True)
+        neuro_layout.addWidget(self.chk_extreme)
+        
         neuro_layout.addStretch()
         tabs.addTab(tab_neuro, "🧠 Neuro-OS")
         
@@ -1881,12 +2192,14 @@ class SettingsWindow(QWidget):
             return
         
         # Guardar configuraciones
-        self.config.set("file_explorer.default_path", self.txt_file_path.text())
-        
         browser_map = {0: "auto", 1: "opera", 2: "chrome", 3: "edge", 4: "firefox", 5: "custom"}
-        self.config.set("browser.preferred", browser_map[self.combo_browser.currentIndex()])
-        self.config.set("browser.custom_path", self.txt_browser_path.text())
-        self.config.set("performance.enable_radar", self.chk_radar.isChecked())
+        values = {
+            "file_explorer.default_path": self.txt_file_path.text(),
+            "browser.preferred": browser_map[self.combo_browser.currentIndex()],
+            "browser.custom_path": self.txt_browser_path.text(),
+            "performance.enable_radar": self.chk_radar.isChecked(),
+            "extreme_optimization": self.chk_extreme.isChecked(),
+        }
         
         # Guardar custom apps
         apps_list = []
@@ -1902,21 +2215,29 @@ class SettingsWindow(QWidget):
                 name = icon_name[2:].strip() if len(icon_name) > 2 else "App"
                 apps_list.append({"name": name, "path": path, "icon": icon})
         
-        self.config.set("custom_apps", apps_list)
+        values["custom_apps"] = apps_list
+        # Un lote: una sola escritura y un aviso por clave cambiada (radar y modo extremo se aplican ya)
+        self.config.update(values, flush=True)
         
-        QMessageBox.information(self, "Success", "✅ Settings saved successfully!\n\nRestart Neuro-OS for changes to take full effect.")
+        QMessageBox.information(self, "Success", "✅ Settings saved successfully!")
     
     def run_cmd(self, cmd):
         import os
         os.system(cmd)
 
+startup.stop(_imports_phase)
+
+
 if __name__ == "__main__":
     print(">>> LANZANDO NEURO-OS MASTER EDITION...")
-    app = QApplication(sys.argv)
-    
-    app.setFont(QFont("Segoe UI", 10))
+    with startup.phase("qapplication"):
+        app = QApplication(sys.argv)
+        app.setFont(QFont("Segoe UI", 10))
     
-    master = NeuroMaster()
-    master.showFullScreen()
+    with startup.window("NeuroMaster"):
+        master = NeuroMaster()
+    with startup.phase("show"):
+        master.showFullScreen()
+    startup.mark("window_shown")
     
     sys.exit(app.exec())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ ADAPTIVE SCHEDULER
+Intervalos de muestreo adaptativos compartidos por los bucles de monitoreo
+(NeuroAIService, SystemStatusBar, radar de juegos)
+
+- Juego detectado o carga subiendo  -> intervalo mínimo (más muestras)
+- Sistema en reposo                 -> back-off exponencial hasta el máximo
+- Ventana oculta o minimizada       -> back-off exponencial hasta el máximo "hidden"
+  (salvo con juego activo: el radar debe seguir viendo cuándo termina)
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+
+class SystemActivity:
+    """Estado de actividad compartido entre bucles (quién juega, cuánta carga)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.game_active = False
+        self.game_name: Optional[str] = None
+        self.game_pids = set()
+        self.cpu_percent: Optional[float] = None
+        self.cpu_timestamp = 0.0
+
+    def set_game_active(self, active: bool, name: Optional[str] = None, pid: Optional[int] = None):
+        """Lo llama el radar al detectar (o perder) un juego"""
+        with self._lock:
+            self.game_active = active
+            self.game_name = name if active else None
+            if not active:
+                self.game_pids.clear()
+            elif pid is not None:
+                self.game_pids.add(pid)
+
+    def snapshot_game_pids(self) -> set:
+        """Copia de los PIDs del juego (el radar los modifica desde otro hilo)"""
+        with self._lock:
+            return set(self.game_pids)
+
+    def report_cpu(self, cpu_percent: float):
+        """Cualquier bucle que mida CPU publica aquí su muestra"""
+        with self._lock:
+            self.cpu_percent = cpu_percent
+            self.cpu_timestamp = time.time()
+
+    def recent_cpu(self, max_age: float = 10.0) -> Optional[float]:
+        """Última muestra de CPU si es reciente (evita medir dos veces)"""
+        with self._lock:
+            if self.cpu_percent is not None and time.time() - self.cpu_timestamp <= max_age:
+                return self.cpu_percent
+            return None
+
+
+class AdaptiveInterval:
+    """Intervalo de muestreo que se ajusta a la actividad del sistema"""
+
+    def __init__(self, base: float, min_interval: float, max_interval: float,
+                 hidden_max_interval: Optional[float] = None, backoff: float = 2.0,
+                 idle_cpu: float = 15.0, busy_cpu: float = 60.0, rise_cpu: float = 15.0,
+                 name: str = "interval"):
+        """
+        Args:
+            base: Intervalo normal en segundos
+            min_interval: Intervalo con juego activo o carga subiendo
+            max_interval: Tope del back-off con la ventana visible
+            hidden_max_interval: Tope del back-off con la ventana oculta
+            backoff: Factor multiplicativo del back-off
+            idle_cpu: % de CPU por debajo del cual se considera reposo
+            busy_cpu: % de CPU por encima del cual se considera carga alta
+            rise_cpu: Subida de CPU (puntos) entre muestras que cuenta como carga subiendo
+        """
+        self.name = name
+        self.base = base
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.hidden_max_interval = hidden_max_interval or max_interval * 4
+        self.backoff = backoff
+        self.idle_cpu = idle_cpu
+        self.busy_cpu = busy_cpu
+        self.rise_cpu = rise_cpu
+
+        self.current = base
+        self.reason = "base"
+        self._last_cpu: Optional[float] = None
+
+    @property
+    def rate_hz(self) -> float:
+        """Frecuencia de muestreo actual"""
+        return 1.0 / self.current if self.current > 0 else 0.0
+
+    @property
+    def current_ms(self) -> int:
+        """Intervalo actual en milisegundos (para QTimer)"""
+        return int(self.current * 1000)
+
+    def set_base(self, base: float):
+        """Cambiar el intervalo base (p.ej. desde la configuración) y aplicarlo ya"""
+        self.base = base
+        self.reset()
+
+    def reset(self):
+        """Volver al intervalo base (p.ej. al volver a mostrarse la ventana)"""
+        self.current = self.base
+        self.reason = "base"
+        return self.current
+
+    def tighten(self, reason: str = "forced"):
+        """Saltar al intervalo mínimo (p.ej. al lanzar un juego)"""
+        self.current = self.min_interval
+        self.reason = reason
+        return self.current
+
+    def update(self, cpu_percent: Optional[float] = None, game_active: bool = False,
+               visible: bool = True) -> float:
+        """
+        Recalcular el intervalo con la última observación
+
+        Returns:
+            Nuevo intervalo en segundos
+        """
+        rising = (cpu_percent is not None and self._last_cpu is not None
+                  and cpu_percent - self._last_cpu >= self.rise_cpu)
+        if cpu_percent is not None:
+            self._last_cpu = cpu_percent
+
+        if game_active:
+            # Con juego activo manda el juego aunque la ventana esté oculta
+            self.current = self.min_interval
+            self.reason = "game"
+        elif not visible:
+            # Nadie está mirando: back-off exponencial agresivo
+            self.current = min(max(self.current, self.base) * self.backoff, self.hidden_max_interval)
+            self.reason = "hidden"
+        elif rising or (cpu_percent is not None and cpu_percent >= self.busy_cpu):
+            self.current = max(self.min_interval, min(self.current, self.base) / self.backoff)
+            self.reason = "load"
+        elif cpu_percent is not None and cpu_percent < self.idle_cpu:
+            self.current = min(max(self.current, self.base) * self.backoff, self.max_interval)
+            self.reason = "idle"
+        else:
+            # Carga normal: volver al intervalo base
+            self.current = self.base
+            self.reason = "base"
+
+        return self.current
+
+    def get_status(self) -> Dict:
+        """Estado actual (expuesto en get_status() de los servicios)"""
+        return {
+            'name': self.name,
+            'interval_s': self.current,
+            'rate_hz': self.rate_hz,
+            'reason': self.reason,
+            'base_s': self.base
+        }
+
+
+# Instancia global compartida
+_activity: Optional[SystemActivity] = None
+
+def get_system_activity() -> SystemActivity:
+    """Obtener el estado de actividad global"""
+    global _activity
+    if _activity is None:
+        _activity = SystemActivity()
+    return _activity
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("ADAPTIVE SCHEDULER TEST")
+    print("=" * 60)
+
+    interval = AdaptiveInterval(base=2.0, min_interval=0.5, max_interval=30.0, name="demo")
+    scenarios = [
+        ("idle", 3.0, False, True), ("idle", 4.0, False, True), ("idle", 2.0, False, True),
+        ("load rising", 40.0, False, True), ("normal", 35.0, False, True),
+        ("game", 70.0, True, True), ("game hidden", 70.0, True, False),
+        ("hidden", 5.0, False, False), ("hidden", 5.0, False, False)
+    ]
+    for label, cpu, game, visible in scenarios:
+        interval.update(cpu_percent=cpu, game_active=game, visible=visible)
+        print(f"  {label:12s} cpu={cpu:5.1f}% -> {interval.current:6.2f}s "
+              f"({interval.rate_hz:.2f} Hz, {interval.reason})")
+    interval.set_base(5.0)
+    print(f"  set_base(5) -> {interval.current:6.2f}s ({interval.reason})")
@@ -6,35 +6,28 @@ Gestiona aplicaciones personalizadas del usuario
 Sin escaneo automático - Solo configuración manual
 """
 
-import json
 from pathlib import Path
 from typing import List, Dict, Optional
 
+from persistence import get_store
+
 class AppManager:
     """Gestor de aplicaciones personalizadas"""
     
     def __init__(self, config_file: str = "config.json"):
+        # Misma carpeta que ConfigManager: ambos comparten el almacén de config.json
         self.config_file = Path(config_file)
+        if not self.config_file.is_absolute():
+            self.config_file = Path(__file__).parent / self.config_file
+        self.store = get_store(self.config_file, indent=4)
         self.apps: List[Dict] = []
         self.load_apps()
     
     def load_apps(self) -> List[Dict]:
         """Cargar apps desde config.json"""
-        try:
-            if self.config_file.exists():
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.apps = data.get('custom_apps', [])
-                    print(f"[AppManager] Loaded {len(self.apps)} apps")
-            else:
-                # Crear config por defecto
-                self.apps = []
-                self.save_apps()
-                print("[AppManager] Created default config")
-        except Exception as e:
-            print(f"[AppManager] Error loading apps: {e}")
-            self.apps = []
-        
+        config = self.store.load()
+        self.apps = config.setdefault('custom_apps', [])
+        print(f"[AppManager] Loaded {len(self.apps)} apps")
         return self.apps
     
     def add_app(self, name: str, path: str, icon: str = "🎮") -> bool:
@@ -97,28 +90,10 @@ class AppManager:
         return self.apps
     
     def save_apps(self) -> bool:
-        """Guardar apps en config.json"""
-        try:
-            # Cargar config existente o crear nuevo
-            if self.config_file.exists():
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-            else:
-                config = {}
-            
-            # Actualizar custom_apps
-            config['custom_apps'] = self.apps
-            
-            # Guardar
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
-            
-            print(f"[AppManager] Saved {len(self.apps)} apps to {self.config_file}")
-            return True
-        
-        except Exception as e:
-            print(f"[AppManager] Error saving apps: {e}")
-            return False
+        """Guardar apps en config.json (en diferido, sin releer el fichero)"""
+        self.store.data['custom_apps'] = self.apps
+        self.store.mark_dirty()
+        return True
 
 
 if __name__ == "__main__":
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📁 APP PATHS
+Carpetas de usuario de Neuro-OS para cachés y datos generados
+
+- Caché (se puede borrar sin perder nada): índices de juegos, manifiestos de
+  precarga, caché del rastreador de ficheros
+  Linux: $XDG_CACHE_HOME/neuro-os (~/.cache/neuro-os)
+  Windows: %LOCALAPPDATA%\\Neuro-OS\\Cache
+  macOS: ~/Library/Caches/Neuro-OS
+- Datos (historial, base de datos): $XDG_DATA_HOME/neuro-os,
+  %LOCALAPPDATA%\\Neuro-OS, ~/Library/Application Support/Neuro-OS
+- NEURO_OS_CACHE_DIR / NEURO_OS_DATA_DIR fuerzan otra carpeta (tests, portable)
+
+Nada de esto se escribe en src/: el árbol del código queda limpio.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+APP_NAME = "neuro-os"
+CACHE_DIR_ENV = "NEURO_OS_CACHE_DIR"
+DATA_DIR_ENV = "NEURO_OS_DATA_DIR"
+
+
+def _base(env: str, xdg: str, xdg_default: str, windows_sub: str, mac_sub: str) -> Path:
+    override = os.environ.get(env)
+    if override:
+        return Path(override)
+    if sys.platform == 'win32':
+        local = os.environ.get('LOCALAPPDATA') or str(Path.home() / "AppData" / "Local")
+        return Path(local) / "Neuro-OS" / windows_sub if windows_sub else Path(local) / "Neuro-OS"
+    if sys.platform == 'darwin':
+        return Path.home() / "Library" / mac_sub / "Neuro-OS"
+    return Path(os.environ.get(xdg) or Path.home() / xdg_default) / APP_NAME
+
+
+def user_cache_dir(*parts: str, create: bool = True) -> Path:
+    """Carpeta de caché (opcionalmente una subcarpeta), creada si no existe"""
+    path = _base(CACHE_DIR_ENV, 'XDG_CACHE_HOME', ".cache", "Cache", "Caches").joinpath(*parts)
+    if create:
+        path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def user_data_dir(*parts: str, create: bool = True) -> Path:
+    """Carpeta de datos persistentes, creada si no existe"""
+    path = _base(DATA_DIR_ENV, 'XDG_DATA_HOME', ".local/share", "", "Application Support").joinpath(*parts)
+    if create:
+        path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def user_cache_file(name: str) -> Path:
+    """Fichero de caché con nombre dado"""
+    return user_cache_dir() / name
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("APP PATHS")
+    print("=" * 60)
+    print(f"Cache: {user_cache_dir(create=False)}")
+    print(f"Data:  {user_data_dir(create=False)}")
@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔥 CACHE WARMER
+Precalentamiento de la caché de páginas aprendido por juego
+
+1. Grabación: durante el arranque del juego se muestrean /proc/<pid>/io
+   (bytes leídos), los ficheros abiertos (/proc/<pid>/fd) y los mapeados
+   (/proc/<pid>/maps) del proceso y sus hijos. La grabación termina cuando
+   las lecturas se estabilizan (fin de la carga) o al agotar el tiempo.
+2. Manifiesto: ficheros en orden de primer acceso, guardado por juego.
+3. Reproducción: en el siguiente lanzamiento se precargan en paralelo
+   (posix_fadvise WILLNEED / mmap+madvise) dentro de un presupuesto de RAM.
+4. Medida: residencia en caché con mincore() antes de precargar y cuando el
+   readahead asíncrono se ha estabilizado.
+
+Los manifiestos se guardan en la carpeta de caché del usuario (app_paths),
+con clave por carpeta de instalación: dos juegos con un "game.exe" no
+comparten manifiesto.
+"""
+
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import mmap
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import psutil
+
+from app_paths import user_cache_dir
+
+IS_LINUX = sys.platform.startswith('linux')
+PAGE_SIZE = mmap.PAGESIZE
+MANIFEST_SUBDIR = "cache_manifests"
+MANIFEST_VERSION = 2  # v2: clave por carpeta de instalación
+
+# Ficheros que nunca merece la pena precargar
+_SKIP_PREFIXES = ("/proc/", "/sys/", "/dev/", "/run/", "/memfd:", "anon_inode:",
+                  "socket:", "pipe:")
+
+
+def _slug(text: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '_', text.lower()).strip('_') or "game"
+
+
+def game_directory(game) -> Optional[str]:
+    """
+    Carpeta de instalación de un Game, o la raíz del juego de un ejecutable
+    (catálogo o heurística de launch_pipeline.game_root)
+    """
+    install_dir = getattr(game, 'install_dir', None)
+    if install_dir:
+        return str(Path(install_dir).resolve())
+    path = game if isinstance(game, str) else getattr(game, 'path', None)
+    if not path or "://" in path or not ('/' in path or '\\' in path):
+        return None
+    p = Path(path)
+    if p.is_dir():
+        return str(p.resolve())
+    from launch_pipeline import game_root
+    return str(game_root(path))
+
+
+def game_key(game) -> str:
+    """
+    Clave estable de un juego: carpeta de instalación resuelta (de un Game o
+    de la ruta del ejecutable), o el nombre si sólo se conoce el nombre
+
+    La ruta completa entra en la clave como hash: "game.exe" o "launcher.exe"
+    de títulos distintos no colisionan.
+    """
+    directory = game_directory(game)
+    if directory:
+        digest = hashlib.sha1(os.path.normcase(directory).encode('utf-8')).hexdigest()[:10]
+        return f"{_slug(Path(directory).name)}_{digest}"
+    return _slug(game if isinstance(game, str) else getattr(game, 'name', str(game)))
+
+
+# --- MINCORE ---
+_libc = None
+
+def _get_libc():
+    global _libc
+    if _libc is None and IS_LINUX:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        _libc.mmap.restype = ctypes.c_void_p
+        _libc.mmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int, ctypes.c_int,
+                               ctypes.c_int, ctypes.c_long]
+        _libc.munmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+        _libc.mincore.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_void_p]
+    return _libc
+
+
+def residency(path: str) -> Optional[Dict]:
+    """
+    Páginas de un fichero presentes en la caché de páginas (mincore)
+
+    Returns:
+        Dict con resident_pages / total_pages, o None si no se puede medir
+    """
+    libc = _get_libc()
+    if libc is None:
+        return None
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        size = os.fstat(fd).st_size
+        if size == 0:
+            return {'resident_pages': 0, 'total_pages': 0}
+        addr = libc.mmap(None, size, mmap.PROT_READ, mmap.MAP_SHARED, fd, 0)
+        if addr in (None, ctypes.c_void_p(-1).value):
+            return None
+        try:
+            pages = (size + PAGE_SIZE - 1) // PAGE_SIZE
+            vec = (ctypes.c_ubyte * pages)()
+            if libc.mincore(addr, size, vec) != 0:
+                return None
+            resident = sum(1 for b in vec if b & 1)
+            return {'resident_pages': resident, 'total_pages': pages}
+        finally:
+            libc.munmap(addr, size)
+    finally:
+        os.close(fd)
+
+
+# --- GRABACIÓN ---
+class AccessRecorder:
+    """Registra qué ficheros lee un juego durante su arranque"""
+
+    def __init__(self, pid: int, root_dirs: Optional[List[str]] = None, max_duration_s: float = 90.0,
+                 interval_s: float = 0.5, settle_s: float = 5.0, settle_rate_mb_s: float = 1.0):
+        """
+        Args:
+            pid: Proceso del juego (o de su lanzador; se siguen los hijos)
+            root_dirs: Sólo se guardan ficheros bajo estas carpetas (None = todos)
+            max_duration_s: Duración máxima de la grabación
+            interval_s: Periodo de muestreo
+            settle_s: Segundos seguidos leyendo poco para dar la carga por terminada
+            settle_rate_mb_s: Umbral de lectura que se considera "poco"
+        """
+        self.pid = pid
+        # Con separador final: /games/foo no debe aceptar /games/foobar
+        self.root_dirs = [os.path.join(os.path.abspath(d), '') for d in (root_dirs or [])]
+        self.max_duration_s = max_duration_s
+        self.interval_s = interval_s
+        self.settle_s = settle_s
+        self.settle_rate = settle_rate_mb_s * 1024 * 1024
+        self.files: Dict[str, Dict] = {}
+        self.read_bytes = 0
+        self._last_io: Dict[int, int] = {}
+
+    def _wanted(self, path: str) -> bool:
+        if not path.startswith('/') and not re.match(r'^[A-Za-z]:\\', path):
+            return False
+        if path.startswith(_SKIP_PREFIXES) or path.endswith(" (deleted)"):
+            return False
+        return not self.root_dirs or any(path.startswith(root) for root in self.root_dirs)
+
+    def _tree(self) -> List[psutil.Process]:
+        try:
+            root = psutil.Process(self.pid)
+            return [root] + root.children(recursive=True)
+        except psutil.Error:
+            return []
+
+    def _paths_of(self, proc: psutil.Process) -> List[str]:
+        paths = []
+        if IS_LINUX:
+            fd_dir = f"/proc/{proc.pid}/fd"
+            try:
+                for fd in os.listdir(fd_dir):
+                    try:
+                        paths.append(os.readlink(f"{fd_dir}/{fd}"))
+                    except OSError:
+                        continue
+                with open(f"/proc/{proc.pid}/maps", 'r') as f:
+                    for line in f:
+                        parts = line.split(None, 5)
+                        if len(parts) == 6:
+                            paths.append(parts[5].strip())
+            except OSError:
+                pass
+        else:
+            try:
+                paths.extend(f.path for f in proc.open_files())
+                paths.extend(m.path for m in proc.memory_maps())
+            except (psutil.Error, OSError):
+                pass
+        return paths
+
+    def _io_delta(self, procs: List[psutil.Process]) -> int:
+        delta = 0
+        for proc in procs:
+            try:
+                current = proc.io_counters().read_bytes
+            except (psutil.Error, AttributeError):
+                continue
+            delta += max(0, current - self._last_io.get(proc.pid, current))
+            self._last_io[proc.pid] = current
+        return delta
+
+    def record(self, stop: Optional[threading.Event] = None) -> Dict:
+        """
+        Grabar hasta que la carga se estabilice (bloqueante)
+
+        Returns:
+            Dict con files (orden de primer acceso) y métricas
+        """
+        start = time.time()
+        quiet_since = None
+        while time.time() - start < self.max_duration_s:
+            if stop is not None and stop.is_set():
+                break
+            procs = self._tree()
+            if not procs:
+                break  # El juego terminó
+            elapsed = time.time() - start
+            for proc in procs:
+                for path in self._paths_of(proc):
+                    if path in self.files or not self._wanted(path):
+                        continue
+                    try:
+                        size = os.stat(path).st_size
+                    except OSError:
+                        continue
+                    self.files[path] = {'path': path, 'size': size, 'first_seen_s': round(elapsed, 2)}
+
+            delta = self._io_delta(procs)
+            self.read_bytes += delta
+            # Carga terminada: lecturas bajas durante settle_s seguidos
+            if delta / self.interval_s < self.settle_rate and elapsed > self.settle_s:
+                quiet_since = quiet_since or time.time()
+                if time.time() - quiet_since >= self.settle_s:
+                    break
+            else:
+                quiet_since = None
+            time.sleep(self.interval_s)
+
+        ordered = sorted(self.files.values(), key=lambda f: f['first_seen_s'])
+        return {'files': ordered, 'startup_read_mb': self.read_bytes / 1024**2,
+                'duration_s': round(time.time() - start, 1)}
+
+
+# --- GESTOR ---
+class CacheWarmer:
+    """Manifiestos por juego: grabar, reproducir y medir"""
+
+    def __init__(self, manifest_dir: Optional[str] = None, workers: int = 4):
+        self.manifest_dir = Path(manifest_dir) if manifest_dir else user_cache_dir(MANIFEST_SUBDIR, create=False)
+        self.workers = workers
+        self._recording: Dict[str, threading.Thread] = {}
+
+    def manifest_path(self, game) -> Path:
+        return self.manifest_dir / f"{game_key(game)}.json"
+
+    def load_manifest(self, game) -> Optional[Dict]:
+        try:
+            with open(self.manifest_path(game), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            return manifest if manifest.get('version') == MANIFEST_VERSION else None
+        except (OSError, ValueError):
+            return None
+
+    def has_manifest(self, game) -> bool:
+        return self.manifest_path(game).exists()
+
+    def _save_manifest(self, game, recording: Dict):
+        """Guardar fusionando con la grabación anterior (mínimo primer acceso)"""
+        previous = self.load_manifest(game) or {'files': []}
+        merged = {f['path']: f for f in previous['files']}
+        for f in recording['files']:
+            if f['path'] not in merged or f['first_seen_s'] < merged[f['path']]['first_seen_s']:
+                merged[f['path']] = f
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'game': game_key(game),
+            'recorded_at': time.time(),
+            'startup_read_mb': round(recording['startup_read_mb'], 1),
+            'files': sorted(merged.values(), key=lambda f: f['first_seen_s'])
+        }
+        self.manifest_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path(game).with_suffix(".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp, self.manifest_path(game))
+        return manifest
+
+    def record(self, game, pid: int, **recorder_kwargs) -> Dict:
+        """Grabar el arranque de un juego y guardar su manifiesto (bloqueante)"""
+        root = game_directory(game)
+        recorder = AccessRecorder(pid, root_dirs=[root] if root else None, **recorder_kwargs)
+        recording = recorder.record()
+        if not recording['files']:
+            # Nada aprendido (p.ej. el proceso terminó enseguida): reintentar la próxima vez
+            return {'version': MANIFEST_VERSION, 'game': game_key(game), 'files': [],
+                    'startup_read_mb': recording['startup_read_mb']}
+        manifest = self._save_manifest(game, recording)
+        print(f"[CacheWarmer] {game_key(game)}: {len(manifest['files'])} files learned "
+              f"({manifest['startup_read_mb']:.0f} MB read at startup)")
+        return manifest
+
+    def record_async(self, game, pid: int, **recorder_kwargs) -> bool:
+        """Grabar en un hilo de fondo (no hace nada si ya se está grabando)"""
+        key = game_key(game)
+        if key in self._recording and self._recording[key].is_alive():
+            return False
+        thread = threading.Thread(target=self.record, args=(game, pid), kwargs=recorder_kwargs,
+                                  daemon=True, name=f"CacheRecord-{key}")
+        self._recording[key] = thread
+        thread.start()
+        return True
+
+    # --- REPRODUCCIÓN ---
+    @staticmethod
+    def default_budget_mb() -> float:
+        """Presupuesto por defecto: 25% de la RAM disponible, máximo 2 GB"""
+        return min(2048.0, psutil.virtual_memory().available / 1024**2 * 0.25)
+
+    @staticmethod
+    def _prefetch_one(path: str) -> int:
+        """Precargar un fichero; devuelve bytes solicitados"""
+        try:
+            with open(path, 'rb', buffering=0) as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    return 0
+                if hasattr(os, 'posix_fadvise'):
+                    # readahead asíncrono del kernel
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                        if hasattr(m, 'madvise') and hasattr(mmap, 'MADV_WILLNEED'):
+                            m.madvise(mmap.MADV_WILLNEED)
+                        else:
+                            for offset in range(0, size, PAGE_SIZE):
+                                m[offset]  # Tocar cada página
+                return size
+        except (OSError, ValueError):
+            return 0
+
+    def plan(self, game, budget_mb: Optional[float] = None) -> List[str]:
+        """Ficheros del manifiesto en orden de acceso que caben en el presupuesto"""
+        manifest = self.load_manifest(game)
+        if not manifest:
+            return []
+        budget = (budget_mb if budget_mb is not None else self.default_budget_mb()) * 1024**2
+        selected, used = [], 0
+        for entry in manifest['files']:
+            if used + entry['size'] > budget:
+                continue
+            if os.path.exists(entry['path']):
+                selected.append(entry['path'])
+                used += entry['size']
+        return selected
+
+    def measure(self, paths: List[str]) -> Optional[float]:
+        """Fracción de páginas residentes (mincore) de una lista de ficheros"""
+        resident = total = 0
+        for path in paths:
+            info = residency(path)
+            if info is None:
+                return None
+            resident += info['resident_pages']
+            total += info['total_pages']
+        return resident / total if total else None
+
+    def measure_settled(self, paths: List[str], timeout_s: float = 2.0,
+                        interval_s: float = 0.1) -> Optional[float]:
+        """
+        Residencia cuando el readahead deja de avanzar (WILLNEED es asíncrono:
+        medir justo después sólo ve lo que el kernel ya había leído)
+        """
+        deadline = time.perf_counter() + timeout_s
+        last = self.measure(paths)
+        while last is not None and last < 1.0 and time.perf_counter() < deadline:
+            time.sleep(interval_s)
+            current = self.measure(paths)
+            if current is None or current <= last:
+                return current
+            last = current
+        return last
+
+    def replay(self, game, budget_mb: Optional[float] = None, measure: bool = True,
+               settle_timeout_s: float = 2.0) -> Dict:
+        """
+        Precargar el manifiesto de un juego en paralelo
+
+        Args:
+            game: Game, ruta del ejecutable o nombre
+            budget_mb: Presupuesto de RAM (None = default_budget_mb)
+            measure: Medir residencia antes y tras el readahead (mincore; espera
+                     hasta settle_timeout_s, no usar en el camino de lanzamiento)
+            settle_timeout_s: Espera máxima a que el readahead se estabilice
+
+        Returns:
+            Dict con files, mb, tiempos y residencia antes/después (mincore)
+        """
+        paths = self.plan(game, budget_mb)
+        if not paths:
+            return {'files': 0, 'mb': 0.0, 'manifest': self.has_manifest(game)}
+        before = self.measure(paths) if measure else None
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="Prefetch") as pool:
+            requested = sum(pool.map(self._prefetch_one, paths))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        result = {'files': len(paths), 'mb': requested / 1024**2, 'ms': elapsed_ms,
+                  'manifest': True, 'paths': paths}
+        if measure:
+            result['resident_before'] = before
+            result['resident_after'] = self.measure_settled(paths, timeout_s=settle_timeout_s)
+        return result
+
+    def hit_rate(self, paths: List[str]) -> Optional[float]:
+        """
+        Tasa de acierto de la precarga: fracción de lo precargado que sigue en
+        caché (llamar justo antes de que el juego lo lea, o tras lanzarlo)
+        """
+        return self.measure(paths)
+
+
+# Instancia global
+_warmer: Optional[CacheWarmer] = None
+
+def get_cache_warmer() -> CacheWarmer:
+    """Obtener el gestor de precalentamiento global"""
+    global _warmer
+    if _warmer is None:
+        _warmer = CacheWarmer()
+    return _warmer
+
+
+if __name__ == "__main__":
+    import subprocess
+    import tempfile
+
+    print("=" * 60)
+    print("CACHE WARMER TEST")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        game_dir = Path(tmp) / "FakeGame"
+        (game_dir / "data").mkdir(parents=True)
+        for i in range(4):
+            (game_dir / "data" / f"level{i}.pak").write_bytes(os.urandom(4 * 1024 * 1024))
+
+        # "Juego" que abre sus assets al arrancar y se queda esperando
+        script = ("import glob, time\n"
+                  f"files = [open(p, 'rb') for p in sorted(glob.glob({str(game_dir / 'data' / '*.pak')!r}))]\n"
+                  "[f.read() for f in files]\n"
+                  "time.sleep(3)\n")
+        game = subprocess.Popen([sys.executable, "-c", script])
+        warmer = CacheWarmer(manifest_dir=str(Path(tmp) / "manifests"))
+        manifest = warmer.record(str(game_dir / "game.exe"), game.pid, max_duration_s=2,
+                                 interval_s=0.2, settle_s=0.5)
+        game.wait()
+        for entry in manifest['files']:
+            print(f"  {Path(entry['path']).name}: {entry['size'] / 1024**2:.0f} MB at {entry['first_seen_s']}s")
+
+        # Expulsar de la caché (las páginas sucias no se expulsan: sync antes) y reproducir
+        paths = [e['path'] for e in manifest['files']]
+        os.sync()
+        for path in paths:
+            with open(path, 'rb') as f:
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        result = warmer.replay(str(game_dir / "game.exe"), budget_mb=64)
+        print(f"\nReplay: {result['files']} files, {result['mb']:.0f} MB in {result['ms']:.1f} ms")
+        print(f"Residency before: {result['resident_before']} | after: {result['resident_after']} "
+              f"| hit rate now: {warmer.hit_rate(paths)}")
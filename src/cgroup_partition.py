@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧱 CGROUP PARTITION MANAGER
+Particionado de recursos con cgroup v2: el juego en un slice, el resto en otro
+
+- Slice "game": cpu.weight / io.weight altos
+- Slice "background": cpu.weight, cpu.max, memory.high, io.weight limitados
+  y cpuset.cpus en los núcleos que el plan de afinidad (cpu_topology) deja
+  fuera del juego
+- Estado persistido ANTES de aplicar (write-ahead): si Neuro-OS crashea, el
+  siguiente arranque devuelve cada proceso a su cgroup original
+- Particiones con dueño: CrashProtection, RAMManager, PSI y la sesión de juego
+  reclaman sus procesos por separado; restore(owner) sólo libera lo suyo y los
+  slices desaparecen al liberarse el último dueño
+- Nunca se limitan procesos críticos de la sesión (compositor, audio, init)
+- Todo pasa por rutas (cgroup_root / proc_root), así que funciona igual
+  contra un árbol cgroupfs falso en un directorio temporal
+- Un lock protege el estado: PSI, el vínculo de perfiles, la precarga, el
+  radar y el supervisor lo modifican desde hilos distintos
+- El estado vive en la carpeta de datos del usuario (app_paths); si no se
+  puede guardar se avisa, no se rompe el particionado
+"""
+
+import errno
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import psutil
+
+from app_paths import user_data_dir
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+PARTITION_NAME = "neuro-os"
+CONTROLLERS = ("cpu", "cpuset", "memory", "io")
+DEFAULT_OWNER = "default"
+
+# Procesos de la sesión que nunca van al slice "background" (compositor, servidor
+# gráfico, audio, bus): limitarlos congela el escritorio entero, juego incluido
+SESSION_CRITICAL_NAMES = {
+    'systemd', 'init', 'xorg', 'xwayland', 'gnome-shell', 'mutter', 'kwin_x11', 'kwin_wayland',
+    'plasmashell', 'sway', 'hyprland', 'weston', 'gamescope', 'mutter-x11-frames',
+    'pipewire', 'pipewire-pulse', 'wireplumber', 'pulseaudio',
+    'dbus-daemon', 'dbus-broker', 'gdm', 'sddm', 'lightdm', 'sshd'
+}
+
+
+@dataclass
+class SliceLimits:
+    """Límites de un slice (None = no tocar)"""
+    cpu_weight: Optional[int] = None  # 1-10000 (defecto del kernel: 100)
+    cpu_max_percent: Optional[float] = None  # % del total de CPUs
+    memory_high_percent: Optional[float] = None  # % de la RAM total
+    io_weight: Optional[int] = None  # 1-10000 (defecto del kernel: 100)
+    cpus: Optional[List[int]] = None  # cpuset.cpus (None = todas)
+
+
+GAME_LIMITS = SliceLimits(cpu_weight=1000, io_weight=1000)
+BACKGROUND_LIMITS = SliceLimits(cpu_weight=20, cpu_max_percent=50.0,
+                                memory_high_percent=40.0, io_weight=25)
+
+
+class ResourcePartitionManager:
+    """Gestor de slices cgroup v2 para juego vs. segundo plano"""
+
+    CPU_PERIOD_US = 100000
+
+    def __init__(self, cgroup_root: str = CGROUP_ROOT, parent: Optional[str] = None,
+                 proc_root: str = "/proc", state_file: Optional[str] = None):
+        """
+        Args:
+            cgroup_root: Punto de montaje de cgroup v2 (o árbol falso)
+            parent: Cgroup padre relativo a la raíz (None = autodetectar el delegado)
+            proc_root: Raíz de /proc (para leer /proc/<pid>/cgroup)
+            state_file: Fichero de estado persistente (None = en la carpeta de datos)
+        """
+        self.cgroup_root = Path(cgroup_root)
+        self.proc_root = Path(proc_root)
+        self.state_file = Path(state_file) if state_file else user_data_dir() / "cgroup_partition_state.json"
+        self.parent = parent if parent is not None else self._detect_delegated_parent()
+        self.base = self.cgroup_root / self.parent.strip('/') / PARTITION_NAME
+        self.state: Dict = {}
+        self._lock = threading.RLock()  # Estado y su fichero: cada cambio y su guardado van juntos
+
+    # --- DETECCIÓN ---
+    def is_available(self) -> bool:
+        """cgroup v2 montado y el padre escribible"""
+        parent_dir = self.base.parent
+        return ((self.cgroup_root / "cgroup.controllers").exists()
+                and os.access(parent_dir, os.W_OK))
+
+    def _detect_delegated_parent(self) -> str:
+        """
+        Usar el subárbol que systemd delega al usuario (user@UID.service) si
+        existe; si no, la raíz (requiere root)
+        """
+        own = self.cgroup_of(os.getpid()) or ""
+        parts = own.strip('/').split('/')
+        for i, part in enumerate(parts):
+            if part.startswith("user@") and part.endswith(".service"):
+                return '/'.join(parts[:i + 1])
+        return ""
+
+    def cgroup_of(self, pid: int) -> Optional[str]:
+        """Cgroup v2 de un proceso (ruta relativa, p.ej. /user.slice/...)"""
+        try:
+            with open(self.proc_root / str(pid) / "cgroup", 'r') as f:
+                for line in f:
+                    if line.startswith("0::"):
+                        return line[3:].strip()
+        except OSError:
+            pass
+        return None
+
+    def cgroup_of_dir(self, directory) -> Optional[str]:
+        """Ruta de cgroup (como en /proc/<pid>/cgroup) de un directorio de cgroupfs"""
+        try:
+            relative = Path(directory).resolve().relative_to(self.cgroup_root.resolve())
+        except ValueError:
+            return None
+        return "/" + relative.as_posix() if relative.parts else "/"
+
+    def _is_real_cgroupfs(self) -> bool:
+        try:
+            with open("/proc/mounts", 'r') as f:
+                return any(line.split()[1] == str(self.cgroup_root) and line.split()[2] == "cgroup2"
+                           for line in f if len(line.split()) > 2)
+        except OSError:
+            return False
+
+    # --- ESTADO PERSISTENTE ---
+    @property
+    def is_active(self) -> bool:
+        return bool(self.state.get('active'))
+
+    def is_claimed(self, owner: str) -> bool:
+        """¿Tiene este dueño una partición vigente?"""
+        return self.is_active and owner in self.state.get('owners', [])
+
+    def _is_session_critical(self, pid: int) -> bool:
+        try:
+            return psutil.Process(pid).name().lower() in SESSION_CRITICAL_NAMES
+        except psutil.Error:
+            return False
+
+    def _save_state(self) -> bool:
+        """Guardar el estado (temporal único + rename); False si no se pudo"""
+        with self._lock:
+            tmp = None
+            try:
+                self.state_file.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(prefix=self.state_file.name + ".", suffix=".tmp",
+                                           dir=str(self.state_file.parent))
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(self.state, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.state_file)
+                return True
+            except OSError as e:
+                print(f"[Partition] State not saved (no crash recovery): {e}")
+                if tmp is not None:
+                    try:
+                        os.unlink(tmp)
+                    except OSError:
+                        pass
+                return False
+
+    def _clear_state(self):
+        with self._lock:
+            self.state = {}
+            try:
+                self.state_file.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"[Partition] State file not removed: {e}")
+
+    def recover(self) -> Optional[Dict]:
+        """Deshacer un particionado que quedó activo tras un crash"""
+        with self._lock:
+            if not self.state_file.exists():
+                return None
+            try:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    self.state = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[Partition] Corrupt state file ignored: {e}")
+                self._clear_state()
+                return None
+            print("[Partition] Stale partition found from a previous session, restoring...")
+            return self.restore()
+
+    # --- ESCRITURA EN CGROUPFS ---
+    def _write(self, path: Path, value: str, errors: List[str]):
+        try:
+            path.write_text(value)
+        except OSError as e:
+            errors.append(f"{path.name}: {e.strerror or e}")
+
+    def _enable_controllers(self, errors: List[str]):
+        """Habilitar cpu/memory/io en subtree_control de padre y base"""
+        for directory in (self.base.parent, self.base):
+            available = set()
+            try:
+                available = set((directory / "cgroup.controllers").read_text().split())
+            except OSError:
+                available = set(CONTROLLERS)  # Árbol falso sin ficheros de interfaz
+            wanted = " ".join(f"+{c}" for c in CONTROLLERS if c in available)
+            if wanted:
+                self._write(directory / "cgroup.subtree_control", wanted, errors)
+
+    def _apply_limits(self, slice_dir: Path, limits: SliceLimits, errors: List[str]):
+        if limits.cpu_weight is not None:
+            self._write(slice_dir / "cpu.weight", str(limits.cpu_weight), errors)
+        if limits.cpu_max_percent is not None:
+            cpus = psutil.cpu_count() or 1
+            quota = int(self.CPU_PERIOD_US * cpus * limits.cpu_max_percent / 100)
+            self._write(slice_dir / "cpu.max", f"{quota} {self.CPU_PERIOD_US}", errors)
+        if limits.memory_high_percent is not None:
+            high = int(psutil.virtual_memory().total * limits.memory_high_percent / 100)
+            self._write(slice_dir / "memory.high", str(high), errors)
+        if limits.io_weight is not None:
+            self._write(slice_dir / "io.weight", f"default {limits.io_weight}", errors)
+        if limits.cpus:
+            self._write(slice_dir / "cpuset.cpus", ",".join(str(cpu) for cpu in limits.cpus), errors)
+
+    @staticmethod
+    def _background_cpus() -> Optional[List[int]]:
+        """Núcleos que el plan de afinidad deja fuera del juego (None si no aísla ninguno)"""
+        try:
+            from cpu_topology import get_affinity_planner
+            plan = get_affinity_planner().plan()
+        except (OSError, ValueError) as e:
+            print(f"[Partition] No affinity plan for the background slice: {e}")
+            return None
+        return list(plan.background_cpus) if plan.isolates else None
+
+    def _move(self, pid: int, target: Path, errors: List[str]) -> bool:
+        try:
+            (target / "cgroup.procs").write_text(str(pid))
+            return True
+        except OSError as e:
+            if e.errno != errno.ESRCH:
+                errors.append(f"move {pid}: {e.strerror or e}")
+            return False
+
+    # --- API ---
+    def partition(self, game_pids: Iterable[int], background_pids: Iterable[int],
+                  owner: str = DEFAULT_OWNER,
+                  game_limits: SliceLimits = GAME_LIMITS,
+                  background_limits: SliceLimits = BACKGROUND_LIMITS) -> Dict:
+        """
+        Crear los slices (si no existen), aplicar límites y mover los procesos.
+        Se suma a las particiones de otros dueños en vez de deshacerlas.
+
+        Args:
+            owner: Quién reclama la partición (restore(owner) la libera)
+            background_limits: Límites del slice "background" (sin cpus = los
+                               sobrantes del plan de afinidad)
+
+        Returns:
+            Dict con procesos colocados, omitidos y errores
+        """
+        with self._lock:
+            errors: List[str] = []
+            game_dir = self.base / "game"
+            background_dir = self.base / "background"
+            game_pids = set(game_pids)
+            background_pids = list(dict.fromkeys(background_pids))
+
+            # 1. Registrar el origen de cada proceso ANTES de tocar nada
+            processes = self.state.get('processes', {}) if self.is_active else {}
+            to_move = []
+            placed = 0  # Ya estaban en su slice (de otro dueño)
+            skipped = 0
+            for role, pids in (("game", game_pids), ("background", background_pids)):
+                for pid in pids:
+                    if role == "background" and (pid in game_pids or self._is_session_critical(pid)):
+                        skipped += 1
+                        continue
+                    entry = processes.get(str(pid))
+                    if entry is not None:
+                        # Ya particionado por otro dueño: compartirlo; el juego siempre gana
+                        owners = entry.setdefault('owners', [DEFAULT_OWNER])
+                        if owner not in owners:
+                            owners.append(owner)
+                        if role == "game" and entry['role'] != "game":
+                            entry['role'] = "game"
+                            to_move.append(str(pid))
+                        else:
+                            placed += 1
+                        continue
+                    origin = self.cgroup_of(pid)
+                    if origin is None:
+                        continue
+                    try:
+                        create_time = psutil.Process(pid).create_time()
+                    except psutil.Error:
+                        continue
+                    processes[str(pid)] = {'role': role, 'origin': origin, 'create_time': create_time,
+                                           'owners': [owner]}
+                    to_move.append(str(pid))
+
+            owners = self.state.get('owners', []) if self.is_active else []
+            if owner not in owners:
+                owners.append(owner)
+            self.state = {
+                'active': True,
+                'timestamp': time.time(),
+                'base': self.state.get('base', str(self.base)) if self.is_active else str(self.base),
+                'owners': owners,
+                'processes': processes
+            }
+            self._save_state()
+
+            # 2. Crear slices y límites
+            try:
+                game_dir.mkdir(parents=True, exist_ok=True)
+                background_dir.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                errors.append(f"mkdir: {e.strerror or e}")
+                self.restore(owner)
+                return {'success': False, 'moved': 0, 'skipped': skipped, 'errors': errors}
+
+            self._enable_controllers(errors)
+            if background_limits.cpus is None:
+                background_limits = replace(background_limits, cpus=self._background_cpus())
+            self._apply_limits(game_dir, game_limits, errors)
+            self._apply_limits(background_dir, background_limits, errors)
+
+            # 3. Mover procesos (los ya colocados por otro dueño se quedan donde están)
+            count = placed
+            for pid in to_move:
+                target = game_dir if processes[pid]['role'] == "game" else background_dir
+                if self._move(int(pid), target, errors):
+                    count += 1
+
+            print(f"[Partition] {owner}: {count} processes partitioned "
+                  f"({skipped} skipped, {len(errors)} errors)")
+            return {'success': count > 0, 'moved': count, 'skipped': skipped, 'errors': errors}
+
+    def game_procs_file(self) -> Optional[Path]:
+        """cgroup.procs del slice 'game' (None si no hay particionado activo)"""
+        procs = Path(self.state.get('base', str(self.base))) / "game" / "cgroup.procs"
+        return procs if self.is_active and procs.exists() else None
+
+    def register_process(self, pid: int, role: str = "game", origin: Optional[str] = None,
+                         owner: str = "game"):
+        """
+        Anotar un proceso que nació dentro de un slice (process_supervisor)
+        para que restore() lo devuelva al cgroup de quien lo lanzó
+
+        Args:
+            pid: PID del proceso
+            role: 'game' o 'background'
+            origin: Cgroup al que debe volver (None = el de este proceso)
+            owner: Dueño de la partición (por defecto la sesión de juego)
+        """
+        with self._lock:
+            if not self.is_active:
+                return
+            origin = origin or self.cgroup_of(os.getpid())
+            try:
+                create_time = psutil.Process(pid).create_time()
+            except psutil.Error:
+                return
+            if origin is None:
+                return
+            entry = self.state.setdefault('processes', {}).get(str(pid))
+            if entry is not None and entry.get('create_time') == create_time:
+                owners = entry.setdefault('owners', [DEFAULT_OWNER])
+                if owner not in owners:
+                    owners.append(owner)
+            else:
+                self.state['processes'][str(pid)] = {
+                    'role': role, 'origin': origin, 'create_time': create_time, 'owners': [owner]}
+            owners = self.state.setdefault('owners', [])
+            if owner not in owners:
+                owners.append(owner)
+            self._save_state()
+
+    def restore(self, owner: Optional[str] = None) -> Dict:
+        """
+        Liberar la partición de un dueño: sus procesos vuelven a su cgroup
+        original salvo que otro dueño los siga reclamando. Al liberarse el
+        último dueño (o con owner=None, p.ej. tras un crash) se eliminan los slices.
+        """
+        with self._lock:
+            errors: List[str] = []
+            restored = 0
+            base = Path(self.state.get('base', str(self.base)))
+            processes = self.state.get('processes', {})
+
+            for pid, entry in list(processes.items()):
+                if owner is not None:
+                    owners = entry.setdefault('owners', [DEFAULT_OWNER])
+                    if owner not in owners:
+                        continue
+                    owners.remove(owner)
+                    if owners:
+                        continue  # Otro dueño lo sigue necesitando en su slice
+                del processes[pid]
+                try:
+                    if psutil.Process(int(pid)).create_time() != entry['create_time']:
+                        continue  # PID reutilizado por otro proceso
+                except psutil.Error:
+                    continue
+                origin = self.cgroup_root / entry['origin'].strip('/')
+                if self._move(int(pid), origin, errors):
+                    restored += 1
+
+            owners = self.state.get('owners', [])
+            if owner in owners:
+                owners.remove(owner)
+            if owner is None or (not owners and not processes):
+                for slice_dir in (base / "game", base / "background", base):
+                    self._remove_cgroup(slice_dir, errors)
+                self._clear_state()
+            elif self.is_active:
+                self._save_state()
+            print(f"[Partition] Restored {restored} processes" + (f" ({owner})" if owner else ""))
+            return {'success': not errors, 'restored': restored, 'errors': errors}
+
+    def _remove_cgroup(self, directory: Path, errors: List[str]):
+        if not directory.exists():
+            return
+        try:
+            directory.rmdir()
+        except OSError as e:
+            if e.errno == errno.ENOTEMPTY and not self._is_real_cgroupfs():
+                # Árbol falso: los "ficheros de interfaz" son ficheros normales
+                shutil.rmtree(directory, ignore_errors=True)
+            else:
+                errors.append(f"rmdir {directory.name}: {e.strerror or e}")
+
+    def get_status(self) -> Dict:
+        """Estado actual del particionado"""
+        with self._lock:
+            return {
+                'available': self.is_available(),
+                'active': self.is_active,
+                'base': str(self.base),
+                'owners': list(self.state.get('owners', [])),
+                'processes': len(self.state.get('processes', {}))
+            }
+
+
+# Instancia global (recupera estado huérfano al crearse)
+_partition_manager: Optional[ResourcePartitionManager] = None
+
+def get_partition_manager() -> ResourcePartitionManager:
+    """Obtener el gestor de particiones global"""
+    global _partition_manager
+    if _partition_manager is None:
+        _partition_manager = ResourcePartitionManager()
+        _partition_manager.recover()
+    return _partition_manager
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("CGROUP PARTITION TEST (fake cgroupfs)")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "cgroup"
+        proc = Path(tmp) / "proc"
+        pid = os.getpid()
+
+        # Árbol cgroupfs falso con el proceso actual en app.slice
+        (root / "app.slice").mkdir(parents=True)
+        (root / "cgroup.controllers").write_text("cpu memory io")
+        (proc / str(pid)).mkdir(parents=True)
+        (proc / str(pid) / "cgroup").write_text("0::/app.slice\n")
+
+        manager = ResourcePartitionManager(cgroup_root=str(root), parent="", proc_root=str(proc),
+                                           state_file=str(Path(tmp) / "state.json"))
+        result = manager.partition(game_pids=[], background_pids=[pid])
+        print(f"Partition: {result}")
+        for f in sorted((root / PARTITION_NAME / "background").iterdir()):
+            print(f"  background/{f.name} = {f.read_text()}")
+
+        # Simular crash: un gestor nuevo recupera desde el fichero de estado
+        recovered = ResourcePartitionManager(cgroup_root=str(root), parent="", proc_root=str(proc),
+                                             state_file=str(Path(tmp) / "state.json")).recover()
+        print(f"Recovered: {recovered}")
+        print(f"  app.slice/cgroup.procs = {(root / 'app.slice' / 'cgroup.procs').read_text()}")
+        print(f"  slices removed: {not (root / PARTITION_NAME).exists()}")
@@ -3,84 +3,435 @@
 """
 🔧 NEURO-OS CONFIG MANAGER
 Gestiona la configuración persistente del sistema
+
+- Esquema tipado (CONFIG_SCHEMA): tipo y valor por defecto de cada clave;
+  set() convierte ("3000" -> 3000) o rechaza los valores del tipo equivocado
+- Accesores compilados: la ruta 'a.b.c' se trocea una sola vez y el accesor
+  recuerda su diccionario padre, así que get() es una consulta de diccionario
+- Observadores: subscribe('performance', callback) avisa de cada cambio bajo
+  esa ruta (set, batch o recarga) para re-ajustar timers e intervalos en vivo
+- batch(): varios set() = un aviso por clave y una sola escritura
+- reload_if_changed(): aplica las ediciones externas del fichero (la UI lo
+  llama desde un QFileSystemWatcher)
 """
 
-import json
+import copy
+import os
+import threading
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from persistence import get_store
+
+_MISSING = object()
+
+_TRUE_STRINGS = ("1", "true", "yes", "on")
+_FALSE_STRINGS = ("0", "false", "no", "off", "")
+
+
+class ConfigKey:
+    """Clave del esquema de configuración"""
+
+    __slots__ = ('path', 'type', 'default')
+
+    def __init__(self, path: str, type_: type, default: Any):
+        """
+        Args:
+            path: Ruta con puntos ('performance.enable_radar')
+            type_: bool, int, float, str, list o dict
+            default: Valor por defecto (o función que lo crea)
+        """
+        self.path = path
+        self.type = type_
+        self.default = default
+
+    def default_value(self) -> Any:
+        return self.default() if callable(self.default) else copy.deepcopy(self.default)
+
+    def coerce(self, value: Any) -> Any:
+        """Convertir al tipo de la clave (TypeError/ValueError si no es posible)"""
+        expected = self.type
+        if expected is bool:
+            if isinstance(value, bool):
+                return value
+            if isinstance(value, int) and value in (0, 1):
+                return bool(value)
+            if isinstance(value, str) and value.strip().lower() in _TRUE_STRINGS + _FALSE_STRINGS:
+                return value.strip().lower() in _TRUE_STRINGS
+        elif expected is int:
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value
+            if isinstance(value, float) and value.is_integer():
+                return int(value)
+            if isinstance(value, str):
+                return int(value.strip())
+        elif expected is float:
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return float(value)
+            if isinstance(value, str):
+                return float(value.strip())
+        elif expected is str:
+            if isinstance(value, (str, os.PathLike)):
+                return os.fspath(value)
+        elif expected is list:
+            if isinstance(value, (list, tuple)):
+                return list(value)
+        elif isinstance(value, expected):
+            return value
+        raise TypeError(f"expected {expected.__name__}, got {type(value).__name__}")
+
+
+CONFIG_SCHEMA: Dict[str, ConfigKey] = {key.path: key for key in (
+    ConfigKey("file_explorer.default_path", str, lambda: os.path.expanduser("~/Desktop")),
+    ConfigKey("file_explorer.show_hidden", bool, False),
+    ConfigKey("browser.preferred", str, "auto"),  # auto, opera, chrome, edge, firefox, custom
+    ConfigKey("browser.custom_path", str, ""),
+    ConfigKey("performance.enable_radar", bool, True),
+    ConfigKey("performance.radar_interval_ms", int, 3000),
+    ConfigKey("performance.memory_threshold_mb", int, 250),
+    ConfigKey("performance.ai_service", bool, True),         # Historial de sesiones y perfiles (neuro_ai_service)
+    ConfigKey("performance.ai_auto_optimize", bool, False),  # El servicio recorta RAM y baja prioridades solo
+    ConfigKey("ui.theme", str, "dark"),
+    ConfigKey("ui.animations", bool, True),
+    ConfigKey("extreme_optimization", bool, True),  # Modo extremo de optimización (menos efectos, timers más lentos)
+    ConfigKey("custom_apps", list, list),           # Compartida con AppManager
+)}
+
+
+def _diff(prefix: str, old: Any, new: Any) -> Iterator[Tuple[str, Any, Any]]:
+    """Cambios hoja a hoja entre dos documentos: (ruta, nuevo, antiguo); _MISSING = no existe"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in list(old) + [key for key in new if key not in old]:
+            yield from _diff(f"{prefix}.{key}" if prefix else key,
+                             old.get(key, _MISSING), new.get(key, _MISSING))
+    elif old is not new and (old is _MISSING or new is _MISSING or old != new):
+        yield prefix, new, old
+
+
+class ConfigAccessor:
+    """Acceso compilado a una clave: ruta troceada una vez y diccionario padre en caché"""
+
+    __slots__ = ('manager', 'path', 'keys', 'leaf', 'spec', '_parent', '_generation')
+
+    def __init__(self, manager: 'ConfigManager', path: str):
+        self.manager = manager
+        self.path = path
+        self.keys = tuple(path.split('.'))
+        self.leaf = self.keys[-1]
+        self.spec = CONFIG_SCHEMA.get(path)
+        self._parent: Optional[dict] = None
+        self._generation = -1
+
+    def _resolve(self) -> Optional[dict]:
+        # La caché del padre vale mientras no cambie la estructura (ver ConfigManager._generation)
+        generation = self.manager._generation
+        node = self.manager.config
+        for key in self.keys[:-1]:
+            node = node.get(key) if isinstance(node, dict) else None
+        self._parent = node if isinstance(node, dict) else None
+        self._generation = generation
+        return self._parent
+
+    def default(self) -> Any:
+        return self.spec.default_value() if self.spec is not None else None
+
+    def get(self, default: Any = _MISSING) -> Any:
+        parent = self._parent if self._generation == self.manager._generation else self._resolve()
+        if parent is not None:
+            value = parent.get(self.leaf, _MISSING)
+            if value is not _MISSING:
+                return value
+        return self.default() if default is _MISSING else default
+
+    def set(self, value: Any) -> bool:
+        return self.manager.set(self.path, value)
+
 
 class ConfigManager:
     def __init__(self, config_file="config.json"):
         self.config_file = Path(__file__).parent / config_file
+        # Compartido con AppManager (custom_apps): un solo documento en memoria
+        self.store = get_store(self.config_file, indent=4)
+        self._lock = threading.RLock()
+        self._generation = 0  # Sube cuando cambia la estructura (los accesores re-resuelven su padre)
+        self._accessors: Dict[str, ConfigAccessor] = {}
+        self._observers: Dict[str, List[Callable]] = {}
+        self._batch_depth = 0
+        self._batch_changes: Dict[str, Tuple[Any, Any]] = {}
+        self._local_paths: set = set()  # Cambiados aquí y quizá aún sin escribir (no los pisa una recarga)
         self.config = self.load_config()
-    
+        self._stamp = self._disk_stamp()
+
     def load_config(self):
-        """Cargar configuración desde JSON"""
-        if self.config_file.exists():
-            try:
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading config: {e}")
-                return self.get_default_config()
-        else:
-            # Crear config por defecto
-            config = self.get_default_config()
-            self.save_config(config)
-            return config
-    
+        """Cargar configuración desde JSON (un fichero nuevo o corrupto usa los valores por defecto)"""
+        return self.store.load(default=self.get_default_config)
+
     def save_config(self, config=None):
-        """Guardar configuración a JSON"""
-        if config is None:
-            config = self.config
-        try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=4)
-            return True
-        except Exception as e:
-            print(f"Error saving config: {e}")
-            return False
-    
+        """Guardar configuración a JSON ya (los cambios con set() se guardan en diferido)"""
+        if config is not None and config is not self.config:
+            with self.batch(), self._lock:
+                for path, new, old in list(_diff("", self.config, config)):
+                    self._record(self._apply(path, new, old))
+        return self.store.flush()
+
     def get_default_config(self):
-        """Configuración por defecto"""
-        import os
-        return {
-            "file_explorer": {
-                "default_path": os.path.expanduser("~/Desktop"),
-                "show_hidden": False
-            },
-            "browser": {
-                "preferred": "auto",  # auto, opera, chrome, edge, firefox
-                "custom_path": ""
-            },
-            "performance": {
-                "enable_radar": True,
-                "radar_interval_ms": 3000,
-                "memory_threshold_mb": 250
-            },
-            "ui": {
-                "theme": "dark",
-                "animations": True
-            }
-        }
-    
+        """Configuración por defecto (generada a partir de CONFIG_SCHEMA)"""
+        config = {}
+        for key in CONFIG_SCHEMA.values():
+            *parents, leaf = key.path.split('.')
+            node = config
+            for name in parents:
+                node = node.setdefault(name, {})
+            node[leaf] = key.default_value()
+        return config
+
+    # --- LECTURA ---
+    def accessor(self, key_path: str) -> ConfigAccessor:
+        """Accesor compilado de una clave (guárdalo para lecturas frecuentes)"""
+        accessor = self._accessors.get(key_path)
+        if accessor is None:
+            accessor = self._accessors[key_path] = ConfigAccessor(self, key_path)
+        return accessor
+
     def get(self, key_path, default=None):
-        """Obtener valor de configuración usando path (ej: 'browser.preferred')"""
-        keys = key_path.split('.')
-        value = self.config
-        for key in keys:
-            if isinstance(value, dict) and key in value:
-                value = value[key]
-            else:
-                return default
-        return value
-    
-    def set(self, key_path, value):
-        """Establecer valor de configuración"""
+        """
+        Obtener valor de configuración usando path (ej: 'browser.preferred')
+
+        Sin default, las claves del esquema devuelven su valor por defecto tipado.
+        """
+        accessor = self._accessors.get(key_path) or self.accessor(key_path)
+        return accessor.get(_MISSING if default is None else default)
+
+    # --- ESCRITURA ---
+    def set(self, key_path, value) -> bool:
+        """
+        Establecer valor de configuración (escritura diferida y agrupada)
+
+        Returns:
+            False si el valor no es válido para el tipo de la clave
+        """
+        spec = CONFIG_SCHEMA.get(key_path)
+        if spec is not None:
+            try:
+                value = spec.coerce(value)
+            except (TypeError, ValueError) as e:
+                print(f"[Config] Invalid value for {key_path}: {value!r} ({e})")
+                return False
+        with self.batch():
+            with self._lock:
+                old = self.accessor(key_path).get(_MISSING)
+                # El mismo objeto lista/dict puede venir modificado en sitio: eso sí es un cambio
+                if (old is not _MISSING and type(old) is type(value) and old == value
+                        and (old is not value or not isinstance(value, (list, dict)))):
+                    return True  # Sin cambios: ni aviso ni escritura
+                self._local_paths.add(key_path)
+                self._record(self._apply(key_path, value, old))
+        return True
+
+    def update(self, values: Dict[str, Any], flush: bool = False) -> bool:
+        """Varios set() como un lote (un aviso por clave y una sola escritura)"""
+        with self.batch(flush=flush):
+            return all([self.set(key_path, value) for key_path, value in values.items()])
+
+    @contextmanager
+    def batch(self, flush: bool = False):
+        """
+        Agrupar cambios: los observadores y el almacén se enteran una vez, al final
+
+        Args:
+            flush: Escribir en disco al cerrar el lote (si no, escritura diferida)
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                changes = {}
+                if self._batch_depth == 0:
+                    changes, self._batch_changes = self._batch_changes, {}
+            if changes:
+                self.store.mark_dirty()
+            if flush and self._batch_depth == 0:
+                self.store.flush()
+            if changes:
+                self._notify(changes)
+
+    def _apply(self, key_path: str, new: Any, old: Any) -> List[Tuple[str, Any, Any]]:
+        """
+        Escribir (o borrar, con _MISSING) una ruta en el documento
+
+        Returns:
+            Cambios hoja a hoja (un subárbol entero se notifica por claves)
+        """
         keys = key_path.split('.')
-        config = self.config
+        node = self.config
         for key in keys[:-1]:
-            if key not in config:
-                config[key] = {}
-            config = config[key]
-        config[keys[-1]] = value
-        self.save_config()
+            child = node.get(key)
+            if not isinstance(child, dict):
+                child = node[key] = {}
+                self._generation += 1
+            node = child
+        if new is _MISSING:
+            node.pop(keys[-1], None)
+        else:
+            node[keys[-1]] = new
+        if isinstance(new, dict) or isinstance(old, dict):
+            self._generation += 1
+            return list(_diff(key_path, old, new))
+        return [(key_path, new, old)]
+
+    def _record(self, changes: List[Tuple[str, Any, Any]]):
+        """Acumular cambios del lote abierto (se conserva el valor anterior más antiguo)"""
+        for path, new, old in changes:
+            self._batch_changes[path] = (new, self._batch_changes.get(path, (None, old))[1])
+
+    # --- OBSERVADORES ---
+    def subscribe(self, key_path: str, callback: Callable[[str, Any, Any], None]) -> Callable[[], None]:
+        """
+        Avisar de los cambios de una clave o de todo lo que cuelga de ella
+
+        Args:
+            key_path: Clave o prefijo ('performance', '' = todo)
+            callback: callback(ruta, valor, valor_anterior), en el hilo que hizo el cambio
+
+        Returns:
+            Función para cancelar la suscripción
+        """
+        with self._lock:
+            self._observers.setdefault(key_path, []).append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                callbacks = self._observers.get(key_path, [])
+                if callback in callbacks:
+                    callbacks.remove(callback)
+        return unsubscribe
+
+    def _notify(self, changes: Dict[str, Tuple[Any, Any]]):
+        for path, (new, old) in changes.items():
+            if new is _MISSING:
+                new = self.accessor(path).default()
+            if old is _MISSING:
+                old = self.accessor(path).default()
+            if new == old and type(new) is type(old) and not isinstance(new, (list, dict)):
+                continue
+            parts = path.split('.')
+            prefixes = [""] + ['.'.join(parts[:i]) for i in range(1, len(parts) + 1)]
+            with self._lock:
+                callbacks = [(prefix, cb) for prefix in prefixes for cb in self._observers.get(prefix, ())]
+            for prefix, callback in callbacks:
+                try:
+                    callback(path, new, old)
+                except RuntimeError as e:
+                    # Widget de Qt ya destruido: olvidar el observador
+                    print(f"[Config] Dropping observer of {prefix or '*'}: {e}")
+                    with self._lock:
+                        if callback in self._observers.get(prefix, []):
+                            self._observers[prefix].remove(callback)
+                except Exception as e:
+                    print(f"[Config] Observer error for {path}: {e}")
+
+    # --- RECARGA ---
+    def _disk_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.config_file.stat()
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def reload_if_changed(self) -> List[str]:
+        """
+        Aplicar las ediciones externas de config.json (avisando a los observadores)
+
+        Los cambios locales todavía sin escribir prevalecen sobre el fichero.
+        Nuestras propias escrituras no producen cambios (el contenido coincide).
+
+        Returns:
+            Rutas que cambiaron
+        """
+        stamp = self._disk_stamp()
+        if stamp is None or stamp == self._stamp:
+            return []
+        data = self.store.read()
+        if not isinstance(data, dict):
+            return []  # A medio escribir o inválido: esperar al siguiente aviso
+        self._stamp = stamp
+        applied = {}
+        with self._lock:
+            if not self.store.dirty:
+                self._local_paths.clear()
+            local = tuple(self._local_paths)
+            changes = [(path, new, old) for path, new, old in _diff("", self.config, data)
+                       if not any(path == p or path.startswith(p + '.') for p in local)]
+            for path, new, old in changes:
+                if new is not _MISSING and path in CONFIG_SCHEMA:
+                    try:
+                        new = CONFIG_SCHEMA[path].coerce(new)
+                    except (TypeError, ValueError) as e:
+                        print(f"[Config] Ignoring invalid {path} in {self.config_file.name}: {e}")
+                        continue
+                for leaf, leaf_new, leaf_old in self._apply(path, new, old):
+                    applied[leaf] = (leaf_new, leaf_old)
+            self._generation += 1
+        # Ya coincide con el disco: sólo avisar (sin marcar el almacén como sucio)
+        if applied:
+            print(f"[Config] Reloaded {self.config_file.name}: {', '.join(applied)}")
+            self._notify(applied)
+        return list(applied)
+
+
+# Instancia global (la comparten ventanas y widgets para que los avisos lleguen a todos)
+_config_manager: Optional[ConfigManager] = None
+
+def get_config_manager() -> ConfigManager:
+    """Obtener el gestor de configuración global"""
+    global _config_manager
+    if _config_manager is None:
+        _config_manager = ConfigManager()
+    return _config_manager
+
+
+if __name__ == "__main__":
+    import json
+    import shutil
+    import tempfile
+    import time
+
+    print("=" * 60)
+    print("CONFIG MANAGER TEST")
+    print("=" * 60)
+
+    config = ConfigManager(str(Path(tempfile.mkdtemp(prefix="neuro_config_")) / "config.json"))
+    config.subscribe('performance', lambda key, value, old: print(f"  📣 {key}: {old!r} -> {value!r}"))
+
+    print("Typed set ('5000' -> int, 'maybe' -> rejected):")
+    config.set('performance.radar_interval_ms', '5000')
+    config.set('performance.enable_radar', 'maybe')
+
+    print("Batch of 3 changes:")
+    with config.batch(flush=True):
+        config.set('performance.enable_radar', False)
+        config.set('performance.memory_threshold_mb', 500)
+        config.set('ui.theme', 'neon')
+    print(f"  store: {config.store.get_status()}")
+
+    print("External edit:")
+    data = json.loads(config.config_file.read_text())
+    data['performance']['radar_interval_ms'] = 1500
+    time.sleep(0.01)
+    config.config_file.write_text(json.dumps(data))
+    config.reload_if_changed()
+
+    accessor = config.accessor('performance.enable_radar')
+    start = time.perf_counter()
+    for _ in range(100000):
+        accessor.get()
+    print(f"Compiled accessor: {(time.perf_counter() - start) * 10:.2f} µs per get")
+    start = time.perf_counter()
+    for _ in range(100000):
+        config.get('performance.enable_radar')
+    print(f"get(): {(time.perf_counter() - start) * 10:.2f} µs per call")
+    shutil.rmtree(config.config_file.parent)
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧩 CPU TOPOLOGY & AFFINITY PLANNER
+Lee la topología de CPU (/sys/devices/system/cpu) y planifica afinidades:
+
+- Núcleos físicos y hermanos SMT
+- Dominios de caché L3 (CCX/CCD en AMD, clústeres en híbridos)
+- Capacidad por CPU (cpu_capacity o frecuencia máxima: P-cores vs E-cores)
+
+El juego va al mejor conjunto de núcleos aislado (mismo L3, máxima
+capacidad); Neuro-OS y el resto de procesos van a los núcleos sobrantes.
+El resto va al slice "background" (cpuset.cpus, ver cgroup_partition) o,
+sin cgroups, por afinidad (RAMManager.throttle_background).
+El plan es un dataclass: tests/test_cpu_topology.py lo prueba con árboles
+sysfs de fixture.
+"""
+
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SYSFS_CPU_ROOT = "/sys/devices/system/cpu"
+
+
+def parse_cpu_list(text: str) -> List[int]:
+    """Parsear listas tipo '0-3,8,10-11'"""
+    cpus = []
+    for part in text.strip().split(','):
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-')
+            cpus.extend(range(int(start), int(end) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+@dataclass(frozen=True)
+class LogicalCPU:
+    """CPU lógica con su posición en la topología"""
+    cpu: int
+    core_id: int
+    package_id: int
+    siblings: Tuple[int, ...]  # Hilos SMT del mismo núcleo físico
+    l3_domain: Tuple[int, ...]  # CPUs que comparten L3
+    capacity: int  # Capacidad relativa (1024 = la más rápida)
+
+
+@dataclass
+class CPUTopology:
+    """Topología completa del sistema"""
+    cpus: Dict[int, LogicalCPU] = field(default_factory=dict)
+
+    @classmethod
+    def from_sysfs(cls, root: str = SYSFS_CPU_ROOT) -> 'CPUTopology':
+        """Leer la topología de sysfs (o de un árbol de fixture)"""
+        base = Path(root)
+        online_file = base / "online"
+        if online_file.exists():
+            online = parse_cpu_list(online_file.read_text())
+        else:
+            online = sorted(int(p.name[3:]) for p in base.glob("cpu[0-9]*"))
+
+        raw = {}
+        for cpu in online:
+            cpu_dir = base / f"cpu{cpu}"
+            topo = cpu_dir / "topology"
+            siblings_file = topo / "core_cpus_list"
+            if not siblings_file.exists():
+                siblings_file = topo / "thread_siblings_list"
+            siblings = tuple(parse_cpu_list(_read(siblings_file, str(cpu))))
+
+            l3 = None
+            for index in sorted((cpu_dir / "cache").glob("index*")):
+                if _read(index / "level") == "3":
+                    l3 = tuple(parse_cpu_list(_read(index / "shared_cpu_list", str(cpu))))
+            capacity = _read(cpu_dir / "cpu_capacity")
+            max_freq = _read(cpu_dir / "cpufreq" / "cpuinfo_max_freq")
+
+            raw[cpu] = {
+                'core_id': int(_read(topo / "core_id", str(cpu))),
+                'package_id': int(_read(topo / "physical_package_id", "0")),
+                'siblings': siblings,
+                'l3': l3,
+                'capacity': int(capacity) if capacity else None,
+                'max_freq': int(max_freq) if max_freq else None
+            }
+
+        return cls._build(raw)
+
+    @classmethod
+    def from_cpu_count(cls, logical: int, physical: Optional[int] = None) -> 'CPUTopology':
+        """Topología aproximada sin sysfs (Windows): SMT adyacente, un solo L3"""
+        physical = physical or logical
+        threads = max(1, logical // max(1, physical))
+        raw = {}
+        for cpu in range(logical):
+            core = cpu // threads
+            raw[cpu] = {
+                'core_id': core, 'package_id': 0,
+                'siblings': tuple(range(core * threads, core * threads + threads)),
+                'l3': tuple(range(logical)), 'capacity': None, 'max_freq': None
+            }
+        return cls._build(raw)
+
+    @classmethod
+    def detect(cls) -> 'CPUTopology':
+        """Topología del sistema actual"""
+        if Path(SYSFS_CPU_ROOT, "online").exists():
+            return cls.from_sysfs()
+        import psutil
+        return cls.from_cpu_count(psutil.cpu_count(logical=True) or 1,
+                                  psutil.cpu_count(logical=False))
+
+    @classmethod
+    def _build(cls, raw: Dict[int, Dict]) -> 'CPUTopology':
+        # Capacidad normalizada: cpu_capacity si existe, si no frecuencia máxima
+        metric = {cpu: info['capacity'] or info['max_freq'] or 1 for cpu, info in raw.items()}
+        best = max(metric.values()) if metric else 1
+        all_cpus = tuple(sorted(raw))
+        cpus = {}
+        for cpu, info in raw.items():
+            cpus[cpu] = LogicalCPU(
+                cpu=cpu,
+                core_id=info['core_id'],
+                package_id=info['package_id'],
+                siblings=tuple(sorted(c for c in info['siblings'] if c in raw)) or (cpu,),
+                l3_domain=tuple(sorted(c for c in (info['l3'] or all_cpus) if c in raw)),
+                capacity=int(metric[cpu] * 1024 / best)
+            )
+        return cls(cpus=cpus)
+
+    def physical_cores(self) -> List[Tuple[int, ...]]:
+        """Núcleos físicos como tuplas de hilos SMT"""
+        return sorted({cpu.siblings for cpu in self.cpus.values()})
+
+    def l3_domains(self) -> List[Tuple[int, ...]]:
+        """Dominios de caché L3"""
+        return sorted({cpu.l3_domain for cpu in self.cpus.values()})
+
+    def core_capacity(self, core: Tuple[int, ...]) -> int:
+        return max(self.cpus[c].capacity for c in core)
+
+    @property
+    def is_hybrid(self) -> bool:
+        return len({self.core_capacity(core) for core in self.physical_cores()}) > 1
+
+
+@dataclass
+class AffinityPlan:
+    """Reparto de CPUs entre juego, Neuro-OS y segundo plano"""
+    game_cpus: List[int]
+    neuro_cpus: List[int]
+    background_cpus: List[int]
+    reason: str
+
+    @property
+    def isolates(self) -> bool:
+        """¿Separa el juego del resto? (con pocos núcleos todos comparten todas)"""
+        return self.game_cpus != self.neuro_cpus
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class AffinityPlanner:
+    """Planificador de afinidades basado en topología"""
+
+    # Núcleos con capacidad >= 90% de la máxima cuentan como "grandes"
+    BIG_CORE_RATIO = 0.9
+
+    def __init__(self, topology: Optional[CPUTopology] = None):
+        self.topology = topology or CPUTopology.detect()
+
+    def plan(self, game_cores: Optional[int] = None, reserve_cores: int = 1) -> AffinityPlan:
+        """
+        Calcular el plan de afinidad
+
+        Args:
+            game_cores: Núcleos físicos deseados para el juego (None = todos los posibles)
+            reserve_cores: Núcleos físicos mínimos que quedan para Neuro-OS y el resto
+
+        Returns:
+            AffinityPlan
+        """
+        topo = self.topology
+        all_cpus = sorted(topo.cpus)
+        cores = topo.physical_cores()
+
+        if len(cores) <= reserve_cores + 1:
+            return AffinityPlan(all_cpus, all_cpus, all_cpus, "too few cores to isolate")
+
+        max_cap = max(topo.core_capacity(c) for c in cores)
+        big = [c for c in cores if topo.core_capacity(c) >= max_cap * self.BIG_CORE_RATIO]
+
+        # Elegir el dominio L3 con más capacidad "grande" (el juego no debe cruzar CCX)
+        def domain_score(domain):
+            domain_big = [c for c in big if c[0] in domain]
+            # Empate: preferir el dominio sin la CPU0 (IRQs y tareas del sistema)
+            return (sum(topo.core_capacity(c) for c in domain_big), len(domain), 0 not in domain, -domain[0])
+        domains = topo.l3_domains()
+        best_domain = max(domains, key=domain_score)
+        candidates = [c for c in big if c[0] in best_domain]
+
+        # Ordenar: mayor capacidad primero; el núcleo de la CPU0 (IRQs, sistema) al final
+        candidates.sort(key=lambda c: (-topo.core_capacity(c), 0 in c, c[0]))
+
+        # Dejar siempre núcleos de reserva para el resto del sistema
+        max_for_game = len(cores) - reserve_cores
+        limit = min(len(candidates), max_for_game, game_cores or len(candidates))
+        game = candidates[:limit]
+        rest = [c for c in cores if c not in game]
+
+        if not rest:
+            return AffinityPlan(all_cpus, all_cpus, all_cpus, "no spare cores")
+
+        # Neuro-OS: el núcleo sobrante de menor capacidad (E-core / otro CCX)
+        rest.sort(key=lambda c: (topo.core_capacity(c), c[0]))
+        neuro = rest[0]
+
+        if topo.is_hybrid:
+            reason = f"hybrid: game on {len(game)} P-cores"
+        elif len(domains) > 1:
+            reason = f"multi-L3: game on L3 domain {best_domain[0]}-{best_domain[-1]}"
+        else:
+            reason = f"uniform: {len(game)} cores for game, {len(rest)} reserved"
+
+        flatten = lambda groups: sorted(cpu for group in groups for cpu in group)
+        return AffinityPlan(
+            game_cpus=flatten(game),
+            neuro_cpus=list(neuro),
+            background_cpus=flatten(rest),
+            reason=reason
+        )
+
+
+_planner: Optional[AffinityPlanner] = None
+
+def get_affinity_planner() -> AffinityPlanner:
+    """Obtener el planificador global (la topología se lee una sola vez)"""
+    global _planner
+    if _planner is None:
+        _planner = AffinityPlanner()
+    return _planner
+
+
+def _read(path: Path, default: str = "") -> str:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return default
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("CPU TOPOLOGY & AFFINITY PLANNER TEST")
+    print("=" * 60)
+
+    plan = AffinityPlanner().plan()
+    print(f"\nThis system: {plan.to_dict()}")
+
+    # Sin sysfs (Windows): SMT adyacente y un solo L3
+    for logical, physical in ((16, 8), (4, 4), (2, 1)):
+        fallback_plan = AffinityPlanner(CPUTopology.from_cpu_count(logical, physical)).plan()
+        print(f"\n{logical} threads / {physical} cores: {fallback_plan.reason}")
+        print(f"  game:       {fallback_plan.game_cpus}")
+        print(f"  neuro:      {fallback_plan.neuro_cpus}")
+        print(f"  background: {fallback_plan.background_cpus}")
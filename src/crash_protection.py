@@ -9,6 +9,8 @@ import sys
 import psutil
 import logging
 from typing import Optional
+from process_registry import get_process_registry
+from memory_profiler import get_memory_accounting
 
 # Configurar logging
 logging.basicConfig(
@@ -30,6 +32,35 @@ class CrashProtection:
         self.enabled = True
         self.warnings_count = 0
         self.emergency_mode = False
+        self.partitioned = False
+        self.saved_limits = {}  # pid -> (create_time, nice, affinity) antes de los límites
+        self.psi = None  # Backend PSI (Linux), ver start_psi_backend()
+    
+    def start_psi_backend(self) -> bool:
+        """
+        Activar la protección por Pressure Stall Information (Linux >= 4.20).
+        Sustituye al sondeo de umbrales de RAM: reacciona a eventos del kernel
+        y escala reclaim -> limitar segundo plano -> limitar Neuro-OS.
+        """
+        if self.psi is not None:
+            return True
+        try:
+            from psi_monitor import PSIMonitor, PSIProtection
+            if not PSIMonitor.is_supported():
+                return False
+            self.psi = PSIProtection(crash_protection=self)
+            self.psi.start()
+            return True
+        except Exception as e:
+            logging.error(f"PSI backend unavailable: {e}")
+            self.psi = None
+            return False
+    
+    def stop_psi_backend(self):
+        """Desactivar el backend PSI (deshace las etapas aplicadas)"""
+        if self.psi is not None:
+            self.psi.stop()
+            self.psi = None
     
     def check_system_health(self) -> dict:
         """Verificar salud del sistema"""
@@ -42,9 +73,9 @@ class CrashProtection:
             ram_percent = ram.percent
             ram_free_gb = ram.available / (1024**3)
             
-            # Procesos de Neuro-OS
-            neuro_processes = self.get_neuro_processes()
-            total_neuro_ram = sum(p.memory_info().rss for p in neuro_processes) / (1024**3)
+            # Procesos de Neuro-OS (una sola pasada sobre el árbol propio)
+            neuro_memory = get_process_registry().memory_totals()
+            total_neuro_ram = neuro_memory['rss'] / (1024**3)
             
             # Determinar estado
             status = "OK"
@@ -65,6 +96,10 @@ class CrashProtection:
             if total_neuro_ram > self.MAX_PROCESS_RAM_GB:
                 status = "WARNING"
                 warnings.append(f"Neuro-OS using too much RAM: {total_neuro_ram:.2f} GB")
+                accounting = get_memory_accounting()
+                if accounting.enabled:
+                    # Quién ocupa la memoria: buffers registrados y top de Python
+                    logging.warning(f"Neuro-OS memory breakdown: {accounting.summary()}")
             
             return {
                 'status': status,
@@ -72,6 +107,8 @@ class CrashProtection:
                 'ram_percent': ram_percent,
                 'ram_free_gb': ram_free_gb,
                 'neuro_ram_gb': total_neuro_ram,
+                'neuro_uss_gb': neuro_memory['uss'] / (1024**3),
+                'neuro_processes': neuro_memory['processes'],
                 'warnings': warnings
             }
         
@@ -80,23 +117,11 @@ class CrashProtection:
             return {'status': 'ERROR', 'warnings': [str(e)]}
     
     def get_neuro_processes(self):
-        """Obtener procesos de Neuro-OS"""
-        neuro_procs = []
+        """Obtener procesos de Neuro-OS (proceso principal, hijos y helpers registrados)"""
         try:
-            current_pid = psutil.Process().pid
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-                try:
-                    # Buscar procesos de Python relacionados con Neuro-OS
-                    if proc.info['cmdline']:
-                        cmdline = ' '.join(proc.info['cmdline']).lower()
-                        if 'neuro' in cmdline or proc.info['pid'] == current_pid:
-                            neuro_procs.append(proc)
-                except:
-                    pass
-        except:
-            pass
-        
-        return neuro_procs
+            return get_process_registry().processes()
+        except Exception:
+            return []
     
     def apply_emergency_limits(self):
         """Aplicar límites de emergencia"""
@@ -106,15 +131,25 @@ class CrashProtection:
         try:
             neuro_procs = self.get_neuro_processes()
             
+            # Linux + cgroup v2: Neuro-OS al slice "background" (reversible y persistido)
+            if sys.platform.startswith('linux') and self._apply_partition_limits(neuro_procs):
+                self.emergency_mode = True
+                return
+            
             for proc in neuro_procs:
                 try:
+                    # Guardar valores originales para restaurarlos exactamente
+                    if proc.pid not in self.saved_limits:
+                        self.saved_limits[proc.pid] = (proc.create_time(), proc.nice(), proc.cpu_affinity())
+                    
                     # Reducir prioridad
                     proc.nice(psutil.BELOW_NORMAL_PRIORITY_CLASS if sys.platform == 'win32' else 10)
                     
-                    # Limitar afinidad de CPU (usar solo mitad de cores)
-                    cpu_count = psutil.cpu_count()
-                    if cpu_count > 2:
-                        proc.cpu_affinity(list(range(cpu_count // 2)))
+                    # Limitar afinidad a los núcleos que el plan de topología reserva
+                    # para Neuro-OS (E-core / CCX sin juego), no a "la mitad"
+                    from cpu_topology import get_affinity_planner
+                    plan = get_affinity_planner().plan()
+                    proc.cpu_affinity(plan.neuro_cpus)
                     
                     logging.warning(f"Emergency limits applied to PID {proc.pid}")
                 
@@ -126,25 +161,47 @@ class CrashProtection:
         except Exception as e:
             logging.error(f"Failed to apply emergency limits: {e}")
     
+    def _apply_partition_limits(self, neuro_procs) -> bool:
+        """Mover Neuro-OS al slice limitado y el juego activo al slice de juego"""
+        try:
+            from cgroup_partition import get_partition_manager
+            from adaptive_scheduler import get_system_activity
+            partitions = get_partition_manager()
+            if not partitions.is_available():
+                return False
+            result = partitions.partition(game_pids=get_system_activity().snapshot_game_pids(),
+                                          background_pids=[p.pid for p in neuro_procs],
+                                          owner="crash_protection")
+            if result['success']:
+                logging.warning(f"Emergency limits applied via cgroup v2 to {result['moved']} processes")
+                self.partitioned = True
+                return True
+        except Exception as e:
+            logging.error(f"cgroup partition failed, falling back to nice/affinity: {e}")
+        return False
+    
     def restore_normal_mode(self):
         """Restaurar modo normal"""
         if not self.emergency_mode:
             return
         
         try:
-            neuro_procs = self.get_neuro_processes()
+            if self.partitioned:
+                from cgroup_partition import get_partition_manager
+                get_partition_manager().restore(owner="crash_protection")
+                self.partitioned = False
             
-            for proc in neuro_procs:
+            # Restaurar prioridad y afinidad originales (no "todos los cores" a ciegas)
+            for pid, (create_time, nice, affinity) in self.saved_limits.items():
                 try:
-                    # Restaurar prioridad normal
-                    proc.nice(psutil.NORMAL_PRIORITY_CLASS if sys.platform == 'win32' else 0)
-                    
-                    # Restaurar afinidad completa
-                    cpu_count = psutil.cpu_count()
-                    proc.cpu_affinity(list(range(cpu_count)))
-                    
+                    proc = psutil.Process(pid)
+                    if proc.create_time() != create_time:
+                        continue  # PID reutilizado
+                    proc.nice(nice)
+                    proc.cpu_affinity(affinity)
                 except:
                     pass
+            self.saved_limits.clear()
             
             self.emergency_mode = False
             logging.info("Normal mode restored")
@@ -159,6 +216,11 @@ class CrashProtection:
         
         health = self.check_system_health()
         
+        # Con PSI activo la escalada la gobiernan los eventos del kernel
+        if self.psi is not None:
+            health['psi'] = self.psi.get_status()
+            return health
+        
         if health['status'] == 'CRITICAL':
             self.warnings_count += 1
             logging.warning(f"CRITICAL: {health['warnings']}")
@@ -211,6 +273,11 @@ if __name__ == "__main__":
         for warning in health['warnings']:
             print(f"  - {warning}")
     
+    # PSI backend
+    if protection.start_psi_backend():
+        print(f"\nPSI backend: {protection.psi.get_status()}")
+        protection.stop_psi_backend()
+    
     # Safe limits
     limits = protection.get_safe_limits()
     print("\n\nSafe Limits:")
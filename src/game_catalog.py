@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📚 GAME CATALOG
+Catálogo de juegos con índices múltiples y búsqueda difusa
+
+- Índices hash: app_id, nombre normalizado, carpeta de instalación y
+  nombre de ejecutable (todas las búsquedas exactas son O(1))
+- Resolución de un proceso en marcha (ruta del exe o nombre) a su Game y
+  GameProfile: ruta exacta, carpeta de instalación que lo contiene (se sube
+  por los padres, acotado por la profundidad de la ruta) o nombre del exe
+- Las carpetas amplias (del sistema, la personal, poco profundas) no se
+  indexan como instalación: un atajo de Steam con StartDir /usr/bin/ no
+  convierte bash ni gnome-shell en ese juego
+- Índice de trigramas para la búsqueda mientras se escribe: sólo se puntúan
+  los títulos que comparten algún trigrama con la consulta, no toda la lista
+- Los índices se reconstruyen aparte y se sustituyen de una vez: las
+  búsquedas nunca ven un catálogo a medias
+"""
+
+import heapq
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from game_scanner import Game
+
+IS_WINDOWS = os.name == 'nt'
+
+# Ejecutables que aparecen en muchos juegos y no identifican a ninguno
+GENERIC_EXE_PREFIXES = ("unins", "crash", "vc_redist", "vcredist", "dxsetup", "dotnet",
+                        "ue4prereq", "uninstall", "setup", "installer", "redist", "easyanticheat")
+
+# Carpetas que contienen programas de todo tipo: nunca son la instalación de UN juego
+BROAD_DIRS = (
+    "/", "/bin", "/sbin", "/lib", "/lib64", "/etc", "/opt", "/srv", "/var", "/tmp", "/run",
+    "/home", "/root", "/mnt", "/media", "/app", "/app/bin", "/snap", "/snap/bin",
+    "/usr", "/usr/bin", "/usr/sbin", "/usr/lib", "/usr/lib64", "/usr/libexec", "/usr/share", "/usr/games",
+    "/usr/local", "/usr/local/bin", "/usr/local/lib", "/usr/local/share", "/usr/local/games",
+    "C:\\Windows", "C:\\Windows\\System32", "C:\\Windows\\SysWOW64", "C:\\Program Files",
+    "C:\\Program Files (x86)", "C:\\ProgramData", "C:\\Users",
+)
+# Relativas a la carpeta personal
+BROAD_HOME_DIRS = ("Games", "Desktop", "Downloads", "Documents", "Applications", "bin", ".local",
+                   ".local/bin", ".local/share", "AppData", "AppData/Local", "AppData/Roaming")
+MIN_INSTALL_DIR_DEPTH = 2  # /games o C:\Games son bibliotecas, no juegos
+
+_SYMBOLS = re.compile(r"[™®©]")
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_name(name: str) -> str:
+    """'The Witcher® 3: Wild Hunt' -> 'the witcher 3 wild hunt' (sin acentos ni símbolos)"""
+    text = unicodedata.normalize("NFKD", _SYMBOLS.sub("", name or ""))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def path_key(path: str) -> str:
+    """Clave de ruta comparable (normalizada y sin distinguir mayúsculas en Windows)"""
+    return os.path.normcase(os.path.normpath(path))
+
+
+def exe_key(exe: str) -> str:
+    """'C:/Games/Witcher3.EXE' -> 'witcher3'"""
+    base = exe.replace("\\", "/").rsplit("/", 1)[-1].lower()
+    return base[:-4] if base.endswith(".exe") else base
+
+
+def broad_dir_keys(home: Optional[str] = None) -> set:
+    """Claves (path_key) de las carpetas amplias, incluida la personal y sus padres"""
+    home_path = Path(home) if home else Path.home()
+    keys = {path_key(d) for d in BROAD_DIRS}
+    keys.update(path_key(str(home_path / d)) for d in BROAD_HOME_DIRS)
+    keys.add(path_key(str(home_path)))
+    keys.update(path_key(str(parent)) for parent in home_path.parents)
+    return keys
+
+
+def is_specific_install_dir(path: str, broad: Optional[set] = None) -> bool:
+    """
+    ¿La carpeta identifica a un solo juego? (no es del sistema, ni la personal,
+    ni una carpeta poco profunda)
+    """
+    key = path_key(path)
+    if len(Path(key).parts) - 1 < MIN_INSTALL_DIR_DEPTH:
+        return False
+    return key not in (broad if broad is not None else broad_dir_keys())
+
+
+def trigrams(text: str) -> set:
+    """Trigramas de cada palabra, con relleno para puntuar los comienzos"""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+@dataclass
+class _Indexes:
+    """Estructuras de un catálogo construido (se reemplazan enteras)"""
+    games: List[Game] = field(default_factory=list)
+    normalized: List[str] = field(default_factory=list)
+    by_app_id: Dict[str, List[int]] = field(default_factory=dict)
+    by_name: Dict[str, List[int]] = field(default_factory=dict)
+    by_dir: Dict[str, int] = field(default_factory=dict)
+    by_exe_path: Dict[str, int] = field(default_factory=dict)
+    by_exe: Dict[str, Optional[int]] = field(default_factory=dict)  # None = ambiguo
+    postings: Dict[str, List[int]] = field(default_factory=dict)
+    learned: Dict[str, Optional[int]] = field(default_factory=dict)  # ruta de exe ya resuelta
+    broad: set = field(default_factory=broad_dir_keys)
+    gram_counts: List[int] = field(default_factory=list)
+    max_dir_depth: int = 0
+
+
+class GameCatalog:
+    """Juegos indexados para búsqueda y para reconocer procesos"""
+
+    def __init__(self, games: Iterable[Game] = (), profile_manager=None):
+        """
+        Args:
+            games: Juegos iniciales
+            profile_manager: GameProfileManager para resolver perfiles (opcional)
+        """
+        self.profile_manager = profile_manager
+        self._idx = _Indexes()
+        self._refresh_thread: Optional[threading.Thread] = None
+        self.last_build_ms = 0.0
+        self.generation = 0  # Sube en cada rebuild (quien guarda resoluciones sabe si caducaron)
+        self.rebuild(games)
+
+    # --- CONSTRUCCIÓN ---
+    def rebuild(self, games: Iterable[Game], executables: Optional[Dict[str, List[str]]] = None):
+        """
+        Reconstruir todos los índices
+
+        Args:
+            games: Juegos del catálogo
+            executables: Ejecutables hallados por carpeta de instalación (ver index_executables)
+        """
+        start = time.perf_counter()
+        idx = _Indexes()
+        for game in games:
+            self._add(idx, game)
+        for install_dir, exes in (executables or {}).items():
+            gid = idx.by_dir.get(path_key(install_dir))
+            if gid is not None:
+                for exe in exes:
+                    self._add_exe(idx, exe, gid)
+        self._idx = idx  # Sustitución atómica: los lectores usan el catálogo anterior o el nuevo
+        self.generation += 1
+        self.last_build_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    def _add(self, idx: _Indexes, game: Game):
+        gid = len(idx.games)
+        norm = normalize_name(game.name)
+        idx.games.append(game)
+        idx.normalized.append(norm)
+        if game.app_id:
+            idx.by_app_id.setdefault(str(game.app_id), []).append(gid)
+        idx.by_name.setdefault(norm, []).append(gid)
+        if game.install_dir and is_specific_install_dir(game.install_dir, idx.broad):
+            key = path_key(game.install_dir)
+            idx.by_dir.setdefault(key, gid)
+            idx.max_dir_depth = max(idx.max_dir_depth, key.count(os.sep) + 1)
+        if game.path.lower().endswith(".exe"):
+            self._add_exe(idx, game.path, gid)  # Standalone/GOG: la ruta es el ejecutable
+        grams = trigrams(norm)
+        idx.gram_counts.append(len(grams))
+        for gram in grams:
+            idx.postings.setdefault(gram, []).append(gid)
+
+    @staticmethod
+    def _add_exe(idx: _Indexes, exe: str, gid: int):
+        idx.by_exe_path.setdefault(path_key(exe), gid)
+        key = exe_key(exe)
+        if key.startswith(GENERIC_EXE_PREFIXES):
+            return
+        if key in idx.by_exe and idx.by_exe[key] != gid:
+            idx.by_exe[key] = None  # El mismo nombre en dos juegos: no identifica
+        else:
+            idx.by_exe[key] = gid
+
+    @staticmethod
+    def index_executables(games: Iterable[Game], max_depth: int = 3,
+                          time_budget_s: float = 5.0) -> Dict[str, List[str]]:
+        """
+        Buscar los .exe de las carpetas de instalación (un recorrido en paralelo con caché)
+
+        Returns:
+            carpeta de instalación -> ejecutables encontrados
+        """
+        from app_paths import user_cache_file
+        from fs_crawler import FileCrawler
+        dirs = sorted({game.install_dir for game in games if game.install_dir and os.path.isdir(game.install_dir)})
+        if not dirs:
+            return {}
+        crawler = FileCrawler(patterns=["*.exe"], max_depth=max_depth, time_budget_s=time_budget_s,
+                              cache_file=str(user_cache_file("game_catalog_exe_cache.json")))
+        matches = crawler.crawl(dirs).matches
+        found: Dict[str, List[str]] = {}
+        keys = {path_key(d) + os.sep: d for d in dirs}
+        for match in matches:
+            parent = path_key(os.path.dirname(match))
+            # Asignar a la carpeta de instalación más cercana que lo contiene
+            while parent and parent + os.sep not in keys:
+                up = os.path.dirname(parent)
+                parent = up if up != parent else ""
+            if parent:
+                found.setdefault(keys[parent + os.sep], []).append(match)
+        return found
+
+    def refresh_async(self, index=None, with_executables: bool = True) -> threading.Thread:
+        """
+        Reconstruir en segundo plano desde el índice de la biblioteca
+
+        Primero con los juegos en caché (instantáneo) y, tras escanear, con
+        los juegos y ejecutables actuales.
+        """
+        def run():
+            from game_library_index import get_library_index
+            library = index or get_library_index()
+            cached = library.games()
+            if cached:
+                self.rebuild(cached)
+            games = library.scan()
+            executables = self.index_executables(games) if with_executables else None
+            self.rebuild(games, executables)
+            print(f"[Catalog] {len(games)} games indexed in {self.last_build_ms} ms")
+
+        self._refresh_thread = threading.Thread(target=run, daemon=True, name="GameCatalogRefresh")
+        self._refresh_thread.start()
+        return self._refresh_thread
+
+    # --- BÚSQUEDAS EXACTAS ---
+    def __len__(self) -> int:
+        return len(self._idx.games)
+
+    def by_app_id(self, app_id: str, launcher: Optional[str] = None) -> Optional[Game]:
+        idx = self._idx
+        for gid in idx.by_app_id.get(str(app_id), ()):
+            if launcher is None or idx.games[gid].launcher == launcher:
+                return idx.games[gid]
+        return None
+
+    def by_name(self, name: str) -> List[Game]:
+        """Juegos con ese nombre normalizado (uno por launcher donde esté)"""
+        idx = self._idx
+        return [idx.games[gid] for gid in idx.by_name.get(normalize_name(name), ())]
+
+    def by_install_dir(self, path: str) -> Optional[Game]:
+        """Juego instalado en esa carpeta o en una que la contenga"""
+        idx = self._idx
+        gid = self._dir_lookup(idx, path_key(path))
+        return idx.games[gid] if gid is not None else None
+
+    @staticmethod
+    def _dir_lookup(idx: _Indexes, key: str) -> Optional[int]:
+        for _ in range(idx.max_dir_depth + 1):
+            gid = idx.by_dir.get(key)
+            if gid is not None:
+                return gid
+            parent = os.path.dirname(key)
+            if parent == key:
+                break
+            key = parent
+        return None
+
+    # --- PROCESOS ---
+    def by_exe(self, exe: Optional[str] = None, name: Optional[str] = None) -> Optional[Game]:
+        """
+        Juego de un proceso en marcha
+
+        Args:
+            exe: Ruta del ejecutable (psutil Process.exe())
+            name: Nombre del proceso (con Proton/Wine es 'Juego.exe' aunque el exe sea wine)
+
+        Returns:
+            Game o None si no es un juego del catálogo
+        """
+        idx = self._idx
+        if exe:
+            key = path_key(exe)
+            learned = idx.learned.get(key, -1)
+            if learned != -1:
+                return idx.games[learned] if learned is not None else None
+            gid = idx.by_exe_path.get(key)
+            if gid is None:
+                gid = self._dir_lookup(idx, os.path.dirname(key))
+            if gid is None:
+                gid = idx.by_exe.get(exe_key(exe))
+            if gid is None:
+                gid = self._single(idx.by_name.get(normalize_name(Path(exe_key(exe)).name)))
+            if gid is not None or not name:
+                idx.learned[key] = gid  # Un exe se resuelve una vez por catálogo
+                return idx.games[gid] if gid is not None else None
+        if name:
+            gid = idx.by_exe.get(exe_key(name))
+            if gid is None:
+                gid = self._single(idx.by_name.get(normalize_name(exe_key(name))))
+            return idx.games[gid] if gid is not None else None
+        return None
+
+    @staticmethod
+    def _single(gids: Optional[List[int]]) -> Optional[int]:
+        return gids[0] if gids else None
+
+    def profile_for(self, game: Game):
+        """GameProfile del juego (por nombre, sin distinguir mayúsculas ni símbolos)"""
+        if self.profile_manager is None:
+            return None
+        return self.profile_manager.get_profile(game.name)
+
+    def resolve_process(self, exe: Optional[str] = None, name: Optional[str] = None) -> Tuple[Optional[Game], Optional[object]]:
+        """(Game, GameProfile) de un proceso; cualquiera de los dos puede ser None"""
+        game = self.by_exe(exe, name)
+        if game is not None:
+            return game, self.profile_for(game)
+        if self.profile_manager is not None and name:
+            # Juego sin instalar por un launcher conocido pero con perfil propio
+            return None, self.profile_manager.get_profile(exe_key(name))
+        return None, None
+
+    # --- BÚSQUEDA DIFUSA ---
+    def search(self, query: str, limit: int = 10) -> List[Tuple[Game, float]]:
+        """
+        Buscar títulos mientras se escribe (tolera errores y palabras sueltas)
+
+        Args:
+            query: Texto escrito
+            limit: Resultados máximos
+
+        Returns:
+            Lista de (Game, puntuación 0-1), de mejor a peor
+        """
+        idx = self._idx
+        norm = normalize_name(query)
+        if not norm:
+            return []
+        grams = trigrams(norm)
+        hits = Counter()
+        for gram in grams:
+            hits.update(idx.postings.get(gram, ()))
+        if not hits:
+            return []
+
+        # Con consultas cortas casi todo comparte un trigrama: descartar coincidencias sueltas
+        minimum = 1 if len(grams) <= 3 else 2
+        total = len(grams)
+        scored = []
+        for gid, count in hits.items():
+            if count < minimum:
+                continue
+            # Coeficiente de Dice sobre trigramas, con premio a prefijos y subcadenas
+            value = 2.0 * count / (total + idx.gram_counts[gid])
+            title = idx.normalized[gid]
+            if title.startswith(norm):
+                value += 0.5
+            elif norm in title:
+                value += 0.25
+            scored.append((min(1.0, value), -len(title), gid))
+        return [(idx.games[gid], round(value, 3)) for value, _, gid in heapq.nlargest(limit, scored)]
+
+    def get_status(self) -> Dict:
+        idx = self._idx
+        return {'games': len(idx.games), 'app_ids': len(idx.by_app_id), 'install_dirs': len(idx.by_dir),
+                'executables': len(idx.by_exe_path), 'trigrams': len(idx.postings),
+                'build_ms': self.last_build_ms}
+
+
+# Instancia global
+_game_catalog: Optional[GameCatalog] = None
+
+def get_game_catalog(profile_manager=None) -> GameCatalog:
+    """Obtener el catálogo global (vacío hasta el primer refresh_async o rebuild)"""
+    global _game_catalog
+    if _game_catalog is None:
+        _game_catalog = GameCatalog(profile_manager=profile_manager)
+    elif profile_manager is not None and _game_catalog.profile_manager is None:
+        _game_catalog.profile_manager = profile_manager
+    return _game_catalog
+
+
+if __name__ == "__main__":
+    import random
+
+    print("=" * 60)
+    print("GAME CATALOG TEST")
+    print("=" * 60)
+
+    random.seed(7)
+    syllables = ["ka", "ro", "mi", "tur", "van", "del", "os", "quen", "bra", "lis", "zor", "eth", "ny", "sar"]
+    words = ["dark", "souls", "legend", "space", "craft", "war", "hunter", "city", "racing", "cyber"]
+    words += ["".join(random.choice(syllables) for _ in range(random.randint(2, 3))) for _ in range(400)]
+    root = "C:\\Games" if IS_WINDOWS else "/games"
+    games = [Game(name="The Witcher® 3: Wild Hunt", path="steam://rungameid/292030", launcher="Steam",
+                  app_id="292030", install_dir=os.path.join(root, "The Witcher 3")),
+             Game(name="Warzone", path=os.path.join(root, "COD", "Warzone.exe"), launcher="Standalone",
+                  install_dir=os.path.join(root, "COD"))]
+    for i in range(5000):
+        title = " ".join(random.choice(words).title() for _ in range(random.randint(2, 4))) + f" {i}"
+        games.append(Game(name=title, path=f"steam://rungameid/{10000 + i}", launcher="Steam",
+                          app_id=str(10000 + i), install_dir=os.path.join(root, f"game{i}")))
+
+    witcher_exe = os.path.join(root, "The Witcher 3", "bin", "x64", "witcher3.exe")
+    catalog = GameCatalog(games)
+    catalog.rebuild(games, executables={os.path.join(root, "The Witcher 3"): [witcher_exe]})
+    print(f"Built: {catalog.get_status()}")
+
+    for query in ("witcher", "wichter 3", "dark souls", "cyb"):
+        start = time.perf_counter()
+        results = catalog.search(query, limit=3)
+        ms = (time.perf_counter() - start) * 1000
+        print(f"search({query!r}) {ms:.2f} ms -> {[(g.name, s) for g, s in results]}")
+
+    import difflib
+    start = time.perf_counter()
+    legacy = difflib.get_close_matches("wichter 3", [g.name.lower() for g in games], n=3, cutoff=0.3)
+    print(f"Legacy difflib scan: {legacy} in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    for exe, name in ((witcher_exe, "witcher3.exe"), (None, "Warzone.exe"),
+                      ("/usr/bin/wine64-preloader", "witcher3.exe"), ("/usr/bin/bash", "bash")):
+        start = time.perf_counter()
+        game = catalog.by_exe(exe, name)
+        print(f"by_exe({name}) -> {game.name if game else None} ({(time.perf_counter() - start) * 1e6:.0f} µs)")
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📚 GAME LIBRARY INDEX
+Índice incremental de la biblioteca de juegos de todos los launchers
+
+- Los launchers se escanean en paralelo (listar carpetas de manifiestos,
+  registro de GOG y búsqueda standalone a la vez)
+- Caché persistente por manifiesto: ruta + mtime + tamaño del manifiesto y
+  estado (mtime / existencia) de las carpetas de juego que el parser
+  consultó. Sólo se vuelven a leer los manifiestos que cambiaron o cuyo
+  juego se instaló, movió o borró; un reescaneo sin cambios es un stat por
+  manifiesto y otro por carpeta de juego
+- La caché vive en la carpeta de caché del usuario (app_paths)
+- Vigilancia opcional de las carpetas con inotify (Linux) para actualizar el
+  índice en vivo cuando Steam/Epic instalan o desinstalan; en otros sistemas
+  se reescanea periódicamente (es barato). Un error en el hilo de vigilancia
+  se registra y el hilo sigue vivo
+"""
+
+import ctypes
+import ctypes.util
+import fnmatch
+import json
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import vdf_parser
+from app_paths import user_cache_file
+from game_scanner import Game, GameScanner, get_manifest_parser
+
+IS_LINUX = sys.platform.startswith('linux')
+CACHE_VERSION = 3  # v3: estado de las carpetas de juego ('deps')
+WATCH_ERROR_BACKOFF_S = 5.0
+
+# inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct("iIII")
+
+
+class Inotify:
+    """Envoltorio mínimo de inotify sobre libc (sin dependencias)"""
+
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    def add_watch(self, path: str, mask: int = MASK) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def read(self, timeout: float) -> List[Tuple[int, int, str]]:
+        """Eventos pendientes como (wd, mask, nombre); espera como mucho timeout"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events, offset = [], 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0').decode(errors='replace')
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class GameLibraryIndex:
+    """Índice de juegos con caché por manifiesto"""
+
+    def __init__(self, scanner: Optional[GameScanner] = None, cache_file: Optional[str] = None,
+                 workers: int = 4):
+        """
+        Args:
+            scanner: GameScanner que define las fuentes (carpetas de manifiestos)
+            cache_file: Caché persistente (JSON; None = carpeta de caché del usuario)
+            workers: Hilos para listar y parsear en paralelo
+        """
+        self.scanner = scanner or GameScanner()
+        self.cache_file = Path(cache_file) if cache_file else user_cache_file("game_library_cache.json")
+        self.workers = workers
+        self._lock = threading.Lock()
+        # ruta del manifiesto -> {'launcher', 'mtime_ns', 'size', 'deps', 'games'}
+        self._manifests: Dict[str, Dict] = {}
+        self._direct: List[Game] = []  # Fuentes sin manifiestos (GOG, standalone)
+        self.last_scan: Dict = {}
+        self._stop = threading.Event()
+        self._watch_thread: Optional[threading.Thread] = None
+        self._load_cache()
+
+    # --- CACHÉ ---
+    def _load_cache(self):
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == CACHE_VERSION:
+                self._manifests = data.get('manifests', {})
+        except (OSError, ValueError):
+            self._manifests = {}
+
+    def _save_cache(self):
+        tmp = self.cache_file.with_suffix(".tmp")
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'manifests': self._manifests}, f)
+            os.replace(tmp, self.cache_file)
+        except OSError as e:
+            print(f"[LibraryIndex] Cache not saved: {e}")
+
+    # --- ESCANEO ---
+    @staticmethod
+    def _list_source(source: Tuple[str, Path, str]) -> List[Tuple[str, str, int, int]]:
+        """(launcher, ruta, mtime_ns, tamaño) de cada manifiesto de una carpeta"""
+        launcher, folder, pattern = source
+        found = []
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if not fnmatch.fnmatchcase(entry.name, pattern):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    found.append((launcher, entry.path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            pass  # Carpeta inexistente (launcher no instalado, disco desmontado)
+        return found
+
+    @staticmethod
+    def _dir_state(path: str) -> Optional[int]:
+        """mtime de una carpeta de juego (None = no existe)"""
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    @classmethod
+    def _dependencies(cls, launcher: str, path: str, games: List[Game]) -> Dict[str, Optional[int]]:
+        """
+        Carpetas de las que depende el resultado del parser: crear o borrar
+        la carpeta del juego (o su .exe) cambia el juego aunque el manifiesto
+        siga igual
+        """
+        dirs = {game.install_dir for game in games if game.install_dir}
+        if not games and path.endswith(".acf"):
+            # Steam sin carpeta de juego: se descarta hasta que aparezca
+            installdir = vdf_parser.find_keys(Path(path), ("installdir",)).get("installdir")
+            if installdir:
+                dirs.add(str(Path(path).parent / "common" / installdir))
+        return {directory: cls._dir_state(directory) for directory in sorted(dirs)}
+
+    @classmethod
+    def _parse(cls, entry: Tuple[str, str, int, int]) -> Tuple[str, Dict]:
+        launcher, path, mtime_ns, size = entry
+        try:
+            games = get_manifest_parser(launcher)(Path(path))
+        except Exception as e:
+            print(f"[LibraryIndex] Error reading {path}: {e}")
+            games = None
+        if not isinstance(games, list):
+            games = [games] if games else []  # Un manifiesto = un juego (salvo shortcuts.vdf)
+        try:
+            deps = cls._dependencies(launcher, path, games)
+        except Exception:
+            deps = {}
+        return path, {'launcher': launcher, 'mtime_ns': mtime_ns, 'size': size, 'deps': deps,
+                      'games': [asdict(game) for game in games]}
+
+    def _stale(self, cached: Optional[Dict], entry: Tuple[str, str, int, int]) -> bool:
+        """¿Hay que volver a leer el manifiesto? (él o sus carpetas de juego cambiaron)"""
+        if cached is None or (cached.get('mtime_ns'), cached.get('size')) != (entry[2], entry[3]):
+            return True
+        return any(self._dir_state(directory) != state
+                   for directory, state in cached.get('deps', {}).items())
+
+    def scan(self, folders: Optional[List[str]] = None, include_direct: bool = True) -> List[Game]:
+        """
+        Escaneo incremental
+
+        Args:
+            folders: Limitar a estas carpetas de manifiestos (None = todas)
+            include_direct: Consultar también fuentes sin manifiestos (GOG, standalone)
+
+        Returns:
+            Todos los juegos del índice
+        """
+        start = time.perf_counter()
+        sources = self.scanner.manifest_sources()
+        if folders is not None:
+            wanted = {str(Path(folder)) for folder in folders}
+            sources = [source for source in sources if str(source[1]) in wanted]
+        scanned_dirs = {str(source[1]) for source in sources}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            direct = pool.submit(self.scanner.scan_direct_sources) if include_direct else None
+            seen = {}
+            for listing in pool.map(self._list_source, sources):
+                for entry in listing:
+                    seen[entry[1]] = entry
+            with self._lock:
+                cached = {path: self._manifests.get(path) for path in seen}
+            changed = [entry for path, entry in seen.items() if self._stale(cached[path], entry)]
+            parsed = dict(pool.map(self._parse, changed))
+            direct_games = direct.result() if direct else None
+
+        with self._lock:
+            before = {path: entry.get('games') for path, entry in self._manifests.items()}
+            removed = [path for path in self._manifests
+                       if path not in seen and str(Path(path).parent) in scanned_dirs]
+            for path in removed:
+                del self._manifests[path]
+            self._manifests.update(parsed)
+            if direct_games is not None:
+                self._direct = direct_games
+            if parsed or removed:
+                self._save_cache()
+
+        diff = {
+            'added': [path for path in parsed if not before.get(path) and parsed[path]['games']],
+            'updated': [path for path in parsed if before.get(path)],
+            'removed': [path for path in removed if before.get(path)]
+        }
+        self.last_scan = {
+            'manifests': len(seen), 'parsed': len(parsed), 'cached': len(seen) - len(parsed),
+            'removed': len(removed), 'ms': round((time.perf_counter() - start) * 1000, 1),
+            'diff': diff
+        }
+        return self.games()
+
+    def games(self) -> List[Game]:
+        """Juegos del índice (sin escanear)"""
+        with self._lock:
+            games = [Game(**game) for entry in self._manifests.values() for game in entry.get('games', ())]
+            return games + list(self._direct)
+
+    # --- VIGILANCIA ---
+    def watch(self, on_change: Optional[Callable[[Dict], None]] = None,
+              debounce_s: float = 0.5, poll_s: float = 30.0) -> bool:
+        """
+        Mantener el índice al día en segundo plano
+
+        Args:
+            on_change: Llamada con el diff ({'added', 'updated', 'removed'}) tras cada cambio
+            debounce_s: Agrupar ráfagas de eventos (Steam reescribe el manifiesto varias veces)
+            poll_s: Periodo de reescaneo si no hay inotify
+
+        Returns:
+            True si se usa inotify, False si es sondeo periódico
+        """
+        inotify, watches = None, {}
+        if IS_LINUX:
+            try:
+                inotify = Inotify()
+                # Antes de volver: ningún cambio posterior a watch() se pierde
+                watches = self._add_watches(inotify)
+            except (OSError, AttributeError) as e:
+                print(f"[LibraryIndex] inotify unavailable ({e}), polling every {poll_s:.0f} s")
+        self._stop.clear()
+        self._watch_thread = threading.Thread(target=self._watch_loop, daemon=True,
+                                              args=(inotify, watches, on_change, debounce_s, poll_s),
+                                              name="LibraryIndexWatch")
+        self._watch_thread.start()
+        return inotify is not None
+
+    def stop_watch(self):
+        self._stop.set()
+        if self._watch_thread:
+            self._watch_thread.join()
+            self._watch_thread = None
+
+    def _add_watches(self, inotify: Inotify) -> Dict[int, Tuple[str, str]]:
+        """Vigilar cada carpeta de manifiestos y las que listan bibliotecas"""
+        watches = {}
+        for _, folder, pattern in self.scanner.manifest_sources():
+            try:
+                watches[inotify.add_watch(str(folder))] = (str(folder), pattern)
+            except OSError:
+                continue  # Carpeta inexistente: aparecerá en un reescaneo completo
+        return watches
+
+    def _watch_loop(self, inotify: Optional[Inotify], watches: Dict[int, Tuple[str, str]],
+                    on_change, debounce_s: float, poll_s: float):
+        def notify():
+            diff = self.last_scan.get('diff', {})
+            if on_change and any(diff.values()):
+                on_change(diff)
+
+        if inotify is None:
+            while not self._stop.wait(poll_s):
+                try:
+                    self.scan()
+                    notify()
+                except Exception as e:
+                    print(f"[LibraryIndex] Watch error: {type(e).__name__}: {e}")
+            return
+
+        pending: Dict[str, float] = {}
+        rewatch = False
+        try:
+            while not self._stop.is_set():
+                try:
+                    if rewatch:
+                        inotify.close()
+                        inotify = Inotify()
+                        watches = self._add_watches(inotify)
+                        pending.clear()
+                        rewatch = False
+                        self.scan(include_direct=False)
+                        notify()
+                        continue
+                    rewatch = self._collect_events(inotify, watches, pending, debounce_s)
+                    if rewatch:
+                        continue
+                    quiet = [folder for folder, stamp in pending.items()
+                             if time.monotonic() - stamp >= debounce_s]
+                    if quiet:
+                        for folder in quiet:
+                            del pending[folder]
+                        self.scan(folders=quiet, include_direct=False)
+                        notify()
+                except Exception as e:
+                    # Sin esto una excepción (callback, disco desmontado...) mata el hilo en silencio
+                    print(f"[LibraryIndex] Watch error: {type(e).__name__}: {e}")
+                    rewatch = True  # Rehacer los watches y reescanear tras la espera
+                    self._stop.wait(WATCH_ERROR_BACKOFF_S)
+        finally:
+            inotify.close()
+
+    @staticmethod
+    def _collect_events(inotify: Inotify, watches: Dict[int, Tuple[str, str]],
+                        pending: Dict[str, float], debounce_s: float) -> bool:
+        """Anotar carpetas con cambios; True si hay que rehacer los watches"""
+        rewatch = False
+        for wd, mask, name in inotify.read(timeout=debounce_s):
+            if wd not in watches:
+                continue
+            folder, pattern = watches[wd]
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF) or name == "libraryfolders.vdf":
+                rewatch = True  # Biblioteca añadida/quitada
+            if rewatch or fnmatch.fnmatchcase(name, pattern):
+                pending[folder] = time.monotonic()
+        return rewatch
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            indexed = sum(len(entry.get('games', ())) for entry in self._manifests.values())
+        return {'manifests': len(self._manifests), 'games': indexed + len(self._direct),
+                'watching': self._watch_thread is not None, 'last_scan': self.last_scan}
+
+
+# Instancia global
+_library_index: Optional[GameLibraryIndex] = None
+
+def get_library_index(scanner: Optional[GameScanner] = None) -> GameLibraryIndex:
+    """Obtener el índice global (el primer scanner recibido define las fuentes)"""
+    global _library_index
+    if _library_index is None:
+        _library_index = GameLibraryIndex(scanner)
+    return _library_index
+
+
+if __name__ == "__main__":
+    import random
+    import shutil
+    import tempfile
+
+    print("=" * 60)
+    print("GAME LIBRARY INDEX TEST")
+    print("=" * 60)
+
+    # Biblioteca sintética de 500 juegos de Steam
+    root = Path(tempfile.mkdtemp(prefix="neuro_library_"))
+    steamapps = root / "steamapps"
+    (steamapps / "common").mkdir(parents=True)
+
+    def write_manifest(appid: int, name: str):
+        (steamapps / "common" / f"game{appid}").mkdir(exist_ok=True)
+        (steamapps / "common" / f"game{appid}" / f"game{appid}.exe").touch()
+        (steamapps / f"appmanifest_{appid}.acf").write_text(
+            f'"AppState"\n{{\n\t"appid"\t\t"{appid}"\n\t"name"\t\t"{name}"\n'
+            f'\t"installdir"\t\t"game{appid}"\n\t"SizeOnDisk"\t\t"{random.randint(1, 10**11)}"\n}}\n')
+
+    for appid in range(1000, 1500):
+        write_manifest(appid, f"Synthetic Game {appid}")
+
+    class DemoScanner(GameScanner):
+        def get_steam_path(self):
+            return str(root)
+
+    index = GameLibraryIndex(DemoScanner(), cache_file=str(root / "cache.json"))
+    games = index.scan()
+    print(f"Cold scan: {len(games)} games {index.last_scan['ms']} ms "
+          f"(parsed {index.last_scan['parsed']})")
+
+    reloaded = GameLibraryIndex(DemoScanner(), cache_file=str(root / "cache.json"))
+    games = reloaded.scan()
+    print(f"Warm rescan (new process, persisted cache): {len(games)} games "
+          f"{reloaded.last_scan['ms']} ms (parsed {reloaded.last_scan['parsed']})")
+
+    changes = []
+    uses_inotify = reloaded.watch(on_change=changes.append, debounce_s=0.2)
+    write_manifest(2000, "Freshly Installed")
+    (steamapps / "appmanifest_1000.acf").unlink()
+    time.sleep(0.8)
+    reloaded.stop_watch()
+    print(f"Live update via {'inotify' if uses_inotify else 'polling'}: {changes}")
+    print(f"Status: { {k: v for k, v in reloaded.get_status().items() if k != 'last_scan'} }")
+    shutil.rmtree(root)
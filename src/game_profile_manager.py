@@ -5,12 +5,17 @@
 Gestor de perfiles de optimización por juego con IA
 """
 
-import json
+import os
+import shutil
+import struct
+import threading
 from pathlib import Path
-from typing import Dict, Optional, List
-from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, Optional, List
 from enum import Enum
 
+from app_paths import user_data_dir
+from persistence import get_store
+
 class GameCategory(Enum):
     """Categorías de juegos para optimización"""
     COMPETITIVE_FPS = "competitive_fps"  # CS2, Valorant, Apex
@@ -22,58 +27,228 @@ class GameCategory(Enum):
     STRATEGY = "strategy"                # Civilization, Age of Empires
     CASUAL = "casual"                    # Fall Guys, Among Us
 
-@dataclass
+PROFILES_FILE_NAME = "game_profiles.json"
+
+# Versión del formato serializado de GameProfile (campo 'v' en JSON, cabecera en binario)
+PROFILE_SCHEMA_VERSION = 2
+
+CPU_PRIORITIES = ("low", "normal", "high", "realtime")
+_CATEGORIES = tuple(GameCategory)
+_CATEGORY_INDEX = {category: i for i, category in enumerate(_CATEGORIES)}
+_PRIORITY_INDEX = {priority: i for i, priority in enumerate(CPU_PRIORITIES)}
+
 class GameProfile:
-    """Perfil de optimización para un juego"""
-    name: str
-    category: GameCategory
-    target_fps: int = 60
+    """Perfil de optimización para un juego
+    
+    Clase con __slots__ (sin __dict__ por instancia) y serialización escrita a
+    mano: to_dict/from_dict se ejecutan en cada guardado y carga de perfiles.
+    """
     
-    # Optimizaciones de resolución
-    render_scale: float = 1.0  # 0.5 = 720p, 0.75 = 1080p, 1.0 = native
+    __slots__ = (
+        'name', 'category', 'target_fps',
+        'render_scale',                                      # 0.5 = 720p, 0.75 = 1080p, 1.0 = native
+        'cpu_priority', 'gpu_priority',                      # low/normal/high/realtime, 0-8 (8 = máxima)
+        'ram_cleanup_before_launch', 'aggressive_ram_cleanup',
+        'network_optimization', 'close_bandwidth_hogs',
+        'disable_overlays', 'disable_recording',             # Discord/Steam overlay, OBS/ShadowPlay
+        'last_fps', 'avg_fps', 'min_fps',                    # Benchmarks
+    )
     
-    # Prioridades de sistema
-    cpu_priority: str = "high"  # low, normal, high, realtime
-    gpu_priority: int = 8  # 0-8, 8 = máxima
+    # Opciones on/off en el orden de los bits del formato binario
+    FLAGS = ('ram_cleanup_before_launch', 'aggressive_ram_cleanup', 'network_optimization',
+             'close_bandwidth_hogs', 'disable_overlays', 'disable_recording')
     
-    # Optimizaciones de RAM
-    ram_cleanup_before_launch: bool = True
-    aggressive_ram_cleanup: bool = False
+    def __init__(self, name: str, category: GameCategory, target_fps: int = 60,
+                 render_scale: float = 1.0, cpu_priority: str = "high", gpu_priority: int = 8,
+                 ram_cleanup_before_launch: bool = True, aggressive_ram_cleanup: bool = False,
+                 network_optimization: bool = False, close_bandwidth_hogs: bool = False,
+                 disable_overlays: bool = False, disable_recording: bool = False,
+                 last_fps: Optional[float] = None, avg_fps: Optional[float] = None,
+                 min_fps: Optional[float] = None):
+        self.name = name
+        self.category = category
+        self.target_fps = target_fps
+        self.render_scale = render_scale
+        self.cpu_priority = cpu_priority
+        self.gpu_priority = gpu_priority
+        self.ram_cleanup_before_launch = ram_cleanup_before_launch
+        self.aggressive_ram_cleanup = aggressive_ram_cleanup
+        self.network_optimization = network_optimization
+        self.close_bandwidth_hogs = close_bandwidth_hogs
+        self.disable_overlays = disable_overlays
+        self.disable_recording = disable_recording
+        self.last_fps = last_fps
+        self.avg_fps = avg_fps
+        self.min_fps = min_fps
     
-    # Optimizaciones de red
-    network_optimization: bool = False
-    close_bandwidth_hogs: bool = False
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{slot}={getattr(self, slot)!r}" for slot in self.__slots__)
+        return f"GameProfile({fields})"
     
-    # Configuraciones específicas
-    disable_overlays: bool = False  # Discord, Steam overlay
-    disable_recording: bool = False  # OBS, ShadowPlay
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
     
-    # Benchmarks
-    last_fps: Optional[float] = None
-    avg_fps: Optional[float] = None
-    min_fps: Optional[float] = None
+    __hash__ = None  # Mutable: no se usa como clave
     
     def to_dict(self) -> Dict:
-        """Convertir a diccionario"""
-        data = asdict(self)
-        data['category'] = self.category.value
-        return data
+        """Convertir a diccionario (plano: sin copia recursiva)"""
+        return {
+            'v': PROFILE_SCHEMA_VERSION,
+            'name': self.name,
+            'category': self.category.value,
+            'target_fps': self.target_fps,
+            'render_scale': self.render_scale,
+            'cpu_priority': self.cpu_priority,
+            'gpu_priority': self.gpu_priority,
+            'ram_cleanup_before_launch': self.ram_cleanup_before_launch,
+            'aggressive_ram_cleanup': self.aggressive_ram_cleanup,
+            'network_optimization': self.network_optimization,
+            'close_bandwidth_hogs': self.close_bandwidth_hogs,
+            'disable_overlays': self.disable_overlays,
+            'disable_recording': self.disable_recording,
+            'last_fps': self.last_fps,
+            'avg_fps': self.avg_fps,
+            'min_fps': self.min_fps,
+        }
     
     @classmethod
     def from_dict(cls, data: Dict) -> 'GameProfile':
-        """Crear desde diccionario"""
-        data['category'] = GameCategory(data['category'])
-        return cls(**data)
+        """Crear desde diccionario (no modifica data; ignora campos desconocidos)"""
+        # v1 (sin 'v'): mismos campos, sin versión
+        get = data.get
+        version = get('v', 1)
+        if not isinstance(version, int) or not 1 <= version <= PROFILE_SCHEMA_VERSION:
+            raise ValueError(f"Unsupported profile version {version!r}")
+        return cls(
+            name=data['name'],
+            category=GameCategory(data['category']),
+            target_fps=get('target_fps', 60),
+            render_scale=get('render_scale', 1.0),
+            cpu_priority=get('cpu_priority', "high"),
+            gpu_priority=get('gpu_priority', 8),
+            ram_cleanup_before_launch=get('ram_cleanup_before_launch', True),
+            aggressive_ram_cleanup=get('aggressive_ram_cleanup', False),
+            network_optimization=get('network_optimization', False),
+            close_bandwidth_hogs=get('close_bandwidth_hogs', False),
+            disable_overlays=get('disable_overlays', False),
+            disable_recording=get('disable_recording', False),
+            last_fps=get('last_fps'),
+            avg_fps=get('avg_fps'),
+            min_fps=get('min_fps'),
+        )
+
+
+# --- FORMATO BINARIO ---
+# Cabecera: magia, versión, número de perfiles
+_BIN_MAGIC = b"NGP"
+_BIN_HEADER = struct.Struct("<3sBI")
+# Por perfil (tras el nombre UTF-8 con longitud uint16): target_fps, render_scale,
+# categoría, prioridad CPU, prioridad GPU, bits de opciones, last/avg/min fps (NaN = None)
+_BIN_RECORD = struct.Struct("<HdBBBBddd")
+_NAN = float('nan')
+
+
+def profiles_to_bytes(profiles: Iterable[GameProfile]) -> bytes:
+    """Serializar perfiles al formato binario compacto"""
+    profiles = list(profiles)
+    out = bytearray(_BIN_HEADER.pack(_BIN_MAGIC, PROFILE_SCHEMA_VERSION, len(profiles)))
+    pack = _BIN_RECORD.pack
+    flags_of = GameProfile.FLAGS
+    for p in profiles:
+        name = p.name.encode('utf-8')
+        flags = 0
+        for bit, attr in enumerate(flags_of):
+            if getattr(p, attr):
+                flags |= 1 << bit
+        priority = _PRIORITY_INDEX.get(p.cpu_priority)
+        if priority is None:
+            raise ValueError(f"{p.name}: unknown cpu_priority {p.cpu_priority!r}")
+        out += len(name).to_bytes(2, 'little')
+        out += name
+        out += pack(p.target_fps, p.render_scale, _CATEGORY_INDEX[p.category],
+                    priority, p.gpu_priority, flags,
+                    _NAN if p.last_fps is None else p.last_fps,
+                    _NAN if p.avg_fps is None else p.avg_fps,
+                    _NAN if p.min_fps is None else p.min_fps)
+    return bytes(out)
+
+
+def profiles_from_bytes(data: bytes) -> List[GameProfile]:
+    """Leer perfiles del formato binario compacto"""
+    magic, version, count = _BIN_HEADER.unpack_from(data, 0)
+    # El binario nació con la v2: cualquier otra versión no se sabe leer
+    if magic != _BIN_MAGIC or version != PROFILE_SCHEMA_VERSION:
+        raise ValueError(f"Unsupported profile data (magic {magic!r}, version {version})")
+    pos = _BIN_HEADER.size
+    unpack = _BIN_RECORD.unpack_from
+    size = _BIN_RECORD.size
+    flags_of = GameProfile.FLAGS
+    profiles = []
+    for _ in range(count):
+        length = int.from_bytes(data[pos:pos + 2], 'little')
+        name = data[pos + 2:pos + 2 + length].decode('utf-8')
+        pos += 2 + length
+        target, scale, category, priority, gpu, flags, last, avg, low = unpack(data, pos)
+        pos += size
+        profile = GameProfile(name, _CATEGORIES[category], target, scale, CPU_PRIORITIES[priority], gpu,
+                              last_fps=None if last != last else last,   # NaN != NaN
+                              avg_fps=None if avg != avg else avg,
+                              min_fps=None if low != low else low)
+        for bit, attr in enumerate(flags_of):
+            setattr(profile, attr, bool(flags & (1 << bit)))
+        profiles.append(profile)
+    return profiles
+
+def default_profiles_file() -> Path:
+    """
+    game_profiles.json en la carpeta de datos del usuario
+
+    Antes se usaba uno relativo al directorio de trabajo: si existe (o uno
+    junto al módulo) y aún no hay perfiles de usuario, se copia la primera vez.
+    """
+    path = user_data_dir() / PROFILES_FILE_NAME
+    if not path.exists():
+        for legacy in (Path.cwd() / PROFILES_FILE_NAME, Path(__file__).parent / PROFILES_FILE_NAME):
+            if legacy.is_file():
+                try:
+                    shutil.copy2(legacy, path)
+                    print(f"[Profiles] Imported {legacy} -> {path}")
+                    break
+                except OSError as e:
+                    print(f"[Profiles] Could not import {legacy}: {e}")
+    return path
 
 class GameProfileManager:
-    """Gestor de perfiles de juego con IA"""
+    """Gestor de perfiles de juego con IA
+    
+    Un gestor por fichero: el almacén es compartido y guarda los perfiles de
+    su dueño, así que un segundo gestor del mismo fichero perdería cambios.
+    Usar get_game_profile_manager() para obtener el existente.
+    """
     
-    def __init__(self, profiles_file: str = "game_profiles.json"):
-        self.profiles_file = Path(profiles_file)
+    def __init__(self, profiles_file: Optional[str] = None):
+        """
+        Args:
+            profiles_file: Fichero de perfiles (None = default_profiles_file())
+        """
+        self.profiles_file = Path(profiles_file) if profiles_file else default_profiles_file()
         self.profiles: Dict[str, GameProfile] = {}
+        # Escritura diferida: ai_auto_optimize cambia el perfil en cada tick
+        # indent=2: el fichero se edita a mano
+        self.store = get_store(self.profiles_file, debounce_s=5.0, max_delay_s=60.0, indent=2)
+        if self.store.snapshot is not None:
+            raise ValueError(f"{self.profiles_file} already has a GameProfileManager; "
+                             f"use get_game_profile_manager()")
+        self.store.snapshot = self._snapshot
         self.load_profiles()
         self._init_default_profiles()
     
+    def _snapshot(self) -> Dict:
+        """Documento que guarda el almacén: los perfiles de este gestor"""
+        return {name: profile.to_dict() for name, profile in self.profiles.items()}
+    
     def _init_default_profiles(self):
         """Inicializar perfiles por defecto para juegos populares"""
         defaults = {
@@ -158,43 +333,40 @@ class GameProfileManager:
         }
         
         # Añadir solo si no existen
-        for name, profile in defaults.items():
-            if name not in self.profiles:
-                self.profiles[name] = profile
+        missing = [name for name in defaults if name not in self.profiles]
+        for name in missing:
+            self.profiles[name] = defaults[name]
         
-        self.save_profiles()
+        if missing:
+            self.store.mark_dirty()
     
     def load_profiles(self):
         """Cargar perfiles desde archivo"""
-        if self.profiles_file.exists():
+        data = self.store.load()
+        for name, profile_data in data.items():
             try:
-                with open(self.profiles_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
-                for name, profile_data in data.items():
-                    self.profiles[name] = GameProfile.from_dict(profile_data)
+                self.profiles[name] = GameProfile.from_dict(profile_data)
             except Exception as e:
-                print(f"Error loading profiles: {e}")
+                print(f"Error loading profile {name}: {e}")
     
-    def save_profiles(self):
-        """Guardar perfiles a archivo"""
-        try:
-            data = {name: profile.to_dict() for name, profile in self.profiles.items()}
-            
-            with open(self.profiles_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"Error saving profiles: {e}")
+    def save_profiles(self) -> bool:
+        """Guardar ya los cambios pendientes (normalmente se guardan en diferido)"""
+        return self.store.flush()
     
     def get_profile(self, game_name: str) -> Optional[GameProfile]:
-        """Obtener perfil de un juego"""
-        return self.profiles.get(game_name)
+        """Obtener perfil de un juego (si no coincide exacto, por nombre normalizado)"""
+        profile = self.profiles.get(game_name)
+        if profile is None:
+            from game_catalog import normalize_name
+            wanted = normalize_name(game_name)
+            profile = next((p for name, p in self.profiles.items() if normalize_name(name) == wanted), None)
+        return profile
     
     def create_profile(self, game_name: str, category: GameCategory) -> GameProfile:
         """Crear nuevo perfil para un juego"""
         profile = GameProfile(name=game_name, category=category)
         self.profiles[game_name] = profile
-        self.save_profiles()
+        self.store.mark_dirty()
         return profile
     
     def update_profile(self, game_name: str, **kwargs):
@@ -206,12 +378,21 @@ class GameProfileManager:
                 if hasattr(profile, key):
                     setattr(profile, key, value)
             
-            self.save_profiles()
+            self.store.mark_dirty()
     
-    def optimize_for_game(self, game_name: str) -> Dict:
+    def optimize_for_game(self, game_name: str, exe_path: Optional[str] = None,
+                          deadline_s: float = 2.0) -> Dict:
         """
         Aplicar optimizaciones para un juego específico
         
+        Los pasos (RAM, segundo plano, red, reserva de CPU, precarga de
+        caché) corren en paralelo; como mucho se espera deadline_s.
+        
+        Args:
+            game_name: Nombre del juego
+            exe_path: Ejecutable del juego (activa la precarga de caché)
+            deadline_s: Espera máxima antes de devolver
+        
         Returns:
             Dict con acciones tomadas
         """
@@ -223,36 +404,11 @@ class GameProfileManager:
                 'message': f'No profile found for {game_name}'
             }
         
-        actions = []
-        
-        # 1. Optimización de RAM
-        if profile.ram_cleanup_before_launch:
-            try:
-                from ram_manager import RAMManager
-                ram_mgr = RAMManager()
-                result = ram_mgr.free_ram(aggressive=profile.aggressive_ram_cleanup)
-                actions.append(f"RAM freed: {result['ram_freed_gb']:.2f} GB")
-            except Exception as e:
-                actions.append(f"RAM cleanup failed: {e}")
-        
-        # 2. Optimización de red
-        if profile.network_optimization:
-            try:
-                from network_optimizer import NetworkOptimizer
-                net_opt = NetworkOptimizer()
-                
-                if profile.close_bandwidth_hogs:
-                    result = net_opt.close_bandwidth_hogs()
-                    if result['success'] and result['count'] > 0:
-                        actions.append(f"Closed {result['count']} bandwidth hogs")
-                
-                # Flush DNS
-                net_opt.flush_dns_cache()
-                actions.append("DNS cache flushed")
-            except Exception as e:
-                actions.append(f"Network optimization failed: {e}")
+        from launch_pipeline import build_prelaunch_pipeline
+        report = build_prelaunch_pipeline(profile, exe_path=exe_path, deadline_s=deadline_s).run()
+        actions = report.lines()
         
-        # 3. Configurar prioridades (esto se haría al lanzar el juego)
+        # Prioridades (process_supervisor las aplica al lanzar el proceso)
         actions.append(f"CPU Priority: {profile.cpu_priority}")
         actions.append(f"GPU Priority: {profile.gpu_priority}")
         actions.append(f"Target FPS: {profile.target_fps}")
@@ -263,7 +419,8 @@ class GameProfileManager:
             'game': game_name,
             'category': profile.category.value,
             'actions': actions,
-            'profile': profile
+            'profile': profile,
+            'prelaunch': report
         }
     
     def ai_auto_optimize(self, game_name: str, current_fps: float) -> Dict:
@@ -322,7 +479,7 @@ class GameProfileManager:
                 adjustments.append("Enabled aggressive RAM cleanup")
         
         # Guardar cambios
-        self.save_profiles()
+        self.store.mark_dirty()
         
         return {
             'success': True,
@@ -342,18 +499,32 @@ class GameProfileManager:
         """Eliminar perfil"""
         if game_name in self.profiles:
             del self.profiles[game_name]
-            self.save_profiles()
+            self.store.mark_dirty()
             return True
         return False
 
 
+_managers: Dict[str, GameProfileManager] = {}
+_managers_lock = threading.Lock()
+
+def get_game_profile_manager(profiles_file: Optional[str] = None) -> GameProfileManager:
+    """Gestor de un fichero de perfiles (el mismo objeto para todos sus usuarios)"""
+    profiles_file = profiles_file or default_profiles_file()
+    key = os.path.realpath(profiles_file)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = _managers[key] = GameProfileManager(profiles_file)
+        return manager
+
+
 if __name__ == '__main__':
     print("=" * 60)
     print("🎮 GAME PROFILE MANAGER TEST")
     print("=" * 60)
     print()
     
-    manager = GameProfileManager()
+    manager = get_game_profile_manager()
     
     # Listar perfiles
     print("📋 Available Profiles:")
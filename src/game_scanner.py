@@ -6,29 +6,188 @@ Detecta juegos instalados de Steam, Epic Games, GOG, y otros launchers
 """
 
 import os
+import sys
 import json
-import winreg
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 
+import vdf_parser
+from fs_crawler import FileCrawler
+
+try:
+    import winreg
+except ImportError:  # Linux/macOS: Steam y GOG se localizan por otras vías
+    winreg = None
+
+EPIC_MANIFESTS = Path("C:/ProgramData/Epic/EpicGamesLauncher/Data/Manifests")
+
 @dataclass
 class Game:
     """Representa un juego detectado"""
     name: str
     path: str
-    launcher: str  # "Steam", "Epic", "GOG", "Standalone"
+    launcher: str  # "Steam", "Epic", "GOG", "Lutris", "Heroic", "itch", "Standalone"
     app_id: Optional[str] = None
     icon: str = "🎮"
+    install_dir: Optional[str] = None
+    runner: Optional[str] = None  # "native", "proton", "wine"... (None = Windows nativo)
+
+
+# Herramientas de Steam que aparecen como apps instaladas pero no son juegos
+STEAM_TOOL_APPIDS = {"228980", "1070560", "1391110", "1628350", "1493710"}
+STEAM_TOOL_PREFIXES = ("Proton", "Steam Linux Runtime", "Steamworks Common Redistributables")
+
+
+# --- PARSERS POR MANIFIESTO (usados también por game_library_index) ---
+def read_steam_library_folders(steam_path: str) -> List[Path]:
+    """Carpetas steamapps de todas las bibliotecas de Steam"""
+    library_paths = [Path(steam_path) / "steamapps"]
+    library_file = Path(steam_path) / "steamapps" / "libraryfolders.vdf"
+    try:
+        data = vdf_parser.load(library_file)
+    except (OSError, vdf_parser.VDFError):
+        return library_paths
+    
+    # Formato actual: "0" { "path" "..." }; antiguo: "1" "D:\\SteamLibrary"
+    folders = next(iter(data.values()), {}) if data else {}
+    for key, entry in folders.items():
+        path = entry.get("path") if isinstance(entry, dict) else (entry if key.isdigit() else None)
+        if path and Path(path) / "steamapps" not in library_paths:
+            library_paths.append(Path(path) / "steamapps")
+    return library_paths
+
+
+def steam_sources(steam_path: str) -> List[Tuple[str, Path, str]]:
+    """Fuentes de manifiestos de una instalación de Steam (bibliotecas y atajos)"""
+    sources = []
+    seen = set()
+    for lib_path in read_steam_library_folders(steam_path):
+        real = os.path.realpath(lib_path)
+        if real not in seen:  # ~/.steam/steam suele ser un enlace a ~/.local/share/Steam
+            seen.add(real)
+            sources.append(("Steam", lib_path, "appmanifest_*.acf"))
+    for config_dir in (Path(steam_path) / "userdata").glob("*/config"):
+        sources.append(("SteamShortcuts", config_dir, "shortcuts.vdf"))
+    return sources
+
+
+def parse_steam_manifest(acf_file: Path) -> Optional[Game]:
+    """Juego descrito por un appmanifest_*.acf (None si no está instalado)"""
+    # Salida temprana: las tres claves están al principio del manifiesto
+    keys = vdf_parser.find_keys(acf_file, ("appid", "name", "installdir"))
+    name = keys.get("name")
+    appid = keys.get("appid")
+    install_dir = keys.get("installdir")
+    
+    if not (name and appid and install_dir):
+        return None
+    if appid in STEAM_TOOL_APPIDS or name.startswith(STEAM_TOOL_PREFIXES):
+        return None
+    
+    library = Path(acf_file).parent
+    game_path = library / "common" / install_dir
+    
+    runner = None
+    if sys.platform == 'win32':
+        # Buscar .exe principal (basta con uno)
+        if next(game_path.glob("*.exe"), None) is None:
+            return None
+    else:
+        if not game_path.is_dir():
+            return None
+        # Juego de Windows ejecutado con Proton: tiene prefijo en compatdata
+        runner = "proton" if (library / "compatdata" / appid).is_dir() else "native"
+    return Game(
+        name=name,
+        path=f"steam://rungameid/{appid}",
+        launcher="Steam",
+        app_id=appid,
+        icon="🎮",
+        install_dir=str(game_path),
+        runner=runner
+    )
+
+
+def parse_steam_shortcuts(shortcuts_file: Path) -> List[Game]:
+    """Juegos no-Steam añadidos a Steam (userdata/<id>/config/shortcuts.vdf)"""
+    games = []
+    for entry in vdf_parser.read_shortcuts(shortcuts_file):
+        name = entry.get("appname")
+        if not name:
+            continue
+        appid = entry.get("appid", 0) & 0xFFFFFFFF
+        # El id de lanzamiento de un atajo es el appid en los 32 bits altos
+        game_id = (appid << 32) | 0x02000000
+        start_dir = str(entry.get("startdir", "")).strip('"')
+        games.append(Game(
+            name=name,
+            path=f"steam://rungameid/{game_id}",
+            launcher="Steam",
+            app_id=str(appid),
+            icon="🕹️",
+            install_dir=start_dir or None
+        ))
+    return games
+
+
+def parse_epic_manifest(manifest_file: Path) -> Optional[Game]:
+    """Juego descrito por un manifiesto .item de Epic"""
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    name = data.get("DisplayName", "Unknown")
+    install_location = data.get("InstallLocation", "")
+    app_name = data.get("AppName", "")
+    
+    if not (name and install_location):
+        return None
+    return Game(
+        name=name,
+        path=install_location,
+        launcher="Epic",
+        app_id=app_name,
+        icon="🎮",
+        install_dir=install_location
+    )
+
+
+# Cada parser devuelve un Game, None o (varios juegos por fichero) una lista
+MANIFEST_PARSERS = {
+    "Steam": parse_steam_manifest,
+    "SteamShortcuts": parse_steam_shortcuts,
+    "Epic": parse_epic_manifest,
+}
+
+
+def get_manifest_parser(source: str):
+    """Parser de una fuente: los propios o los de un backend de launchers/"""
+    parser = MANIFEST_PARSERS.get(source)
+    if parser is None:
+        import launchers
+        parser = launchers.get_parser(source)
+    return parser
 
 class GameScanner:
     """Escanea y detecta juegos instalados en el sistema"""
+
+    # Límites del recorrido standalone en los escaneos automáticos (get_all_games,
+    # catálogo): Program Files/Editor/Juego/bin/juego.exe son 4 niveles
+    STANDALONE_MAX_DEPTH = 5
+    STANDALONE_TIME_BUDGET_S = 10.0
     
-    def __init__(self):
+    def __init__(self, home: Optional[Path] = None):
+        """
+        Args:
+            home: Carpeta personal donde buscar launchers (None = la del usuario)
+        """
+        self.home = Path(home) if home else Path.home()
         self.games: List[Game] = []
     
     def get_steam_path(self) -> Optional[str]:
         """Obtener ruta de instalación de Steam desde el registro"""
+        if winreg is None:
+            return None
         try:
             key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, 
                                 r"SOFTWARE\WOW6432Node\Valve\Steam")
@@ -46,75 +205,49 @@ class GameScanner:
             except:
                 return None
     
-    def scan_steam_library(self) -> List[Game]:
-        """Escanear biblioteca de Steam"""
-        games = []
-        steam_path = self.get_steam_path()
-        
-        if not steam_path:
-            print("⚠️ Steam no encontrado")
-            return games
-        
-        # Buscar libraryfolders.vdf
-        library_file = Path(steam_path) / "steamapps" / "libraryfolders.vdf"
-        
-        if not library_file.exists():
-            return games
-        
-        # Leer carpetas de biblioteca
-        library_paths = [Path(steam_path) / "steamapps"]
-        
-        try:
-            with open(library_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                # Buscar rutas adicionales (formato simple)
-                for line in content.split('\n'):
-                    if '"path"' in line:
-                        path = line.split('"')[3]
-                        library_paths.append(Path(path) / "steamapps")
-        except:
-            pass
+    def manifest_sources(self) -> List[Tuple[str, Path, str]]:
+        """
+        Carpetas de manifiestos de cada launcher
+
+        Returns:
+            Lista de (launcher, carpeta, patrón glob)
+        """
+        import launchers
         
-        # Escanear cada carpeta de biblioteca
-        for lib_path in library_paths:
-            if not lib_path.exists():
+        sources = []
+        steam_path = self.get_steam_path()
+        if steam_path:
+            sources.extend(steam_sources(steam_path))
+        if sys.platform == 'win32':
+            sources.append(("Epic", EPIC_MANIFESTS, "*.item"))
+        # Backends de la plataforma actual (Steam nativo/Flatpak, Lutris, Heroic, itch)
+        for backend in launchers.detect_backends(self.home):
+            sources.extend(backend.manifest_sources())
+        return sources
+    
+    def _scan_manifests(self, launcher: str) -> List[Game]:
+        games = []
+        for source, folder, pattern in self.manifest_sources():
+            if not source.startswith(launcher) or not folder.exists():
                 continue
-            
-            # Buscar archivos .acf (manifiestos de juegos)
-            for acf_file in lib_path.glob("appmanifest_*.acf"):
+            for manifest in folder.glob(pattern):
                 try:
-                    with open(acf_file, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        
-                        # Extraer nombre y appid
-                        name = None
-                        appid = None
-                        install_dir = None
-                        
-                        for line in content.split('\n'):
-                            if '"name"' in line:
-                                name = line.split('"')[3]
-                            elif '"appid"' in line:
-                                appid = line.split('"')[3]
-                            elif '"installdir"' in line:
-                                install_dir = line.split('"')[3]
-                        
-                        if name and appid and install_dir:
-                            game_path = lib_path / "common" / install_dir
-                            
-                            # Buscar .exe principal
-                            exe_files = list(game_path.glob("*.exe"))
-                            if exe_files:
-                                games.append(Game(
-                                    name=name,
-                                    path=f"steam://rungameid/{appid}",
-                                    launcher="Steam",
-                                    app_id=appid,
-                                    icon="🎮"
-                                ))
+                    game = get_manifest_parser(source)(manifest)
+                    if isinstance(game, list):
+                        games.extend(game)
+                    elif game:
+                        games.append(game)
                 except Exception as e:
-                    print(f"Error leyendo {acf_file}: {e}")
-        
+                    print(f"Error leyendo {manifest}: {e}")
+        return games
+    
+    def scan_steam_library(self) -> List[Game]:
+        """Escanear biblioteca de Steam"""
+        # Registro en Windows; en Linux lo localiza el backend de launchers/
+        games = self._scan_manifests("Steam")
+        if not games and not self.get_steam_path():
+            print("⚠️ Steam no encontrado")
+            return games
         print(f"✅ Steam: {len(games)} juegos encontrados")
         return games
     
@@ -127,41 +260,19 @@ class GameScanner:
     
     def scan_epic_library(self) -> List[Game]:
         """Escanear biblioteca de Epic Games"""
-        games = []
-        
         # Epic guarda manifiestos en ProgramData
-        manifests_path = Path("C:/ProgramData/Epic/EpicGamesLauncher/Data/Manifests")
-        
-        if not manifests_path.exists():
+        if not EPIC_MANIFESTS.exists():
             print("⚠️ Epic Games no encontrado")
-            return games
-        
-        for manifest_file in manifests_path.glob("*.item"):
-            try:
-                with open(manifest_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
-                    name = data.get("DisplayName", "Unknown")
-                    install_location = data.get("InstallLocation", "")
-                    app_name = data.get("AppName", "")
-                    
-                    if name and install_location:
-                        games.append(Game(
-                            name=name,
-                            path=install_location,
-                            launcher="Epic",
-                            app_id=app_name,
-                            icon="🎮"
-                        ))
-            except Exception as e:
-                print(f"Error leyendo Epic manifest: {e}")
-        
+            return []
+        games = self._scan_manifests("Epic")
         print(f"✅ Epic Games: {len(games)} juegos encontrados")
         return games
     
     def scan_gog_library(self) -> List[Game]:
         """Escanear biblioteca de GOG"""
         games = []
+        if winreg is None:
+            return games
         
         try:
             # GOG guarda juegos en el registro
@@ -182,7 +293,8 @@ class GameScanner:
                             name=name,
                             path=path,
                             launcher="GOG",
-                            icon="🎮"
+                            icon="🎮",
+                            install_dir=path
                         ))
                     except:
                         pass
@@ -199,8 +311,17 @@ class GameScanner:
         print(f"✅ GOG: {len(games)} juegos encontrados")
         return games
     
-    def scan_standalone_games(self, directories: List[str] = None) -> List[Game]:
-        """Escanear juegos standalone en carpetas comunes"""
+    def scan_standalone_games(self, directories: List[str] = None, max_depth: Optional[int] = None,
+                              time_budget_s: Optional[float] = None) -> List[Game]:
+        """
+        Escanear juegos standalone en carpetas comunes
+
+        Args:
+            directories: Raíces (None = Program Files y ~/Games)
+            max_depth: Profundidad máxima (None = sin límite; los escaneos
+                       automáticos usan STANDALONE_MAX_DEPTH)
+            time_budget_s: Tiempo máximo (None = sin límite)
+        """
         games = []
         
         if directories is None:
@@ -217,40 +338,49 @@ class GameScanner:
             "Warhammer.exe", "TotalWar.exe"
         ]
         
-        for directory in directories:
-            dir_path = Path(directory)
-            if not dir_path.exists():
-                continue
-            
-            # Buscar solo en primer nivel para no tardar mucho
-            for exe in known_games:
-                for exe_file in dir_path.rglob(exe):
-                    if exe_file.is_file():
-                        name = exe_file.stem
-                        games.append(Game(
-                            name=name,
-                            path=str(exe_file),
-                            launcher="Standalone",
-                            icon="🎮"
-                        ))
+        # Un solo recorrido paralelo por raíz (con caché de mtime) para todos los nombres
+        crawler = FileCrawler(names=known_games, max_depth=max_depth, time_budget_s=time_budget_s,
+                              max_dirs=None, cache_file=FileCrawler.default_cache_file())
+        result = crawler.crawl([d for d in directories if Path(d).exists()])
+        if result.budget_hit:
+            print(f"⚠️ Standalone: presupuesto de {result.budget_hit} agotado, búsqueda parcial")
+        for match in result.matches:
+            exe_file = Path(match)
+            games.append(Game(
+                name=exe_file.stem,
+                path=str(exe_file),
+                launcher="Standalone",
+                icon="🎮",
+                install_dir=str(exe_file.parent)
+            ))
         
         print(f"✅ Standalone: {len(games)} juegos encontrados")
         return games
     
+    def scan_direct_sources(self, max_depth: Optional[int] = STANDALONE_MAX_DEPTH,
+                            time_budget_s: Optional[float] = STANDALONE_TIME_BUDGET_S) -> List[Game]:
+        """
+        Fuentes sin manifiestos: registro de GOG y ejecutables standalone
+
+        Args:
+            max_depth: Profundidad del recorrido standalone (None = sin límite)
+            time_budget_s: Tiempo máximo del recorrido standalone (None = sin límite)
+        """
+        return self.scan_gog_library() + self.scan_standalone_games(max_depth=max_depth,
+                                                                    time_budget_s=time_budget_s)
+    
     def get_all_games(self) -> List[Game]:
         """Obtener todos los juegos detectados"""
-        all_games = []
+        from game_library_index import get_library_index
         
         print("🔍 Escaneando bibliotecas de juegos...")
         
-        # Escanear cada launcher
-        all_games.extend(self.scan_steam_library())
-        all_games.extend(self.scan_epic_library())
-        all_games.extend(self.scan_gog_library())
-        # all_games.extend(self.scan_standalone_games())  # Comentado por ahora (puede tardar)
+        # Launchers en paralelo; sólo se vuelven a leer los manifiestos que cambiaron
+        index = get_library_index(self)
+        all_games = index.scan()
         
         self.games = all_games
-        print(f"\n✅ Total: {len(all_games)} juegos detectados")
+        print(f"\n✅ Total: {len(all_games)} juegos detectados ({index.last_scan})")
         
         return all_games
 
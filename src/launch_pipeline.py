@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🚦 LAUNCH PIPELINE
+Preparación de lanzamiento de juegos en paralelo y con fecha límite
+
+- Pasos independientes (recorte de memoria, precarga de caché, reserva de
+  CPU, limitar segundo plano, red) en un pool de hilos
+- Fecha límite: el juego se lanza como tarde en deadline_s; los pasos que no
+  han terminado siguen en segundo plano y se reportan como 'running'
+- Precarga opcional del ejecutable y los assets principales en la caché de
+  páginas con posix_fadvise(WILLNEED) (readahead asíncrono del kernel)
+- Tiempos por paso en el informe
+
+Antes los pasos corrían en serie y bloqueaban el lanzamiento; ahora el
+lanzamiento espera como mucho la fecha límite y la E/S de precarga corre a la
+vez que el arranque del propio juego.
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Extensiones típicas de contenedores de assets grandes
+ASSET_EXTENSIONS = {'.pak', '.vpk', '.upk', '.assets', '.bundle', '.bin', '.dat',
+                    '.arc', '.big', '.forge', '.rpf', '.wad', '.pck', '.ucas', '.utoc'}
+LIBRARY_EXTENSIONS = {'.dll', '.so', '.dylib'}
+# Carpetas de binarios bajo la raíz del juego (UE: <juego>/Binaries/Win64)
+BINARY_DIR_NAMES = {'bin', 'bin32', 'bin64', 'binaries', 'win32', 'win64', 'x64', 'x86',
+                    'x86_64', 'linux', 'linux64', 'linuxnosteam', 'release', 'retail', 'shipping'}
+
+
+@dataclass
+class StepResult:
+    """Resultado de un paso del pipeline"""
+    name: str
+    status: str  # ok, error, running (no terminó antes de la fecha límite)
+    duration_ms: float
+    detail: str = ""
+
+
+@dataclass
+class PipelineReport:
+    """Informe de un pipeline de pre-lanzamiento"""
+    steps: List[StepResult] = field(default_factory=list)
+    total_ms: float = 0.0
+    deadline_s: float = 0.0
+    results: Dict[str, object] = field(default_factory=dict)
+
+    @property
+    def deadline_hit(self) -> bool:
+        return any(step.status == 'running' for step in self.steps)
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data.pop('results')
+        data['deadline_hit'] = self.deadline_hit
+        return data
+
+    def lines(self) -> List[str]:
+        """Líneas legibles para logs / acciones"""
+        out = [f"{step.name}: {step.status} in {step.duration_ms:.0f} ms"
+               + (f" ({step.detail})" if step.detail else "") for step in self.steps]
+        out.append(f"Pre-launch total: {self.total_ms:.0f} ms (deadline {self.deadline_s:.1f} s)")
+        return out
+
+
+class LaunchPipeline:
+    """Pasos de pre-lanzamiento concurrentes con fecha límite"""
+
+    def __init__(self, deadline_s: float = 1.0, max_workers: int = 4):
+        self.deadline_s = deadline_s
+        self.max_workers = max_workers
+        self._steps: List[tuple] = []
+
+    def add(self, name: str, func: Callable[[], object], describe: Optional[Callable[[object], str]] = None):
+        """
+        Añadir un paso
+
+        Args:
+            name: Nombre del paso
+            func: Función sin argumentos; su valor de retorno va a report.results
+            describe: Resumen opcional del resultado para el informe
+        """
+        self._steps.append((name, func, describe))
+        return self
+
+    def run(self) -> PipelineReport:
+        """Ejecutar todos los pasos y esperar como mucho deadline_s"""
+        report = PipelineReport(deadline_s=self.deadline_s)
+        if not self._steps:
+            return report
+
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+
+        def timed(name, func):
+            step_start = time.perf_counter()
+            try:
+                return func()
+            finally:
+                timings[name] = (time.perf_counter() - step_start) * 1000
+
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(self._steps)),
+                                      thread_name_prefix="PreLaunch")
+        futures = {executor.submit(timed, name, func): (name, describe)
+                   for name, func, describe in self._steps}
+        wait(futures, timeout=self.deadline_s)
+        # No bloquear el lanzamiento: lo que falte termina en segundo plano
+        executor.shutdown(wait=False)
+
+        for future, (name, describe) in futures.items():
+            if not future.done():
+                elapsed = (time.perf_counter() - start) * 1000
+                report.steps.append(StepResult(name, 'running', elapsed, "continues after launch"))
+                continue
+            try:
+                value = future.result()
+                report.results[name] = value
+                detail = describe(value) if describe else ""
+                report.steps.append(StepResult(name, 'ok', timings.get(name, 0.0), detail))
+            except Exception as e:
+                report.steps.append(StepResult(name, 'error', timings.get(name, 0.0), str(e)))
+
+        report.total_ms = (time.perf_counter() - start) * 1000
+        return report
+
+
+# --- PRECARGA DE CACHÉ ---
+def game_root(exe_path: str, install_dir: Optional[str] = None) -> Path:
+    """
+    Carpeta raíz del juego para la precarga
+
+    install_dir si contiene al ejecutable; si no, la carpeta del juego en el
+    catálogo; si no, se sube desde el ejecutable mientras la carpeta sea de
+    binarios (Binaries/Win64, bin/x64...), donde no están los assets.
+    """
+    exe = Path(exe_path).resolve()
+    if install_dir is None:
+        try:
+            from game_catalog import get_game_catalog
+            game = get_game_catalog().by_exe(str(exe))
+            install_dir = getattr(game, 'install_dir', None) if game is not None else None
+        except Exception:
+            install_dir = None
+    if install_dir:
+        root = Path(install_dir).resolve()
+        if root in exe.parents:
+            return root
+    root = exe.parent
+    while root.name.lower() in BINARY_DIR_NAMES and root.parent != root:
+        root = root.parent
+    return root
+
+
+def prefetch_targets(exe_path: str, budget_mb: float = 1024, max_files: int = 64,
+                     max_depth: int = 4, install_dir: Optional[str] = None) -> List[Path]:
+    """
+    Ejecutable + bibliotecas + contenedores de assets más grandes del juego,
+    hasta agotar el presupuesto
+
+    Args:
+        exe_path: Ruta del ejecutable
+        budget_mb: Bytes máximos a precargar
+        max_files: Ficheros máximos
+        max_depth: Profundidad máxima de búsqueda bajo la raíz del juego
+        install_dir: Carpeta de instalación (None = catálogo o heurística, ver game_root)
+    """
+    exe = Path(exe_path)
+    if not exe.is_file():
+        return []
+    candidates = []
+    root = game_root(exe_path, install_dir)
+    stack = [(root, 0)]
+    while stack:
+        directory, depth = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False) and depth < max_depth:
+                        stack.append((Path(entry.path), depth + 1))
+                    elif entry.is_file(follow_symlinks=False):
+                        suffix = os.path.splitext(entry.name)[1].lower()
+                        if suffix in ASSET_EXTENSIONS or suffix in LIBRARY_EXTENSIONS:
+                            # Bibliotecas primero (se cargan antes que los assets)
+                            rank = 0 if suffix in LIBRARY_EXTENSIONS else 1
+                            candidates.append((rank, -entry.stat().st_size, Path(entry.path)))
+        except OSError:
+            continue
+
+    budget = int(budget_mb * 1024 * 1024)
+    selected = [exe]
+    used = exe.stat().st_size
+    for _, negative_size, path in sorted(candidates):
+        if len(selected) >= max_files:
+            break
+        if used - negative_size <= budget:
+            selected.append(path)
+            used -= negative_size
+    return selected
+
+
+def prefetch_files(paths: List[Path]) -> Dict:
+    """
+    Pedir al kernel que lea los ficheros en la caché de páginas
+
+    Linux/Unix: posix_fadvise(WILLNEED) inicia readahead asíncrono y vuelve
+    enseguida. Sin fadvise (Windows) se hace una lectura secuencial.
+
+    Returns:
+        Dict con ficheros y bytes solicitados
+    """
+    files, requested = 0, 0
+    has_fadvise = hasattr(os, 'posix_fadvise')
+    for path in paths:
+        try:
+            size = path.stat().st_size
+            if has_fadvise:
+                fd = os.open(path, os.O_RDONLY)
+                try:
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                finally:
+                    os.close(fd)
+            else:
+                with open(path, 'rb', buffering=0) as f:
+                    while f.read(4 * 1024 * 1024):
+                        pass
+            files += 1
+            requested += size
+        except OSError:
+            continue
+    return {'files': files, 'mb': requested / (1024 * 1024),
+            'method': 'fadvise' if has_fadvise else 'read'}
+
+
+# --- PIPELINE ESTÁNDAR ---
+def build_prelaunch_pipeline(profile=None, exe_path: Optional[str] = None,
+                             prefetch: bool = True, deadline_s: float = 1.0,
+                             install_dir: Optional[str] = None) -> LaunchPipeline:
+    """
+    Pipeline estándar para un juego
+
+    Args:
+        profile: GameProfile (None = valores por defecto)
+        exe_path: Ejecutable del juego (para precarga)
+        install_dir: Carpeta de instalación (raíz de la precarga; None = ver game_root)
+        prefetch: Precargar ejecutable y assets en la caché de páginas
+        deadline_s: Espera máxima antes de lanzar
+    """
+    pipeline = LaunchPipeline(deadline_s=deadline_s)
+    cleanup = getattr(profile, 'ram_cleanup_before_launch', True)
+    aggressive = getattr(profile, 'aggressive_ram_cleanup', False)
+
+    # La precarga va primero: su E/S solapa con todo lo demás. Con manifiesto
+    # aprendido (cache_warmer) se reproduce; si no, heurística por extensión
+    game = exe_path or getattr(profile, 'name', None)
+    if prefetch and game:
+        def cache_warmup():
+            from cache_warmer import get_cache_warmer
+            warmer = get_cache_warmer()
+            if warmer.has_manifest(game):
+                result = warmer.replay(game, measure=False)
+                result['method'] = 'manifest'
+                return result
+            return prefetch_files(prefetch_targets(exe_path, install_dir=install_dir)) if exe_path else {
+                'files': 0, 'mb': 0.0, 'method': 'none'}
+        pipeline.add("cache_warmup", cache_warmup,
+                     lambda r: f"{r['files']} files, {r['mb']:.0f} MB via {r['method']}")
+
+    if cleanup:
+        def memory_reclaim():
+            from ram_manager import RAMManager
+            return RAMManager().free_ram(aggressive=False)
+        pipeline.add("memory_reclaim", memory_reclaim,
+                     lambda r: f"{r['ram_freed_gb']:.2f} GB freed, {r['reclaimed_gb']:.2f} GB trimmed")
+
+    def reserve_cpu():
+        from cpu_topology import get_affinity_planner
+        return get_affinity_planner().plan()
+    pipeline.add("cpu_reservation", reserve_cpu, lambda plan: plan.reason)
+
+    if aggressive:
+        def throttle_background():
+            from ram_manager import RAMManager
+            return RAMManager().throttle_background(owner="game")  # Se libera al cerrar el juego
+        pipeline.add("throttle_background", throttle_background,
+                     lambda actions: f"{len(actions)} apps limited")
+
+    if getattr(profile, 'network_optimization', False):
+        close_hogs = getattr(profile, 'close_bandwidth_hogs', False)
+
+        def network():
+            from network_optimizer import NetworkOptimizer
+            net_opt = NetworkOptimizer()
+            closed = net_opt.close_bandwidth_hogs()['count'] if close_hogs else 0
+            net_opt.flush_dns_cache()
+            return closed
+        pipeline.add("network", network, lambda closed: f"DNS flushed, {closed} bandwidth hogs closed")
+
+    return pipeline
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("LAUNCH PIPELINE TEST")
+    print("=" * 60)
+
+    # Serie vs paralelo con pasos simulados
+    steps = [("memory", 0.3), ("network", 0.4), ("cpu", 0.05), ("slow_step", 2.0)]
+    serial = sum(d for _, d in steps)
+    pipeline = LaunchPipeline(deadline_s=0.6)
+    for name, delay in steps:
+        pipeline.add(name, lambda d=delay: time.sleep(d))
+    report = pipeline.run()
+    print(f"\nSerial would take {serial * 1000:.0f} ms; pipeline returned after:")
+    for line in report.lines():
+        print(f"  {line}")
+
+    # Precarga real del intérprete de Python como "juego"
+    targets = prefetch_targets(sys.executable, budget_mb=64)
+    print(f"\nPrefetch {len(targets)} files: {prefetch_files(targets)}")
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+🧩 LAUNCHER BACKENDS
+Registro de backends de launchers de juegos para GameScanner
+
+Cada backend sabe localizar un launcher y describir sus ficheros de datos
+como fuentes de manifiestos (launcher, carpeta, patrón); el índice de la
+biblioteca los lista en paralelo y sólo vuelve a leer los que cambian.
+
+- Carga perezosa: sólo se importan los módulos de la plataforma actual, y
+  las dependencias pesadas (sqlite3) sólo al leer
+- Todos los backends reciben la carpeta personal: los árboles de prueba de
+  tests/test_launchers.py sustituyen a la del usuario
+"""
+
+import importlib
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# nombre -> (módulo, clase, prefijos de sys.platform)
+BACKENDS: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {
+    "steam": ("launchers.steam", "SteamBackend", ("linux",)),
+    "lutris": ("launchers.lutris", "LutrisBackend", ("linux",)),
+    "heroic": ("launchers.heroic", "HeroicBackend", ("linux", "win32", "darwin")),
+    "itch": ("launchers.itch", "ItchBackend", ("linux", "win32", "darwin")),
+}
+
+_classes: Dict[str, type] = {}
+_parsers: Dict[str, Callable] = {}
+
+
+def register_backend(name: str, module: str, class_name: str, platforms: Tuple[str, ...]):
+    """Añadir un backend al registro (se importa cuando se usa)"""
+    BACKENDS[name] = (module, class_name, platforms)
+
+
+def load_backend(name: str) -> type:
+    """Importar (una vez) la clase de un backend y registrar sus parsers"""
+    if name not in _classes:
+        module, class_name, _ = BACKENDS[name]
+        cls = getattr(importlib.import_module(module), class_name)
+        _classes[name] = cls
+        _parsers.update(cls.PARSERS)
+    return _classes[name]
+
+
+def backends_for_platform(platform: Optional[str] = None) -> List[str]:
+    platform = platform or sys.platform
+    return [name for name, (_, _, platforms) in BACKENDS.items() if platform.startswith(platforms)]
+
+
+def detect_backends(home: Optional[Path] = None, platform: Optional[str] = None) -> List:
+    """Instancias de los backends cuyo launcher está instalado"""
+    found = []
+    for name in backends_for_platform(platform):
+        try:
+            backend = load_backend(name)(home)
+        except Exception as e:
+            print(f"[Launchers] {name} backend unavailable: {e}")
+            continue
+        if backend.detect():
+            found.append(backend)
+    return found
+
+
+def get_parser(source: str) -> Callable:
+    """Parser de una fuente declarada por un backend ('Lutris', 'HeroicLegendary'...)"""
+    if source not in _parsers:
+        for name in backends_for_platform():
+            load_backend(name)
+            if source in _parsers:
+                break
+    return _parsers[source]
+
+
+def scan_all(home: Optional[Path] = None, workers: int = 4) -> List:
+    """Escanear todos los backends detectados en paralelo (sin caché)"""
+    backends = detect_backends(home)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda backend: backend.scan(), backends))
+    return [game for games in results for game in games]
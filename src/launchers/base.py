@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Clase base de los backends de launchers
+"""
+
+import os
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from game_scanner import Game
+
+
+class LauncherBackend:
+    """Un launcher: dónde está y cómo leer sus juegos"""
+
+    name = "base"
+    # fuente -> parser(ruta) que devuelve Game, None o List[Game]
+    PARSERS: Dict[str, Callable] = {}
+
+    def __init__(self, home: Optional[Path] = None):
+        self.home = Path(home) if home else Path.home()
+
+    def existing(self, *relative: str) -> List[Path]:
+        """Rutas (relativas a home) que existen, sin duplicar enlaces simbólicos"""
+        found, seen = [], set()
+        for rel in relative:
+            path = self.home / rel
+            real = os.path.realpath(path)
+            if path.exists() and real not in seen:
+                seen.add(real)
+                found.append(path)
+        return found
+
+    def detect(self) -> bool:
+        """¿Está instalado el launcher?"""
+        return bool(self.manifest_sources())
+
+    def manifest_sources(self) -> List[Tuple[str, Path, str]]:
+        """Ficheros de datos como (fuente, carpeta, patrón glob)"""
+        return []
+
+    def scan(self) -> List[Game]:
+        """Leer todas las fuentes directamente (sin la caché del índice)"""
+        games = []
+        for source, folder, pattern in self.manifest_sources():
+            for path in sorted(folder.glob(pattern)):
+                try:
+                    result = self.PARSERS[source](path)
+                except Exception as e:
+                    print(f"[Launchers] {self.name}: error reading {path}: {e}")
+                    continue
+                if isinstance(result, list):
+                    games.extend(result)
+                elif result:
+                    games.append(result)
+        return games
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Heroic Games Launcher: juegos de Epic (Legendary), GOG y añadidos a mano
+
+Heroic guarda el estado en JSON; cada fichero es una fuente distinta para
+que el índice sólo relea el que cambió.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from game_scanner import Game
+from launchers.base import LauncherBackend
+
+HEROIC_CONFIG = (
+    ".config/heroic",
+    ".var/app/com.heroicgameslauncher.hgl/config/heroic",  # Flatpak
+    "AppData/Roaming/heroic",                              # Windows
+    "Library/Application Support/heroic",                  # macOS
+)
+
+
+def _load_json(path: Path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _heroic_game(name: str, app_name: str, runner: str, install_dir) -> Game:
+    return Game(
+        name=name,
+        path=f"heroic://launch?appName={app_name}&runner={runner}",
+        launcher="Heroic",
+        app_id=app_name,
+        icon="🦸",
+        install_dir=install_dir or None,
+        runner=runner
+    )
+
+
+def parse_heroic_legendary(installed_json: Path) -> List[Game]:
+    """legendaryConfig/legendary/installed.json: {appName: {title, install_path...}}"""
+    data = _load_json(installed_json)
+    return [_heroic_game(info.get("title") or app_name, app_name, "legendary", info.get("install_path"))
+            for app_name, info in data.items()
+            if isinstance(info, dict) and not info.get("is_dlc")]
+
+
+def _gog_titles(store_dir: Path) -> Dict[str, str]:
+    """Títulos de la biblioteca de GOG (installed.json sólo trae ids)"""
+    try:
+        library = _load_json(store_dir / "library.json")
+    except (OSError, ValueError):
+        return {}
+    return {str(game.get("app_name")): game.get("title")
+            for game in library.get("games", []) if isinstance(game, dict)}
+
+
+def parse_heroic_gog(installed_json: Path) -> List[Game]:
+    """gog_store/installed.json: {"installed": [{appName, install_path...}]}"""
+    titles = _gog_titles(installed_json.parent)
+    games = []
+    for info in _load_json(installed_json).get("installed", []):
+        app_name = str(info.get("appName", ""))
+        if not app_name or info.get("is_dlc"):
+            continue
+        install_path = info.get("install_path")
+        name = titles.get(app_name) or (Path(install_path).name if install_path else app_name)
+        games.append(_heroic_game(name, app_name, "gog", install_path))
+    return games
+
+
+def parse_heroic_sideload(library_json: Path) -> List[Game]:
+    """sideload_apps/library.json: {"games": [{app_name, title, is_installed...}]}"""
+    return [_heroic_game(game.get("title") or game["app_name"], game["app_name"], "sideload",
+                         game.get("folder_name"))
+            for game in _load_json(library_json).get("games", [])
+            if isinstance(game, dict) and game.get("app_name") and game.get("is_installed", True)]
+
+
+class HeroicBackend(LauncherBackend):
+    name = "heroic"
+    PARSERS = {
+        "HeroicLegendary": parse_heroic_legendary,
+        "HeroicGOG": parse_heroic_gog,
+        "HeroicSideload": parse_heroic_sideload,
+    }
+
+    def manifest_sources(self) -> List[Tuple[str, Path, str]]:
+        sources = []
+        for config in self.existing(*HEROIC_CONFIG):
+            for source, folder in (("HeroicLegendary", config / "legendaryConfig" / "legendary"),
+                                   ("HeroicGOG", config / "gog_store"),
+                                   ("HeroicSideload", config / "sideload_apps")):
+                pattern = "library.json" if source == "HeroicSideload" else "installed.json"
+                if (folder / pattern).exists():
+                    sources.append((source, folder, pattern))
+        return sources
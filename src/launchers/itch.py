@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+itch.io: base de datos de butler (db/butler.db)
+
+Las instalaciones son "caves" (juego + carpeta). La carpeta de un cave es
+install_locations.path + install_folder_name (la ubicación por defecto ya es
+.../itch/apps), o custom_install_folder si el usuario eligió otra. La base
+usa WAL: el índice
+sigue el mtime de butler.db, que no cambia hasta el siguiente checkpoint,
+así que una instalación reciente puede tardar en aparecer.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import List, Tuple
+
+from game_scanner import Game
+from launchers.base import LauncherBackend
+
+ITCH_CONFIG = (
+    ".config/itch",
+    ".var/app/io.itch.itch/config/itch",   # Flatpak
+    "AppData/Roaming/itch",                # Windows
+    "Library/Application Support/itch",    # macOS
+)
+
+
+def parse_itch_db(db_path: Path) -> List[Game]:
+    """Juegos instalados según butler.db (sólo lectura)"""
+    import sqlite3
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=1.0)
+    try:
+        # custom_install_folder puede faltar en bases de butler antiguas
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(caves)")}
+        custom = "caves.custom_install_folder" if "custom_install_folder" in columns else "NULL"
+        rows = conn.execute(
+            f"SELECT caves.id, games.title, caves.install_folder_name, "
+            f"install_locations.path, caves.verdict, {custom} FROM caves "
+            "JOIN games ON games.id = caves.game_id "
+            "LEFT JOIN install_locations ON install_locations.id = caves.install_location_id "
+            "ORDER BY games.title").fetchall()
+    finally:
+        conn.close()
+    games = []
+    for cave_id, title, folder_name, location, verdict, custom_folder in rows:
+        if custom_folder:
+            install_dir = custom_folder
+        else:
+            install_dir = os.path.join(location, folder_name) if location and folder_name else None
+        runner = None
+        try:
+            candidates = (json.loads(verdict) or {}).get("candidates") or []
+            runner = candidates[0].get("flavor") if candidates else None  # "linux", "windows"...
+        except (TypeError, ValueError, AttributeError):
+            pass
+        games.append(Game(
+            name=title or folder_name or cave_id,
+            path=f"itch://caves/{cave_id}/launch",
+            launcher="itch",
+            app_id=cave_id,
+            icon="🕹️",
+            install_dir=install_dir,
+            runner=runner
+        ))
+    return games
+
+
+class ItchBackend(LauncherBackend):
+    name = "itch"
+    PARSERS = {"itch": parse_itch_db}
+
+    def manifest_sources(self) -> List[Tuple[str, Path, str]]:
+        return [("itch", config / "db", "butler.db") for config in self.existing(*ITCH_CONFIG)
+                if (config / "db" / "butler.db").exists()]
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Lutris: base de datos SQLite pga.db (tabla games)
+"""
+
+from pathlib import Path
+from typing import List, Tuple
+
+from game_scanner import Game
+from launchers.base import LauncherBackend
+
+LUTRIS_DATA = (
+    ".local/share/lutris",
+    ".var/app/net.lutris.Lutris/data/lutris",  # Flatpak
+)
+
+
+def parse_lutris_db(db_path: Path) -> List[Game]:
+    """Juegos instalados según pga.db (abierta en sólo lectura: Lutris puede tenerla abierta)"""
+    import sqlite3
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=1.0)
+    try:
+        rows = conn.execute(
+            "SELECT name, slug, runner, directory, service_id FROM games "
+            "WHERE installed = 1 ORDER BY name").fetchall()
+    finally:
+        conn.close()
+    return [Game(
+        name=name,
+        path=f"lutris:rungame/{slug}",
+        launcher="Lutris",
+        app_id=service_id or slug,
+        icon="🍷" if runner == "wine" else "🎮",
+        install_dir=directory or None,
+        runner=runner or None
+    ) for name, slug, runner, directory, service_id in rows if name and slug]
+
+
+class LutrisBackend(LauncherBackend):
+    name = "lutris"
+    PARSERS = {"Lutris": parse_lutris_db}
+
+    def manifest_sources(self) -> List[Tuple[str, Path, str]]:
+        return [("Lutris", folder, "pga.db") for folder in self.existing(*LUTRIS_DATA)
+                if (folder / "pga.db").exists()]
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Steam en Linux: instalación nativa, Flatpak y Snap
+
+Las bibliotecas y los atajos no-Steam se leen con los parsers de
+game_scanner; los juegos de Windows se marcan con runner "proton" cuando
+tienen prefijo en steamapps/compatdata.
+"""
+
+from pathlib import Path
+from typing import List, Tuple
+
+from game_scanner import parse_steam_manifest, parse_steam_shortcuts, steam_sources
+from launchers.base import LauncherBackend
+
+STEAM_ROOTS = (
+    ".local/share/Steam",
+    ".steam/steam",
+    ".steam/root",
+    ".var/app/com.valvesoftware.Steam/.local/share/Steam",  # Flatpak
+    ".var/app/com.valvesoftware.Steam/data/Steam",          # Flatpak (antiguo)
+    "snap/steam/common/.local/share/Steam",                 # Snap
+)
+
+
+class SteamBackend(LauncherBackend):
+    name = "steam"
+    PARSERS = {"Steam": parse_steam_manifest, "SteamShortcuts": parse_steam_shortcuts}
+
+    def roots(self) -> List[Path]:
+        """Instalaciones de Steam encontradas (con carpeta steamapps)"""
+        return [root for root in self.existing(*STEAM_ROOTS) if (root / "steamapps").is_dir()]
+
+    def manifest_sources(self) -> List[Tuple[str, Path, str]]:
+        sources, seen = [], set()
+        for root in self.roots():
+            for source in steam_sources(str(root)):
+                key = (source[0], source[1].resolve())
+                if key not in seen:  # Una biblioteca compartida por dos instalaciones
+                    seen.add(key)
+                    sources.append(source)
+        return sources
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧮 MEMORY PROFILER
+Contabilidad de memoria de Neuro-OS (opt-in)
+
+- Contadores de bytes explícitos: los subsistemas que poseen buffers grandes
+  (NumPy, QImage, QPixmap) los registran por dueño (captura, upscaler...);
+  con holder= se liberan solos cuando su dueño se destruye
+- Informe periódico combinando RSS/PSS del proceso y buffers
+- Diagnóstico profundo (enable(trace=True)): tracemalloc activo desde ya y
+  cada informe toma un snapshot con el top-N de memoria Python viva por
+  traceback (lo que explica el residente) y el crecimiento respecto al
+  snapshot anterior (lo que está fugando)
+
+Activación: NEURO_OS_MEMPROFILE=1 (contadores + RSS/PSS) o =trace (además
+tracemalloc), o get_memory_accounting().enable(). El modo por defecto cuesta
+una operación de diccionario por buffer y una lectura de smaps por informe,
+dentro de unos pocos % (tests/test_memory_profiler.py lo mide). tracemalloc
+siempre activo hace mucho más lento el código que sólo asigna (la demo mide
+el peor caso): es sólo para cazar una fuga concreta.
+"""
+
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from typing import Callable, Dict, List, Optional, Tuple
+
+import psutil
+
+
+def buffer_nbytes(obj) -> int:
+    """Tamaño en bytes de un buffer NumPy / QImage / QPixmap (0 si se desconoce)"""
+    if obj is None:
+        return 0
+    nbytes = getattr(obj, 'nbytes', None)  # numpy.ndarray
+    if isinstance(nbytes, int):
+        return nbytes
+    if hasattr(obj, 'sizeInBytes'):  # QImage
+        return int(obj.sizeInBytes())
+    if hasattr(obj, 'depth') and hasattr(obj, 'width') and hasattr(obj, 'height'):  # QPixmap
+        return obj.width() * obj.height() * obj.depth() // 8
+    return 0
+
+
+class MemoryAccounting:
+    """Contabilidad de memoria en proceso"""
+
+    def __init__(self, top_n: int = 10, frames: int = 2, interval_s: float = 120.0):
+        """
+        Args:
+            top_n: Entradas del top de tracemalloc en el informe
+            frames: Profundidad del traceback registrado
+            interval_s: Periodo entre informes (snapshots)
+        """
+        self.top_n = top_n
+        self.frames = frames
+        self.interval_s = interval_s
+
+        self.enabled = False
+        self.tracing = False  # tracemalloc (enable(trace=True))
+        self._lock = threading.Lock()
+        # dueño -> clave -> bytes
+        self._buffers: Dict[str, Dict[str, int]] = {}
+        self._peak_buffers: Dict[str, int] = {}
+        self._finalizers: Dict[Tuple[str, str], weakref.finalize] = {}
+        self._last_top: List[Dict] = []
+        self._last_growth: List[Dict] = []
+        self._previous_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._started_tracing = False
+        self._last_traced = (0, 0)
+        self._reports: List[Dict] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- ACTIVACIÓN ---
+    def enable(self, periodic: bool = True, on_report: Optional[Callable[[Dict], None]] = None,
+               trace: bool = False):
+        """
+        Activar la contabilidad y los informes periódicos
+
+        Args:
+            periodic: Informe cada interval_s en un hilo
+            on_report: Destino de los informes (None = imprimir el resumen)
+            trace: Diagnóstico profundo: tracemalloc desde ya (mucho más lento)
+        """
+        self.enabled = True
+        if trace:
+            self.tracing = True
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+                self._started_tracing = True
+        if periodic and self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._periodic_loop, args=(on_report,),
+                                            daemon=True, name="MemoryProfiler")
+            self._thread.start()
+
+    def disable(self):
+        """Desactivar y liberar tracemalloc"""
+        self.enabled = False
+        self.tracing = False
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        # Sólo parar tracemalloc si lo arrancamos nosotros (p.ej. no el de un test)
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracing = False
+        self._previous_snapshot = None
+
+    # --- BUFFERS ---
+    def register_buffer(self, owner: str, key: str, obj=None, nbytes: Optional[int] = None,
+                        holder=None):
+        """
+        Registrar (o reemplazar) un buffer grande
+
+        Args:
+            owner: Subsistema dueño ('capture', 'upscaler', ...)
+            key: Identificador del buffer dentro del dueño (reusar la clave al
+                 sustituir un frame evita contar dos veces)
+            obj: Buffer (ndarray / QImage / QPixmap) para medir su tamaño
+            nbytes: Tamaño explícito si no se pasa obj
+            holder: Objeto que retiene el buffer; al destruirse se libera la entrada
+        """
+        if not self.enabled:
+            return
+        size = nbytes if nbytes is not None else buffer_nbytes(obj)
+        with self._lock:
+            owned = self._buffers.setdefault(owner, {})
+            owned[key] = size
+            total = sum(owned.values())
+            if total > self._peak_buffers.get(owner, 0):
+                self._peak_buffers[owner] = total
+            if holder is not None and (owner, key) not in self._finalizers:
+                self._finalizers[(owner, key)] = weakref.finalize(holder, self.release_buffer, owner, key)
+
+    def release_buffer(self, owner: str, key: Optional[str] = None):
+        """Olvidar un buffer (o todos los del dueño si key es None)"""
+        with self._lock:
+            if key is None:
+                self._buffers.pop(owner, None)
+                finalizers = [k for k in self._finalizers if k[0] == owner]
+            else:
+                if owner in self._buffers:
+                    self._buffers[owner].pop(key, None)
+                    if not self._buffers[owner]:
+                        del self._buffers[owner]
+                finalizers = [(owner, key)]
+            for entry in finalizers:
+                finalizer = self._finalizers.pop(entry, None)
+                if finalizer is not None:
+                    finalizer.detach()
+
+    def buffer_totals(self) -> Dict[str, int]:
+        """Bytes vivos por dueño"""
+        with self._lock:
+            return {owner: sum(keys.values()) for owner, keys in self._buffers.items()}
+
+    # --- TRACEMALLOC ---
+    @staticmethod
+    def _filtered(snapshot: tracemalloc.Snapshot) -> tracemalloc.Snapshot:
+        return snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+
+    def sample(self) -> List[Dict]:
+        """
+        Snapshot de tracemalloc: top-N de memoria viva por traceback y
+        crecimiento respecto al snapshot anterior (ver report()['top_growth'])
+
+        Returns:
+            Lista de {'traceback', 'size_kb', 'count'} (memoria viva)
+        """
+        if not self.tracing or not tracemalloc.is_tracing():
+            return self._last_top
+        snapshot = self._filtered(tracemalloc.take_snapshot())
+        self._last_traced = tracemalloc.get_traced_memory()
+
+        top = []
+        for stat in snapshot.statistics('traceback')[:self.top_n]:
+            top.append({
+                'traceback': [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+                'size_kb': stat.size / 1024,
+                'count': stat.count
+            })
+        growth = []
+        if self._previous_snapshot is not None:
+            for stat in snapshot.compare_to(self._previous_snapshot, 'traceback')[:self.top_n]:
+                if stat.size_diff <= 0:
+                    continue
+                growth.append({
+                    'traceback': [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+                    'size_kb': stat.size / 1024,
+                    'growth_kb': stat.size_diff / 1024,
+                    'count_diff': stat.count_diff
+                })
+        self._previous_snapshot = snapshot
+        self._last_top = top
+        self._last_growth = growth
+        return top
+
+    # --- INFORME ---
+    def report(self) -> Dict:
+        """Informe combinado: RSS/PSS, buffers registrados y top de Python"""
+        process = psutil.Process()
+        try:
+            rss = process.memory_info().rss
+        except psutil.Error:
+            rss = 0
+        try:
+            pss = getattr(process.memory_full_info(), 'pss', None)  # Linux: smaps_rollup
+        except (psutil.Error, OSError):
+            pss = None
+        buffers = self.buffer_totals()
+        with self._lock:
+            peaks = dict(self._peak_buffers)
+        current, peak = self._last_traced
+        return {
+            'timestamp': time.time(),
+            'rss_mb': rss / 1024**2,
+            'pss_mb': pss / 1024**2 if pss is not None else None,
+            'tracing': self.tracing,
+            'buffers_mb': {owner: size / 1024**2 for owner, size in buffers.items()},
+            'buffers_peak_mb': {owner: size / 1024**2 for owner, size in peaks.items()},
+            'buffers_total_mb': sum(buffers.values()) / 1024**2,
+            'python_traced_mb': current / 1024**2,
+            'python_traced_peak_mb': peak / 1024**2,
+            'top_allocations': list(self._last_top),
+            'top_growth': list(self._last_growth)
+        }
+
+    def summary(self) -> str:
+        """Resumen de una línea (para logs y avisos)"""
+        data = self.report()
+        owners = sorted(data['buffers_mb'].items(), key=lambda item: -item[1])
+        parts = [f"{owner}={mb:.1f}MB" for owner, mb in owners[:3]]
+        if data['top_allocations']:
+            top = data['top_allocations'][0]
+            parts.append(f"top python={top['traceback'][-1]} ({top['size_kb'] / 1024:.1f}MB)")
+        return f"RSS {data['rss_mb']:.0f}MB; " + ", ".join(parts or ["no buffers registered"])
+
+    @property
+    def reports(self) -> List[Dict]:
+        return list(self._reports)
+
+    def _periodic_loop(self, on_report: Optional[Callable[[Dict], None]]):
+        while not self._stop.is_set():
+            self.sample()
+            data = self.report()
+            self._reports = (self._reports + [data])[-10:]
+            if on_report:
+                on_report(data)
+            else:
+                print(f"[MemProfiler] {self.summary()}")
+            self._stop.wait(self.interval_s)
+
+
+# Instancia global
+_accounting: Optional[MemoryAccounting] = None
+
+def get_memory_accounting() -> MemoryAccounting:
+    """Obtener la contabilidad global (se activa sola con NEURO_OS_MEMPROFILE=1)"""
+    global _accounting
+    if _accounting is None:
+        _accounting = MemoryAccounting()
+        mode = os.environ.get("NEURO_OS_MEMPROFILE")
+        if mode in ("1", "trace"):
+            _accounting.enable(trace=mode == "trace")
+    return _accounting
+
+
+if __name__ == "__main__":
+    import numpy as np
+
+    print("=" * 60)
+    print("MEMORY PROFILER TEST")
+    print("=" * 60)
+
+    def workload(n=200000):
+        return [str(i) * 3 for i in range(n)]
+
+    accounting = MemoryAccounting()
+    accounting.enable(periodic=False, trace=True)
+    frame = np.zeros((1080, 1920, 4), dtype=np.uint8)
+    accounting.register_buffer("capture", "frame", frame)
+    accounting.register_buffer("upscaler", "output", nbytes=3840 * 2160 * 3)
+
+    # Coste de tracemalloc en el peor caso (bucle que sólo asigna)
+    tracemalloc.stop()
+    workload()
+    start = time.perf_counter()
+    workload()
+    baseline = time.perf_counter() - start
+    tracemalloc.start(accounting.frames)
+    accounting.sample()
+    start = time.perf_counter()
+    kept = workload()
+    traced = time.perf_counter() - start
+    top = accounting.sample()
+
+    # Buffers con holder: se liberan al destruirse su dueño
+    class Holder:
+        pass
+    holder = Holder()
+    accounting.register_buffer("temp", "frame", nbytes=1 << 20, holder=holder)
+    del holder
+
+    print(f"Summary: {accounting.summary()}")
+    print(f"Worst-case slowdown with trace=True (deep diagnostics only): {(traced / baseline - 1) * 100:.0f}%")
+    print(f"Buffer owners after holder died: {sorted(accounting.buffer_totals())}")
+    print("Top growth since previous snapshot:")
+    for entry in accounting.report()['top_growth'][:3]:
+        print(f"  +{entry['growth_kb']:.0f} KB x{entry['count_diff']}  {entry['traceback'][-1]}")
+    accounting.disable()
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+♻️ MEMORY RECLAIM ENGINE
+Recorte real de working set en Linux para procesos en segundo plano
+
+Métodos (en orden de preferencia):
+- process_madvise(MADV_PAGEOUT / MADV_COLD) sobre los VMAs del proceso
+  (kernel >= 5.10, requiere CAP_SYS_NICE o ser dueño del proceso + ptrace)
+- memory.reclaim del cgroup v2 del proceso (kernel >= 5.19, cgroups delegados)
+
+Cada candidato se mide antes y después (VmRSS/VmSwap de /proc/<pid>/status):
+lo que se reporta es lo medido, nunca una estimación.
+
+Nunca se recortan el juego activo (y sus hijos), los árboles lanzados por
+el supervisor, los PIDs protegidos ni procesos con actividad reciente.
+"""
+
+import ctypes
+import errno
+import math
+import os
+import sys
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+
+from adaptive_scheduler import get_system_activity
+from process_footprint import get_footprint_sampler
+
+IS_LINUX = sys.platform.startswith('linux')
+
+# Constantes del kernel (asm-generic, iguales en x86_64 y aarch64)
+MADV_COLD = 20
+MADV_PAGEOUT = 21
+SYS_PROCESS_MADVISE = 440
+IOV_MAX = 1024
+
+# Procesos que nunca se tocan (sesión gráfica, audio, init)
+PROTECTED_NAMES = {
+    'systemd', 'init', 'xorg', 'xwayland', 'gnome-shell', 'kwin_x11', 'kwin_wayland',
+    'plasmashell', 'pipewire', 'pipewire-pulse', 'wireplumber', 'pulseaudio',
+    'dbus-daemon', 'dbus-broker', 'sshd', 'gdm', 'sddm', 'lightdm'
+}
+
+
+class _IOVec(ctypes.Structure):
+    _fields_ = [('iov_base', ctypes.c_void_p), ('iov_len', ctypes.c_size_t)]
+
+
+@dataclass
+class ReclaimCandidate:
+    """Proceso candidato a recorte"""
+    pid: int
+    name: str
+    create_time: float
+    rss_bytes: int
+    idle_seconds: float
+    footprint_bytes: int = 0  # PSS (RSS si no se pudo medir)
+
+    @property
+    def score(self) -> float:
+        """Más huella propia y más tiempo inactivo = mejor candidato"""
+        return (self.footprint_bytes or self.rss_bytes) * (1.0 + math.log1p(self.idle_seconds / 60.0))
+
+
+@dataclass
+class ReclaimResult:
+    """Resultado medido de un recorte"""
+    pid: int
+    name: str
+    method: str
+    rss_before_mb: float
+    rss_after_mb: float
+    freed_mb: float
+    swap_delta_mb: float
+    duration_ms: float
+    error: Optional[str] = None
+    advice: str = "pageout"  # pageout (expulsa páginas) o cold (sólo las desactiva)
+    advised_mb: float = 0.0  # Lo que el kernel aceptó realmente (process_madvise)
+
+
+def read_memory_status(pid: int) -> Optional[Dict[str, int]]:
+    """Leer VmRSS/VmSwap/RssAnon/RssFile (bytes) de /proc/<pid>/status"""
+    wanted = {'VmRSS', 'VmSwap', 'RssAnon', 'RssFile'}
+    values = {}
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for line in f:
+                key, _, rest = line.partition(':')
+                if key in wanted:
+                    values[key] = int(rest.split()[0]) * 1024
+                    if len(values) == len(wanted):
+                        break
+    except (OSError, ValueError, IndexError):
+        return None
+    return values
+
+
+def read_mem_available() -> int:
+    """MemAvailable del sistema en bytes"""
+    return psutil.virtual_memory().available
+
+
+class MemoryReclaimer:
+    """Motor de recorte de working set (Linux)"""
+
+    def __init__(self, min_rss_mb: float = 100.0, min_idle_seconds: float = 120.0):
+        self.min_rss_bytes = int(min_rss_mb * 1024 * 1024)
+        self.min_idle_seconds = min_idle_seconds
+        self.self_pid = os.getpid()
+        self.protected_pids = set()
+
+        # Historial de CPU por (pid, create_time) -> (cpu_total, instante del último cambio)
+        self._cpu_history: Dict[Tuple[int, float], Tuple[float, float]] = {}
+
+        self._libc = None
+        self._madvise_supported = IS_LINUX and hasattr(os, 'pidfd_open')
+        if self._madvise_supported:
+            try:
+                self._libc = ctypes.CDLL(None, use_errno=True)
+                self._libc.syscall.restype = ctypes.c_long
+            except OSError:
+                self._madvise_supported = False
+
+    # --- CANDIDATOS ---
+    def protect(self, pid: int):
+        """No recortar nunca este PID (p.ej. el juego en primer plano)"""
+        self.protected_pids.add(pid)
+
+    def unprotect(self, pid: int):
+        self.protected_pids.discard(pid)
+
+    def excluded_pids(self) -> set:
+        """PIDs intocables: protegidos, el juego activo y sus hijos, y los árboles del supervisor"""
+        excluded = set(self.protected_pids)
+        excluded.add(self.self_pid)
+        game_pids = get_system_activity().snapshot_game_pids()
+        excluded.update(game_pids)
+        for pid in game_pids:
+            try:
+                excluded.update(child.pid for child in psutil.Process(pid).children(recursive=True))
+            except psutil.Error:
+                pass
+        try:
+            from process_supervisor import get_process_supervisor
+            for tree in get_process_supervisor().trees():
+                excluded.update(tree.pids)
+        except Exception:
+            pass
+        return excluded
+
+    def observe(self) -> Dict[Tuple[int, float], float]:
+        """
+        Muestrear tiempos de CPU para estimar cuánto lleva inactivo cada proceso.
+        Conviene llamarlo periódicamente (lo hace la política de RAM del servicio de IA).
+
+        Returns:
+            Dict (pid, create_time) -> segundos inactivo
+        """
+        now = time.time()
+        seen = {}
+        history = self._cpu_history
+        for proc in psutil.process_iter(['pid', 'create_time', 'cpu_times']):
+            info = proc.info
+            if info['cpu_times'] is None or info['create_time'] is None:
+                continue
+            key = (info['pid'], info['create_time'])
+            cpu_total = info['cpu_times'].user + info['cpu_times'].system
+            previous = history.get(key)
+            if previous is None:
+                # Primera vez: si nunca ha usado CPU, inactivo desde que nació
+                history[key] = (cpu_total, info['create_time'] if cpu_total == 0 else now)
+            elif cpu_total != previous[0]:
+                # Ha consumido CPU: inactivo desde ahora
+                history[key] = (cpu_total, now)
+            seen[key] = now - history[key][1]
+
+        # Olvidar procesos muertos
+        for key in list(history):
+            if key not in seen:
+                del history[key]
+        return seen
+
+    def rank_candidates(self, limit: int = 10) -> List[ReclaimCandidate]:
+        """Ordenar procesos en segundo plano por huella (PSS) e inactividad"""
+        idle = self.observe()
+        excluded = self.excluded_pids()
+        candidates = []
+        for proc in psutil.process_iter(['pid', 'name', 'create_time', 'memory_info', 'uids']):
+            info = proc.info
+            pid = info['pid']
+            if pid in excluded or pid <= 2:
+                continue
+            if info['memory_info'] is None or info['memory_info'].rss < self.min_rss_bytes:
+                continue
+            name = (info['name'] or '').lower()
+            if name in PROTECTED_NAMES:
+                continue
+            # Sólo procesos inactivos de verdad (requiere observe() periódico: sin historial, 0 s)
+            idle_seconds = idle.get((pid, info['create_time']), 0.0)
+            if idle_seconds < self.min_idle_seconds:
+                continue
+            candidates.append(ReclaimCandidate(
+                pid=pid, name=info['name'] or str(pid), create_time=info['create_time'],
+                rss_bytes=info['memory_info'].rss, idle_seconds=idle_seconds))
+
+        # PSS sólo para la lista corta de mejores por RSS (presupuesto y caché del sampler)
+        candidates.sort(key=lambda c: c.score, reverse=True)
+        shortlist = candidates[:limit * 2]
+        footprints = get_footprint_sampler().begin_pass()
+        for candidate in shortlist:
+            candidate.footprint_bytes = footprints.footprint(
+                candidate.pid, candidate.create_time, candidate.rss_bytes).bytes
+
+        shortlist.sort(key=lambda c: c.score, reverse=True)
+        return shortlist[:limit]
+
+    # --- MÉTODOS DE RECORTE ---
+    def _read_vmas(self, pid: int) -> List[Tuple[int, int]]:
+        """Rangos de memoria recortables de /proc/<pid>/maps"""
+        ranges = []
+        with open(f'/proc/{pid}/maps', 'r') as f:
+            for line in f:
+                parts = line.split(None, 5)
+                path = parts[5].strip() if len(parts) > 5 else ''
+                # Mapeos especiales del kernel: process_madvise los rechaza
+                if path in ('[vvar]', '[vdso]', '[vsyscall]', '[vvar_vclock]'):
+                    continue
+                start, end = parts[0].split('-')
+                ranges.append((int(start, 16), int(end, 16)))
+        return ranges
+
+    def _madvise_call(self, pidfd: int, ranges: List[Tuple[int, int]], advice: int) -> int:
+        """Una llamada a process_madvise: bytes aconsejados o -errno"""
+        iovecs = (_IOVec * len(ranges))(*[_IOVec(start, end - start) for start, end in ranges])
+        ret = self._libc.syscall(SYS_PROCESS_MADVISE, pidfd, iovecs,
+                                 ctypes.c_size_t(len(ranges)), advice, 0)
+        return ret if ret >= 0 else -ctypes.get_errno()
+
+    def _process_madvise(self, pid: int, advice: int) -> int:
+        """
+        Aplicar process_madvise a todos los VMAs del proceso (por lotes de IOV_MAX)
+
+        Returns:
+            Bytes que el kernel aceptó (sólo lo aconsejado de verdad)
+        """
+        pidfd = os.pidfd_open(pid)
+        try:
+            ranges = self._read_vmas(pid)
+            advised = 0
+            i = 0
+            single_until = 0  # Tras un EINVAL, VMA a VMA hasta aislar el que falla
+            while i < len(ranges):
+                batch = ranges[i:i + (1 if i < single_until else IOV_MAX)]
+                ret = self._madvise_call(pidfd, batch, advice)
+                if ret < 0:
+                    err = -ret
+                    if err == errno.EINTR:
+                        continue
+                    if err == errno.EINVAL:
+                        # Un VMA concreto (p.ej. VM_LOCKED) rechaza el lote entero: reintentar de uno en uno
+                        if len(batch) > 1:
+                            single_until = i + len(batch)
+                        else:
+                            i += 1
+                        continue
+                    raise OSError(err, os.strerror(err))
+                if ret == 0:
+                    i += 1  # Sin progreso: no insistir con este VMA
+                    continue
+
+                # Resultado parcial: saltar lo ya aconsejado y seguir desde donde se quedó
+                advised += ret
+                remaining = ret
+                while i < len(ranges) and remaining >= ranges[i][1] - ranges[i][0]:
+                    remaining -= ranges[i][1] - ranges[i][0]
+                    i += 1
+                if remaining and i < len(ranges):
+                    ranges[i] = (ranges[i][0] + remaining, ranges[i][1])
+            return advised
+        finally:
+            os.close(pidfd)
+
+    def _cgroup_dir(self, pid: int, cgroup_root: str = '/sys/fs/cgroup') -> Optional[Path]:
+        """Directorio cgroup v2 del proceso"""
+        try:
+            with open(f'/proc/{pid}/cgroup', 'r') as f:
+                for line in f:
+                    if line.startswith('0::'):
+                        return Path(cgroup_root) / line[3:].strip().lstrip('/')
+        except OSError:
+            pass
+        return None
+
+    def _cgroup_reclaim(self, pid: int, amount_bytes: int) -> None:
+        """Escribir en memory.reclaim del cgroup del proceso (sólo si el cgroup es sólo suyo)"""
+        cgroup = self._cgroup_dir(pid)
+        if cgroup is None or not (cgroup / 'memory.reclaim').exists():
+            raise OSError(errno.ENOTSUP, "memory.reclaim not available")
+        # memory.reclaim actúa sobre todo el cgroup: en uno compartido (session.slice,
+        # app.slice...) recortaría a todos sus procesos, incluido el juego
+        try:
+            members = {int(line) for line in (cgroup / 'cgroup.procs').read_text().split()}
+        except (OSError, ValueError):
+            members = set()
+        if members != {pid}:
+            raise OSError(errno.ENOTSUP, "cgroup shared with other processes")
+        # También recorta los cgroups hijos, que tienen procesos propios
+        if any(child.is_dir() for child in cgroup.iterdir()):
+            raise OSError(errno.ENOTSUP, "cgroup has child cgroups")
+        try:
+            (cgroup / 'memory.reclaim').write_text(str(amount_bytes))
+        except OSError as e:
+            # EAGAIN: el kernel no pudo recuperar todo lo pedido (recuperó parte)
+            if e.errno != errno.EAGAIN:
+                raise
+
+    def reclaim_process(self, candidate: ReclaimCandidate, advice: int = MADV_PAGEOUT) -> ReclaimResult:
+        """Recortar un proceso y medir lo liberado"""
+        start = time.perf_counter()
+        before = read_memory_status(candidate.pid)
+        if before is None:
+            return ReclaimResult(candidate.pid, candidate.name, 'none', 0, 0, 0, 0, 0, 'process gone')
+
+        method = 'none'
+        error = None
+        advised = 0
+        try:
+            if self._madvise_supported:
+                try:
+                    advised = self._process_madvise(candidate.pid, advice)
+                    method = 'process_madvise'
+                except OSError as e:
+                    if e.errno not in (errno.EPERM, errno.ENOSYS, errno.EACCES):
+                        raise
+                    error = f"process_madvise: {e.strerror}"
+            if method == 'none' and advice == MADV_PAGEOUT:
+                # memory.reclaim siempre expulsa: no sirve como sustituto de MADV_COLD
+                # Pedir al cgroup tanto como el anónimo del proceso
+                self._cgroup_reclaim(candidate.pid, max(before.get('RssAnon', 0), 1 << 20))
+                method = 'memory.reclaim'
+                error = None
+        except OSError as e:
+            error = f"{error}; {e.strerror}" if error else e.strerror
+
+        after = read_memory_status(candidate.pid) or before
+        mb = 1024 * 1024
+        return ReclaimResult(
+            pid=candidate.pid,
+            name=candidate.name,
+            method=method,
+            rss_before_mb=before.get('VmRSS', 0) / mb,
+            rss_after_mb=after.get('VmRSS', 0) / mb,
+            freed_mb=max(0, before.get('VmRSS', 0) - after.get('VmRSS', 0)) / mb,
+            swap_delta_mb=(after.get('VmSwap', 0) - before.get('VmSwap', 0)) / mb,
+            duration_ms=(time.perf_counter() - start) * 1000,
+            error=error,
+            advice='cold' if advice == MADV_COLD else 'pageout',
+            advised_mb=advised / mb
+        )
+
+    def reclaim(self, max_processes: int = 5, cold_only: bool = False) -> Dict:
+        """
+        Recortar el working set de los mejores candidatos
+
+        Args:
+            max_processes: Número máximo de procesos a recortar
+            cold_only: Si True usa MADV_COLD (solo desactiva páginas, no las expulsa)
+
+        Returns:
+            Dict con resultados medidos por proceso y totales
+        """
+        if not IS_LINUX:
+            return self._summary(False, [], 0)
+
+        available_before = read_mem_available()
+        advice = MADV_COLD if cold_only else MADV_PAGEOUT
+        results = [self.reclaim_process(c, advice) for c in self.rank_candidates(max_processes)]
+        return self._summary(True, results, read_mem_available() - available_before)
+
+    @staticmethod
+    def _summary(supported: bool, results: List[ReclaimResult], available_delta: int) -> Dict:
+        """Mismas claves en todas las plataformas; MADV_COLD no cuenta como recortado"""
+        done = [r for r in results if r.method != 'none']
+        return {
+            'supported': supported,
+            'results': [asdict(r) for r in results],
+            'freed_mb': sum(r.freed_mb for r in done if r.advice == 'pageout'),
+            'advised_mb': sum(r.advised_mb for r in done),
+            'system_freed_mb': available_delta / (1024 * 1024),
+            'reclaimed_processes': sum(1 for r in done if r.advice == 'pageout'),
+            'cold_processes': sum(1 for r in done if r.advice == 'cold')
+        }
+
+
+# Instancia global (conserva el historial de inactividad entre llamadas)
+_reclaimer: Optional[MemoryReclaimer] = None
+
+def get_memory_reclaimer() -> MemoryReclaimer:
+    """Obtener el motor de recorte global"""
+    global _reclaimer
+    if _reclaimer is None:
+        _reclaimer = MemoryReclaimer()
+    return _reclaimer
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("MEMORY RECLAIM ENGINE TEST")
+    print("=" * 60)
+
+    engine = get_memory_reclaimer()
+    engine.observe()
+    time.sleep(2)
+
+    print("\nTop candidates:")
+    for c in engine.rank_candidates(5):
+        print(f"  {c.name} (PID {c.pid}): RSS {c.rss_bytes / 1024**2:.0f} MB, "
+              f"PSS {c.footprint_bytes / 1024**2:.0f} MB, idle {c.idle_seconds:.0f}s")
+
+    if '--apply' in sys.argv:
+        result = engine.reclaim(max_processes=3)
+        for r in result['results']:
+            print(f"  {r['name']}: {r['method']} advised {r['advised_mb']:.1f} MB, freed {r['freed_mb']:.1f} MB "
+                  f"(swap +{r['swap_delta_mb']:.1f} MB) {r['error'] or ''}")
+        print(f"Total measured: {result['freed_mb']:.1f} MB "
+              f"(system MemAvailable delta {result['system_freed_mb']:+.1f} MB)")
+    else:
+        print("\n(run with --apply to reclaim)")
@@ -13,6 +13,15 @@ import subprocess
 import argparse
 from pathlib import Path
 
+# Pipeline de pre-lanzamiento de Neuro-OS (src/), opcional si se ejecuta suelto
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+try:
+    from launch_pipeline import build_prelaunch_pipeline
+    from cache_warmer import get_cache_warmer
+    from process_supervisor import SpawnSettings, get_process_supervisor
+except ImportError:
+    build_prelaunch_pipeline = None
+
 def launch_game(target, mode="PASSIVE", **kwargs):
     """
     Launch target executable with optimization
@@ -28,9 +37,22 @@ def launch_game(target, mode="PASSIVE", **kwargs):
     # For now, just launch the target directly
     # Advanced modes (HOOK, STREAM) would require additional DLL injection
     
+    # Pre-launch: memory, CPU reservation and page-cache warm-up run concurrently;
+    # the game starts at the deadline at the latest
+    report = None
+    if build_prelaunch_pipeline:
+        exe_path = None if target.startswith("steam://") else target
+        report = build_prelaunch_pipeline(exe_path=exe_path,
+                                          deadline_s=kwargs.get('prelaunch_deadline', 0.5)).run()
+        for line in report.lines():
+            print(f"[NEURO-GFX] {line}")
+    
     if target.startswith("steam://"):
-        # Steam URL - let Windows handle it
-        os.startfile(target)
+        # Steam URL - let the OS handle it
+        if sys.platform == 'win32':
+            os.startfile(target)
+        else:
+            subprocess.Popen(["xdg-open", target])
         print("[NEURO-GFX] Steam launch command sent")
     else:
         # Regular executable
@@ -39,20 +61,36 @@ def launch_game(target, mode="PASSIVE", **kwargs):
             print(f"[ERROR] Target not found: {target}")
             return 1
         
-        # Launch with subprocess
+        # Launch with the priority and the CPU set reserved by the pipeline
+        # already applied at spawn, and follow the whole process tree
         try:
             cwd = target_path.parent if target_path.parent.exists() else None
-            proc = subprocess.Popen(
-                [str(target_path)],
-                cwd=cwd,
-                creationflags=subprocess.CREATE_NEW_PROCESS_GROUP
-            )
-            print(f"[NEURO-GFX] Process started (PID: {proc.pid})")
+            if report is not None:
+                supervisor = get_process_supervisor()
+                supervisor.enable_subreaper()  # Keep double-forking launchers in the tree
+                tree = supervisor.spawn([str(target_path)], cwd=cwd,
+                                        settings=SpawnSettings.from_reservation(report, partition=False))
+                pid = tree.pid
+            elif sys.platform == 'win32':
+                tree = None
+                pid = subprocess.Popen([str(target_path)], cwd=cwd,
+                                       creationflags=subprocess.CREATE_NEW_PROCESS_GROUP).pid
+            else:
+                tree = None
+                pid = subprocess.Popen([str(target_path)], cwd=cwd, start_new_session=True).pid
+            print(f"[NEURO-GFX] Process started (PID: {pid})")
             
-            # TODO: Apply priority optimization here if needed
-            # import psutil
-            # p = psutil.Process(proc.pid)
-            # p.nice(psutil.HIGH_PRIORITY_CLASS)
+            if tree is not None:
+                # First launch of this game: learn its startup reads for the next one
+                # (the launcher is a detached helper, so it can wait here)
+                if not get_cache_warmer().has_manifest(str(target_path)):
+                    print("[NEURO-GFX] Learning startup file access...")
+                    get_cache_warmer().record(str(target_path), pid)
+                
+                if not kwargs.get('detach'):
+                    # Stay alive as the tree's reaper until the game and its children exit
+                    tree.wait()
+                    print(f"[NEURO-GFX] Game exited (code {tree.returncode})")
             
         except Exception as e:
             print(f"[ERROR] Failed to launch: {e}")
@@ -70,6 +108,7 @@ if __name__ == "__main__":
     parser.add_argument("--render-res", default="100%")
     parser.add_argument("--fps", default="UNCAPPED")
     parser.add_argument("--upscaling", default="OFF")
+    parser.add_argument("--detach", action="store_true", help="Exit once the game is running")
     
     args = parser.parse_args()
     
@@ -79,7 +118,8 @@ if __name__ == "__main__":
         out_res=args.out_res,
         render_res=args.render_res,
         fps=args.fps,
-        upscaling=args.upscaling
+        upscaling=args.upscaling,
+        detach=args.detach
     )
     
     sys.exit(exit_code)
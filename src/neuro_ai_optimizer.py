@@ -6,10 +6,13 @@ IA inteligente que gestiona RAM, detecta cuellos de botella y auto-escala resolu
 """
 
 import psutil
+import sys
 import time
 from typing import Dict, Optional, Tuple
 from enum import Enum
 
+from process_footprint import get_footprint_sampler
+
 class BottleneckType(Enum):
     """Tipos de cuello de botella"""
     NONE = "none"
@@ -116,13 +119,21 @@ class NeuroAI:
             Dict con acciones tomadas
         """
         actions = []
+        reclaim = None
+        available_before = psutil.virtual_memory().available
         
         try:
-            # 1. Limpiar caché del sistema
-            if aggressive:
-                # En Windows, esto requiere privilegios de admin
-                # Por ahora, solo registramos la acción
-                actions.append("Cache clearing (requires admin)")
+            # 1. Recortar working set de procesos en segundo plano (Linux, medido)
+            if sys.platform.startswith('linux'):
+                from memory_reclaim import get_memory_reclaimer
+                reclaim = get_memory_reclaimer().reclaim(max_processes=5 if aggressive else 2,
+                                                         cold_only=not aggressive)
+                if reclaim['reclaimed_processes']:
+                    actions.append(f"Working set trimmed: {reclaim['freed_mb']:.0f} MB "
+                                   f"from {reclaim['reclaimed_processes']} processes")
+                elif reclaim['cold_processes']:
+                    actions.append(f"Working set marked cold: {reclaim['advised_mb']:.0f} MB "
+                                   f"in {reclaim['cold_processes']} processes (not freed)")
             
             # 2. Reducir prioridad de procesos no esenciales
             current_pid = psutil.Process().pid
@@ -136,16 +147,19 @@ class NeuroAI:
                         # Lista de procesos que podemos reducir prioridad
                         reducible = ['chrome', 'firefox', 'discord', 'spotify']
                         if any(name in proc.info['name'].lower() for name in reducible):
-                            proc.nice(psutil.BELOW_NORMAL_PRIORITY_CLASS)
+                            proc.nice(psutil.BELOW_NORMAL_PRIORITY_CLASS if sys.platform == 'win32' else 10)
                             actions.append(f"Reduced priority: {proc.info['name']}")
                 except:
                     pass
             
             # 3. Sugerir cerrar apps pesadas
             heavy_apps = []
-            for proc in psutil.process_iter(['name', 'memory_info']):
+            footprints = get_footprint_sampler().begin_pass()
+            for proc in psutil.process_iter(['name', 'create_time', 'memory_info']):
                 try:
                     mem_gb = proc.info['memory_info'].rss / (1024**3)
+                    if mem_gb > 1.0:
+                        mem_gb = footprints.footprint_of(proc).bytes / (1024**3)  # PSS
                     if mem_gb > 1.0:  # > 1GB
                         heavy_apps.append({
                             'name': proc.info['name'],
@@ -160,9 +174,14 @@ class NeuroAI:
         except Exception as e:
             actions.append(f"Error: {str(e)}")
         
+        available_after = psutil.virtual_memory().available
+        
         return {
             'actions': actions,
-            'ram_freed_estimate_gb': len(actions) * 0.5  # Estimación
+            # Valores medidos: suma de RSS recortado por proceso y delta de MemAvailable
+            'ram_reclaimed_gb': reclaim['freed_mb'] / 1024 if reclaim else 0.0,
+            'ram_freed_gb': max(0, available_after - available_before) / (1024**3),
+            'reclaim_results': reclaim['results'] if reclaim else []
         }
     
     def decide_resolution(self, current_fps: Optional[float] = None, 
@@ -214,6 +233,22 @@ class NeuroAI:
         # 1. Analizar sistema
         system_state = self.analyze_system()
         
+        return self.build_recommendations(system_state, current_fps)
+    
+    def build_recommendations(self, system_state: Dict,
+                              current_fps: Optional[float] = None,
+                              optimize_ram: bool = True) -> Dict:
+        """
+        Generar recomendaciones a partir de un estado ya medido
+        
+        Args:
+            system_state: Resultado de analyze_system()
+            current_fps: FPS actual del juego (opcional)
+            optimize_ram: Si False, no ejecuta optimize_ram (lo hace otro paso)
+        
+        Returns:
+            Dict con recomendaciones y acciones
+        """
         # 2. Detectar cuello de botella
         bottleneck = self.detect_bottleneck(system_state)
         
@@ -222,7 +257,7 @@ class NeuroAI:
         
         # 4. Optimizar RAM si es necesario
         ram_optimization = None
-        if bottleneck in [BottleneckType.RAM, BottleneckType.MIXED]:
+        if optimize_ram and bottleneck in [BottleneckType.RAM, BottleneckType.MIXED]:
             ram_optimization = self.optimize_ram(aggressive=True)
         
         # 5. Generar recomendaciones
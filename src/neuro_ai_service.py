@@ -3,107 +3,354 @@
 """
 🤖 NEURO-AI SERVICE
 Servicio de IA que optimiza en tiempo real automáticamente en segundo plano
+
+Arquitectura: un event loop asyncio en su propio hilo. Cada tarea
+(telemetría, cuellos de botella, política de RAM, persistencia de perfiles)
+es una corrutina con su propio periodo y deadline, de forma que un paso lento
+no retrasa a los demás. Las llamadas bloqueantes (psutil) van a un executor.
+
+En la app lo arranca NeuroMaster tras el login, con el gestor de perfiles
+compartido: sesiones de juego (CPU/RAM), copia de los perfiles en
+neuro_store y reajuste con profile_tuner al terminar cada sesión. Neuro-OS
+no mide los FPS de los juegos: sin un contador de fotogramas que llame a
+set_current_fps, las sesiones no tienen filas de FPS y el tuner no propone nada.
 """
 
+import asyncio
+import sys
 import threading
 import time
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Optional
 from neuro_ai_optimizer import NeuroAI, BottleneckType
+from adaptive_scheduler import AdaptiveInterval, get_system_activity
+
+
+@dataclass
+class ScheduledTask:
+    """Tarea periódica del servicio con sus métricas de planificación"""
+    name: str
+    period: float  # Segundos entre ejecuciones
+    deadline: float  # Segundos máximos por ejecución
+    func: Callable[[], Awaitable[None]] = field(repr=False)
+
+    # Métricas
+    runs: int = 0
+    overruns: int = 0  # Ejecuciones que superaron el deadline
+    skipped: int = 0  # Periodos perdidos por ir con retraso
+    errors: int = 0
+    last_duration: float = 0.0
+    max_duration: float = 0.0
+    last_jitter: float = 0.0  # Retraso respecto al instante planificado
+    max_jitter: float = 0.0
+    avg_jitter: float = 0.0  # Media móvil exponencial
+    wake: Optional[asyncio.Event] = field(default=None, repr=False)  # Re-planificar ya (cambio de periodo)
+
+    def record(self, jitter: float, duration: float):
+        """Registrar una ejecución"""
+        self.runs += 1
+        self.last_jitter = jitter
+        self.max_jitter = max(self.max_jitter, jitter)
+        self.avg_jitter = jitter if self.runs == 1 else self.avg_jitter * 0.9 + jitter * 0.1
+        self.last_duration = duration
+        self.max_duration = max(self.max_duration, duration)
+
+    def get_metrics(self) -> Dict:
+        """Métricas en milisegundos"""
+        return {
+            'period_s': self.period,
+            'deadline_s': self.deadline,
+            'runs': self.runs,
+            'overruns': self.overruns,
+            'skipped': self.skipped,
+            'errors': self.errors,
+            'last_duration_ms': self.last_duration * 1000,
+            'max_duration_ms': self.max_duration * 1000,
+            'last_jitter_ms': self.last_jitter * 1000,
+            'avg_jitter_ms': self.avg_jitter * 1000,
+            'max_jitter_ms': self.max_jitter * 1000
+        }
+
 
 class NeuroAIService:
     """Servicio de IA que corre en segundo plano"""
-    
+
     def __init__(self):
         self.ai = NeuroAI()
         self.running = False
         self.thread: Optional[threading.Thread] = None
-        
+
+        # Event loop propio (se crea en start())
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+
         # Configuración
-        self.monitor_interval = 2.0  # Segundos entre análisis
+        self.monitor_interval = 2.0  # Segundos entre análisis (intervalo base)
         self.auto_optimize = True
-        
+
+        # Intervalo adaptativo: 0.5s con juego/carga, back-off hasta 30s en reposo
+        self.adaptive_interval = AdaptiveInterval(
+            base=self.monitor_interval, min_interval=0.5, max_interval=30.0,
+            name="ai_service")
+
         # Estado actual
+        self.current_fps: Optional[float] = None
+        self.latest_state: Optional[dict] = None
         self.current_recommendations = None
         self.last_optimization_time = 0
         self.optimization_cooldown = 5.0  # Segundos entre optimizaciones
-    
+
+        # Gestor de perfiles opcional (persistencia periódica)
+        self.profile_manager = None
+
+        # Historial en SQLite (neuro_store): sesión de juego abierta y su juego
+        self.history_enabled = True
+        self._session_game: Optional[str] = None
+
+        # Reajustar el perfil con profile_tuner al terminar cada sesión
+        self.tune_profiles = True
+
+        # Tareas planificadas (cada una con su propio periodo y deadline)
+        self.tasks: Dict[str, ScheduledTask] = {}
+        self._add_task('telemetry', self.monitor_interval, 1.0, self._telemetry_task)
+        self._add_task('bottleneck', self.monitor_interval, 0.5, self._bottleneck_task)
+        self._add_task('ram_policy', self.optimization_cooldown, 3.0, self._ram_policy_task)
+        self._add_task('profile_persistence', 30.0, 5.0, self._persistence_task)
+
+    def _add_task(self, name: str, period: float, deadline: float,
+                  func: Callable[[], Awaitable[None]]):
+        self.tasks[name] = ScheduledTask(name=name, period=period, deadline=deadline, func=func)
+
     def start(self):
         """Iniciar servicio de IA en segundo plano"""
         if self.running:
             return
-        
+
         self.running = True
-        self.thread = threading.Thread(target=self._monitor_loop, daemon=True)
+        started = threading.Event()
+        self.thread = threading.Thread(target=self._thread_main, args=(started,),
+                                       name="NeuroAIService", daemon=True)
         self.thread.start()
+        started.wait()
         print("[AI Service] Started in background")
-    
-    def stop(self):
-        """Detener servicio de IA"""
+
+    def stop(self, timeout: float = 10.0):
+        """Detener servicio de IA (espera a que las tareas terminen, como mucho timeout s)"""
+        if not self.running:
+            return
+
         self.running = False
-        if self.thread:
-            self.thread.join(timeout=5.0)
+        if self.loop and self._stop_event:
+            self.loop.call_soon_threadsafe(self._stop_event.set)
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+            if self.thread.is_alive():
+                # Hilo daemon: una llamada bloqueada en el executor no debe colgar el cierre
+                print(f"[AI Service] Worker still busy after {timeout:.0f}s, not waiting")
+        self.thread = None
         print("[AI Service] Stopped")
-    
-    def _monitor_loop(self):
-        """Loop de monitoreo en segundo plano"""
-        while self.running:
+
+    def _thread_main(self, started: threading.Event):
+        """Hilo dedicado: crea el event loop y ejecuta el planificador"""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="neuro-ai-io")
+        self.loop.set_default_executor(self.executor)
+        self._stop_event = asyncio.Event()
+        started.set()
+
+        try:
+            self.loop.run_until_complete(self._scheduler_main())
+        finally:
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.loop.close()
+            self.loop = None
+            self.executor = None
+
+    async def _scheduler_main(self):
+        """Lanzar una corrutina por tarea y esperar a la señal de parada"""
+        runners = [asyncio.create_task(self._run_periodic(task), name=task.name)
+                   for task in self.tasks.values()]
+        await self._stop_event.wait()
+        for runner in runners:
+            runner.cancel()
+        await asyncio.gather(*runners, return_exceptions=True)
+
+    async def _run_periodic(self, task: ScheduledTask):
+        """Ejecutar una tarea con periodo fijo (sin deriva) y deadline"""
+        loop = asyncio.get_running_loop()
+        next_run = loop.time()
+        task.wake = asyncio.Event()
+
+        while not self._stop_event.is_set():
+            start = loop.time()
             try:
-                # Analizar sistema
-                recommendations = self.ai.auto_optimize(current_fps=None)
-                self.current_recommendations = recommendations
-                
-                # Aplicar optimizaciones automáticamente si está habilitado
-                if self.auto_optimize:
-                    self._apply_optimizations(recommendations)
-                
-                # Esperar antes del próximo análisis
-                time.sleep(self.monitor_interval)
-            
+                await asyncio.wait_for(task.func(), timeout=task.deadline)
+            except asyncio.TimeoutError:
+                task.overruns += 1
             except Exception as e:
-                print(f"[AI Service] Error in monitor loop: {e}")
-                time.sleep(self.monitor_interval)
-    
-    def _apply_optimizations(self, recommendations: dict):
-        """Aplicar optimizaciones automáticamente"""
-        # Verificar cooldown
-        current_time = time.time()
-        if current_time - self.last_optimization_time < self.optimization_cooldown:
+                task.errors += 1
+                print(f"[AI Service] Error in task '{task.name}': {e}")
+            end = loop.time()
+            task.record(jitter=max(0.0, start - next_run), duration=end - start)
+
+            # Siguiente instante planificado; si vamos tarde, saltar periodos
+            next_run += task.period
+            if next_run < end:
+                missed = int((end - next_run) // task.period) + 1
+                task.skipped += missed
+                next_run += missed * task.period
+
+            # Esperar al siguiente instante; un cambio de periodo re-planifica desde este inicio
+            # (la parada cancela la corrutina desde _scheduler_main)
+            while True:
+                try:
+                    await asyncio.wait_for(task.wake.wait(), timeout=max(0.0, next_run - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+                task.wake.clear()
+                next_run = max(start + task.period, loop.time())
+
+    def _set_period(self, period: float, *names: str):
+        """Cambiar el periodo de tareas y despertarlas (seguro desde cualquier hilo)"""
+        for name in names:
+            task = self.tasks[name]
+            if task.period == period:
+                continue
+            task.period = period
+            if task.wake is not None and self.loop is not None:
+                try:
+                    self.loop.call_soon_threadsafe(task.wake.set)
+                except RuntimeError:
+                    pass  # Loop ya cerrado
+
+    async def _run_blocking(self, func, *args):
+        """Ejecutar una llamada bloqueante (psutil, disco) en el executor"""
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    # --- TAREAS ---
+    async def _telemetry_task(self):
+        """Muestrear el sistema (psutil bloquea ~100ms, va al executor)"""
+        state = await self._run_blocking(self.ai.analyze_system)
+        self.latest_state = state
+
+        # Ajustar la cadencia de telemetría y análisis a la actividad
+        activity = get_system_activity()
+        activity.report_cpu(state['cpu_percent'])
+        interval = self.adaptive_interval.update(
+            cpu_percent=state['cpu_percent'],
+            game_active=activity.game_active or self.current_fps is not None)
+        self._set_period(interval, 'telemetry', 'bottleneck')
+
+        if self.history_enabled:
+            await self._run_blocking(self._record_history, state, activity)
+
+    def _record_history(self, state: dict, activity):
+        """Sesiones y telemetría al historial (en memoria; se vuelca en lotes)"""
+        from neuro_store import get_neuro_store
+        store = get_neuro_store()
+        game = activity.game_name if activity.game_active else None
+        if game != self._session_game:
+            if self._session_game is not None:
+                store.end_session()
+                if self.tune_profiles and self.profile_manager is not None:
+                    from profile_tuner import get_profile_tuner
+                    get_profile_tuner().apply(self.profile_manager, self._session_game)
+            if game is not None:
+                profile = self.profile_manager.get_profile(game) if self.profile_manager is not None else None
+                store.start_session(game, profile=profile.name if profile else None,
+                                    settings=profile.to_dict() if profile else None)
+            self._session_game = game
+        store.record_sample(cpu=state['cpu_percent'], ram=state['ram_percent'],
+                            gpu=state.get('gpu_usage'), fps=self.current_fps if game else None,
+                            ts=state.get('timestamp'))
+
+    async def _bottleneck_task(self):
+        """Detectar cuello de botella y recomendar preset con la última telemetría"""
+        if self.latest_state is None:
             return
-        
-        bottleneck = recommendations.get('bottleneck')
-        
-        # Optimizar RAM si hay cuello de botella
-        if bottleneck in ['ram', 'mixed'] and recommendations.get('ram_optimization'):
-            ram_opt = recommendations['ram_optimization']
-            if ram_opt.get('actions'):
-                print(f"[AI Service] Auto-optimizing RAM: {len(ram_opt['actions'])} actions")
-                self.last_optimization_time = current_time
-        
-        # Ajustar resolución si FPS es bajo
-        # (Esto se aplicaría al juego activo, por ahora solo registramos)
+        recommendations = self.ai.build_recommendations(
+            self.latest_state, current_fps=self.current_fps, optimize_ram=False)
+        self.current_recommendations = recommendations
+
         preset = recommendations.get('recommended_preset')
-        if preset:
+        if self.auto_optimize and preset != getattr(self, '_last_preset', None):
+            self._last_preset = preset
             print(f"[AI Service] Recommended preset: {preset}")
-    
+
+    async def _ram_policy_task(self):
+        """Optimizar RAM si hay cuello de botella (tiene su propio periodo/cooldown)"""
+        recommendations = self.current_recommendations
+        if not self.auto_optimize or not recommendations:
+            return
+
+        # Mantener el historial de inactividad del motor de recorte al día
+        if sys.platform.startswith('linux'):
+            from memory_reclaim import get_memory_reclaimer
+            await self._run_blocking(get_memory_reclaimer().observe)
+
+        bottleneck = recommendations.get('bottleneck')
+        if bottleneck not in [BottleneckType.RAM.value, BottleneckType.MIXED.value]:
+            return
+
+        ram_opt = await self._run_blocking(self.ai.optimize_ram, True)
+        recommendations['ram_optimization'] = ram_opt
+        self.last_optimization_time = time.time()
+        if ram_opt.get('actions'):
+            print(f"[AI Service] Auto-optimizing RAM: {len(ram_opt['actions'])} actions")
+
+    async def _persistence_task(self):
+        """Guardar perfiles e historial periódicamente (fuera del camino de las demás tareas)"""
+        if self.profile_manager is not None:
+            changed = self.profile_manager.store.dirty
+            await self._run_blocking(self.profile_manager.save_profiles)
+            if changed and self.history_enabled:
+                from neuro_store import get_neuro_store
+                await self._run_blocking(get_neuro_store().save_profiles, dict(self.profile_manager.profiles))
+        if self.history_enabled:
+            from neuro_store import get_neuro_store
+            await self._run_blocking(get_neuro_store().flush)
+
+    # --- API PÚBLICA ---
     def get_status(self) -> dict:
         """Obtener estado actual del servicio"""
         return {
             'running': self.running,
             'auto_optimize': self.auto_optimize,
             'monitor_interval': self.monitor_interval,
-            'current_recommendations': self.current_recommendations
+            'sampling': self.adaptive_interval.get_status(),
+            'current_recommendations': self.current_recommendations,
+            'tasks': {name: task.get_metrics() for name, task in self.tasks.items()}
         }
-    
+
     def set_auto_optimize(self, enabled: bool):
         """Activar/desactivar optimización automática"""
         self.auto_optimize = enabled
         print(f"[AI Service] Auto-optimize: {enabled}")
-    
+
     def set_monitor_interval(self, seconds: float):
-        """Cambiar intervalo de monitoreo"""
+        """Cambiar intervalo de monitoreo (base del intervalo adaptativo)"""
         self.monitor_interval = max(1.0, seconds)
+        self.adaptive_interval.set_base(self.monitor_interval)
+        self._set_period(self.adaptive_interval.current, 'telemetry', 'bottleneck')
         print(f"[AI Service] Monitor interval: {self.monitor_interval}s")
 
+    def set_current_fps(self, fps: Optional[float]):
+        """
+        Informar del FPS actual del juego (cuellos de botella e historial de FPS)
+
+        Punto de entrada para un contador de fotogramas externo: la app no tiene
+        ninguno, así que en ella sigue en None.
+        """
+        self.current_fps = fps
+
+    def attach_profile_manager(self, manager):
+        """Asociar un GameProfileManager para persistencia periódica"""
+        self.profile_manager = manager
+
 
 # Instancia global del servicio
 _ai_service: Optional[NeuroAIService] = None
@@ -134,14 +381,14 @@ if __name__ == "__main__":
     print("NEURO-AI SERVICE TEST")
     print("=" * 60)
     print()
-    
+
     # Iniciar servicio
     service = start_ai_service()
-    
+
     print("AI Service running in background...")
     print("Monitoring system every 2 seconds...")
     print()
-    
+
     # Dejar correr por 10 segundos
     try:
         for i in range(5):
@@ -151,13 +398,19 @@ if __name__ == "__main__":
                 rec = status['current_recommendations']
                 print(f"[{i*2}s] Bottleneck: {rec.get('bottleneck', 'N/A')}, "
                       f"Preset: {rec.get('recommended_preset', 'N/A')}")
-    
+
     except KeyboardInterrupt:
         print("\nStopping...")
-    
+
+    # Métricas de planificación
+    print("\nScheduler metrics:")
+    for name, metrics in service.get_status()['tasks'].items():
+        print(f"  {name}: runs={metrics['runs']} overruns={metrics['overruns']} "
+              f"jitter avg={metrics['avg_jitter_ms']:.2f}ms max={metrics['max_jitter_ms']:.2f}ms")
+
     # Detener servicio
     stop_ai_service()
-    
+
     print("\n" + "=" * 60)
     print("AI SERVICE TEST COMPLETED")
     print("=" * 60)
@@ -74,13 +74,26 @@ class NeuroBenchmark:
         except:
             pass
         
-        return {
+        result = {
             'total_ram_gb': ram.total / (1024**3),
             'used_ram_gb': ram.used / (1024**3),
             'free_ram_gb': ram.available / (1024**3),
             'ram_percent': ram.percent,
             'neuro_os_ram_gb': neuro_ram
         }
+        
+        # Desglose por subsistema si la contabilidad de memoria está activa
+        try:
+            from memory_profiler import get_memory_accounting
+            accounting = get_memory_accounting()
+            if accounting.enabled:
+                report = accounting.report()
+                result['neuro_os_buffers_mb'] = report['buffers_mb']
+                result['neuro_os_python_traced_mb'] = report['python_traced_mb']
+        except ImportError:
+            pass
+        
+        return result
     
     def benchmark_upscaling_performance(self) -> Dict:
         """
@@ -140,18 +153,54 @@ class NeuroBenchmark:
         
         return results
     
-    def benchmark_startup_time(self) -> Dict:
+    def benchmark_startup_time(self, runs: int = 3, timeout_s: float = 60.0) -> Dict:
         """
         Benchmark de tiempo de inicio
-        Mide cuánto tarda en iniciar Neuro-OS
+        Arranca Neuro-OS en modo medición (startup_profiler) y mide cuánto
+        tarda desde el inicio del proceso hasta el login interactivo
         """
         print("[Benchmark] Startup Time Test...")
-        
-        # Este benchmark debe ejecutarse al inicio de la app
-        # Por ahora retornamos placeholder
+        import os
+        import subprocess
+        import sys
+        import tempfile
+        from startup_profiler import STARTUP_EXIT_ENV, STARTUP_PROFILE_ENV, STARTUP_REPORT_ENV
+
+        master = Path(__file__).parent / "NEURO_OS_MASTER.py"
+        env = dict(os.environ)
+        env.update({STARTUP_PROFILE_ENV: "1", STARTUP_EXIT_ENV: "1"})
+        if sys.platform.startswith('linux') and not env.get('DISPLAY') and not env.get('WAYLAND_DISPLAY'):
+            env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+        reports = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for run in range(runs):
+                report_path = Path(tmp) / f"startup_{run}.json"
+                env[STARTUP_REPORT_ENV] = str(report_path)
+                try:
+                    proc = subprocess.run([sys.executable, str(master)], cwd=str(master.parent), env=env,
+                                          capture_output=True, text=True, timeout=timeout_s)
+                except subprocess.TimeoutExpired:
+                    return {'startup_time_ms': None, 'error': f'Timeout after {timeout_s:.0f} s'}
+                if not report_path.exists():
+                    tail = (proc.stderr or proc.stdout or '').strip().splitlines()[-1:]
+                    return {'startup_time_ms': None,
+                            'error': tail[0] if tail else f'Exit code {proc.returncode}'}
+                with open(report_path, 'r', encoding='utf-8') as f:
+                    reports.append(json.load(f))
+
+        # La ejecución mediana (la primera suele pagar la caché de disco fría)
+        reports.sort(key=lambda r: r['startup_time_ms'])
+        median = reports[len(reports) // 2]
         return {
-            'startup_time_ms': 0,
-            'note': 'Run at app startup to measure'
+            'startup_time_ms': median['startup_time_ms'],
+            'runs_ms': [r['startup_time_ms'] for r in reports],
+            'marks': median['marks'],
+            'imports_ms': median['imports']['total_ms'],
+            'phases': [{k: phase[k] for k in ('name', 'kind', 'wall_ms', 'cpu_ms')}
+                       for phase in median['phases']],
+            'top_imports': [(record['module'], record['cumulative_ms'])
+                            for record in median['imports']['top_cumulative'][:10]],
         }
     
     def benchmark_game_boost(self, game_name: str = "Test Game") -> Dict:
@@ -205,6 +254,14 @@ class NeuroBenchmark:
             json.dump(self.results, f, indent=2)
         
         print(f"\nResults saved to: {output_path.absolute()}")
+        
+        # Historial: el JSON sólo guarda la última ejecución
+        try:
+            from neuro_store import get_neuro_store
+            rows = get_neuro_store().add_benchmark(self.results, source=output_path.name)
+            print(f"History: {rows} results added to {get_neuro_store().db_path.name}")
+        except Exception as e:
+            print(f"History not saved: {e}")
     
     def print_summary(self):
         """Imprimir resumen de resultados"""
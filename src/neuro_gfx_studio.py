@@ -15,6 +15,8 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, QProcess
 from PySide6.QtGui import QFont
 
+from process_registry import get_process_registry
+
 # Intentar importar lógica original si se desea, o reimplementar la UI
 # Aquí reimplemento la UI para asegurar integración perfecta sin dependencias raras
 
@@ -197,7 +199,8 @@ class NeuroGFXPanel(QMainWindow):
             
         try:
             # Lanzar proceso desacoplado
-            subprocess.Popen(cmd, cwd=str(base_dir))
+            launcher = subprocess.Popen(cmd, cwd=str(base_dir))
+            get_process_registry().register_helper(launcher.pid, "gfx_launcher", include_children=False)
             
             if not self.stand_alone:
                 # Feedback visual en el SO
@@ -11,6 +11,8 @@ import numpy as np
 from PIL import Image
 from typing import Tuple, Optional
 
+from memory_profiler import get_memory_accounting
+
 class NeuroGFXUpscaler:
     """
     Motor de upscaling de Neuro-OS
@@ -114,6 +116,7 @@ class NeuroGFXUpscaler:
         # 3. Reducción de ruido ligera (opcional)
         # upscaled = cv2.fastNlMeansDenoisingColored(upscaled, None, 3, 3, 7, 21)
         
+        get_memory_accounting().register_buffer("upscaler", f"{id(self)}:output", upscaled, holder=self)
         return upscaled
     
     def upscale_image(self, image_path: str, output_path: str) -> bool:
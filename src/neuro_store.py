@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🗄️ NEURO STORE
+Base de datos SQLite embebida: perfiles, sesiones de juego, telemetría y benchmarks
+
+- Modo WAL + synchronous=NORMAL: los lectores (UI, consultas) no bloquean
+  al escritor y cada transacción cuesta un append al WAL, no un fsync
+- Sentencias SQL constantes (el módulo sqlite3 las prepara una vez y las
+  reutiliza desde su caché) y executemany para los lotes
+- La telemetría no se escribe muestra a muestra: se agrega en ventanas
+  (media, mínimo y 1% low de FPS, CPU, RAM) y las filas resultantes se
+  insertan en lote en una sola transacción
+- El 1% low de una sesión sale de todas sus muestras de FPS juntas (el de
+  una ventana de ~60 muestras es casi su mínimo); las consultas por juego y
+  día usan el de las sesiones
+- Índices por (juego, instante) para consultas como "media del 1% low de
+  X en los últimos 30 días"
+- Migración única de game_profiles.json y de los benchmark_results*.json
+- La base de datos vive en la carpeta de datos del usuario (app_paths)
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from app_paths import user_data_dir
+
+SCHEMA_VERSION = 2
+
+# Cambios sobre bases de datos ya creadas (versión -> sentencias)
+MIGRATIONS = {
+    2: ["ALTER TABLE sessions ADD COLUMN settings TEXT"],
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    name TEXT PRIMARY KEY,
+    category TEXT,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    game TEXT NOT NULL,
+    exe TEXT,
+    profile TEXT,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    samples INTEGER DEFAULT 0,
+    avg_fps REAL,
+    p1_low_fps REAL,
+    settings TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_game ON sessions (game, started_at);
+CREATE TABLE IF NOT EXISTS telemetry (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER REFERENCES sessions (id) ON DELETE CASCADE,
+    game TEXT,
+    ts REAL NOT NULL,
+    window_s REAL NOT NULL,
+    samples INTEGER NOT NULL,
+    fps_samples INTEGER NOT NULL,
+    avg_fps REAL,
+    min_fps REAL,
+    p1_low_fps REAL,
+    avg_cpu REAL,
+    max_cpu REAL,
+    avg_ram REAL,
+    avg_gpu REAL
+);
+CREATE INDEX IF NOT EXISTS idx_telemetry_game_ts ON telemetry (game, ts);
+CREATE INDEX IF NOT EXISTS idx_telemetry_session ON telemetry (session_id);
+CREATE TABLE IF NOT EXISTS benchmarks (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    result TEXT NOT NULL,
+    system TEXT,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_benchmarks_kind_ts ON benchmarks (kind, ts);
+"""
+
+# --- SENTENCIAS (constantes: sqlite3 las compila una vez por conexión) ---
+SQL_UPSERT_PROFILE = ("INSERT INTO profiles (name, category, data, updated_at) VALUES (?, ?, ?, ?) "
+                      "ON CONFLICT (name) DO UPDATE SET category = excluded.category, "
+                      "data = excluded.data, updated_at = excluded.updated_at")
+SQL_SELECT_PROFILES = "SELECT name, data FROM profiles"
+SQL_START_SESSION = "INSERT INTO sessions (game, exe, profile, started_at, settings) VALUES (?, ?, ?, ?, ?)"
+SQL_END_SESSION = ("UPDATE sessions SET ended_at = ?, samples = "
+                   "(SELECT COALESCE(SUM(fps_samples), 0) FROM telemetry WHERE session_id = ?), "
+                   "avg_fps = (SELECT SUM(avg_fps * fps_samples) / NULLIF(SUM(fps_samples), 0) "
+                   "FROM telemetry WHERE session_id = ?), "
+                   "p1_low_fps = ? WHERE id = ?")
+SQL_INSERT_TELEMETRY = ("INSERT INTO telemetry (session_id, game, ts, window_s, samples, fps_samples, "
+                        "avg_fps, min_fps, p1_low_fps, avg_cpu, max_cpu, avg_ram, avg_gpu) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+SQL_INSERT_BENCHMARK = "INSERT INTO benchmarks (ts, kind, result, system, source) VALUES (?, ?, ?, ?, ?)"
+SQL_FPS_SUMMARY = ("SELECT COUNT(DISTINCT session_id), SUM(fps_samples), "
+                   "SUM(avg_fps * fps_samples) / NULLIF(SUM(fps_samples), 0), MIN(min_fps), "
+                   "AVG(avg_cpu), AVG(avg_ram) "
+                   "FROM telemetry WHERE game = ? AND ts >= ? AND fps_samples > 0")
+# 1% low por sesión (calculado con todas sus muestras), ponderado por muestras
+SQL_SESSION_P1_LOW = ("SELECT SUM(p1_low_fps * samples) / NULLIF(SUM(samples), 0) FROM sessions "
+                      "WHERE game = ? AND started_at >= ? AND p1_low_fps IS NOT NULL")
+SQL_RECENT_SESSIONS = ("SELECT id, game, profile, started_at, ended_at, samples, avg_fps, p1_low_fps "
+                       "FROM sessions WHERE game = ? ORDER BY started_at DESC LIMIT ?")
+SQL_TUNING_WINDOWS = ("SELECT t.session_id, s.started_at, s.settings, t.fps_samples, t.avg_fps, t.p1_low_fps, "
+                      "t.avg_cpu, t.avg_ram, t.avg_gpu FROM telemetry t JOIN sessions s ON s.id = t.session_id "
+                      "WHERE t.game = ? AND t.ts >= ? AND t.fps_samples > 0 AND s.settings IS NOT NULL "
+                      "ORDER BY s.started_at, t.ts")
+SQL_BENCHMARK_HISTORY = "SELECT ts, result, source FROM benchmarks WHERE kind = ? ORDER BY ts DESC LIMIT ?"
+SQL_DAILY_FPS = ("SELECT CAST(ts / 86400 AS INTEGER) * 86400 AS day, "
+                 "SUM(avg_fps * fps_samples) / SUM(fps_samples) "
+                 "FROM telemetry WHERE game = ? AND ts >= ? AND fps_samples > 0 GROUP BY day ORDER BY day")
+SQL_DAILY_P1_LOW = ("SELECT CAST(started_at / 86400 AS INTEGER) * 86400 AS day, "
+                    "SUM(p1_low_fps * samples) / NULLIF(SUM(samples), 0) FROM sessions "
+                    "WHERE game = ? AND started_at >= ? AND p1_low_fps IS NOT NULL GROUP BY day")
+
+
+def percentile_low(values: List[float], fraction: float = 0.01) -> Optional[float]:
+    """Media del peor 1% (definición habitual de '1% low'); con pocas muestras, la peor"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    worst = ordered[:max(1, int(len(ordered) * fraction))]
+    return sum(worst) / len(worst)
+
+
+@dataclass
+class _Window:
+    """Muestras de una ventana de telemetría todavía abierta"""
+    game: Optional[str]
+    session_id: Optional[int]
+    start: float
+    fps: List[float] = field(default_factory=list)
+    cpu: List[float] = field(default_factory=list)
+    ram: List[float] = field(default_factory=list)
+    gpu: List[float] = field(default_factory=list)
+
+    def row(self, window_s: float) -> tuple:
+        mean = (lambda xs: sum(xs) / len(xs) if xs else None)
+        return (self.session_id, self.game, self.start, window_s, len(self.cpu) or len(self.fps), len(self.fps),
+                mean(self.fps), min(self.fps) if self.fps else None, percentile_low(self.fps),
+                mean(self.cpu), max(self.cpu) if self.cpu else None, mean(self.ram), mean(self.gpu))
+
+
+class NeuroStore:
+    """Almacén SQLite de Neuro-OS (un escritor, seguro entre hilos)"""
+
+    def __init__(self, db_path: Optional[str] = None, window_s: float = 60.0,
+                 batch_rows: int = 50, flush_s: float = 30.0):
+        """
+        Args:
+            db_path: Fichero de la base de datos (None = neuro_os.db en la carpeta de datos)
+            window_s: Duración de cada ventana de telemetría agregada
+            batch_rows: Filas pendientes que fuerzan un volcado
+            flush_s: Antigüedad máxima de las filas pendientes
+        """
+        self.db_path = Path(db_path) if db_path else user_data_dir() / "neuro_os.db"
+        self.window_s = window_s
+        self.batch_rows = batch_rows
+        self.flush_s = flush_s
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False,
+                                     cached_statements=64, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._init_schema()
+        self._window: Optional[_Window] = None
+        self._pending: List[tuple] = []
+        self._last_flush = time.monotonic()
+        self.session_id: Optional[int] = None
+        self.session_game: Optional[str] = None
+        self._session_fps = array('d')  # Todas las muestras de FPS de la sesión (para su 1% low)
+        self.stats = {'samples': 0, 'rows': 0, 'transactions': 0}
+
+    def _init_schema(self):
+        with self._lock, self._conn:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < SCHEMA_VERSION:
+                if version > 0:
+                    for target in range(version + 1, SCHEMA_VERSION + 1):
+                        for statement in MIGRATIONS.get(target, ()):
+                            self._conn.execute(statement)
+                self._conn.executescript(SCHEMA)
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        with self._lock:
+            self.end_session()
+            self.flush(close_window=True)
+            self._conn.close()
+
+    # --- META / MIGRACIÓN ---
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def migrate_json(self, profiles_file: Optional[str] = None,
+                     benchmark_files: Iterable[str] = ()) -> Dict:
+        """
+        Importar (una sola vez por fichero) los JSON de versiones anteriores
+
+        Args:
+            profiles_file: game_profiles.json
+            benchmark_files: benchmark_results*.json
+
+        Returns:
+            Dict con lo importado
+        """
+        imported = {'profiles': 0, 'benchmarks': 0, 'skipped': []}
+        with self._lock:
+            if profiles_file and Path(profiles_file).exists():
+                key = f"migrated:{Path(profiles_file).resolve()}"
+                if self._meta(key) is None:
+                    try:
+                        with open(profiles_file, 'r', encoding='utf-8') as f:
+                            imported['profiles'] = self.save_profiles(json.load(f))
+                        with self._conn:
+                            self._conn.execute("INSERT INTO meta VALUES (?, ?)", (key, str(time.time())))
+                    except (OSError, ValueError) as e:
+                        imported['skipped'].append(f"{profiles_file}: {e}")
+            for path in benchmark_files:
+                path = Path(path)
+                if not path.exists():
+                    continue
+                key = f"migrated:{path.resolve()}"
+                if self._meta(key) is not None:
+                    continue
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        results = json.load(f)
+                    self.add_benchmark(results, source=path.name, ts=path.stat().st_mtime)
+                    with self._conn:
+                        self._conn.execute("INSERT INTO meta VALUES (?, ?)", (key, str(time.time())))
+                    imported['benchmarks'] += 1
+                except (OSError, ValueError) as e:
+                    imported['skipped'].append(f"{path}: {e}")
+        return imported
+
+    # --- PERFILES ---
+    def save_profiles(self, profiles: Dict) -> int:
+        """
+        Guardar perfiles en lote (una transacción)
+
+        Args:
+            profiles: nombre -> GameProfile o dict (to_dict())
+        """
+        now = time.time()
+        rows = []
+        for name, profile in profiles.items():
+            data = profile.to_dict() if hasattr(profile, 'to_dict') else dict(profile)
+            rows.append((name, data.get('category'), json.dumps(data, ensure_ascii=False), now))
+        with self._lock, self._conn:
+            self._conn.executemany(SQL_UPSERT_PROFILE, rows)
+        self.stats['transactions'] += 1
+        return len(rows)
+
+    def load_profiles(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {name: json.loads(data) for name, data in self._conn.execute(SQL_SELECT_PROFILES)}
+
+    # --- SESIONES ---
+    def start_session(self, game: str, exe: Optional[str] = None, profile: Optional[str] = None,
+                      settings: Optional[Dict] = None) -> int:
+        """
+        Abrir una sesión de juego (cierra la anterior si seguía abierta)
+
+        Args:
+            game: Juego
+            exe: Ejecutable
+            profile: Nombre del perfil aplicado
+            settings: Ajustes en vigor (GameProfile.to_dict()); los usa profile_tuner
+        """
+        with self._lock:
+            if self.session_id is not None:
+                self.end_session()
+            self._close_window()
+            settings_json = json.dumps(settings, ensure_ascii=False) if settings is not None else None
+            with self._conn:
+                cursor = self._conn.execute(SQL_START_SESSION, (game, exe, profile, time.time(), settings_json))
+            self.session_id, self.session_game = cursor.lastrowid, game
+            self._session_fps = array('d')
+            return self.session_id
+
+    def end_session(self):
+        """Cerrar la sesión: vuelca su telemetría y calcula sus resúmenes"""
+        with self._lock:
+            if self.session_id is None:
+                return
+            self.flush(close_window=True)
+            sid = self.session_id
+            p1_low = percentile_low(self._session_fps)
+            with self._conn:
+                self._conn.execute(SQL_END_SESSION, (time.time(), sid, sid, p1_low, sid))
+            self.session_id, self.session_game = None, None
+            self._session_fps = array('d')
+
+    # --- TELEMETRÍA ---
+    def record_sample(self, cpu: Optional[float] = None, ram: Optional[float] = None,
+                      gpu: Optional[float] = None, fps: Optional[float] = None,
+                      game: Optional[str] = None, ts: Optional[float] = None):
+        """
+        Añadir una muestra a la ventana actual (sin tocar el disco)
+
+        Args:
+            cpu, ram, gpu: Porcentajes de uso
+            fps: FPS del juego (None si no hay juego o no se mide)
+            game: Juego (None = el de la sesión abierta)
+            ts: Instante (None = ahora)
+        """
+        ts = ts or time.time()
+        with self._lock:
+            game = game or self.session_game
+            window = self._window
+            if window is not None and (ts - window.start >= self.window_s or window.game != game):
+                self._close_window()
+                window = None
+            if window is None:
+                window = self._window = _Window(game=game, session_id=self.session_id, start=ts)
+            if fps is not None:
+                window.fps.append(fps)
+                if window.session_id is not None:
+                    self._session_fps.append(fps)
+            if cpu is not None:
+                window.cpu.append(cpu)
+            if ram is not None:
+                window.ram.append(ram)
+            if gpu is not None:
+                window.gpu.append(gpu)
+            self.stats['samples'] += 1
+            if len(self._pending) >= self.batch_rows or time.monotonic() - self._last_flush >= self.flush_s:
+                self.flush()
+
+    def record_frames(self, fps_values: Iterable[float], game: Optional[str] = None):
+        """Muestras de FPS por fotograma (o por segundo) en bloque"""
+        now = time.time()
+        with self._lock:
+            for fps in fps_values:
+                self.record_sample(fps=fps, game=game, ts=now)
+
+    def _close_window(self):
+        if self._window is not None and (self._window.fps or self._window.cpu):
+            self._pending.append(self._window.row(self.window_s))
+        self._window = None
+
+    def flush(self, close_window: bool = False) -> int:
+        """
+        Insertar las filas de telemetría pendientes en una transacción
+
+        Args:
+            close_window: Cerrar también la ventana en curso (al terminar sesión o salir)
+        """
+        with self._lock:
+            if close_window:
+                self._close_window()
+            rows, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+            if not rows:
+                return 0
+            with self._conn:
+                self._conn.executemany(SQL_INSERT_TELEMETRY, rows)
+            self.stats['rows'] += len(rows)
+            self.stats['transactions'] += 1
+            return len(rows)
+
+    # --- BENCHMARKS ---
+    def add_benchmark(self, results: Dict, source: Optional[str] = None, ts: Optional[float] = None) -> int:
+        """
+        Guardar una ejecución de NeuroBenchmark (una fila por prueba)
+
+        Returns:
+            Filas insertadas
+        """
+        ts = ts or time.time()
+        system = json.dumps(results.get('system_info', {}))
+        rows = [(ts, kind, json.dumps(result), system, source)
+                for kind, result in results.get('benchmarks', {}).items()]
+        with self._lock, self._conn:
+            self._conn.executemany(SQL_INSERT_BENCHMARK, rows)
+        self.stats['transactions'] += 1
+        return len(rows)
+
+    # --- CONSULTAS ---
+    def fps_summary(self, game: str, days: float = 30.0) -> Dict:
+        """Media de FPS y de 1% low (el de cada sesión terminada) de un juego en los últimos N días"""
+        since = time.time() - days * 86400
+        with self._lock:
+            self.flush()
+            row = self._conn.execute(SQL_FPS_SUMMARY, (game, since)).fetchone()
+            p1_low = self._conn.execute(SQL_SESSION_P1_LOW, (game, since)).fetchone()[0]
+        sessions, samples, avg_fps, min_fps, cpu, ram = row
+        return {'game': game, 'days': days, 'sessions': sessions, 'samples': samples or 0,
+                'avg_fps': avg_fps, 'p1_low_fps': p1_low, 'min_fps': min_fps,
+                'avg_cpu': cpu, 'avg_ram': ram}
+
+    def daily_fps(self, game: str, days: float = 30.0) -> List[Dict]:
+        since = time.time() - days * 86400
+        with self._lock:
+            lows = dict(self._conn.execute(SQL_DAILY_P1_LOW, (game, since)).fetchall())
+            return [{'day': day, 'avg_fps': avg, 'p1_low_fps': lows.get(day)}
+                    for day, avg in self._conn.execute(SQL_DAILY_FPS, (game, since))]
+
+    def recent_sessions(self, game: str, limit: int = 10) -> List[Dict]:
+        columns = ('id', 'game', 'profile', 'started_at', 'ended_at', 'samples', 'avg_fps', 'p1_low_fps')
+        with self._lock:
+            return [dict(zip(columns, row)) for row in self._conn.execute(SQL_RECENT_SESSIONS, (game, limit))]
+
+    def tuning_windows(self, game: str, days: float = 90.0) -> List[tuple]:
+        """
+        Ventanas de telemetría con los ajustes de su sesión (entrenamiento de profile_tuner)
+
+        Returns:
+            Tuplas (session_id, started_at, settings JSON, fps_samples, avg_fps, p1_low_fps,
+            avg_cpu, avg_ram, avg_gpu) en orden cronológico
+        """
+        since = time.time() - days * 86400
+        with self._lock:
+            self.flush()
+            return self._conn.execute(SQL_TUNING_WINDOWS, (game, since)).fetchall()
+
+    def benchmark_history(self, kind: str, limit: int = 20) -> List[Dict]:
+        with self._lock:
+            return [{'ts': ts, 'result': json.loads(result), 'source': source}
+                    for ts, result, source in self._conn.execute(SQL_BENCHMARK_HISTORY, (kind, limit))]
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            counts = {table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                      for table in ('profiles', 'sessions', 'telemetry', 'benchmarks')}
+        return {'db': str(self.db_path), 'session': self.session_id, 'pending_rows': len(self._pending),
+                **counts, **self.stats}
+
+
+# Instancia global
+_neuro_store: Optional[NeuroStore] = None
+
+def get_neuro_store() -> NeuroStore:
+    """Obtener el almacén global (migra los JSON antiguos la primera vez)"""
+    global _neuro_store
+    if _neuro_store is None:
+        _neuro_store = NeuroStore()
+        from game_profile_manager import default_profiles_file
+        here = Path(__file__).parent
+        _neuro_store.migrate_json(profiles_file=str(default_profiles_file()),
+                                  benchmark_files=sorted(here.glob("*benchmark_results*.json")))
+        import atexit
+        atexit.register(_neuro_store.close)
+    return _neuro_store
+
+
+if __name__ == "__main__":
+    import random
+    import shutil
+    import tempfile
+
+    print("=" * 60)
+    print("NEURO STORE TEST")
+    print("=" * 60)
+
+    root = Path(tempfile.mkdtemp(prefix="neuro_db_"))
+    (root / "game_profiles.json").write_text(json.dumps(
+        {"Valorant": {"name": "Valorant", "category": "competitive_fps", "target_fps": 144}}))
+    (root / "benchmark_results.json").write_text(json.dumps(
+        {"system_info": {"cpu": "x"}, "benchmarks": {"cpu": {"avg_cpu_percent": 12.5}}}))
+
+    store = NeuroStore(str(root / "neuro_os.db"), window_s=10.0)
+    print(f"Migration: {store.migrate_json(str(root / 'game_profiles.json'), [root / 'benchmark_results.json'])}")
+    print(f"Migration again: {store.migrate_json(str(root / 'game_profiles.json'), [root / 'benchmark_results.json'])}")
+
+    # 30 días de sesiones sintéticas: 2 muestras por segundo durante 20 minutos
+    random.seed(3)
+    start = time.perf_counter()
+    base = time.time() - 30 * 86400
+    for day in range(30):
+        store.start_session("Valorant", profile="Valorant")
+        t0 = base + day * 86400
+        for i in range(2400):
+            fps = random.gauss(140, 8) if random.random() > 0.01 else random.uniform(40, 70)
+            store.record_sample(cpu=random.uniform(30, 70), ram=55.0, fps=fps, ts=t0 + i * 0.5)
+        store.end_session()
+    ms = (time.perf_counter() - start) * 1000
+    print(f"72,000 samples in {ms:.0f} ms -> {store.get_status()}")
+
+    start = time.perf_counter()
+    summary = store.fps_summary("Valorant", days=31)
+    query_ms = (time.perf_counter() - start) * 1000
+    print(f"avg/1% low over 30 days ({query_ms:.1f} ms): {summary['avg_fps']:.1f} / {summary['p1_low_fps']:.1f} FPS "
+          f"in {summary['sessions']} sessions")
+    print(f"Last session: {store.recent_sessions('Valorant', 1)}")
+    print(f"Benchmarks: {store.benchmark_history('cpu')}")
+    plan = store._conn.execute("EXPLAIN QUERY PLAN " + SQL_FPS_SUMMARY, ("x", 0)).fetchall()
+    print(f"Query plan: {'; '.join(row[-1] for row in plan)}")
+    store.close()
+    shutil.rmtree(root)
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+💾 PERSISTENCE
+Almacén JSON con escritura diferida (write-behind) y atómica
+
+- Los cambios sólo marcan el documento como sucio; un temporizador agrupa
+  las ráfagas (debounce) y escribe una vez, con un retraso máximo para que
+  un flujo continuo de cambios no aplace la escritura indefinidamente
+- Escritura atómica: fichero temporal + fsync + os.replace (+ fsync del
+  directorio según la política), así que en disco siempre hay la versión
+  anterior completa o la nueva completa
+- Recuperación al cargar: un temporal completo que no llegó a renombrarse
+  se recupera; un fichero corrupto (escrito por versiones anteriores sin
+  escritura atómica) se aparta como .corrupt y se usan los valores por defecto
+- Un almacén por ruta: ConfigManager y AppManager comparten config.json
+  sin releerlo ni pisarse
+- La escritura (y su fsync) va fuera del lock del documento: mark_dirty
+  desde la interfaz nunca espera al disco
+- Al salir se vuelcan todos los almacenes pendientes (atexit)
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+FSYNC_FULL = "full"   # Fichero y directorio: sobrevive a un corte de luz
+FSYNC_DATA = "data"   # Sólo el fichero
+FSYNC_NONE = "none"   # Confiar en el sistema (sobrevive a un cierre del proceso, no a un corte)
+
+
+class JsonStore:
+    """Documento JSON persistente con escritura diferida"""
+
+    def __init__(self, path: Union[str, Path], snapshot: Optional[Callable[[], Any]] = None,
+                 debounce_s: float = 2.0, max_delay_s: float = 30.0, fsync: str = FSYNC_FULL,
+                 indent: Optional[int] = 2):
+        """
+        Args:
+            path: Fichero JSON
+            snapshot: Función que devuelve lo que hay que guardar (None = self.data)
+            debounce_s: Silencio necesario tras el último cambio antes de escribir
+            max_delay_s: Retraso máximo desde el primer cambio sin guardar
+            fsync: FSYNC_FULL, FSYNC_DATA o FSYNC_NONE
+            indent: Sangría del JSON (None = compacto)
+        """
+        self.path = Path(path)
+        self.snapshot = snapshot
+        self.debounce_s = debounce_s
+        self.max_delay_s = max_delay_s
+        self.fsync = fsync
+        self.indent = indent
+        self.data: Any = None
+        self.loaded = False
+        self.recovered: Optional[str] = None  # 'tmp', 'corrupt' o None
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()  # Escrituras en orden, sin bloquear mark_dirty
+        self._timer: Optional[threading.Timer] = None
+        self._dirty_since: Optional[float] = None
+        self._version = 0
+        self._written_version = 0
+        self.stats = {'changes': 0, 'writes': 0, 'errors': 0}
+
+    @property
+    def tmp_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".tmp")
+
+    @property
+    def dirty(self) -> bool:
+        return self._version != self._written_version
+
+    # --- CARGA ---
+    def load(self, default: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        Cargar el documento (una sola vez por almacén)
+
+        Args:
+            default: Función que crea el documento si no hay fichero válido
+                     (un documento nuevo se marca como sucio para crearlo)
+        """
+        with self._lock:
+            if self.loaded:
+                return self.data
+            data = self._read(self.path)
+            tmp = self._read(self.tmp_path) if self.tmp_path.exists() else None
+            if data is None and tmp is not None:
+                # Cierre entre el fsync del temporal y el rename: el temporal está completo
+                data, self.recovered = tmp, 'tmp'
+                print(f"[Persistence] Recovered {self.path.name} from interrupted write")
+            elif data is None and self.path.exists():
+                self.recovered = 'corrupt'
+                try:
+                    os.replace(self.path, self.path.with_name(self.path.name + ".corrupt"))
+                except OSError:
+                    pass
+                print(f"[Persistence] {self.path.name} was corrupt, kept as .corrupt")
+            try:
+                self.tmp_path.unlink()
+            except OSError:
+                pass
+            self.loaded = True
+            if data is None:
+                self.data = default() if default else {}
+                self.mark_dirty()
+            else:
+                self.data = data
+                if self.recovered:
+                    self.mark_dirty()
+            return self.data
+
+    def read(self) -> Any:
+        """Contenido actual del fichero en disco (None si falta o no es JSON válido)"""
+        return self._read(self.path)
+
+    @staticmethod
+    def _read(path: Path) -> Any:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    # --- ESCRITURA DIFERIDA ---
+    def mark_dirty(self):
+        """Anotar un cambio; la escritura se programa y se agrupa con las siguientes"""
+        with self._lock:
+            self._version += 1
+            self.stats['changes'] += 1
+            now = time.monotonic()
+            if self._dirty_since is None:
+                self._dirty_since = now
+            # Reprogramar al final de la ráfaga, sin pasar del retraso máximo
+            delay = min(self.debounce_s, max(0.0, self._dirty_since + self.max_delay_s - now))
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(delay, self._timer_flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _timer_flush(self):
+        if not self.flush():
+            with self._lock:
+                if self.dirty and self._timer is None:
+                    # Error transitorio (disco lleno, documento mutando): reintentar
+                    self._timer = threading.Timer(self.debounce_s, self._timer_flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+
+    def flush(self, force: bool = False) -> bool:
+        """
+        Escribir ya si hay cambios pendientes
+
+        Args:
+            force: Escribir aunque no haya cambios
+
+        Returns:
+            True si el fichero en disco está al día
+        """
+        # Un escritor cada vez: la instantánea y su escritura van juntas, así que
+        # en disco nunca acaba una instantánea anterior a otra ya escrita
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self.loaded or (not self.dirty and not force):
+                    return True
+                version = self._version
+                try:
+                    payload = json.dumps(self.snapshot() if self.snapshot else self.data,
+                                         indent=self.indent, ensure_ascii=False)
+                except (TypeError, ValueError, RuntimeError) as e:
+                    # RuntimeError: otro hilo modificó el documento mientras se serializaba
+                    self.stats['errors'] += 1
+                    print(f"[Persistence] {self.path.name} not serialisable: {e}")
+                    return False
+            # Disco (y fsync) fuera del lock: los cambios siguen entrando mientras tanto
+            try:
+                self._write_atomic(payload)
+            except OSError as e:
+                with self._lock:
+                    self.stats['errors'] += 1
+                print(f"[Persistence] Error saving {self.path.name}: {e}")
+                return False
+            with self._lock:
+                self._written_version = version
+                self._dirty_since = None if not self.dirty else time.monotonic()
+                self.stats['writes'] += 1
+            return True
+
+    def _write_atomic(self, payload: str):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.tmp_path
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(payload)
+            if self.fsync != FSYNC_NONE:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        if self.fsync == FSYNC_FULL and hasattr(os, 'O_DIRECTORY'):
+            # El rename sólo es duradero cuando el directorio llega a disco
+            fd = os.open(self.path.parent, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def close(self):
+        """Volcar lo pendiente y parar el temporizador"""
+        self.flush()
+
+    def get_status(self) -> Dict:
+        return {'path': str(self.path), 'dirty': self.dirty, 'recovered': self.recovered, **self.stats}
+
+
+# --- REGISTRO DE ALMACENES ---
+_stores: Dict[str, JsonStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path: Union[str, Path], **options) -> JsonStore:
+    """
+    Almacén de una ruta (el mismo objeto para todos los que usan ese fichero)
+
+    Args:
+        path: Fichero JSON
+        **options: Argumentos de JsonStore (sólo cuentan en la primera llamada)
+    """
+    key = os.path.realpath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = JsonStore(path, **options)
+        return store
+
+
+def flush_all() -> int:
+    """Volcar todos los almacenes con cambios (al salir, antes de un juego...)"""
+    with _stores_lock:
+        stores = list(_stores.values())
+    return sum(1 for store in stores if store.dirty and store.flush())
+
+
+atexit.register(flush_all)
+
+
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+
+    print("=" * 60)
+    print("PERSISTENCE TEST")
+    print("=" * 60)
+
+    root = Path(tempfile.mkdtemp(prefix="neuro_store_"))
+
+    # Antes: un json.dump completo por cambio
+    legacy_file = root / "legacy.json"
+    data = {f"game{i}": {"avg_fps": 60.0, "render_scale": 1.0} for i in range(50)}
+    start = time.perf_counter()
+    for tick in range(500):
+        data["game1"]["avg_fps"] = tick
+        with open(legacy_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+    legacy_ms = (time.perf_counter() - start) * 1000
+    print(f"Legacy: 500 updates -> 500 writes in {legacy_ms:.0f} ms")
+
+    store = get_store(root / "profiles.json", debounce_s=0.2, max_delay_s=1.0)
+    store.load(default=lambda: {f"game{i}": {"avg_fps": 60.0, "render_scale": 1.0} for i in range(50)})
+    start = time.perf_counter()
+    for tick in range(500):
+        store.data["game1"]["avg_fps"] = tick
+        store.mark_dirty()
+        time.sleep(0.004)  # Un tick de telemetría cada 4 ms durante 2 s
+    update_ms = (time.perf_counter() - start) * 1000
+    store.flush()
+    print(f"Write-behind: 500 updates in {update_ms:.0f} ms -> {store.stats['writes']} writes "
+          f"({store.get_status()})")
+
+    # Recuperación: temporal completo sin renombrar y fichero corrupto
+    (root / "crashed.json.tmp").write_text('{"recovered": true}')
+    print(f"Interrupted write: {get_store(root / 'crashed.json').load()}")
+    (root / "broken.json").write_text('{"half": ')
+    broken = get_store(root / "broken.json")
+    print(f"Corrupt file: {broken.load(default=lambda: {'fresh': True})} ({broken.recovered})")
+    flush_all()
+    print(f"Files: {sorted(p.name for p in root.iterdir())}")
+    shutil.rmtree(root)
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📏 PROCESS FOOTPRINT SAMPLER
+Huella de memoria real por proceso (PSS/USS/swap) en vez de RSS
+
+RSS cuenta las bibliotecas compartidas en cada proceso, así que un navegador
+con 20 procesos parece usar 20 veces su libxul. PSS reparte lo compartido
+entre quienes lo usan y USS es lo que se liberaría al cerrar el proceso.
+
+- Linux: /proc/<pid>/smaps_rollup (una lectura, ya agregada por el kernel)
+- Otros: psutil memory_full_info() (USS)
+- Presupuesto de lecturas por pasada: el resto usa el valor en caché o RSS
+- Cada llamador (radar, RAM, reclaim, pipeline) abre su propia pasada con
+  begin_pass(); la caché es compartida y está protegida por un lock
+- Caché por (pid, create_time) con TTL: un PID reutilizado nunca hereda datos
+- Como PSS <= RSS, quien filtra por umbral sólo mide los que superan el
+  umbral en RSS (el coste por tick no crece)
+"""
+
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import psutil
+
+IS_LINUX = sys.platform.startswith('linux')
+
+
+@dataclass
+class Footprint:
+    """Huella de memoria de un proceso (bytes)"""
+    pid: int
+    rss: int
+    pss: int
+    uss: int
+    swap: int
+    source: str  # 'smaps_rollup', 'uss' o 'rss' (fallback)
+    timestamp: float
+
+    @property
+    def bytes(self) -> int:
+        """Mejor métrica disponible (PSS; RSS si no se pudo medir)"""
+        return self.pss
+
+    @property
+    def mb(self) -> float:
+        return self.pss / (1024 * 1024)
+
+    @property
+    def exact(self) -> bool:
+        return self.source != 'rss'
+
+
+def read_smaps_rollup(pid: int, proc_root: str = "/proc") -> Dict[str, int]:
+    """Leer /proc/<pid>/smaps_rollup (valores en bytes)"""
+    values = {}
+    with open(f"{proc_root}/{pid}/smaps_rollup", 'rb') as f:
+        for line in f:
+            key, _, rest = line.partition(b':')
+            parts = rest.split()
+            if len(parts) == 2 and parts[1] == b'kB':
+                values[key.decode()] = int(parts[0]) * 1024
+    return values
+
+
+class FootprintPass:
+    """Una pasada de un llamador: presupuesto propio sobre la caché compartida"""
+
+    def __init__(self, sampler: "FootprintSampler", budget: int):
+        self.sampler = sampler
+        self.budget_left = budget
+
+    def footprint(self, pid: int, create_time: float, rss: int) -> Footprint:
+        """Ver FootprintSampler.footprint"""
+        return self.sampler._footprint(pid, create_time, rss, self)
+
+    def footprint_of(self, proc: psutil.Process) -> Footprint:
+        """Atajo para un psutil.Process (usa proc.info si viene de process_iter)"""
+        info = getattr(proc, 'info', None) or {}
+        mem = info.get('memory_info') or proc.memory_info()
+        create_time = info.get('create_time') or proc.create_time()
+        return self.footprint(proc.pid, create_time, mem.rss)
+
+
+class FootprintSampler:
+    """Muestreador de huella con presupuesto y caché (seguro entre hilos)"""
+
+    def __init__(self, ttl_s: float = 30.0, scan_budget: int = 24, proc_root: str = "/proc"):
+        """
+        Args:
+            ttl_s: Validez de una medida en caché
+            scan_budget: Lecturas de smaps_rollup permitidas por pasada
+            proc_root: Raíz de /proc
+        """
+        self.ttl_s = ttl_s
+        self.scan_budget = scan_budget
+        self.proc_root = proc_root
+        self._cache: Dict[Tuple[int, float], Footprint] = {}
+        self._lock = threading.Lock()
+        self.stats = {'reads': 0, 'cache_hits': 0, 'fallbacks': 0}
+
+    def begin_pass(self) -> FootprintPass:
+        """
+        Iniciar una pasada (presupuesto nuevo y poda de entradas caducadas)
+
+        El presupuesto es de la pasada devuelta, no del muestreador: el radar
+        y el pipeline de lanzamiento pueden medir a la vez sin gastarse el
+        presupuesto el uno al otro.
+        """
+        now = time.time()
+        with self._lock:
+            expired = [key for key, fp in self._cache.items() if now - fp.timestamp > self.ttl_s * 4]
+            for key in expired:
+                del self._cache[key]
+        return FootprintPass(self, self.scan_budget)
+
+    def _measure(self, pid: int, rss: int) -> Optional[Footprint]:
+        now = time.time()
+        try:
+            if IS_LINUX:
+                values = read_smaps_rollup(pid, self.proc_root)
+                uss = values.get('Private_Clean', 0) + values.get('Private_Dirty', 0)
+                return Footprint(pid=pid, rss=values.get('Rss', rss), pss=values.get('Pss', rss),
+                                 uss=uss, swap=values.get('Swap', 0),
+                                 source='smaps_rollup', timestamp=now)
+            mem = psutil.Process(pid).memory_full_info()
+            return Footprint(pid=pid, rss=mem.rss, pss=getattr(mem, 'pss', mem.uss), uss=mem.uss,
+                             swap=getattr(mem, 'swap', 0), source='uss', timestamp=now)
+        except (OSError, psutil.Error, ValueError):
+            return None
+
+    def footprint(self, pid: int, create_time: float, rss: int) -> Footprint:
+        """
+        Huella de un proceso: caché fresca, lectura nueva (si queda
+        presupuesto) o, en su defecto, la última medida o el RSS
+
+        Sin pasada abierta usa una de una sola lectura.
+
+        Args:
+            pid: PID
+            create_time: Momento de creación (clave anti reutilización de PID)
+            rss: RSS ya conocido (de process_iter), usado como fallback
+        """
+        return self._footprint(pid, create_time, rss, FootprintPass(self, 1))
+
+    def footprint_of(self, proc: psutil.Process) -> Footprint:
+        """Atajo para un psutil.Process (usa proc.info si viene de process_iter)"""
+        return FootprintPass(self, 1).footprint_of(proc)
+
+    def _footprint(self, pid: int, create_time: float, rss: int, pass_: FootprintPass) -> Footprint:
+        now = time.time()
+        if rss == 0:
+            return Footprint(pid, 0, 0, 0, 0, 'rss', now)  # Hilo del kernel
+        key = (pid, create_time)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and now - cached.timestamp <= self.ttl_s:
+                self.stats['cache_hits'] += 1
+                return cached
+            if pass_.budget_left <= 0:
+                self.stats['fallbacks'] += 1
+                return cached or Footprint(pid, rss, rss, rss, 0, 'rss', now)  # Caducada: mejor que RSS
+            pass_.budget_left -= 1
+            self.stats['reads'] += 1
+
+        # La lectura de /proc va fuera del lock
+        measured = self._measure(pid, rss)
+        if measured is None:
+            # Sin permiso (proceso de otro usuario): no reintentar hasta el TTL
+            measured = Footprint(pid, rss, rss, rss, 0, 'rss', now)
+        with self._lock:
+            self._cache[key] = measured
+        return measured
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            return {'cached': len(self._cache), 'ttl_s': self.ttl_s,
+                    'scan_budget': self.scan_budget, **self.stats}
+
+
+# Instancia global
+_sampler: Optional[FootprintSampler] = None
+
+def get_footprint_sampler() -> FootprintSampler:
+    """Obtener el muestreador global (caché compartida entre radar, RAM y reclaim)"""
+    global _sampler
+    if _sampler is None:
+        _sampler = FootprintSampler()
+    return _sampler
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("PROCESS FOOTPRINT TEST")
+    print("=" * 60)
+
+    sampler = get_footprint_sampler()
+    rows = []
+    start = time.perf_counter()
+    footprints = sampler.begin_pass()
+    procs = [p for p in psutil.process_iter(['pid', 'name', 'create_time', 'memory_info'])
+             if p.info['memory_info'] is not None]
+    # Los más grandes primero: el presupuesto se gasta donde importa
+    procs.sort(key=lambda p: p.info['memory_info'].rss, reverse=True)
+    for proc in procs:
+        rows.append((proc.info['name'], footprints.footprint_of(proc)))
+    first = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    footprints = sampler.begin_pass()
+    for proc in psutil.process_iter(['pid', 'name', 'create_time', 'memory_info']):
+        if proc.info['memory_info'] is not None:
+            footprints.footprint_of(proc)
+    second = (time.perf_counter() - start) * 1000
+
+    rows.sort(key=lambda r: r[1].rss, reverse=True)
+    print(f"{'name':20s} {'RSS MB':>8s} {'PSS MB':>8s} {'USS MB':>8s}  source")
+    for name, fp in rows[:8]:
+        print(f"{name[:20]:20s} {fp.rss / 1024**2:8.1f} {fp.mb:8.1f} {fp.uss / 1024**2:8.1f}  {fp.source}")
+    print(f"\nPass 1: {first:.1f} ms | pass 2 (cached): {second:.1f} ms | {sampler.get_status()}")
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🗂️ SELF PROCESS REGISTRY
+Registro de los procesos propios de Neuro-OS (proceso principal, hijos y
+helpers lanzados por CapturedAppWindow / el launcher GFX)
+
+- Los helpers se registran al lanzarse (evento), no buscando "neuro" en el
+  cmdline de todos los procesos del sistema
+- Los descendientes se descubren con un recorrido barato de
+  /proc/<pid>/task/<tid>/children (Linux) o psutil.children() en otro caso;
+  los hijos de un helper hoja (lanzador de juegos) no se cuentan aunque el
+  helper cuelgue del proceso principal
+- La memoria (RSS/PSS/USS) se agrega en una sola pasada
+
+Coste de un health check: O(procesos propios) en vez de O(todos los procesos)
+"""
+
+import os
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+
+IS_LINUX = sys.platform.startswith('linux')
+
+
+def child_pids(pid: int) -> List[int]:
+    """Hijos directos leyendo /proc/<pid>/task/*/children (sin recorrer /proc)"""
+    children = []
+    try:
+        for tid in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tid}/children", 'r') as f:
+                children.extend(int(c) for c in f.read().split())
+    except (OSError, ValueError):
+        pass
+    return children
+
+
+class SelfProcessRegistry:
+    """Árbol de procesos propio de Neuro-OS"""
+
+    def __init__(self, root_pid: Optional[int] = None):
+        self._lock = threading.Lock()
+        self.root = psutil.Process(root_pid or os.getpid())
+        # (pid, create_time) -> (Process, rol)
+        self._procs: Dict[Tuple[int, float], Tuple[psutil.Process, str]] = {}
+        self._helpers: Dict[Tuple[int, float], str] = {}
+        self._excluded = set()
+        self._leaves = set()
+        self._add(self.root, "main")
+
+    def _add(self, proc: psutil.Process, role: str):
+        try:
+            key = (proc.pid, proc.create_time())
+        except psutil.Error:
+            return
+        if key not in self._procs:
+            self._procs[key] = (proc, role)
+
+    # --- EVENTOS ---
+    def register_helper(self, pid: int, role: str = "helper", include_children: bool = True):
+        """
+        Registrar un proceso lanzado por Neuro-OS (captura, launcher, juego)
+
+        Args:
+            pid: PID del helper
+            role: Rol para el desglose
+            include_children: Contar también sus hijos (False para lanzadores
+                              cuyos hijos son juegos)
+        """
+        with self._lock:
+            try:
+                proc = psutil.Process(pid)
+                key = (pid, proc.create_time())
+            except psutil.Error:
+                return
+            self._helpers[key] = role
+            self._procs[key] = (proc, role)
+            if not include_children:
+                self._leaves.add(key)
+
+    def unregister(self, pid: int):
+        """Olvidar un helper (p.ej. al cerrar su ventana)"""
+        with self._lock:
+            for key in [k for k in self._procs if k[0] == pid]:
+                self._procs.pop(key, None)
+                self._helpers.pop(key, None)
+
+    def exclude_tree(self, pid: int):
+        """
+        No contar un árbol como propio aunque cuelgue de Neuro-OS (juegos
+        lanzados por el supervisor: no deben sufrir los límites de emergencia)
+        """
+        with self._lock:
+            self._excluded.add(pid)
+            # Sus descendientes pueden estar ya registrados de un refresh anterior
+            tree = {pid}
+            try:
+                tree.update(child.pid for child in self._descendants(psutil.Process(pid)))
+            except psutil.Error:
+                pass
+            for key in [k for k in self._procs if k[0] in tree]:
+                self._procs.pop(key, None)
+                self._helpers.pop(key, None)
+                self._leaves.discard(key)
+
+    # --- DESCUBRIMIENTO ---
+    def _descendants(self, proc: psutil.Process) -> List[psutil.Process]:
+        """Descendientes sin entrar en árboles excluidos ni bajo helpers hoja"""
+        use_proc = IS_LINUX and os.path.exists(f"/proc/{proc.pid}/task/{proc.pid}/children")
+        leaves = {key[0] for key in self._leaves}
+        found = []
+        stack = [proc]
+        while stack:
+            parent = stack.pop()
+            if use_proc:
+                children = []
+                for pid in child_pids(parent.pid):
+                    try:
+                        children.append(psutil.Process(pid))
+                    except psutil.Error:
+                        continue
+            else:
+                try:
+                    children = parent.children()
+                except psutil.Error:
+                    continue
+            for child in children:
+                if child.pid in self._excluded:
+                    continue
+                found.append(child)
+                if child.pid not in leaves:
+                    stack.append(child)
+        return found
+
+    def refresh(self) -> int:
+        """Descubrir hijos nuevos y podar procesos muertos. Devuelve el total."""
+        with self._lock:
+            # Podar muertos (is_running compara create_time: seguro ante PID reutilizado)
+            for key, (proc, _) in list(self._procs.items()):
+                if not proc.is_running():
+                    self._procs.pop(key, None)
+                    self._helpers.pop(key, None)
+                    self._leaves.discard(key)
+
+            roots = [(proc, role) for key, (proc, role) in self._procs.items()
+                     if role == "main" or (key in self._helpers and key not in self._leaves)]
+            for proc, role in roots:
+                child_role = "child" if role == "main" else f"{role}_child"
+                for child in self._descendants(proc):
+                    self._add(child, child_role)
+            return len(self._procs)
+
+    def processes(self, refresh: bool = True) -> List[psutil.Process]:
+        """Procesos propios vivos"""
+        if refresh:
+            self.refresh()
+        with self._lock:
+            return [proc for proc, _ in self._procs.values()]
+
+    # --- MEMORIA ---
+    def memory_totals(self, refresh: bool = True) -> Dict:
+        """
+        RSS/PSS/USS agregados en una pasada (PSS/USS si el SO los expone)
+
+        Returns:
+            Dict con totales en bytes y desglose por rol
+        """
+        if refresh:
+            self.refresh()
+        with self._lock:
+            entries = list(self._procs.values())
+
+        totals = {'rss': 0, 'pss': 0, 'uss': 0, 'processes': 0, 'by_role': {}}
+        for proc, role in entries:
+            try:
+                try:
+                    mem = proc.memory_full_info()  # Incluye uss (y pss en Linux)
+                except psutil.AccessDenied:
+                    mem = proc.memory_info()
+            except psutil.Error:
+                continue
+            rss = mem.rss
+            uss = getattr(mem, 'uss', rss)
+            pss = getattr(mem, 'pss', uss)
+            totals['rss'] += rss
+            totals['pss'] += pss
+            totals['uss'] += uss
+            totals['processes'] += 1
+            role_totals = totals['by_role'].setdefault(role, {'rss': 0, 'uss': 0, 'count': 0})
+            role_totals['rss'] += rss
+            role_totals['uss'] += uss
+            role_totals['count'] += 1
+        return totals
+
+
+# Instancia global
+_registry: Optional[SelfProcessRegistry] = None
+
+def get_process_registry() -> SelfProcessRegistry:
+    """Obtener el registro de procesos propios"""
+    global _registry
+    if _registry is None:
+        _registry = SelfProcessRegistry()
+    return _registry
+
+
+if __name__ == "__main__":
+    import subprocess
+    import time
+
+    print("=" * 60)
+    print("SELF PROCESS REGISTRY TEST")
+    print("=" * 60)
+
+    registry = get_process_registry()
+    helper = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(5)"])
+    registry.register_helper(helper.pid, "captured_app")
+
+    start = time.perf_counter()
+    totals = registry.memory_totals()
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"Own processes: {totals['processes']} (scan {elapsed:.1f} ms)")
+    print(f"  RSS: {totals['rss'] / 1024**2:.1f} MB | PSS: {totals['pss'] / 1024**2:.1f} MB | "
+          f"USS: {totals['uss'] / 1024**2:.1f} MB")
+    for role, data in totals['by_role'].items():
+        print(f"  {role}: {data['count']} procs, USS {data['uss'] / 1024**2:.1f} MB")
+
+    helper.terminate()
+    helper.wait()
+    print(f"After helper exit: {registry.refresh()} processes")
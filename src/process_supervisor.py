@@ -0,0 +1,577 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🛡️ PROCESS SUPERVISOR
+Lanzamiento de juegos con prioridad, afinidad, E/S y cgroup desde el arranque
+
+El radar tarda hasta 2 s en encontrar un juego y subirle la prioridad; para
+entonces ya ha cargado shaders y assets con la prioridad por defecto. El
+supervisor lanza el proceso con todo aplicado desde su primera instrucción:
+
+- Sin preexec_fn (inseguro con hilos y desactiva vfork): un hilo nuevo se
+  aplica a sí mismo nice, afinidad, prioridad de E/S (ioprio_set) y política
+  de planificación -en Linux son atributos por hilo- y lanza el proceso; el
+  hijo los hereda del hilo que lo creó
+- cgroup: Python no expone clone3(CLONE_INTO_CGROUP), así que un trampolín
+  /bin/sh escribe en cgroup.procs y hace exec del juego (mismo PID); si la
+  escritura falla el juego arranca igual, y el supervisor comprueba en
+  /proc/<pid>/cgroup si de verdad entró antes de darlo por aplicado
+- Windows: CREATE_SUSPENDED + clase de prioridad, afinidad y reanudar
+- Seguimiento del árbol completo por pidfd (hijos, re-exec y procesos que
+  se desentienden de su padre si el lanzador es subreaper)
+"""
+
+import ctypes
+import ctypes.util
+import os
+import platform
+import select
+import signal
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import psutil
+
+from process_registry import child_pids, get_process_registry
+
+IS_LINUX = sys.platform.startswith('linux')
+IS_WINDOWS = sys.platform == 'win32'
+
+PRIORITY_NICE = {'low': 10, 'normal': 0, 'high': -5, 'realtime': -10}
+
+# ioprio_set(2)
+IOPRIO_CLASS_RT = 1
+IOPRIO_CLASS_BE = 2
+IOPRIO_CLASS_IDLE = 3
+IOPRIO_WHO_PROCESS = 1
+IOPRIO_CLASS_SHIFT = 13
+_IOPRIO_SET_NR = {'x86_64': 251, 'amd64': 251, 'aarch64': 30, 'arm64': 30,
+                  'i386': 289, 'i686': 289, 'armv7l': 314, 'armv6l': 314}
+
+PR_SET_CHILD_SUBREAPER = 36
+
+_libc = None
+
+def _get_libc():
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    return _libc
+
+
+def ioprio_set(ioclass: int, level: int = 4, who: int = 0) -> None:
+    """
+    Prioridad de E/S de un hilo/proceso (who=0: el hilo que llama)
+
+    Raises:
+        OSError: Arquitectura sin número de syscall conocido o error del kernel
+    """
+    nr = _IOPRIO_SET_NR.get(platform.machine().lower())
+    if nr is None:
+        raise OSError(f"ioprio_set: unknown syscall number for {platform.machine()}")
+    value = (ioclass << IOPRIO_CLASS_SHIFT) | max(0, min(7, level))
+    if _get_libc().syscall(nr, IOPRIO_WHO_PROCESS, who, value) != 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err))
+
+
+def set_child_subreaper() -> bool:
+    """
+    Adoptar a los descendientes huérfanos (lanzadores que hacen doble fork y
+    salen). Sólo para procesos dedicados a lanzar, como NEURO_GFX_LAUNCHER.
+    """
+    if not IS_LINUX:
+        return False
+    try:
+        return _get_libc().prctl(PR_SET_CHILD_SUBREAPER, 1, 0, 0, 0) == 0
+    except (OSError, AttributeError):
+        return False
+
+
+@dataclass
+class SpawnSettings:
+    """Atributos con los que debe nacer el proceso"""
+    priority: str = "normal"                 # low / normal / high / realtime
+    nice: Optional[int] = None               # None = derivado de priority
+    cpus: Optional[List[int]] = None         # Afinidad (None = sin cambios)
+    ioprio_class: Optional[int] = None       # IOPRIO_CLASS_* (None = sin cambios)
+    ioprio_level: int = 4                    # 0 (máxima) .. 7
+    sched_policy: Optional[int] = None       # os.SCHED_* (None = heredada)
+    cgroup_procs: Optional[str] = None       # Ruta a cgroup.procs destino
+
+    @property
+    def effective_nice(self) -> Optional[int]:
+        if self.nice is not None:
+            return self.nice
+        return PRIORITY_NICE.get(self.priority) if self.priority != "normal" else None
+
+    @classmethod
+    def for_game(cls, priority: str = "high", plan=None, partition: bool = True) -> 'SpawnSettings':
+        """
+        Ajustes estándar de un juego
+
+        Args:
+            priority: Prioridad de CPU del perfil
+            plan: AffinityPlan reservado (None = no tocar la afinidad)
+            partition: Nacer en el slice 'game' si el particionado está activo
+                       (sólo en el proceso principal: get_partition_manager()
+                       deshace en otros procesos el estado que encuentre)
+        """
+        settings = cls(priority=priority, ioprio_class=IOPRIO_CLASS_BE, ioprio_level=0)
+        if plan is not None and plan.game_cpus != plan.neuro_cpus:
+            settings.cpus = list(plan.game_cpus)
+        if partition and IS_LINUX:
+            from cgroup_partition import get_partition_manager
+            procs_file = get_partition_manager().game_procs_file()
+            settings.cgroup_procs = str(procs_file) if procs_file else None
+        return settings
+
+    @classmethod
+    def from_reservation(cls, report, priority: str = "high", partition: bool = True) -> 'SpawnSettings':
+        """Ajustes a partir del PipelineReport de launch_pipeline"""
+        plan = report.results.get("cpu_reservation") if report else None
+        return cls.for_game(priority, plan=plan, partition=partition)
+
+
+@dataclass
+class TreeMember:
+    pid: int
+    create_time: float
+    pidfd: Optional[int] = None
+    exe: str = ""
+
+
+@dataclass
+class SupervisedTree:
+    """Árbol de procesos de un lanzamiento (interfaz parecida a Popen)"""
+    argv: List[str]
+    settings: SpawnSettings
+    role: str = "game"
+    popen: Optional[subprocess.Popen] = None
+    members: Dict[int, TreeMember] = field(default_factory=dict)
+    applied: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    events: List[Tuple[float, str]] = field(default_factory=list)
+    started: float = field(default_factory=time.time)
+    ended: Optional[float] = None
+    adopt_orphans: bool = False
+    on_exit: Optional[Callable[['SupervisedTree'], None]] = None
+    _done: threading.Event = field(default_factory=threading.Event)
+
+    @property
+    def pid(self) -> int:
+        return self.popen.pid
+
+    @property
+    def pids(self) -> List[int]:
+        return list(self.members)
+
+    @property
+    def returncode(self) -> Optional[int]:
+        return self.popen.returncode
+
+    def is_alive(self) -> bool:
+        return not self._done.is_set()
+
+    def poll(self) -> Optional[int]:
+        """Código de salida del proceso raíz (None si sigue vivo)"""
+        return self.popen.poll()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Esperar a que termine TODO el árbol (True si terminó)"""
+        return self._done.wait(timeout)
+
+    def terminate(self):
+        """SIGTERM a todo el árbol (raíz incluida)"""
+        for member in list(self.members.values()):
+            try:
+                if member.pidfd is not None and hasattr(signal, 'pidfd_send_signal'):
+                    signal.pidfd_send_signal(member.pidfd, signal.SIGTERM)
+                else:
+                    proc = psutil.Process(member.pid)
+                    if proc.create_time() == member.create_time:
+                        proc.terminate()
+            except (OSError, psutil.Error):
+                continue
+
+    def log(self, event: str):
+        self.events = (self.events + [(time.time(), event)])[-100:]
+
+
+def _apply_to_current_thread(settings: SpawnSettings) -> Tuple[List[str], List[str]]:
+    """Aplicar los ajustes al hilo actual (Linux: el hijo los heredará)"""
+    applied, errors = [], []
+    tid = threading.get_native_id()
+    nice = settings.effective_nice
+    if nice is not None:
+        try:
+            os.setpriority(os.PRIO_PROCESS, tid, nice)
+            applied.append(f"nice {nice}")
+        except OSError as e:
+            errors.append(f"nice {nice}: {e.strerror or e}")  # Subir prioridad requiere CAP_SYS_NICE
+    if settings.cpus:
+        try:
+            os.sched_setaffinity(0, settings.cpus)
+            applied.append(f"affinity {len(settings.cpus)} CPUs")
+        except OSError as e:
+            errors.append(f"affinity: {e.strerror or e}")
+    if settings.ioprio_class is not None:
+        try:
+            ioprio_set(settings.ioprio_class, settings.ioprio_level)
+            applied.append(f"ioprio {settings.ioprio_class}/{settings.ioprio_level}")
+        except OSError as e:
+            errors.append(f"ioprio: {e.strerror or e}")
+    if settings.sched_policy is not None:
+        try:
+            os.sched_setscheduler(0, settings.sched_policy, os.sched_param(0))
+            applied.append(f"sched policy {settings.sched_policy}")
+        except OSError as e:
+            errors.append(f"sched policy: {e.strerror or e}")
+    return applied, errors
+
+
+def cgroup_trampoline(argv: List[str], procs_file: str) -> List[str]:
+    """Envolver argv para que el proceso entre en el cgroup antes del exec"""
+    return ['/bin/sh', '-c', '{ echo 0 > "$0"; } 2>/dev/null; exec "$@"', procs_file] + list(argv)
+
+
+class ProcessSupervisor:
+    """Lanzador y vigilante de árboles de procesos"""
+
+    def __init__(self, interval_s: float = 0.25, rescan_s: float = 0.5):
+        """
+        Args:
+            interval_s: Espera máxima del poll sobre los pidfd
+            rescan_s: Periodo de búsqueda de descendientes nuevos
+        """
+        self.interval_s = interval_s
+        self.rescan_s = rescan_s
+        self.subreaper = False
+        self._lock = threading.RLock()  # on_exit puede volver a consultar al supervisor
+        self._trees: List[SupervisedTree] = []
+        self._thread: Optional[threading.Thread] = None
+
+    def enable_subreaper(self) -> bool:
+        """Hacer de este proceso el subreaper de sus descendientes"""
+        self.subreaper = set_child_subreaper()
+        return self.subreaper
+
+    # --- LANZAMIENTO ---
+    def spawn(self, argv: List[str], cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None,
+              settings: Optional[SpawnSettings] = None, role: str = "game",
+              on_exit: Optional[Callable[[SupervisedTree], None]] = None) -> SupervisedTree:
+        """
+        Lanzar un proceso con los ajustes ya aplicados y vigilar su árbol
+
+        Raises:
+            OSError: Si el ejecutable no se pudo lanzar
+        """
+        settings = settings or SpawnSettings()
+        tree = SupervisedTree(argv=list(argv), settings=settings, role=role, on_exit=on_exit,
+                              adopt_orphans=self.subreaper)
+        if IS_WINDOWS:
+            self._spawn_windows(tree, cwd, env)
+        else:
+            self._spawn_posix(tree, cwd, env)
+            if settings.cgroup_procs:
+                if self._joined_cgroup(tree):
+                    tree.applied.append("cgroup game slice")
+                else:
+                    tree.errors.append(f"cgroup game slice: not moved into {settings.cgroup_procs}")
+
+        tree.log(f"spawn {tree.pid}: {', '.join(tree.applied) or 'default settings'}")
+        print(f"[Supervisor] {argv[0]} started (PID {tree.pid}) with "
+              f"{', '.join(tree.applied) or 'default settings'}")
+        for error in tree.errors:
+            print(f"[Supervisor] ⚠️ {error}")
+
+        with self._lock:
+            self._track(tree, tree.pid)
+            self._trees.append(tree)
+        if role == "game":
+            # Un juego no es memoria de Neuro-OS aunque cuelgue de su árbol
+            get_process_registry().exclude_tree(tree.pid)
+        if "cgroup game slice" in tree.applied:
+            from cgroup_partition import get_partition_manager
+            get_partition_manager().register_process(tree.pid, "game")
+        self._ensure_monitor()
+        return tree
+
+    def _spawn_posix(self, tree: SupervisedTree, cwd, env):
+        argv = tree.argv
+        if tree.settings.cgroup_procs:
+            argv = cgroup_trampoline(argv, tree.settings.cgroup_procs)
+        outcome: Dict = {}
+
+        def spawner():
+            # Hilo desechable: sus atributos modificados mueren con él
+            if IS_LINUX:
+                outcome['applied'], outcome['errors'] = _apply_to_current_thread(tree.settings)
+            try:
+                # Sin preexec_fn, Popen usa vfork desde ESTE hilo
+                outcome['popen'] = subprocess.Popen(argv, cwd=cwd, env=env, start_new_session=True)
+            except OSError as e:
+                outcome['exception'] = e
+
+        thread = threading.Thread(target=spawner, name="NeuroSpawner")
+        thread.start()
+        thread.join()
+        if 'exception' in outcome:
+            raise outcome['exception']
+        tree.popen = outcome['popen']
+        tree.applied.extend(outcome.get('applied', []))
+        tree.errors.extend(outcome.get('errors', []))
+
+        if not IS_LINUX:
+            # Sin atributos por hilo: aplicar tras el lanzamiento (mejor que nada)
+            nice = tree.settings.effective_nice
+            try:
+                if nice is not None:
+                    psutil.Process(tree.pid).nice(nice)
+                    tree.applied.append(f"nice {nice} (post-spawn)")
+            except (psutil.Error, OSError) as e:
+                tree.errors.append(f"nice {nice}: {e}")
+
+    def _joined_cgroup(self, tree: SupervisedTree, timeout_s: float = 1.0) -> bool:
+        """
+        ¿Entró el proceso en el cgroup del trampolín? El shell escribe en
+        cgroup.procs antes del exec: cuando el PID ya ejecuta otro programa
+        (o vence el plazo) su cgroup es definitivo
+        """
+        from cgroup_partition import get_partition_manager
+        partitions = get_partition_manager()
+        target = partitions.cgroup_of_dir(os.path.dirname(tree.settings.cgroup_procs))
+        shell = os.path.realpath('/bin/sh')
+        deadline = time.monotonic() + timeout_s
+        while True:
+            current = partitions.cgroup_of(tree.pid)
+            if current is None or current == target:
+                return current is not None
+            if self._exe_of(tree.pid) not in ("", shell) or time.monotonic() >= deadline:
+                return partitions.cgroup_of(tree.pid) == target
+            time.sleep(0.005)
+
+    def _spawn_windows(self, tree: SupervisedTree, cwd, env):
+        classes = {'low': subprocess.BELOW_NORMAL_PRIORITY_CLASS,
+                   'normal': subprocess.NORMAL_PRIORITY_CLASS,
+                   'high': subprocess.HIGH_PRIORITY_CLASS,
+                   'realtime': subprocess.HIGH_PRIORITY_CLASS}  # REALTIME bloquea el sistema
+        create_suspended = 0x00000004
+        flags = (classes.get(tree.settings.priority, subprocess.NORMAL_PRIORITY_CLASS)
+                 | subprocess.CREATE_NEW_PROCESS_GROUP)
+        if tree.settings.cpus:
+            flags |= create_suspended
+        tree.popen = subprocess.Popen(tree.argv, cwd=cwd, env=env, creationflags=flags)
+        tree.applied.append(f"priority class {tree.settings.priority}")
+        if tree.settings.cpus:
+            proc = psutil.Process(tree.pid)
+            try:
+                proc.cpu_affinity(tree.settings.cpus)
+                tree.applied.append(f"affinity {len(tree.settings.cpus)} CPUs")
+            except (psutil.Error, OSError) as e:
+                tree.errors.append(f"affinity: {e}")
+            finally:
+                proc.resume()
+
+    # --- SEGUIMIENTO ---
+    def _track(self, tree: SupervisedTree, pid: int) -> bool:
+        """Añadir un proceso al árbol (con pidfd si el kernel lo permite)"""
+        if pid in tree.members:
+            return False
+        pidfd = None
+        if hasattr(os, 'pidfd_open'):
+            try:
+                pidfd = os.pidfd_open(pid)
+            except OSError:
+                return False  # Ya terminó
+        try:
+            # Con el pidfd abierto el PID ya no puede reutilizarse: create_time es fiable
+            create_time = psutil.Process(pid).create_time()
+        except psutil.Error:
+            if pidfd is not None:
+                os.close(pidfd)
+            return False
+        tree.members[pid] = TreeMember(pid, create_time, pidfd, self._exe_of(pid))
+        return True
+
+    @staticmethod
+    def _exe_of(pid: int) -> str:
+        try:
+            return os.readlink(f"/proc/{pid}/exe") if IS_LINUX else psutil.Process(pid).exe()
+        except (OSError, psutil.Error):
+            return ""
+
+    def _verify(self, tree: SupervisedTree, pid: int):
+        """Un descendiente nuevo hereda los ajustes; corregir si alguien los cambió"""
+        cpus = tree.settings.cpus
+        if not cpus:
+            return
+        try:
+            proc = psutil.Process(pid)
+            if sorted(proc.cpu_affinity()) != sorted(cpus):
+                proc.cpu_affinity(cpus)
+                tree.log(f"affinity re-applied to {pid}")
+        except (psutil.Error, OSError, AttributeError):
+            pass
+
+    def _rescan(self):
+        """Descubrir hijos nuevos, re-exec y huérfanos adoptados"""
+        with self._lock:
+            trees = [tree for tree in self._trees if tree.is_alive()]
+            known = {pid for tree in trees for pid in tree.members}
+            roots = {tree.pid for tree in trees}
+            for tree in trees:
+                stack = list(tree.members)
+                while stack:
+                    for child in child_pids(stack.pop()):
+                        if child not in known and self._track(tree, child):
+                            known.add(child)
+                            tree.log(f"fork {child} ({tree.members[child].exe})")
+                            self._verify(tree, child)
+                            stack.append(child)
+                for member in tree.members.values():
+                    exe = self._exe_of(member.pid)
+                    if exe and exe != member.exe:
+                        tree.log(f"exec {member.pid}: {exe}")
+                        member.exe = exe
+                if not hasattr(os, 'pidfd_open'):
+                    tree.popen.poll()  # Recoger la raíz zombi para que deje de parecer viva
+                    for pid, member in list(tree.members.items()):
+                        try:
+                            alive = psutil.Process(pid).create_time() == member.create_time
+                        except psutil.Error:
+                            alive = False
+                        if not alive:
+                            self._member_exited(tree, pid)
+
+            if self.subreaper:
+                adopters = [tree for tree in trees if tree.adopt_orphans]
+                for orphan in child_pids(os.getpid()):
+                    if orphan not in known and orphan not in roots and adopters:
+                        if self._track(adopters[-1], orphan):
+                            adopters[-1].log(f"adopted orphan {orphan}")
+
+    def _member_exited(self, tree: SupervisedTree, pid: int):
+        member = tree.members.pop(pid, None)
+        if member is None:
+            return
+        if member.pidfd is not None:
+            os.close(member.pidfd)
+        if pid == tree.pid:
+            tree.popen.poll()
+        else:
+            try:
+                os.waitpid(pid, os.WNOHANG)  # Huérfano adoptado (subreaper)
+            except ChildProcessError:
+                pass
+        tree.log(f"exit {pid}")
+        if not tree.members and tree.is_alive():
+            tree.ended = time.time()
+            tree._done.set()
+            print(f"[Supervisor] {tree.argv[0]} tree finished "
+                  f"(exit {tree.returncode}, {tree.ended - tree.started:.1f} s)")
+            if tree.on_exit:
+                try:
+                    tree.on_exit(tree)
+                except Exception as e:
+                    print(f"[Supervisor] on_exit error: {e}")
+
+    def _ensure_monitor(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._monitor_loop, daemon=True,
+                                            name="ProcessSupervisor")
+            self._thread.start()
+
+    def _monitor_loop(self):
+        last_scan = 0.0
+        while True:
+            with self._lock:
+                self._trees = [tree for tree in self._trees if tree.is_alive()]
+                if not self._trees:
+                    self._thread = None
+                    return
+                by_fd = {member.pidfd: (tree, pid) for tree in self._trees
+                         for pid, member in tree.members.items() if member.pidfd is not None}
+
+            if by_fd and hasattr(select, 'poll'):
+                poller = select.poll()
+                for fd in by_fd:
+                    poller.register(fd, select.POLLIN)
+                ready = poller.poll(self.interval_s * 1000)
+            else:
+                time.sleep(self.interval_s)
+                ready = []
+
+            # Antes de procesar salidas: sus hijos pueden haberse quedado huérfanos
+            if ready or time.time() - last_scan >= self.rescan_s:
+                self._rescan()
+                last_scan = time.time()
+            with self._lock:
+                for fd, _ in ready:
+                    if fd in by_fd:
+                        tree, pid = by_fd[fd]
+                        self._member_exited(tree, pid)
+
+    # --- CONSULTA ---
+    def trees(self) -> List[SupervisedTree]:
+        with self._lock:
+            return [tree for tree in self._trees if tree.is_alive()]
+
+    def owns(self, pid: int) -> Optional[SupervisedTree]:
+        """Árbol vigilado que contiene un PID (None si no es nuestro)"""
+        with self._lock:
+            for tree in self._trees:
+                if tree.is_alive() and pid in tree.members:
+                    return tree
+        return None
+
+    def get_status(self) -> Dict:
+        return {
+            'subreaper': self.subreaper,
+            'pidfd': hasattr(os, 'pidfd_open'),
+            'trees': [{'root': tree.pid, 'argv0': tree.argv[0], 'role': tree.role,
+                       'members': len(tree.members), 'applied': tree.applied,
+                       'errors': tree.errors} for tree in self.trees()]
+        }
+
+
+# Instancia global
+_supervisor: Optional[ProcessSupervisor] = None
+
+def get_process_supervisor() -> ProcessSupervisor:
+    """Obtener el supervisor global"""
+    global _supervisor
+    if _supervisor is None:
+        _supervisor = ProcessSupervisor()
+    return _supervisor
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("PROCESS SUPERVISOR TEST")
+    print("=" * 60)
+
+    supervisor = ProcessSupervisor()
+    cpus = sorted(os.sched_getaffinity(0))[-1:] if IS_LINUX else None
+    settings = SpawnSettings(priority="low", cpus=cpus, ioprio_class=IOPRIO_CLASS_IDLE)
+
+    # Un "lanzador" que hace fork + exec y sale antes que su hijo
+    script = "sleep 1.5 & exec sleep 0.5"
+    tree = supervisor.spawn(['/bin/sh', '-c', script], settings=settings, role="demo")
+    time.sleep(0.1)
+    for pid in tree.pids:
+        try:
+            proc = psutil.Process(pid)
+            ioprio = proc.ionice() if IS_LINUX else None
+            print(f"  PID {pid} {proc.name():8s} nice={proc.nice()} "
+                  f"cpus={proc.cpu_affinity()} ionice={ioprio}")
+        except psutil.Error:
+            pass
+    print(f"Parent nice unchanged: {os.getpriority(os.PRIO_PROCESS, 0)}")
+    print(f"Tree finished: {tree.wait(timeout=5)} (exit {tree.returncode})")
+    for stamp, event in tree.events:
+        print(f"  +{stamp - tree.started:5.2f}s {event}")
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔗 PROFILE BINDING
+Vinculación automática proceso -> perfil de juego en el momento de detectarlo
+
+- El proceso se resuelve con el catálogo (ruta del exe, carpeta de
+  instalación o nombre) a su Game y GameProfile
+- El perfil se compila UNA vez a SpawnSettings (prioridad, afinidad, E/S,
+  cgroup) y se aplica en un solo lote a todos los hilos del proceso
+- Sólo ajustes por proceso: el juego ya está en marcha, así que los pasos
+  de pre-lanzamiento del perfil (recorte de RAM, limitar segundo plano,
+  red) no se ejecutan aquí; son de launch_pipeline, antes de lanzar
+- Caché por (exe, create_time): un PID reutilizado no hereda el vínculo y
+  las pasadas siguientes del radar son una consulta de diccionario. Un
+  vínculo sin aplicar se vuelve a resolver si el catálogo se reconstruyó
+"""
+
+import os
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+
+from game_catalog import GameCatalog, get_game_catalog
+from process_supervisor import IOPRIO_CLASS_BE, SpawnSettings, ioprio_set
+
+IS_LINUX = sys.platform.startswith('linux')
+IS_WINDOWS = sys.platform == 'win32'
+
+
+@dataclass
+class ProfileBinding:
+    """Un proceso detectado y el perfil que se le aplicó"""
+    pid: int
+    exe: str
+    create_time: float
+    name: str
+    game: Optional[object] = None       # game_scanner.Game
+    profile: Optional[object] = None    # game_profile_manager.GameProfile
+    settings: Optional[SpawnSettings] = None
+    plan: Optional[object] = None       # cpu_topology.AffinityPlan usado para la afinidad
+    applied: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    applied_at: Optional[float] = None
+    apply_ms: float = 0.0
+    generation: int = 0                 # GameCatalog.generation al resolver
+
+    @property
+    def key(self) -> Tuple[str, float]:
+        return (self.exe or self.name, self.create_time)
+
+    @property
+    def title(self) -> str:
+        return self.game.name if self.game is not None else self.name
+
+    def summary(self) -> str:
+        source = f"profile '{self.profile.name}'" if self.profile is not None else "default profile"
+        return f"{self.title}: {source} → {', '.join(self.applied) or 'nothing applied'}"
+
+
+def _threads_of(pid: int) -> List[int]:
+    """Hilos del proceso (Linux: nice, afinidad y E/S son por hilo)"""
+    if not IS_LINUX:
+        return [pid]
+    try:
+        return [int(tid) for tid in os.listdir(f"/proc/{pid}/task")]
+    except OSError:
+        return [pid]
+
+
+def apply_settings(pid: int, settings: SpawnSettings) -> Tuple[List[str], List[str]]:
+    """
+    Aplicar SpawnSettings a un proceso que ya está en marcha
+
+    Returns:
+        (aplicado, errores)
+    """
+    applied, errors = [], []
+    tids = _threads_of(pid)
+    nice = settings.effective_nice
+
+    if IS_WINDOWS:
+        classes = {'low': psutil.BELOW_NORMAL_PRIORITY_CLASS, 'normal': psutil.NORMAL_PRIORITY_CLASS,
+                   'high': psutil.HIGH_PRIORITY_CLASS,
+                   'realtime': psutil.HIGH_PRIORITY_CLASS}  # REALTIME bloquea el sistema
+        try:
+            psutil.Process(pid).nice(classes.get(settings.priority, psutil.NORMAL_PRIORITY_CLASS))
+            applied.append(f"priority class {settings.priority}")
+        except (psutil.Error, OSError) as e:
+            errors.append(f"priority: {e}")
+    elif nice is not None:
+        done = 0
+        for tid in tids:
+            try:
+                os.setpriority(os.PRIO_PROCESS, tid, nice)
+                done += 1
+            except OSError as e:
+                errors.append(f"nice {nice}: {e.strerror or e}")  # Requiere CAP_SYS_NICE
+                break
+        if done:
+            applied.append(f"nice {nice} ({done} threads)")
+
+    if settings.cpus:
+        try:
+            if IS_LINUX:
+                for tid in tids:
+                    os.sched_setaffinity(tid, settings.cpus)
+            else:
+                psutil.Process(pid).cpu_affinity(settings.cpus)
+            applied.append(f"affinity {len(settings.cpus)} CPUs")
+        except (OSError, psutil.Error) as e:
+            errors.append(f"affinity: {getattr(e, 'strerror', None) or e}")
+
+    if IS_LINUX and settings.ioprio_class is not None:
+        try:
+            for tid in tids:
+                ioprio_set(settings.ioprio_class, settings.ioprio_level, who=tid)
+            applied.append(f"ioprio {settings.ioprio_class}/{settings.ioprio_level}")
+        except OSError as e:
+            errors.append(f"ioprio: {e.strerror or e}")
+
+    if settings.cgroup_procs:
+        from cgroup_partition import get_partition_manager
+        partitions = get_partition_manager()
+        origin = partitions.cgroup_of(pid)
+        try:
+            with open(settings.cgroup_procs, 'w') as f:
+                f.write(str(pid))
+            partitions.register_process(pid, "game", origin=origin)
+            applied.append("cgroup game slice")
+        except OSError as e:
+            errors.append(f"cgroup: {e.strerror or e}")
+    return applied, errors
+
+
+class ProfileBinder:
+    """Vincula procesos detectados con su perfil y lo aplica en un lote"""
+
+    def __init__(self, catalog: Optional[GameCatalog] = None, profile_manager=None,
+                 default_priority: str = "high", max_entries: int = 4096, partition: bool = True):
+        """
+        Args:
+            catalog: Catálogo de juegos (None = el global)
+            profile_manager: GameProfileManager (None = el del catálogo o el compartido)
+            default_priority: Prioridad de los juegos sin perfil
+            max_entries: Vínculos recordados (LRU; el radar sólo vincula candidatos)
+            partition: Mover el juego al slice 'game' si el particionado está activo
+                       (sólo en el proceso principal, ver SpawnSettings.for_game)
+        """
+        self.catalog = catalog if catalog is not None else get_game_catalog()  # Vacío es falsy (__len__)
+        if profile_manager is None:
+            profile_manager = self.catalog.profile_manager
+        if profile_manager is None:
+            from game_profile_manager import get_game_profile_manager
+            profile_manager = get_game_profile_manager()
+        self.profile_manager = profile_manager
+        if self.catalog.profile_manager is None:
+            self.catalog.profile_manager = profile_manager
+        self.default_priority = default_priority
+        self.max_entries = max_entries
+        self.partition = partition
+        self._bindings: "OrderedDict[Tuple[str, float], ProfileBinding]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, exe: Optional[str], name: str, create_time: float) -> Optional[ProfileBinding]:
+        """Vínculo ya existente (una consulta de diccionario)"""
+        binding = self._bindings.get((exe or name, create_time))
+        if binding is not None:
+            self._bindings.move_to_end(binding.key)
+        return binding
+
+    def bind(self, info: Dict) -> Tuple[ProfileBinding, bool]:
+        """
+        Vincular un proceso a su perfil
+
+        Args:
+            info: Atributos del proceso (psutil process_iter: pid, name, exe, create_time)
+
+        Returns:
+            (vínculo, True si es nuevo)
+        """
+        exe, name, create_time = info.get('exe') or "", info.get('name') or "", info.get('create_time') or 0.0
+        binding = self.lookup(exe, name, create_time)
+        if binding is not None:
+            if binding.applied_at is None and binding.generation != self.catalog.generation:
+                # Catálogo reconstruido (p.ej. cargado tras la primera pasada): resolver de nuevo
+                binding.game, binding.profile = self.catalog.resolve_process(exe or None, name)
+                binding.generation = self.catalog.generation
+            self.hits += 1
+            return binding, False
+        self.misses += 1
+        game, profile = self.catalog.resolve_process(exe or None, name)
+        binding = ProfileBinding(pid=info['pid'], exe=exe, create_time=create_time, name=name,
+                                 game=game, profile=profile, generation=self.catalog.generation)
+        self._bindings[binding.key] = binding
+        while len(self._bindings) > self.max_entries:
+            self._bindings.popitem(last=False)
+        return binding, True
+
+    def apply(self, binding: ProfileBinding, plan=None) -> ProfileBinding:
+        """
+        Aplicar los ajustes por proceso del perfil en un lote: prioridad (la
+        del perfil o la de por defecto), afinidad del plan de CPU, E/S y
+        cgroup. Puede tardar (un hilo por thread del juego): llamar fuera
+        del hilo de la interfaz.
+
+        Args:
+            binding: Vínculo devuelto por bind() (de un juego confirmado)
+            plan: AffinityPlan ya calculado (None = calcularlo)
+        """
+        if binding.applied_at is not None:
+            return binding
+        start = time.perf_counter()
+        priority = getattr(binding.profile, 'cpu_priority', None) or self.default_priority
+        if plan is None:
+            try:
+                from cpu_topology import get_affinity_planner
+                plan = get_affinity_planner().plan()
+            except Exception as e:
+                binding.errors.append(f"affinity plan: {e}")
+        settings = SpawnSettings.for_game(priority, plan=plan, partition=self.partition)
+        settings.ioprio_class = IOPRIO_CLASS_BE
+        binding.settings = settings
+        binding.plan = plan
+        applied, errors = apply_settings(binding.pid, settings)
+        binding.applied.extend(applied)
+        binding.errors.extend(errors)
+        binding.applied_at = time.time()
+        binding.apply_ms = round((time.perf_counter() - start) * 1000, 1)
+        return binding
+
+    def bind_and_apply(self, info: Dict, plan=None) -> Tuple[ProfileBinding, bool]:
+        """bind() y, si el vínculo es nuevo, apply()"""
+        binding, new = self.bind(info)
+        if new:
+            self.apply(binding, plan=plan)
+        return binding, new
+
+    def forget_dead(self, alive_pids) -> int:
+        """Olvidar los vínculos de procesos que ya terminaron"""
+        dead = [key for key, binding in self._bindings.items() if binding.pid not in alive_pids]
+        for key in dead:
+            del self._bindings[key]
+        return len(dead)
+
+    def bindings(self) -> List[ProfileBinding]:
+        return list(self._bindings.values())
+
+    def get_status(self) -> Dict:
+        return {'bindings': len(self._bindings), 'hits': self.hits, 'misses': self.misses,
+                'with_profile': sum(1 for b in self._bindings.values() if b.profile is not None)}
+
+
+# Instancia global
+_profile_binder: Optional[ProfileBinder] = None
+
+def get_profile_binder() -> ProfileBinder:
+    """Obtener el vinculador global"""
+    global _profile_binder
+    if _profile_binder is None:
+        _profile_binder = ProfileBinder()
+    return _profile_binder
+
+
+if __name__ == "__main__":
+    import subprocess
+    import tempfile
+    from pathlib import Path
+
+    from game_profile_manager import GameCategory, GameProfileManager
+    from game_scanner import Game
+
+    print("=" * 60)
+    print("PROFILE BINDING TEST")
+    print("=" * 60)
+
+    # Un "juego" de prueba: un proceso python con perfil propio (prioridad baja: no requiere root)
+    manager = GameProfileManager(str(Path(tempfile.mkdtemp()) / "profiles.json"))
+    manager.create_profile("Sleepy Game", GameCategory.CASUAL)
+    manager.update_profile("Sleepy Game", cpu_priority="low", ram_cleanup_before_launch=False)
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    proc = psutil.Process(child.pid)
+    catalog = GameCatalog(profile_manager=manager)
+    catalog.rebuild([Game(name="Sleepy Game", path=proc.exe(), launcher="Standalone",
+                          install_dir=str(Path(proc.exe()).parent))])
+
+    binder = ProfileBinder(catalog, manager, partition=False)
+    info = proc.as_dict(['pid', 'name', 'exe', 'create_time'])
+    binding, new = binder.bind_and_apply(info)
+    print(f"New binding: {new} in {binding.apply_ms} ms")
+    print(f"  {binding.summary()}")
+    for error in binding.errors:
+        print(f"  ⚠️ {error}")
+    print(f"  nice now: {proc.nice()}")
+
+    start = time.perf_counter()
+    for _ in range(10000):
+        binder.bind(info)
+    print(f"Cached lookup: {(time.perf_counter() - start) * 1e6 / 10000:.2f} µs per process")
+    print(f"Status: {binder.get_status()}")
+    child.kill()
+    child.wait()
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🎯 PROFILE TUNER
+Aprende de las sesiones grabadas qué ajustes de arranque dan más FPS a cada juego
+
+- Datos: ventanas de telemetría de neuro_store (FPS medio, 1% low, CPU,
+  RAM) con los ajustes que tenía la sesión (render_scale, prioridad,
+  política de limpieza de RAM). El 1% low es el de la ventana (con pocas
+  muestras, su peor muestra), no el de la sesión: así va con la CPU y la
+  RAM de esa misma ventana
+- Modelo por juego: regresión ridge ponderada sobre log(FPS) y log(1% low)
+  con NumPy (sin dependencias de ML). El render_scale entra como log y
+  su efecto depende del cuello de botella: limitado por GPU el FPS escala
+  con los píxeles, limitado por CPU apenas cambia
+- La regularización tira hacia un modelo a priori (FPS ∝ escala^-1.6), así
+  que con pocas sesiones o sin variación de ajustes la propuesta es la
+  física razonable y con más historial manda lo medido
+- Propuesta: se evalúan a la vez todas las combinaciones de escala,
+  prioridad y limpieza y se elige la mayor escala que cumple el objetivo
+  de FPS y de 1% low con el coste más bajo
+- Evaluación por repetición (replay): cada sesión se predice sólo con las
+  anteriores y se compara con el modelo a priori y con "igual que la
+  última vez"
+- En la app lo llama neuro_ai_service al terminar cada sesión de juego.
+  Sólo aprende de sesiones con FPS, y Neuro-OS no mide los FPS de los
+  juegos: mientras nada llame a set_current_fps, no hay propuesta y el
+  perfil no cambia (con datos reales, hoy sólo lo ejercita la demo)
+"""
+
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+PRIORITY_LEVELS = {'low': 0, 'normal': 1, 'high': 2, 'realtime': 3}
+
+# Políticas de limpieza de RAM -> (ram_cleanup_before_launch, aggressive_ram_cleanup)
+CLEANUP_POLICIES = {'none': (False, False), 'cleanup': (True, False), 'aggressive': (True, True)}
+CLEANUP_LEVELS = ('none', 'cleanup', 'aggressive')
+
+# Candidatos de la propuesta (realtime deja sin CPU al resto del sistema; low nunca ayuda)
+CANDIDATE_SCALES = tuple(np.round(np.arange(0.5, 1.0001, 0.05), 2))
+CANDIDATE_PRIORITIES = ('normal', 'high')
+
+FEATURES = ('intercept', 'log_scale', 'log_scale*cpu_bound', 'cpu_bound', 'priority', 'priority*cpu_bound',
+            'cleanup', 'aggressive', 'aggressive*ram_bound', 'ram_bound')
+
+# Modelo a priori (mismas columnas, igual para FPS medio y 1% low): limitado por
+# GPU, FPS ∝ escala^-1.6; limitado por CPU, la escala casi no influye
+PRIOR = np.array([0.0, -1.6, 1.4, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0])
+
+
+def design_matrix(scale, priority, cleanup, cpu_bound, ram_bound) -> np.ndarray:
+    """
+    Matriz de diseño (una fila por ventana o candidato; arrays que se difunden entre sí)
+
+    Args:
+        scale: render_scale
+        priority: Nivel de prioridad 0-3 (PRIORITY_LEVELS)
+        cleanup: Nivel de limpieza 0-2 (CLEANUP_LEVELS)
+        cpu_bound, ram_bound: Fracción de tiempo limitado por CPU / RAM (0-1)
+    """
+    scale, priority, cleanup, cpu_bound, ram_bound = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (scale, priority, cleanup, cpu_bound, ram_bound)))
+    log_scale = np.log(scale)
+    priority = priority / 3.0
+    aggressive = (cleanup >= 2).astype(float)
+    return np.column_stack([np.ones_like(log_scale), log_scale, log_scale * cpu_bound, cpu_bound,
+                            priority, priority * cpu_bound, (cleanup >= 1).astype(float), aggressive,
+                            aggressive * ram_bound, ram_bound])
+
+
+@dataclass
+class TuningData:
+    """Ventanas de telemetría de un juego listas para el modelo"""
+    game: str
+    session: np.ndarray       # Índice de sesión (0 = la más antigua)
+    weight: np.ndarray        # Muestras de FPS de la ventana
+    scale: np.ndarray
+    priority: np.ndarray
+    cleanup: np.ndarray
+    cpu_bound: np.ndarray
+    ram_bound: np.ndarray
+    fps: np.ndarray           # (n, 2): FPS medio y 1% low
+    target_fps: Optional[float] = None
+
+    @property
+    def windows(self) -> int:
+        return len(self.weight)
+
+    @property
+    def sessions(self) -> int:
+        return int(self.session.max()) + 1 if len(self.session) else 0
+
+    def design(self) -> np.ndarray:
+        return design_matrix(self.scale, self.priority, self.cleanup, self.cpu_bound, self.ram_bound)
+
+    def subset(self, mask: np.ndarray) -> 'TuningData':
+        return TuningData(self.game, self.session[mask], self.weight[mask], self.scale[mask],
+                          self.priority[mask], self.cleanup[mask], self.cpu_bound[mask],
+                          self.ram_bound[mask], self.fps[mask], self.target_fps)
+
+
+@dataclass
+class FpsModel:
+    """Modelo ajustado de un juego: ajustes -> (FPS medio, 1% low)"""
+    game: str
+    coef: np.ndarray          # (características, 2)
+    windows: int
+    sessions: int
+    cpu_bound: float          # Contexto típico del juego (para predecir la próxima sesión)
+    ram_bound: float
+
+    def predict(self, scale, priority, cleanup, cpu_bound=None, ram_bound=None) -> np.ndarray:
+        """(n, 2) FPS medio y 1% low previstos"""
+        cpu_bound = self.cpu_bound if cpu_bound is None else cpu_bound
+        ram_bound = self.ram_bound if ram_bound is None else ram_bound
+        return np.exp(design_matrix(scale, priority, cleanup, cpu_bound, ram_bound) @ self.coef)
+
+
+@dataclass
+class Proposal:
+    """Ajustes propuestos para el próximo arranque"""
+    game: str
+    render_scale: float
+    cpu_priority: str
+    cleanup: str
+    predicted_fps: float
+    predicted_p1_low: float
+    target_fps: float
+    meets_target: bool
+    windows: int
+    sessions: int
+    confident: bool           # Hay historial suficiente para aplicarla
+    alternatives: List[Dict] = field(default_factory=list)
+
+    def profile_updates(self) -> Dict:
+        """Campos de GameProfile para update_profile()"""
+        cleanup, aggressive = CLEANUP_POLICIES[self.cleanup]
+        return {'render_scale': self.render_scale, 'cpu_priority': self.cpu_priority,
+                'ram_cleanup_before_launch': cleanup, 'aggressive_ram_cleanup': aggressive}
+
+    def summary(self) -> str:
+        status = "meets" if self.meets_target else "below"
+        return (f"{self.game}: scale {self.render_scale:.2f}, priority {self.cpu_priority}, "
+                f"cleanup {self.cleanup} -> ~{self.predicted_fps:.0f} FPS / 1% low "
+                f"{self.predicted_p1_low:.0f} ({status} target {self.target_fps:.0f}, "
+                f"{self.sessions} sessions{'' if self.confident else ', prior only'})")
+
+
+class ProfileTuner:
+    """Ajuste offline de perfiles a partir de las sesiones grabadas"""
+
+    def __init__(self, store=None, ridge: float = 4.0, days: float = 90.0, min_sessions: int = 3,
+                 min_windows: int = 10, low_ratio: float = 0.75, tolerance: float = 0.02,
+                 cpu_threshold: float = 85.0, ram_threshold: float = 80.0):
+        """
+        Args:
+            store: NeuroStore (None = el global)
+            ridge: Fuerza de la regularización hacia el modelo a priori
+            days: Antigüedad máxima del historial usado
+            min_sessions, min_windows: Historial necesario para aplicar una propuesta
+            low_ratio: 1% low mínimo aceptable, como fracción del objetivo de FPS
+            tolerance: Pérdida de 1% low aceptable a cambio de un ajuste más barato
+            cpu_threshold, ram_threshold: Umbrales de cuello de botella (los de NeuroAI)
+        """
+        self._store = store
+        self.ridge = ridge
+        self.days = days
+        self.min_sessions = min_sessions
+        self.min_windows = min_windows
+        self.low_ratio = low_ratio
+        self.tolerance = tolerance
+        self.cpu_threshold = cpu_threshold
+        self.ram_threshold = ram_threshold
+
+    @property
+    def store(self):
+        if self._store is None:
+            from neuro_store import get_neuro_store
+            self._store = get_neuro_store()
+        return self._store
+
+    # --- DATOS ---
+    def load(self, game: str) -> TuningData:
+        """Ventanas de telemetría del juego con los ajustes de su sesión"""
+        rows = self.store.tuning_windows(game, days=self.days)
+        sessions: Dict[int, Tuple[int, Dict]] = {}
+        columns = []
+        for session_id, _, settings, samples, avg_fps, p1_low, cpu, ram, _gpu in rows:
+            if session_id not in sessions:
+                sessions[session_id] = (len(sessions), json.loads(settings))
+            index, config = sessions[session_id]
+            cleanup = 2 if config.get('aggressive_ram_cleanup') else int(bool(config.get('ram_cleanup_before_launch')))
+            columns.append((index, samples, config.get('render_scale', 1.0),
+                            PRIORITY_LEVELS.get(config.get('cpu_priority'), 2), cleanup,
+                            cpu if cpu is not None else 0.0, ram if ram is not None else 0.0,
+                            avg_fps, p1_low if p1_low is not None else avg_fps))
+        table = np.array(columns, dtype=float).reshape(-1, 9)
+        target = next((config.get('target_fps') for _, config in reversed(list(sessions.values()))), None)
+        fps = np.maximum(table[:, 7:9], 1.0)  # log(0) no: un cuelgue cuenta como 1 FPS
+        return TuningData(game=game, session=table[:, 0].astype(int), weight=table[:, 1],
+                          scale=np.clip(table[:, 2], 0.1, 2.0), priority=table[:, 3], cleanup=table[:, 4],
+                          cpu_bound=(table[:, 5] > self.cpu_threshold).astype(float),
+                          ram_bound=(table[:, 6] > self.ram_threshold).astype(float),
+                          fps=fps, target_fps=target)
+
+    # --- MODELO ---
+    def fit(self, data: TuningData, ridge: Optional[float] = None) -> Optional[FpsModel]:
+        """
+        Regresión ridge ponderada hacia el modelo a priori
+
+        β = (XᵀWX + λI)⁻¹ (XᵀW log y + λ β₀); el término independiente no se regulariza
+
+        Returns:
+            FpsModel o None si no hay datos
+        """
+        if data.windows == 0:
+            return None
+        ridge = self.ridge if ridge is None else ridge
+        x = data.design()
+        w = data.weight / data.weight.mean()
+        y = np.log(data.fps)
+        penalty = np.full(x.shape[1], ridge)
+        penalty[0] = 1e-9
+        prior = np.repeat(PRIOR[:, None], 2, axis=1)
+        xtw = x.T * w
+        coef = np.linalg.solve(xtw @ x + np.diag(penalty), xtw @ y + penalty[:, None] * prior)
+        return FpsModel(game=data.game, coef=coef, windows=data.windows, sessions=data.sessions,
+                        cpu_bound=float(np.average(data.cpu_bound, weights=w)),
+                        ram_bound=float(np.average(data.ram_bound, weights=w)))
+
+    # --- PROPUESTA ---
+    def propose(self, game: str, target_fps: Optional[float] = None,
+                data: Optional[TuningData] = None) -> Optional[Proposal]:
+        """
+        Mejores ajustes de arranque para el próximo lanzamiento
+
+        Args:
+            game: Juego
+            target_fps: Objetivo (None = el del perfil de la última sesión, o 60)
+            data: Datos ya cargados (None = cargarlos del almacén)
+        """
+        data = data if data is not None else self.load(game)
+        model = self.fit(data)
+        if model is None:
+            return None
+        target = float(target_fps or data.target_fps or 60)
+
+        # Todas las combinaciones a la vez
+        scale, priority, cleanup = (a.ravel() for a in np.meshgrid(
+            np.array(CANDIDATE_SCALES), [PRIORITY_LEVELS[p] for p in CANDIDATE_PRIORITIES],
+            np.arange(len(CLEANUP_LEVELS)), indexing='ij'))
+        predicted = model.predict(scale, priority, cleanup)
+        feasible = (predicted[:, 0] >= target) & (predicted[:, 1] >= target * self.low_ratio)
+
+        if feasible.any():
+            # Mayor escala que cumple; a esa escala, lo más barato que no pierda 1% low
+            best_scale = scale[feasible].max()
+            pool = np.flatnonzero(feasible & (scale == best_scale))
+        else:
+            # Nada cumple: el mejor 1% low posible (y, a igualdad, más escala)
+            pool = np.flatnonzero(np.isclose(predicted[:, 1], predicted[:, 1].max(), rtol=self.tolerance))
+            pool = pool[scale[pool] == scale[pool].max()]
+        best_low = predicted[pool, 1].max()
+        cost = cleanup[pool] * 10 + priority[pool]
+        good = pool[predicted[pool, 1] >= best_low * (1 - self.tolerance)]
+        choice = good[np.argmin(cleanup[good] * 10 + priority[good])] if len(good) else pool[np.argmin(cost)]
+
+        by_priority = {level: name for name, level in PRIORITY_LEVELS.items()}
+        order = np.lexsort((-predicted[:, 1], -scale, ~feasible))[:5]  # Las que cumplen, por escala
+        alternatives = [{'render_scale': float(scale[i]), 'cpu_priority': by_priority[int(priority[i])],
+                         'cleanup': CLEANUP_LEVELS[int(cleanup[i])], 'fps': round(float(predicted[i, 0]), 1),
+                         'p1_low': round(float(predicted[i, 1]), 1)} for i in order]
+        return Proposal(game=game, render_scale=float(scale[choice]),
+                        cpu_priority=by_priority[int(priority[choice])],
+                        cleanup=CLEANUP_LEVELS[int(cleanup[choice])],
+                        predicted_fps=float(predicted[choice, 0]), predicted_p1_low=float(predicted[choice, 1]),
+                        target_fps=target, meets_target=bool(feasible[choice]),
+                        windows=data.windows, sessions=data.sessions,
+                        confident=data.sessions >= self.min_sessions and data.windows >= self.min_windows,
+                        alternatives=alternatives)
+
+    def apply(self, profile_manager, game: str) -> Optional[Proposal]:
+        """
+        Proponer y, si hay historial suficiente, guardar en el perfil del juego
+
+        Returns:
+            La propuesta (aplicada sólo si proposal.confident)
+        """
+        profile = profile_manager.get_profile(game)
+        if profile is None:
+            return None
+        proposal = self.propose(profile.name, target_fps=profile.target_fps)
+        if proposal is None:
+            print(f"[ProfileTuner] {profile.name}: no FPS history, profile unchanged")
+        elif proposal.confident:
+            updates = proposal.profile_updates()
+            if any(getattr(profile, key) != value for key, value in updates.items()):
+                profile_manager.update_profile(profile.name, **updates)
+                print(f"[ProfileTuner] {proposal.summary()}")
+        return proposal
+
+    # --- EVALUACIÓN ---
+    def evaluate_replay(self, game: str, min_history: int = 2, data: Optional[TuningData] = None) -> Dict:
+        """
+        Repetir el historial: predecir cada sesión sólo con las anteriores
+
+        Compara el error (MAPE del FPS medio y del 1% low por sesión) del modelo
+        aprendido con el modelo a priori y con "igual que la sesión anterior".
+
+        Args:
+            game: Juego
+            min_history: Sesiones de historial antes de la primera predicción
+            data: Datos ya cargados (None = cargarlos del almacén)
+        """
+        data = data if data is not None else self.load(game)
+        x = data.design()
+        per_session = []
+        for k in range(min_history, data.sessions):
+            test = data.session == k
+            if not test.any():
+                continue
+            history = data.subset(data.session < k)
+            weight = data.weight[test]
+            actual = np.average(data.fps[test], axis=0, weights=weight)
+            # Cada ventana se predice con su propio contexto (CPU/RAM medidos): así se mide el modelo de ajustes
+            learned = np.average(np.exp(x[test] @ self.fit(history).coef), axis=0, weights=weight)
+            prior = np.average(np.exp(x[test] @ self.fit(history, ridge=1e9).coef), axis=0, weights=weight)
+            previous = data.session == k - 1
+            last = np.average(data.fps[previous], axis=0, weights=data.weight[previous])
+            per_session.append(np.stack([actual, learned, prior, last]))
+        if not per_session:
+            return {'game': game, 'sessions': data.sessions, 'evaluated': 0}
+        results = np.array(per_session)                       # (sesiones, 4, 2)
+        errors = np.abs(results[:, 1:, :] / results[:, :1, :] - 1) * 100
+        mape = errors.mean(axis=0)
+        return {'game': game, 'sessions': data.sessions, 'evaluated': len(per_session),
+                'mape_fps': {'model': round(float(mape[0, 0]), 2), 'prior': round(float(mape[1, 0]), 2),
+                             'last_session': round(float(mape[2, 0]), 2)},
+                'mape_p1_low': {'model': round(float(mape[0, 1]), 2), 'prior': round(float(mape[1, 1]), 2),
+                                'last_session': round(float(mape[2, 1]), 2)}}
+
+
+# Instancia global
+_profile_tuner: Optional[ProfileTuner] = None
+
+def get_profile_tuner() -> ProfileTuner:
+    """Obtener el ajustador global"""
+    global _profile_tuner
+    if _profile_tuner is None:
+        _profile_tuner = ProfileTuner()
+    return _profile_tuner
+
+
+if __name__ == "__main__":
+    import random
+    import shutil
+    import tempfile
+    from pathlib import Path
+
+    from neuro_store import NeuroStore
+
+    print("=" * 60)
+    print("PROFILE TUNER TEST")
+    print("=" * 60)
+
+    # Juego sintético limitado por GPU (y por CPU en las escenas cargadas):
+    # FPS = 70 · escala^-1.7, 1% low mejor con limpieza de RAM y prioridad alta
+    def true_fps(scale, priority, cleanup, cpu_bound):
+        avg = 70 * scale ** (-1.7 * (1 - 0.8 * cpu_bound)) * (1 + 0.05 * (priority == 'high') * cpu_bound)
+        low = avg * (0.62 + 0.08 * (cleanup != 'none') + 0.04 * (cleanup == 'aggressive'))
+        return avg, low
+
+    root = Path(tempfile.mkdtemp(prefix="neuro_tuner_"))
+    store = NeuroStore(str(root / "neuro_os.db"), window_s=10.0)
+    rng = random.Random(5)
+    t0 = time.time() - 20 * 86400
+    for day in range(14):
+        settings = {'render_scale': rng.choice([0.6, 0.7, 0.8, 0.9, 1.0]),
+                    'cpu_priority': rng.choice(CANDIDATE_PRIORITIES), 'target_fps': 90}
+        cleanup_policy = rng.choice(CLEANUP_LEVELS)
+        settings['ram_cleanup_before_launch'], settings['aggressive_ram_cleanup'] = CLEANUP_POLICIES[cleanup_policy]
+        store.start_session("Synthetic Game", profile="Synthetic Game", settings=settings)
+        for window in range(30):
+            cpu_bound = rng.random() < 0.2
+            avg, low = true_fps(settings['render_scale'], settings['cpu_priority'], cleanup_policy, cpu_bound)
+            for i in range(20):
+                ts = t0 + day * 86400 + window * 10 + i * 0.5
+                fps = rng.gauss(avg, avg * 0.04) if i else low  # Un tirón por ventana
+                store.record_sample(cpu=rng.uniform(88, 95) if cpu_bound else rng.uniform(35, 70),
+                                    ram=60.0, fps=fps, ts=ts)
+        store.end_session()
+
+    tuner = ProfileTuner(store)
+    start = time.perf_counter()
+    data = tuner.load("Synthetic Game")
+    load_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    proposal = tuner.propose("Synthetic Game", data=data)
+    propose_ms = (time.perf_counter() - start) * 1000
+    print(f"{data.windows} windows / {data.sessions} sessions loaded in {load_ms:.1f} ms, "
+          f"fit + {len(CANDIDATE_SCALES) * len(CANDIDATE_PRIORITIES) * len(CLEANUP_LEVELS)} candidates "
+          f"in {propose_ms:.1f} ms")
+    print(f"Proposal: {proposal.summary()}")
+    avg, low = true_fps(proposal.render_scale, proposal.cpu_priority, proposal.cleanup, 0.2)
+    print(f"Ground truth for the proposal: ~{avg:.0f} FPS / 1% low {low:.0f}")
+    print("Top alternatives:")
+    for alternative in proposal.alternatives[:3]:
+        print(f"  {alternative}")
+    coef = tuner.fit(data).coef[:, 0]
+    print(f"Learned scale exponent (GPU-bound): {coef[1]:.2f} (truth -1.70, prior {PRIOR[1]:.2f})")
+
+    start = time.perf_counter()
+    report = tuner.evaluate_replay("Synthetic Game", data=data)
+    print(f"Replay over {report['evaluated']} sessions ({(time.perf_counter() - start) * 1000:.1f} ms):")
+    print(f"  FPS MAPE    : {report['mape_fps']}")
+    print(f"  1% low MAPE : {report['mape_p1_low']}")
+    store.close()
+    shutil.rmtree(root)
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📉 PSI MONITOR
+Protección guiada por Pressure Stall Information (/proc/pressure/{memory,cpu,io})
+
+- Triggers PSI del kernel + poll(): el hilo duerme sin coste mientras el
+  sistema está sano y despierta solo cuando el tiempo de bloqueo supera el
+  umbral dentro de la ventana (p.ej. 150ms de 1s)
+- Escalado por etapas: recorte de memoria -> limitar segundo plano -> limitar Neuro-OS
+- Desescalado cuando la presión se mantiene baja durante recovery_s
+- Si el fichero no admite triggers (kernel antiguo o fichero falso en tests)
+  se usa sondeo del contador total= con la misma semántica umbral/ventana
+"""
+
+import os
+import select
+import threading
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+PRESSURE_ROOT = "/proc/pressure"
+
+
+class ProtectionStage(IntEnum):
+    """Etapas de escalado"""
+    HEALTHY = 0
+    RECLAIM = 1
+    THROTTLE_BACKGROUND = 2
+    LIMIT_NEURO = 3
+
+
+@dataclass
+class PressureSample:
+    """Lectura de un fichero de presión"""
+    some_avg10: float
+    some_total_us: int
+    full_avg10: float = 0.0
+    full_total_us: int = 0
+
+
+def read_pressure(path: str) -> PressureSample:
+    """Parsear un fichero PSI ('some avg10=.. avg60=.. avg300=.. total=..')"""
+    values = {}
+    with open(path, 'r') as f:
+        for line in f:
+            kind, *fields = line.split()
+            for field in fields:
+                key, _, value = field.partition('=')
+                values[f"{kind}_{key}"] = value
+    return PressureSample(
+        some_avg10=float(values.get('some_avg10', 0)),
+        some_total_us=int(values.get('some_total', 0)),
+        full_avg10=float(values.get('full_avg10', 0)),
+        full_total_us=int(values.get('full_total', 0))
+    )
+
+
+@dataclass
+class PSITrigger:
+    """Umbral de bloqueo: stall_us de bloqueo dentro de window_us"""
+    resource: str  # memory, cpu, io
+    stall_us: int = 150000
+    window_us: int = 1000000
+    kind: str = "some"
+
+    # Estado interno
+    fd: Optional[int] = None
+    polling: bool = False  # True si el fichero no admite triggers
+    _last_total: Optional[int] = None
+    _last_time: float = 0.0
+
+
+class PSIMonitor:
+    """Hilo que espera eventos PSI y ejecuta el escalado"""
+
+    def __init__(self, triggers: Optional[List[PSITrigger]] = None,
+                 pressure_root: str = PRESSURE_ROOT,
+                 on_event: Optional[Callable[[str, PressureSample], None]] = None,
+                 on_recovered: Optional[Callable[[], None]] = None,
+                 recovery_s: float = 5.0, fallback_poll_s: float = 0.05):
+        """
+        Args:
+            triggers: Umbrales (por defecto: memoria 150ms/1s, cpu e io 300ms/1s)
+            pressure_root: Directorio con los ficheros memory/cpu/io
+            on_event: Callback(resource, sample) cuando se supera un umbral
+            on_recovered: Callback cuando la presión vuelve a estar bajo umbral
+            recovery_s: Segundos bajo umbral para considerar el sistema recuperado
+            fallback_poll_s: Intervalo de sondeo si no hay triggers del kernel
+        """
+        self.pressure_root = Path(pressure_root)
+        self.triggers = triggers or [PSITrigger("memory", 150000, 1000000),
+                                     PSITrigger("cpu", 300000, 1000000),
+                                     PSITrigger("io", 300000, 1000000)]
+        self.on_event = on_event
+        self.on_recovered = on_recovered
+        self.recovery_s = recovery_s
+        self.fallback_poll_s = fallback_poll_s
+
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+        self._wake_r: Optional[int] = None
+        self._wake_w: Optional[int] = None
+        self.under_pressure = False
+        self._last_event = 0.0
+        self.events = 0
+        self.last_latency_ms: Optional[float] = None
+
+    @staticmethod
+    def is_supported(pressure_root: str = PRESSURE_ROOT) -> bool:
+        return Path(pressure_root, "memory").exists()
+
+    # --- TRIGGERS ---
+    def _open_trigger(self, trigger: PSITrigger):
+        """Registrar el trigger en el kernel; si no se puede, modo sondeo"""
+        path = self.pressure_root / trigger.resource
+        windows = [trigger.window_us]
+        if trigger.window_us % 2000000:
+            # Sin privilegios el kernel exige ventanas múltiplo de 2s
+            windows.append(2000000 * max(1, round(trigger.window_us / 2000000)))
+        for window in windows:
+            stall = trigger.stall_us * window // trigger.window_us
+            fd = None
+            try:
+                fd = os.open(path, os.O_RDWR | os.O_NONBLOCK)
+                if os.fstat(fd).st_size != 0:
+                    # Fichero normal (no procfs): no es un fichero PSI real
+                    break
+                os.write(fd, f"{trigger.kind} {stall} {window}\0".encode())
+                trigger.fd = fd
+                trigger.polling = False
+                return
+            except OSError:
+                pass
+            if fd is not None:
+                os.close(fd)
+        trigger.polling = True
+
+    def _poll_exceeded(self, trigger: PSITrigger) -> Optional[PressureSample]:
+        """Modo sondeo: comparar el delta de total= con el umbral en la ventana"""
+        try:
+            sample = read_pressure(str(self.pressure_root / trigger.resource))
+        except (OSError, ValueError):
+            return None
+        now = time.monotonic()
+        total = sample.some_total_us if trigger.kind == "some" else sample.full_total_us
+        exceeded = False
+        if trigger._last_total is not None:
+            elapsed_us = (now - trigger._last_time) * 1e6
+            if elapsed_us > 0:
+                # Escalar el bloqueo observado a la ventana del trigger
+                exceeded = (total - trigger._last_total) * trigger.window_us / elapsed_us >= trigger.stall_us
+        trigger._last_total = total
+        trigger._last_time = now
+        return sample if exceeded else None
+
+    # --- BUCLE ---
+    def start(self):
+        """Registrar triggers y arrancar el hilo"""
+        if self.running:
+            return
+        for trigger in self.triggers:
+            self._open_trigger(trigger)
+        self._wake_r, self._wake_w = os.pipe()
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name="PSIMonitor", daemon=True)
+        self.thread.start()
+        modes = ', '.join(f"{t.resource}:{'poll' if t.polling else 'trigger'}" for t in self.triggers)
+        print(f"[PSI] Monitor started ({modes})")
+
+    def stop(self):
+        """Detener el hilo y cerrar los triggers"""
+        if not self.running:
+            return
+        self.running = False
+        os.write(self._wake_w, b'x')
+        if self.thread:
+            self.thread.join()
+        for trigger in self.triggers:
+            if trigger.fd is not None:
+                os.close(trigger.fd)
+                trigger.fd = None
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+        print("[PSI] Monitor stopped")
+
+    def _loop(self):
+        poller = select.poll()
+        by_fd = {}
+        for trigger in self.triggers:
+            if trigger.fd is not None:
+                poller.register(trigger.fd, select.POLLPRI)
+                by_fd[trigger.fd] = trigger
+        poller.register(self._wake_r, select.POLLIN)
+        polled = [t for t in self.triggers if t.polling]
+
+        while self.running:
+            # Sano y solo triggers del kernel: bloquear indefinidamente (coste cero)
+            if polled:
+                timeout_ms = int(self.fallback_poll_s * 1000)
+            elif self.under_pressure:
+                timeout_ms = 500
+            else:
+                timeout_ms = None
+
+            events = poller.poll(timeout_ms)
+            woke = time.monotonic()
+            fired = []
+            for fd, mask in events:
+                if fd == self._wake_r:
+                    return
+                if mask & select.POLLERR:
+                    print("[PSI] Trigger error, switching to polling")
+                    poller.unregister(fd)
+                    by_fd[fd].polling = True
+                    polled.append(by_fd[fd])
+                elif mask & select.POLLPRI:
+                    fired.append(by_fd[fd])
+
+            samples = {}
+            for trigger in fired:
+                samples[trigger.resource] = read_pressure(str(self.pressure_root / trigger.resource))
+            for trigger in polled:
+                sample = self._poll_exceeded(trigger)
+                if sample is not None:
+                    samples[trigger.resource] = sample
+
+            if samples:
+                self._last_event = woke
+                self.under_pressure = True
+                for resource, sample in samples.items():
+                    self.events += 1
+                    if self.on_event:
+                        self.on_event(resource, sample)
+                self.last_latency_ms = (time.monotonic() - woke) * 1000
+            elif self.under_pressure and woke - self._last_event >= self.recovery_s:
+                self.under_pressure = False
+                if self.on_recovered:
+                    self.on_recovered()
+
+
+class PSIProtection:
+    """Escalado por etapas sobre un PSIMonitor"""
+
+    def __init__(self, crash_protection=None, escalate_after_s: float = 1.0,
+                 pressure_root: str = PRESSURE_ROOT, monitor: Optional[PSIMonitor] = None):
+        """
+        Args:
+            crash_protection: CrashProtection para la última etapa (limitar Neuro-OS)
+            escalate_after_s: Si la presión persiste este tiempo tras una etapa, subir otra
+        """
+        self.crash_protection = crash_protection
+        self.escalate_after_s = escalate_after_s
+        self.stage = ProtectionStage.HEALTHY
+        self._stage_time = 0.0
+        self.history: List[Dict] = []
+        self.monitor = monitor or PSIMonitor(pressure_root=pressure_root,
+                                             on_event=self.handle_event,
+                                             on_recovered=self.handle_recovered)
+
+    def start(self):
+        self.monitor.start()
+
+    def stop(self):
+        self.monitor.stop()
+        if self.stage != ProtectionStage.HEALTHY:
+            self.handle_recovered()
+
+    def handle_event(self, resource: str, sample: PressureSample):
+        """Subir una etapa si la presión persiste"""
+        now = time.monotonic()
+        if self.stage != ProtectionStage.HEALTHY and now - self._stage_time < self.escalate_after_s:
+            return  # Dar tiempo a que la etapa actual haga efecto
+        if self.stage == ProtectionStage.LIMIT_NEURO:
+            return
+
+        next_stage = ProtectionStage(self.stage + 1)
+        if next_stage == ProtectionStage.RECLAIM and resource != "memory":
+            next_stage = ProtectionStage.THROTTLE_BACKGROUND  # Recortar RAM no ayuda a CPU/IO
+        self.stage = next_stage
+        self._stage_time = now
+        result = self._apply(next_stage)
+        self.history.append({'time': time.time(), 'resource': resource,
+                             'avg10': sample.some_avg10, 'stage': next_stage.name, 'result': result})
+        print(f"[PSI] {resource} pressure (avg10={sample.some_avg10:.1f}%) -> {next_stage.name}")
+
+    def _apply(self, stage: ProtectionStage) -> str:
+        try:
+            if stage == ProtectionStage.RECLAIM:
+                from memory_reclaim import get_memory_reclaimer
+                result = get_memory_reclaimer().reclaim(max_processes=3)
+                return f"reclaimed {result['freed_mb']:.0f} MB"
+            if stage == ProtectionStage.THROTTLE_BACKGROUND:
+                return self._throttle_background()
+            if stage == ProtectionStage.LIMIT_NEURO and self.crash_protection:
+                self.crash_protection.apply_emergency_limits()
+                return "Neuro-OS limited"
+        except Exception as e:
+            return f"error: {e}"
+        return "no-op"
+
+    def _throttle_background(self) -> str:
+        from cgroup_partition import get_partition_manager
+        from adaptive_scheduler import get_system_activity
+        from memory_reclaim import get_memory_reclaimer
+        partitions = get_partition_manager()
+        if not partitions.is_available():
+            return "cgroup v2 not available"
+        game_pids = get_system_activity().snapshot_game_pids()
+        background = [c.pid for c in get_memory_reclaimer().rank_candidates(10) if c.pid not in game_pids]
+        result = partitions.partition(game_pids=game_pids, background_pids=background, owner="psi")
+        return f"{result['moved']} background processes throttled"
+
+    def handle_recovered(self):
+        """Presión bajo umbral durante recovery_s: deshacer todas las etapas"""
+        if self.stage >= ProtectionStage.LIMIT_NEURO and self.crash_protection:
+            self.crash_protection.restore_normal_mode()
+        if self.stage >= ProtectionStage.THROTTLE_BACKGROUND:
+            from cgroup_partition import get_partition_manager
+            partitions = get_partition_manager()
+            if partitions.is_claimed("psi"):
+                partitions.restore(owner="psi")
+        print(f"[PSI] Pressure recovered, leaving {self.stage.name}")
+        self.stage = ProtectionStage.HEALTHY
+
+    def get_status(self) -> Dict:
+        return {
+            'stage': self.stage.name,
+            'under_pressure': self.monitor.under_pressure,
+            'events': self.monitor.events,
+            'last_latency_ms': self.monitor.last_latency_ms,
+            'triggers': {t.resource: 'poll' if t.polling else 'trigger' for t in self.monitor.triggers}
+        }
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    print("=" * 60)
+    print("PSI MONITOR TEST (fake pressure files)")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def write_fake(resource, total):
+            Path(tmp, resource).write_text(
+                f"some avg10=0.00 avg60=0.00 avg300=0.00 total={total}\n"
+                f"full avg10=0.00 avg60=0.00 avg300=0.00 total={total // 2}\n")
+
+        write_fake("memory", 0)
+        write_fake("cpu", 0)
+        write_fake("io", 0)
+
+        fired = []
+        monitor = PSIMonitor(pressure_root=tmp, recovery_s=0.5,
+                             on_event=lambda r, s: fired.append((r, time.monotonic())),
+                             on_recovered=lambda: print("  recovered"))
+        monitor.start()
+        time.sleep(0.2)
+        print(f"  healthy: {len(fired)} events")
+
+        # 400ms de bloqueo de memoria de golpe: supera 150ms/1s
+        spike = time.monotonic()
+        write_fake("memory", 400000)
+        time.sleep(0.2)
+        if fired:
+            print(f"  spike: event '{fired[0][0]}' after {(fired[0][1] - spike) * 1000:.0f} ms")
+        time.sleep(1.0)
+        monitor.stop()
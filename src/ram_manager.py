@@ -11,6 +11,8 @@ import sys
 from pathlib import Path
 from typing import Dict, List
 
+from process_footprint import get_footprint_sampler
+
 class RAMManager:
     """Gestor de RAM: liberación y expansión virtual"""
     
@@ -45,6 +47,7 @@ class RAMManager:
         """
         ram_before = psutil.virtual_memory().available / (1024**3)
         actions = []
+        reclaim = None
         
         try:
             # 1. Limpiar caché de Python
@@ -52,33 +55,25 @@ class RAMManager:
             gc.collect()
             actions.append("Python garbage collection")
             
-            # 2. Reducir prioridad de apps pesadas
-            heavy_apps = []
-            for proc in psutil.process_iter(['name', 'memory_info']):
-                try:
-                    mem_gb = proc.info['memory_info'].rss / (1024**3)
-                    if mem_gb > 0.5:  # > 500MB
-                        heavy_apps.append({
-                            'name': proc.info['name'],
-                            'ram_gb': mem_gb,
-                            'proc': proc
-                        })
-                except:
-                    pass
+            # 2. Apps pesadas por huella PSS
+            heavy_apps = self.find_heavy_apps()
             
-            # Ordenar por uso de RAM
-            heavy_apps.sort(key=lambda x: x['ram_gb'], reverse=True)
+            # 3. Recorte real de working set (Linux): process_madvise / memory.reclaim
+            if sys.platform.startswith('linux'):
+                from memory_reclaim import get_memory_reclaimer
+                reclaim = get_memory_reclaimer().reclaim(max_processes=5 if aggressive else 2,
+                                                         cold_only=not aggressive)
+                if reclaim['reclaimed_processes']:
+                    actions.append(f"Working set trimmed: {reclaim['freed_mb']:.0f} MB "
+                                   f"from {reclaim['reclaimed_processes']} processes (measured)")
+                elif reclaim['cold_processes']:
+                    actions.append(f"Working set marked cold: {reclaim['advised_mb']:.0f} MB "
+                                   f"in {reclaim['cold_processes']} processes (not freed)")
             
             if aggressive and heavy_apps:
-                # Reducir prioridad de las 5 apps más pesadas
-                for app in heavy_apps[:5]:
-                    try:
-                        app['proc'].nice(psutil.BELOW_NORMAL_PRIORITY_CLASS if sys.platform == 'win32' else 10)
-                        actions.append(f"Reduced priority: {app['name']}")
-                    except:
-                        pass
+                actions.extend(self.throttle_background(heavy_apps))
             
-            # 3. Limpiar archivos temporales (Windows)
+            # 4. Limpiar archivos temporales (Windows)
             if sys.platform == 'win32' and aggressive:
                 temp_dirs = [
                     os.environ.get('TEMP'),
@@ -107,9 +102,99 @@ class RAMManager:
             'ram_before_gb': ram_before,
             'ram_after_gb': ram_after,
             'actions': actions,
+            'reclaimed_gb': reclaim['freed_mb'] / 1024 if reclaim else 0.0,
+            'reclaim_results': reclaim['results'] if reclaim else [],
             'heavy_apps': [{'name': app['name'], 'ram_gb': app['ram_gb']} for app in heavy_apps[:10]]
         }
     
+    def find_heavy_apps(self, min_gb: float = 0.5) -> List[Dict]:
+        """
+        Apps pesadas ordenadas por huella PSS (no RSS): los navegadores
+        multiproceso no cuentan sus bibliotecas compartidas una vez por proceso
+        """
+        heavy_apps = []
+        footprints = get_footprint_sampler().begin_pass()
+        for proc in psutil.process_iter(['name', 'create_time', 'memory_info']):
+            try:
+                mem_gb = proc.info['memory_info'].rss / (1024**3)
+                if mem_gb > min_gb:
+                    mem_gb = footprints.footprint_of(proc).bytes / (1024**3)
+                if mem_gb > min_gb:
+                    heavy_apps.append({
+                        'name': proc.info['name'],
+                        'ram_gb': mem_gb,
+                        'proc': proc
+                    })
+            except:
+                pass
+        
+        # Ordenar por uso de RAM
+        heavy_apps.sort(key=lambda x: x['ram_gb'], reverse=True)
+        return heavy_apps
+    
+    def throttle_background(self, heavy_apps: List[Dict] = None, limit: int = 5,
+                            owner: str = "ram_manager") -> List[str]:
+        """
+        Limitar las apps pesadas (salvo el juego): slice cgroup v2 en Linux,
+        prioridad baja en otro caso
+        
+        Args:
+            owner: Dueño de la partición cgroup (restore_background_limits la libera)
+        
+        Returns:
+            Lista de acciones realizadas
+        """
+        if heavy_apps is None:
+            heavy_apps = self.find_heavy_apps()
+        actions = []
+        
+        from adaptive_scheduler import get_system_activity
+        game_pids = get_system_activity().snapshot_game_pids()
+        targets = [app for app in heavy_apps if app['proc'].pid not in game_pids][:limit]
+        if not targets:
+            return actions
+        
+        # Linux con cgroup v2: limitar las apps pesadas en el slice "background"
+        # (reversible y persistido) en vez de renice proceso a proceso
+        if sys.platform.startswith('linux'):
+            from cgroup_partition import get_partition_manager
+            partitions = get_partition_manager()
+            if partitions.is_available():
+                result = partitions.partition(game_pids=game_pids,
+                                              background_pids=[app['proc'].pid for app in targets],
+                                              owner=owner)
+                if result['success']:
+                    actions.append(f"Background slice: {result['moved']} processes limited (cgroup v2)")
+                    return actions
+        
+        # Reducir prioridad de las apps más pesadas y llevarlas a los núcleos que
+        # el plan de afinidad deja fuera del juego (lo que hace cpuset.cpus con cgroups)
+        background_cpus = None
+        if hasattr(psutil.Process, 'cpu_affinity'):
+            from cpu_topology import get_affinity_planner
+            plan = get_affinity_planner().plan()
+            background_cpus = plan.background_cpus if plan.isolates else None
+        for app in targets:
+            try:
+                app['proc'].nice(psutil.BELOW_NORMAL_PRIORITY_CLASS if sys.platform == 'win32' else 10)
+                actions.append(f"Reduced priority: {app['name']}")
+            except:
+                pass
+            if background_cpus:
+                try:
+                    app['proc'].cpu_affinity(background_cpus)
+                    actions.append(f"Background CPUs {background_cpus}: {app['name']}")
+                except (psutil.Error, OSError, ValueError):
+                    pass
+        return actions
+    
+    def restore_background_limits(self, owner: str = "ram_manager") -> Dict:
+        """Deshacer los límites cgroup aplicados por free_ram(aggressive=True)"""
+        if not sys.platform.startswith('linux'):
+            return {'success': True, 'restored': 0, 'errors': []}
+        from cgroup_partition import get_partition_manager
+        return get_partition_manager().restore(owner=owner)
+    
     def create_virtual_ram(self, size_gb: int) -> Dict:
         """
         Crear RAM virtual usando espacio en disco
@@ -120,6 +205,15 @@ class RAMManager:
         Returns:
             Dict con resultado
         """
+        # Linux: swapfile preasignado + mkswap + swapon (activo al momento)
+        if sys.platform.startswith('linux'):
+            from swap_manager import get_swap_manager
+            result = get_swap_manager().provision_swapfile(size_gb=size_gb)
+            if result['success']:
+                self.virtual_ram_size_gb = size_gb
+                result.setdefault('size_gb', size_gb)
+            return result
+        
         try:
             # Crear directorio si no existe
             self.virtual_ram_path.mkdir(exist_ok=True)
@@ -155,6 +249,20 @@ class RAMManager:
     
     def get_virtual_ram_status(self) -> Dict:
         """Obtener estado de RAM virtual"""
+        if sys.platform.startswith('linux'):
+            from swap_manager import get_swap_manager, DEFAULT_SWAPFILE
+            status = get_swap_manager().get_status()
+            active = [s for s in status['swaps'] if s['path'] == DEFAULT_SWAPFILE]
+            return {
+                'exists': bool(active),
+                'size_gb': active[0]['size_gb'] if active else 0,
+                'path': DEFAULT_SWAPFILE,
+                'swaps': status['swaps'],
+                'zswap': status['zswap'],
+                'swapin_mb_s': status['swapin_mb_s'],
+                'swapout_mb_s': status['swapout_mb_s']
+            }
+        
         swap_file = self.virtual_ram_path / "neuro_swap.dat"
         
         if swap_file.exists():
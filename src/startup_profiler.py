@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ STARTUP PROFILER
+Instrumentación del arranque de Neuro-OS: fases, imports y ventanas
+
+- Fases anidadas con tiempo de pared y de CPU (phase() como context manager),
+  contadas desde el inicio del proceso (incluye el arranque del intérprete)
+- Hitos (mark()): ventana visible, login interactivo...
+- Imports al estilo de `python -X importtime`: tiempo propio y acumulado de
+  cada módulo importado por primera vez (sólo con NEURO_OS_STARTUP_PROFILE=1:
+  envolver __import__ tiene un coste pequeño en cada import)
+- Construcción de ventanas (window()) y módulos diferidos (lazy_module()):
+  los subsistemas pesados se importan al primer uso y su carga queda medida
+- Informe como dict, JSON o texto; NeuroBenchmark.benchmark_startup_time
+  arranca Neuro-OS en modo medición y lee este informe
+"""
+
+import builtins
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+STARTUP_PROFILE_ENV = "NEURO_OS_STARTUP_PROFILE"  # 1 = medir también los imports
+STARTUP_REPORT_ENV = "NEURO_OS_STARTUP_REPORT"    # Ruta donde guardar el informe al llegar al login
+STARTUP_EXIT_ENV = "NEURO_OS_STARTUP_EXIT"        # 1 = salir al llegar al login (benchmark)
+
+
+@dataclass
+class Phase:
+    """Un tramo medido del arranque"""
+    name: str
+    kind: str            # phase, window o lazy
+    start_ms: float      # Desde el inicio del proceso
+    depth: int
+    wall_ms: float = 0.0
+    cpu_ms: float = 0.0
+
+
+@dataclass
+class ImportRecord:
+    """Primer import de un módulo (como una línea de -X importtime)"""
+    module: str
+    start_ms: float
+    depth: int
+    self_ms: float
+    cumulative_ms: float
+    failed: bool = False
+
+
+def _process_age_s(now_wall: float) -> float:
+    """Segundos desde el inicio del proceso"""
+    if sys.platform.startswith('linux'):
+        # psutil.create_time() parte de btime (segundos enteros): aquí, ticks desde el arranque
+        try:
+            with open('/proc/uptime') as f:
+                uptime = float(f.read().split()[0])
+            with open('/proc/self/stat') as f:
+                start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+            return max(0.0, uptime - start_ticks / os.sysconf('SC_CLK_TCK'))
+        except (OSError, ValueError, IndexError):
+            pass
+    try:
+        import psutil
+        return max(0.0, now_wall - psutil.Process().create_time())
+    except Exception:
+        return 0.0
+
+
+class StartupProfiler:
+    """Registro del arranque (un solo hilo: el de la UI)"""
+
+    def __init__(self):
+        now_perf, now_wall = time.perf_counter(), time.time()
+        age = _process_age_s(now_wall)
+        # Origen: inicio del proceso, llevado al reloj monotónico
+        self.process_start = now_wall - age
+        self.origin = now_perf - age
+        self.phases: List[Phase] = []
+        self.marks: Dict[str, float] = {}
+        self.imports: List[ImportRecord] = []
+        self._depth = 0
+        self._import_stack: List[list] = []
+        self._original_import = None
+        self._main_thread = threading.main_thread()
+
+    def now_ms(self) -> float:
+        return (time.perf_counter() - self.origin) * 1000
+
+    # --- FASES ---
+    def start(self, name: str, kind: str = "phase") -> Phase:
+        """Abrir una fase (cerrarla con stop(); para bloques, mejor phase())"""
+        phase = Phase(name=name, kind=kind, start_ms=self.now_ms(), depth=self._depth)
+        phase.cpu_ms = time.process_time() * 1000
+        self.phases.append(phase)
+        self._depth += 1
+        return phase
+
+    def stop(self, phase: Phase) -> Phase:
+        phase.wall_ms = round(self.now_ms() - phase.start_ms, 2)
+        phase.cpu_ms = round(time.process_time() * 1000 - phase.cpu_ms, 2)
+        phase.start_ms = round(phase.start_ms, 2)
+        self._depth = max(0, self._depth - 1)
+        return phase
+
+    @contextmanager
+    def phase(self, name: str, kind: str = "phase"):
+        """Medir un bloque del arranque"""
+        phase = self.start(name, kind)
+        try:
+            yield phase
+        finally:
+            self.stop(phase)
+
+    def window(self, name: str):
+        """Medir la construcción de una ventana"""
+        return self.phase(name, kind="window")
+
+    def mark(self, name: str) -> float:
+        """Hito del arranque (sólo cuenta la primera vez)"""
+        if name not in self.marks:
+            self.marks[name] = round(self.now_ms(), 2)
+        return self.marks[name]
+
+    # --- IMPORTS ---
+    def track_imports(self):
+        """Medir cada módulo importado por primera vez desde ahora"""
+        if self._original_import is not None:
+            return
+        self._original_import = original = builtins.__import__
+        stack = self._import_stack
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if (level or name in sys.modules
+                    or threading.current_thread() is not self._main_thread):
+                return original(name, globals, locals, fromlist, level)
+            record = [name, 0.0]
+            stack.append(record)
+            start = time.perf_counter()
+            failed = False
+            try:
+                return original(name, globals, locals, fromlist, level)
+            except ImportError:
+                failed = True
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                stack.pop()
+                if stack:
+                    stack[-1][1] += elapsed
+                self.imports.append(ImportRecord(
+                    module=name, start_ms=round((start - self.origin) * 1000, 2), depth=len(stack),
+                    self_ms=round((elapsed - record[1]) * 1000, 3), cumulative_ms=round(elapsed * 1000, 3),
+                    failed=failed))
+
+        builtins.__import__ = timed_import
+
+    def stop_tracking_imports(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    # --- INFORME ---
+    def report(self, top: int = 25) -> Dict:
+        """Informe del arranque (fases, hitos e imports más caros)"""
+        top_level = [record for record in self.imports if record.depth == 0]
+        return {
+            'process_start': self.process_start,
+            'marks': dict(self.marks),
+            'startup_time_ms': self.marks.get('login_interactive'),
+            'cpu_time_ms': round(time.process_time() * 1000, 1),
+            'phases': [asdict(phase) for phase in self.phases],
+            'imports': {
+                'tracked': self._original_import is not None or bool(self.imports),
+                'count': len(self.imports),
+                'total_ms': round(sum(record.cumulative_ms for record in top_level), 1),
+                'top_cumulative': [asdict(record) for record in
+                                   sorted(top_level, key=lambda r: r.cumulative_ms, reverse=True)[:top]],
+                'top_self': [asdict(record) for record in
+                             sorted(self.imports, key=lambda r: r.self_ms, reverse=True)[:top]],
+            },
+        }
+
+    def format_report(self, top: int = 15) -> str:
+        """Informe en texto (fases en árbol e imports al estilo -X importtime)"""
+        lines = ["Phases (wall / cpu ms since process start):"]
+        for phase in self.phases:
+            lines.append(f"  {phase.start_ms:8.1f}  {'  ' * phase.depth}{phase.name} [{phase.kind}] "
+                         f"{phase.wall_ms:.1f} / {phase.cpu_ms:.1f}")
+        if self.marks:
+            lines.append("Marks: " + ", ".join(f"{name} @ {ms:.0f} ms" for name, ms in self.marks.items()))
+        if self.imports:
+            lines.append("Imports (self ms | cumulative ms | module):")
+            for record in sorted((r for r in self.imports if r.depth == 0),
+                                 key=lambda r: r.cumulative_ms, reverse=True)[:top]:
+                lines.append(f"  {record.self_ms:8.1f} | {record.cumulative_ms:8.1f} | {record.module}"
+                             + (" (failed)" if record.failed else ""))
+        return "\n".join(lines)
+
+    def save(self, path: str) -> str:
+        """Guardar el informe en JSON (escritura atómica)"""
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+        os.replace(tmp, path)
+        return path
+
+
+class LazyModule:
+    """Módulo que se importa (midiendo la carga) al primer acceso a un atributo"""
+
+    def __init__(self, name: str):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            with get_startup_profiler().phase(f"import {self._name}", kind="lazy"):
+                module = importlib.import_module(self._name)
+            self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        value = getattr(self._load(), attr)
+        self.__dict__[attr] = value  # Los siguientes accesos no pasan por __getattr__
+        return value
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__['_module'] is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    """Referencia diferida a un módulo (ver LazyModule)"""
+    return LazyModule(name)
+
+
+# Instancia global
+_startup_profiler: Optional[StartupProfiler] = None
+
+def get_startup_profiler() -> StartupProfiler:
+    """Obtener el perfilador del arranque (se crea con el primer import)"""
+    global _startup_profiler
+    if _startup_profiler is None:
+        _startup_profiler = StartupProfiler()
+        if os.environ.get(STARTUP_PROFILE_ENV) == "1":
+            _startup_profiler.track_imports()
+    return _startup_profiler
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("STARTUP PROFILER TEST")
+    print("=" * 60)
+
+    profiler = get_startup_profiler()
+    profiler.track_imports()
+    with profiler.phase("eager imports"):
+        import game_catalog  # noqa: F401
+    catalog = lazy_module("profile_binding")
+    with profiler.phase("boot"):
+        with profiler.phase("config"):
+            from config_manager import get_config_manager  # noqa: F401
+        profiler.mark("login_interactive")
+    print(f"Lazy before use: {catalog!r}")
+    with profiler.window("first open"):
+        catalog.ProfileBinder
+    print(f"Lazy after use: {catalog!r}")
+    profiler.stop_tracking_imports()
+    print(profiler.format_report(top=8))
+    report = profiler.report()
+    print(f"\nLogin interactive at {report['startup_time_ms']} ms, {report['imports']['count']} modules imported "
+          f"({report['imports']['total_ms']} ms)")
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔄 SWAP MANAGER
+Aprovisionamiento real de memoria virtual en Linux
+
+- Swapfile con extents preasignados (fallocate), mkswap y swapon con prioridad
+  (btrfs: chattr +C antes de asignar; un fichero sparse no sirve como swap)
+- zram: swap comprimida en RAM con prioridad alta (nivel rápido)
+- zswap: caché comprimida delante del swap de disco
+- Tasas de swap-in/swap-out (/proc/vmstat) y presión de memoria (PSI) para
+  elegir la configuración que menos bloqueos provoca
+
+Todos los pasos privilegiados pasan por PrivilegedOps, así que en pruebas se
+sustituye por RecordingOps y no se toca el sistema. Cada operación (swapfile,
+zram, zswap) va en un solo lote: una única elevación (una contraseña de
+pkexec) que ejecuta los pasos como argv, sin shell, y deshace si uno falla.
+"""
+
+import abc
+import inspect
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_SWAPFILE = "/var/lib/neuro-os/swapfile"
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def cmd(*argv: str, check: bool = True) -> Dict:
+    """Paso de un lote: ejecutar un comando ({out:N} = salida del paso N)"""
+    return {'argv': list(argv), 'check': check}
+
+
+def write(path: str, value: str) -> Dict:
+    """Paso de un lote: escribir un parámetro de sysfs/procfs"""
+    return {'write': path, 'value': value, 'check': True}
+
+
+def run_steps(payload: Dict, execute: Optional[Callable] = None) -> Dict:
+    """
+    Ejecutar un lote de pasos en orden; al primer fallo, ejecutar el rollback
+    (sólo si el paso que falló es posterior a rollback_from: los anteriores son
+    comprobaciones que no han cambiado nada).
+    Es también el código del helper elevado, así que sólo usa la biblioteca estándar.
+
+    Returns:
+        Dict con failed (índice del paso que falló o -1), outputs y error
+    """
+    import subprocess
+
+    def run_step(step):
+        if 'write' in step:
+            try:
+                with open(step['write'], 'w') as f:
+                    f.write(step['value'])
+                return 0, '', ''
+            except OSError as e:
+                return 1, '', str(e)
+        try:
+            result = subprocess.run(step['argv'], capture_output=True, text=True, timeout=120)
+            return result.returncode, result.stdout, result.stderr
+        except (OSError, subprocess.TimeoutExpired) as e:
+            return 1, '', str(e)
+
+    execute = execute or run_step
+    outputs = []
+
+    def expand(step):
+        if 'argv' not in step:
+            return step
+        argv = []
+        for arg in step['argv']:
+            if arg.startswith('{out:') and arg.endswith('}'):
+                index = int(arg[5:-1])
+                if index >= len(outputs) or not outputs[index]:
+                    return None
+                arg = outputs[index]
+            argv.append(arg)
+        return dict(step, argv=argv)
+
+    for i, step in enumerate(payload['steps']):
+        expanded = expand(step)
+        code, out, err = execute(expanded) if expanded is not None else (1, '', 'missing step output')
+        outputs.append(out.strip())
+        if code != 0 and step.get('check', True):
+            undo_steps = payload.get('rollback', []) if i >= payload.get('rollback_from', 0) else []
+            for undo in undo_steps:
+                expanded = expand(undo)
+                if expanded is not None:
+                    execute(expanded)
+            return {'failed': i, 'outputs': outputs, 'error': err.strip() or f"exit code {code}"}
+    return {'failed': -1, 'outputs': outputs, 'error': ''}
+
+
+class PrivilegedOps(abc.ABC):
+    """Interfaz de operaciones que requieren root"""
+
+    @abc.abstractmethod
+    def run_batch(self, steps: List[Dict], rollback: Optional[List[Dict]] = None,
+                  rollback_from: int = 0) -> Dict:
+        """
+        Ejecutar un lote (ver cmd()/write()) con una sola elevación
+
+        Args:
+            rollback_from: Primer paso cuyo fallo dispara el rollback
+
+        Returns:
+            Dict de run_steps(): failed, outputs, error
+        """
+
+    def run(self, argv: List[str]) -> Tuple[int, str, str]:
+        """Ejecutar un comando suelto. Devuelve (returncode, stdout, stderr)"""
+        result = self.run_batch([cmd(*argv)])
+        code = 0 if result['failed'] < 0 else 1
+        return code, (result['outputs'] or [''])[0], result['error']
+
+    def write_file(self, path: str, value: str) -> bool:
+        """Escribir un parámetro de sysfs/procfs"""
+        return self.run_batch([write(path, value)])['failed'] < 0
+
+
+class SystemOps(PrivilegedOps):
+    """Implementación real: ejecuta directamente si es root, si no un helper vía pkexec"""
+
+    def __init__(self, elevate: Optional[List[str]] = None):
+        is_root = hasattr(os, "geteuid") and os.geteuid() == 0
+        self.elevate = elevate if elevate is not None else ([] if is_root else ["pkexec"])
+
+    @staticmethod
+    def helper_argv(payload: Dict) -> List[str]:
+        """Intérprete + run_steps autocontenido + lote en JSON (sin shell ni interpolación)"""
+        source = "from typing import Callable, Dict, Optional\n" + inspect.getsource(run_steps)
+        source += "\nimport json, sys\nprint(json.dumps(run_steps(json.loads(sys.argv[1]))))\n"
+        return [sys.executable, "-I", "-c", source, json.dumps(payload)]
+
+    def run_batch(self, steps: List[Dict], rollback: Optional[List[Dict]] = None,
+                  rollback_from: int = 0) -> Dict:
+        payload = {'steps': steps, 'rollback': rollback or [], 'rollback_from': rollback_from}
+        if not self.elevate:
+            return run_steps(payload)
+        try:
+            result = subprocess.run(self.elevate + self.helper_argv(payload),
+                                    capture_output=True, text=True, timeout=300)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            return {'failed': 0, 'outputs': [], 'error': str(e)}
+        try:
+            return json.loads(result.stdout.strip().splitlines()[-1])
+        except (ValueError, IndexError):
+            # pkexec cancelado o denegado: no se ejecutó ningún paso
+            return {'failed': 0, 'outputs': [], 'error': result.stderr.strip() or f"exit code {result.returncode}"}
+
+
+class RecordingOps(PrivilegedOps):
+    """Implementación falsa para pruebas: registra y devuelve respuestas fijadas"""
+
+    def __init__(self, responses: Optional[Dict[str, Tuple[int, str, str]]] = None):
+        """
+        Args:
+            responses: Comando (argv[0]) -> (returncode, stdout, stderr)
+        """
+        self.responses = responses or {}
+        self.commands: List[List[str]] = []
+        self.writes: List[Tuple[str, str]] = []
+        self.batches = 0  # Elevaciones (contraseñas) que habría pedido
+
+    def _execute(self, step: Dict) -> Tuple[int, str, str]:
+        if 'write' in step:
+            self.writes.append((step['write'], step['value']))
+            return 0, '', ''
+        self.commands.append(list(step['argv']))
+        return self.responses.get(step['argv'][0], (0, "", ""))
+
+    def run_batch(self, steps: List[Dict], rollback: Optional[List[Dict]] = None,
+                  rollback_from: int = 0) -> Dict:
+        self.batches += 1
+        payload = {'steps': steps, 'rollback': rollback or [], 'rollback_from': rollback_from}
+        return run_steps(payload, execute=self._execute)
+
+
+class SwapManager:
+    """Gestor de swapfile / zram / zswap"""
+
+    def __init__(self, ops: Optional[PrivilegedOps] = None, proc_root: str = "/proc",
+                 sys_root: str = "/sys"):
+        self.ops = ops or SystemOps()
+        self.proc_root = Path(proc_root)
+        self.sys_root = Path(sys_root)
+        self._last_vmstat: Optional[Tuple[float, Dict[str, int]]] = None
+
+    # --- ESTADO ---
+    def list_swaps(self) -> List[Dict]:
+        """Dispositivos de swap activos (/proc/swaps)"""
+        swaps = []
+        try:
+            with open(self.proc_root / "swaps", 'r') as f:
+                next(f, None)  # Cabecera
+                for line in f:
+                    parts = line.split()
+                    if len(parts) >= 5:
+                        swaps.append({
+                            'path': parts[0], 'type': parts[1],
+                            'size_gb': int(parts[2]) / 1024**2,
+                            'used_gb': int(parts[3]) / 1024**2,
+                            'priority': int(parts[4])
+                        })
+        except OSError:
+            pass
+        return swaps
+
+    def filesystem_of(self, path: str) -> str:
+        """Tipo de sistema de ficheros del punto de montaje más largo que contiene path"""
+        best, fstype = "", "unknown"
+        target = os.path.abspath(path)
+        try:
+            with open(self.proc_root / "mounts", 'r') as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) < 3:
+                        continue
+                    mount = parts[1]
+                    if (target == mount or target.startswith(mount.rstrip('/') + '/')) and len(mount) > len(best):
+                        best, fstype = mount, parts[2]
+        except OSError:
+            pass
+        return fstype
+
+    # --- SWAPFILE ---
+    def provision_swapfile(self, path: str = DEFAULT_SWAPFILE, size_gb: float = 4,
+                           priority: int = 10) -> Dict:
+        """
+        Crear y activar un swapfile preasignado. Nunca reutiliza ni borra un
+        fichero que ya existía y no es un swap activo: sólo se deshace lo que
+        el propio lote ha creado.
+
+        Args:
+            path: Ruta del swapfile
+            size_gb: Tamaño en GB
+            priority: Prioridad de swapon (zram usa una mayor para ir primero)
+
+        Returns:
+            Dict con success, pasos ejecutados y error
+        """
+        if any(s['path'] == path for s in self.list_swaps()):
+            return {'success': True, 'path': path, 'steps': [], 'note': 'already active'}
+
+        if os.path.lexists(path):
+            return {'success': False, 'path': path, 'steps': [],
+                    'error': f'{path} already exists and is not an active swap'}
+
+        fstype = self.filesystem_of(os.path.dirname(path) or "/")
+        if fstype in ("zfs", "tmpfs", "overlay", "nfs", "nfs4"):
+            return {'success': False, 'path': path, 'steps': [],
+                    'error': f'{fstype} cannot host a swapfile'}
+
+        size_bytes = int(size_gb * 1024**3)
+        # test ! -e: la misma comprobación dentro del lote elevado, por si el
+        # usuario no puede ver el directorio o el fichero apareció entretanto
+        steps = [cmd("mkdir", "-p", os.path.dirname(path)), cmd("test", "!", "-e", path)]
+        created_from = len(steps)
+        if fstype == "btrfs":
+            # btrfs: sin copy-on-write ni compresión, y antes de asignar datos
+            steps += [cmd("truncate", "-s", "0", path), cmd("chattr", "+C", path)]
+        steps += [
+            cmd("fallocate", "-l", str(size_bytes), path),
+            cmd("chmod", "600", path),
+            cmd("mkswap", path),
+            cmd("swapon", "--priority", str(priority), path)
+        ]
+
+        # Un solo lote; si un paso falla tras crear el fichero, no dejarlo a
+        # medias ocupando disco (si falla antes, el fichero no es nuestro)
+        result = self.ops.run_batch(steps, rollback=[cmd("rm", "-f", path)], rollback_from=created_from)
+        ran = steps if result['failed'] < 0 else steps[:result['failed'] + 1]
+        done = [' '.join(step['argv']) for step in ran]
+        if result['failed'] == created_from - 1:
+            return {'success': False, 'path': path, 'steps': done,
+                    'error': f'{path} already exists and is not an active swap'}
+        if result['failed'] >= 0:
+            return {'success': False, 'path': path, 'steps': done,
+                    'error': f"{steps[result['failed']]['argv'][0]} failed: {result['error']}"}
+
+        print(f"[Swap] {size_gb:g} GB swapfile active at {path} (priority {priority}, {fstype})")
+        return {'success': True, 'path': path, 'size_gb': size_gb, 'priority': priority,
+                'filesystem': fstype, 'steps': done}
+
+    def remove_swapfile(self, path: str = DEFAULT_SWAPFILE) -> Dict:
+        """Desactivar y borrar un swapfile"""
+        steps = []
+        if any(s['path'] == path for s in self.list_swaps()):
+            steps.append(cmd("swapoff", path))
+        steps.append(cmd("rm", "-f", path))
+        result = self.ops.run_batch(steps)
+        if result['failed'] >= 0:
+            return {'success': False, 'error': f"{steps[result['failed']]['argv'][0]} failed: {result['error']}"}
+        return {'success': True, 'error': None}
+
+    # --- ZRAM ---
+    def setup_zram(self, size_gb: float, algorithm: str = "zstd", priority: int = 100) -> Dict:
+        """
+        Crear un dispositivo zram como swap comprimida de alta prioridad
+
+        Returns:
+            Dict con success y device
+        """
+        # {out:1}: el dispositivo que devuelve zramctl --find
+        steps = [
+            cmd("modprobe", "zram", check=False),
+            cmd("zramctl", "--find", "--size", f"{int(size_gb * 1024)}M", "--algorithm", algorithm),
+            cmd("mkswap", "{out:1}"),
+            cmd("swapon", "--priority", str(priority), "{out:1}")
+        ]
+        result = self.ops.run_batch(steps, rollback=[cmd("zramctl", "--reset", "{out:1}")])
+        device = result['outputs'][1] if len(result['outputs']) > 1 else ''
+        if result['failed'] >= 0 or not device:
+            failed = steps[max(result['failed'], 1)]['argv'][0]
+            return {'success': False, 'device': device or None,
+                    'error': f"{failed} failed: {result['error'] or 'no device'}"}
+
+        print(f"[Swap] zram {device}: {size_gb:g} GB ({algorithm}, priority {priority})")
+        return {'success': True, 'device': device, 'size_gb': size_gb, 'algorithm': algorithm}
+
+    def teardown_zram(self, device: str) -> Dict:
+        """Desactivar y liberar un dispositivo zram"""
+        result = self.ops.run_batch([cmd("swapoff", device, check=False), cmd("zramctl", "--reset", device)])
+        return {'success': result['failed'] < 0, 'error': result['error'] or None}
+
+    # --- ZSWAP ---
+    def _zswap_param(self, name: str) -> Path:
+        return self.sys_root / "module" / "zswap" / "parameters" / name
+
+    def get_zswap_status(self) -> Dict:
+        """Parámetros actuales de zswap"""
+        status = {'available': self._zswap_param("enabled").exists()}
+        for name in ("enabled", "compressor", "max_pool_percent"):
+            try:
+                status[name] = self._zswap_param(name).read_text().strip()
+            except OSError:
+                pass
+        return status
+
+    def configure_zswap(self, enabled: bool = True, compressor: str = "zstd",
+                        max_pool_percent: int = 20) -> Dict:
+        """Activar zswap delante del swap de disco"""
+        if not self._zswap_param("enabled").exists():
+            return {'success': False, 'error': 'zswap not available in this kernel'}
+        result = self.ops.run_batch([
+            write(str(self._zswap_param("compressor")), compressor),
+            write(str(self._zswap_param("max_pool_percent")), str(max_pool_percent)),
+            write(str(self._zswap_param("enabled")), "Y" if enabled else "N")
+        ])
+        return {'success': result['failed'] < 0, 'enabled': enabled, 'compressor': compressor,
+                'max_pool_percent': max_pool_percent, 'error': result['error'] or None}
+
+    # --- TASAS ---
+    def read_vmstat(self) -> Dict[str, int]:
+        """Contadores de swap de /proc/vmstat (páginas)"""
+        counters = {}
+        try:
+            with open(self.proc_root / "vmstat", 'r') as f:
+                for line in f:
+                    key, _, value = line.partition(' ')
+                    if key in ("pswpin", "pswpout"):
+                        counters[key] = int(value)
+        except OSError:
+            pass
+        return counters
+
+    def swap_rates(self) -> Dict:
+        """
+        Tasas de swap-in/out desde la lectura anterior (la primera llamada
+        devuelve 0 y fija la referencia)
+
+        Returns:
+            Dict con pages/s y MB/s de entrada y salida
+        """
+        now, counters = time.time(), self.read_vmstat()
+        previous, self._last_vmstat = self._last_vmstat, (now, counters)
+        rates = {'swapin_pages_s': 0.0, 'swapout_pages_s': 0.0}
+        if previous:
+            elapsed = max(now - previous[0], 1e-6)
+            rates['swapin_pages_s'] = (counters.get('pswpin', 0) - previous[1].get('pswpin', 0)) / elapsed
+            rates['swapout_pages_s'] = (counters.get('pswpout', 0) - previous[1].get('pswpout', 0)) / elapsed
+        rates['swapin_mb_s'] = rates['swapin_pages_s'] * PAGE_SIZE / 1024**2
+        rates['swapout_mb_s'] = rates['swapout_pages_s'] * PAGE_SIZE / 1024**2
+        return rates
+
+    def memory_pressure(self) -> Optional[float]:
+        """PSI memory 'some avg10' (% de tiempo con tareas bloqueadas por memoria)"""
+        try:
+            from psi_monitor import read_pressure
+            return read_pressure(str(self.proc_root / "pressure" / "memory")).some_avg10
+        except (ImportError, OSError, ValueError):
+            return None
+
+    def recommend(self, rates: Optional[Dict] = None) -> Dict:
+        """
+        Elegir el nivel de swap que menos bloqueos provoca con la carga actual
+
+        - Swap-in frecuente (fallos que esperan al disco) -> zram primero
+        - Sólo swap-out (páginas frías saliendo) -> zswap delante del disco basta
+        - Sin swap -> swapfile preasignado
+        """
+        rates = rates or self.swap_rates()
+        swaps = self.list_swaps()
+        pressure = self.memory_pressure()
+        has_zram = any("zram" in s['path'] for s in swaps)
+        zswap_on = self.get_zswap_status().get('enabled') == "Y"
+
+        if not swaps:
+            action, reason = "swapfile", "no swap configured"
+        elif (rates['swapin_mb_s'] > 5 or (pressure or 0) > 10) and not has_zram:
+            action, reason = "zram", "frequent swap-in stalls on disk swap"
+        elif rates['swapout_mb_s'] > 5 and not (zswap_on or has_zram):
+            action, reason = "zswap", "steady swap-out: compress before hitting disk"
+        else:
+            action, reason = "none", "current configuration is not stalling"
+        return {'action': action, 'reason': reason, 'memory_pressure': pressure,
+                'swaps': swaps, **rates}
+
+    def get_status(self) -> Dict:
+        """Swaps activos, zswap y tasas actuales"""
+        return {'swaps': self.list_swaps(), 'zswap': self.get_zswap_status(), **self.swap_rates()}
+
+
+# Instancia global
+_swap_manager: Optional[SwapManager] = None
+
+def get_swap_manager() -> SwapManager:
+    """Obtener el gestor de swap global"""
+    global _swap_manager
+    if _swap_manager is None:
+        _swap_manager = SwapManager()
+    return _swap_manager
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("SWAP MANAGER TEST (recording ops, nothing is changed)")
+    print("=" * 60)
+
+    fake = RecordingOps(responses={"zramctl": (0, "/dev/zram0\n", "")})
+    manager = SwapManager(ops=fake)
+
+    print(f"\nActive swaps: {manager.list_swaps()}")
+    print(f"Filesystem of /var/lib: {manager.filesystem_of('/var/lib')}")
+    print(f"Provision: {manager.provision_swapfile(size_gb=2)['success']}")
+    print(f"zram: {manager.setup_zram(size_gb=4)}")
+    print(f"zswap: {manager.configure_zswap()}")
+    print("\nCommands that would run:")
+    for argv in fake.commands:
+        print(f"  $ {' '.join(argv)}")
+    for path, value in fake.writes:
+        print(f"  {path} <- {value}")
+    print(f"Elevations (password prompts): {fake.batches}")
+
+    # Helper real sin elevación: un paso que falla dispara el rollback
+    real = SystemOps(elevate=[])
+    print(f"Helper: {real.run_batch([cmd('true'), cmd('false')], rollback=[cmd('echo', 'undo')])}")
+
+    manager.swap_rates()
+    time.sleep(1)
+    print(f"\nRecommendation: {manager.recommend()}")
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧾 VDF PARSER
+Lector de KeyValues de Valve: VDF de texto (ACF, libraryfolders.vdf) y
+VDF binario (appinfo.vdf, shortcuts.vdf)
+
+- Tokenizador en streaming por bloques: una expresión regular por token en
+  vez de dividir líneas, con comillas escapadas, bloques anidados,
+  comentarios // y condicionales [$WIN32]
+- find_keys(): modo de salida temprana, deja de leer el fichero en cuanto
+  tiene las claves pedidas (un ACF sólo necesita appid/name/installdir)
+- Binario: shortcuts.vdf (juegos no-Steam) y appinfo.vdf v27/v28/v29 (con
+  tabla de cadenas), filtrando appids sin decodificar el resto
+"""
+
+import re
+import struct
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+CHUNK_SIZE = 16 * 1024
+
+# Un token por coincidencia; el grupo 'bad' captura comillas sin cerrar
+_TOKEN = re.compile(r'''
+    \s*(?:
+    (?P<comment>//[^\n]*)
+  | "(?P<quoted>(?:[^"\\]|\\.)*)"
+  | (?P<open>\{)
+  | (?P<close>\})
+  | (?P<cond>\[[^\]\n]*\])
+  | (?P<bare>[^\s{}"\[][^\s{}"]*)
+  | (?P<bad>["\[])
+  | (?P<ws>\Z)
+    )
+''', re.VERBOSE | re.DOTALL)
+
+_ESCAPES = {'n': '\n', 't': '\t', '\\': '\\', '"': '"'}
+_ESCAPE = re.compile(r'\\(.)', re.DOTALL)
+
+# Tokens del iterador
+OPEN, CLOSE, STRING = 0, 1, 2
+
+
+class VDFError(ValueError):
+    """VDF mal formado"""
+
+
+def _unescape(text: str) -> str:
+    if '\\' not in text:
+        return text
+    return _ESCAPE.sub(lambda m: _ESCAPES.get(m.group(1), '\\' + m.group(1)), text)
+
+
+def _chunks_of(source) -> Iterator[str]:
+    """Bloques de texto de una ruta, un fichero abierto o una cadena"""
+    if isinstance(source, str) and ('\n' in source or '{' in source or '"' in source):
+        yield source
+        return
+    if isinstance(source, (str, Path)):
+        with open(source, 'r', encoding='utf-8', errors='replace') as f:
+            yield from iter(lambda: f.read(CHUNK_SIZE), '')
+        return
+    yield from iter(lambda: source.read(CHUNK_SIZE), '')
+
+
+def iter_tokens(chunks: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    """
+    Tokens (tipo, texto) de un VDF de texto leído por bloques
+
+    Un token que cruza el final de un bloque se completa con el siguiente.
+    """
+    buffer = ""
+    chunks = iter(chunks)
+    eof = False
+    while not eof:
+        try:
+            buffer += next(chunks)
+        except StopIteration:
+            eof = True
+        pos, end = 0, len(buffer)
+        while pos < end:
+            match = _TOKEN.match(buffer, pos)
+            if match is None:
+                raise VDFError(f"unexpected character {buffer[pos]!r}")
+            kind = match.lastgroup
+            # Un token que toca el final del bloque puede continuar en el siguiente
+            if not eof and (match.end() == end or kind == 'bad'):
+                break
+            pos = match.end()
+            if kind == 'quoted':
+                yield STRING, _unescape(match.group('quoted'))
+            elif kind == 'open':
+                yield OPEN, '{'
+            elif kind == 'close':
+                yield CLOSE, '}'
+            elif kind == 'bare':
+                yield STRING, match.group('bare')
+            elif kind == 'bad':
+                raise VDFError(f"unterminated {match.group('bad')!r}")
+        buffer = buffer[pos:]
+
+
+def _parse(tokens: Iterator[Tuple[int, str]]) -> Dict:
+    root: Dict = {}
+    stack = [root]
+    key = None
+    for kind, text in tokens:
+        current = stack[-1]
+        if kind == STRING:
+            if key is None:
+                key = text
+            else:
+                current[key] = text
+                key = None
+        elif kind == OPEN:
+            if key is None:
+                raise VDFError("block without a key")
+            child = current.get(key)
+            if not isinstance(child, dict):  # Clave repetida: se fusionan los bloques
+                child = current[key] = {}
+            stack.append(child)
+            key = None
+        else:
+            if key is not None or len(stack) == 1:
+                raise VDFError("unexpected '}'")
+            stack.pop()
+    if key is not None or len(stack) != 1:
+        raise VDFError("unexpected end of data")
+    return root
+
+
+def loads(text: str) -> Dict:
+    """VDF de texto -> dict anidado"""
+    return _parse(iter_tokens([text]))
+
+
+def load(source: Union[str, Path]) -> Dict:
+    """VDF de texto desde una ruta o un fichero abierto"""
+    return _parse(iter_tokens(_chunks_of(source)))
+
+
+def find_keys(source, keys: Iterable[str], depth: int = 1) -> Dict[str, str]:
+    """
+    Buscar claves de valor simple a una profundidad y dejar de leer al tenerlas
+
+    Args:
+        source: Ruta, fichero abierto o texto VDF
+        keys: Claves buscadas (sin distinguir mayúsculas, como hace Steam)
+        depth: Nivel de los valores (1 = dentro del bloque raíz, p.ej. "AppState")
+
+    Returns:
+        {clave en minúsculas: valor} con las claves encontradas
+    """
+    wanted = {key.lower() for key in keys}
+    found: Dict[str, str] = {}
+    level = 0
+    key = None
+    for kind, text in iter_tokens(_chunks_of(source)):
+        if kind == STRING:
+            if key is None:
+                key = text
+                continue
+            if level == depth and key.lower() in wanted:
+                found.setdefault(key.lower(), text)
+                if len(found) == len(wanted):
+                    break  # Salida temprana: el resto del fichero no se lee
+            key = None
+        elif kind == OPEN:
+            level += 1
+            key = None
+        else:
+            level -= 1
+    return found
+
+
+def dumps(data: Dict, indent: int = 0) -> str:
+    """dict anidado -> VDF de texto"""
+    lines = []
+    pad = '\t' * indent
+    for key, value in data.items():
+        qkey = '"' + str(key).replace('\\', '\\\\').replace('"', '\\"') + '"'
+        if isinstance(value, dict):
+            lines.append(f"{pad}{qkey}\n{pad}{{\n{dumps(value, indent + 1)}{pad}}}\n")
+        else:
+            qvalue = str(value).replace('\\', '\\\\').replace('"', '\\"')
+            lines.append(f'{pad}{qkey}\t\t"{qvalue}"\n')
+    return ''.join(lines)
+
+
+# --- VDF BINARIO ---
+_BIN_MAP, _BIN_STRING, _BIN_INT32, _BIN_FLOAT = 0x00, 0x01, 0x02, 0x03
+_BIN_POINTER, _BIN_WSTRING, _BIN_COLOR, _BIN_UINT64 = 0x04, 0x05, 0x06, 0x07
+_BIN_END, _BIN_INT64, _BIN_END_ALT = 0x08, 0x0A, 0x0B
+
+_INT32 = struct.Struct('<i')
+_UINT32 = struct.Struct('<I')
+_FLOAT = struct.Struct('<f')
+_UINT64 = struct.Struct('<Q')
+_INT64 = struct.Struct('<q')
+
+
+def _read_cstring(data: bytes, pos: int) -> Tuple[str, int]:
+    end = data.find(b'\0', pos)
+    if end < 0:
+        raise VDFError("unterminated string")
+    return data[pos:end].decode('utf-8', errors='replace'), end + 1
+
+
+def binary_loads(data: bytes, pos: int = 0, key_table: Optional[List[str]] = None) -> Tuple[Dict, int]:
+    """
+    VDF binario -> (dict, posición tras el bloque)
+
+    Args:
+        data: Bytes
+        pos: Desplazamiento inicial
+        key_table: Tabla de cadenas de appinfo v29 (claves como índice int32)
+    """
+    root: Dict = {}
+    stack = [root]
+    size = len(data)
+    try:
+        while True:
+            if pos >= size:
+                raise VDFError("unexpected end of binary data")
+            kind = data[pos]
+            pos += 1
+            if kind in (_BIN_END, _BIN_END_ALT):
+                if len(stack) == 1:
+                    return root, pos
+                stack.pop()
+                continue
+            if key_table is not None:
+                index = _INT32.unpack_from(data, pos)[0]
+                if not 0 <= index < len(key_table):
+                    raise VDFError(f"key index {index} out of range at {pos}")
+                key = key_table[index]
+                pos += 4
+            else:
+                key, pos = _read_cstring(data, pos)
+            current = stack[-1]
+            if kind == _BIN_MAP:
+                child: Dict = {}
+                current[key] = child
+                stack.append(child)
+            elif kind == _BIN_STRING:
+                current[key], pos = _read_cstring(data, pos)
+            elif kind == _BIN_WSTRING:
+                # Terminador UTF-16 alineado a 2 bytes; acotado por el tamaño (datos truncados)
+                end = pos
+                while end + 1 < size and data[end:end + 2] != b'\0\0':
+                    end += 2
+                if end + 1 >= size:
+                    raise VDFError("unterminated wide string")
+                current[key] = data[pos:end].decode('utf-16-le', errors='replace')
+                pos = end + 2
+            elif kind in (_BIN_INT32, _BIN_POINTER, _BIN_COLOR):
+                current[key] = _INT32.unpack_from(data, pos)[0]
+                pos += 4
+            elif kind == _BIN_FLOAT:
+                current[key] = _FLOAT.unpack_from(data, pos)[0]
+                pos += 4
+            elif kind == _BIN_UINT64:
+                current[key] = _UINT64.unpack_from(data, pos)[0]
+                pos += 8
+            elif kind == _BIN_INT64:
+                current[key] = _INT64.unpack_from(data, pos)[0]
+                pos += 8
+            else:
+                raise VDFError(f"unknown binary type 0x{kind:02x} at {pos - 1}")
+    except (struct.error, IndexError) as e:
+        raise VDFError(f"truncated binary data: {e}") from None
+
+
+def binary_dumps(data: Dict) -> bytes:
+    """dict -> VDF binario (str, int32 y mapas; lo que usa shortcuts.vdf)"""
+    out = bytearray()
+
+    def write(block: Dict):
+        for key, value in block.items():
+            bkey = str(key).encode('utf-8') + b'\0'
+            if isinstance(value, dict):
+                out.extend(bytes([_BIN_MAP]) + bkey)
+                write(value)
+                out.append(_BIN_END)
+            elif isinstance(value, int):
+                out.extend(bytes([_BIN_INT32]) + bkey + _INT32.pack(value))
+            else:
+                out.extend(bytes([_BIN_STRING]) + bkey + str(value).encode('utf-8') + b'\0')
+    write(data)
+    out.append(_BIN_END)
+    return bytes(out)
+
+
+def read_shortcuts(path: Union[str, Path]) -> List[Dict]:
+    """
+    Juegos no-Steam de userdata/<id>/config/shortcuts.vdf
+
+    Returns:
+        Lista de atajos (claves en minúsculas: appname, exe, startdir, appid...)
+    """
+    data = Path(path).read_bytes()
+    root, _ = binary_loads(data)
+    shortcuts = next(iter(root.values()), {}) if root else {}
+    return [{key.lower(): value for key, value in entry.items()}
+            for entry in shortcuts.values() if isinstance(entry, dict)]
+
+
+APPINFO_MAGIC = {0x07564427: 27, 0x07564428: 28, 0x07564429: 29}
+
+
+def read_appinfo(path: Union[str, Path], app_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict]:
+    """
+    Leer appcache/appinfo.vdf
+
+    Args:
+        path: Ruta de appinfo.vdf
+        app_ids: Decodificar sólo estas apps (el resto se salta por tamaño)
+
+    Returns:
+        {appid: datos}
+    """
+    data = Path(path).read_bytes()
+    magic, _universe = struct.unpack_from('<II', data, 0)
+    version = APPINFO_MAGIC.get(magic)
+    if version is None:
+        raise VDFError(f"unknown appinfo magic 0x{magic:08x}")
+    pos = 8
+    key_table = None
+    if version >= 29:
+        table_offset = _INT64.unpack_from(data, pos)[0]
+        pos += 8
+        count = _UINT32.unpack_from(data, table_offset)[0]
+        key_table, cursor = [], table_offset + 4
+        for _ in range(count):
+            key, cursor = _read_cstring(data, cursor)
+            key_table.append(key)
+    wanted = set(app_ids) if app_ids is not None else None
+    # appid, size | info_state, last_updated, access_token, sha1, change_number [, sha1 binario]
+    header = 4 + 4 + 8 + 20 + 4 + (20 if version >= 28 else 0)
+
+    apps: Dict[int, Dict] = {}
+    while pos + 4 <= len(data):
+        appid = _UINT32.unpack_from(data, pos)[0]
+        if appid == 0:
+            break
+        size = _UINT32.unpack_from(data, pos + 4)[0]
+        body = pos + 8
+        if wanted is None or appid in wanted:
+            apps[appid], _ = binary_loads(data, body + header, key_table)
+            if wanted is not None and len(apps) == len(wanted):
+                break
+        pos = body + size
+    return apps
+
+
+if __name__ == "__main__":
+    import time
+
+    print("=" * 60)
+    print("VDF PARSER TEST")
+    print("=" * 60)
+
+    acf = ('"AppState"\n{\n\t"appid"\t\t"570"\n\t"name"\t\t"Dota \\"2\\""\n'
+           '\t"installdir"\t\t"dota 2 beta"\n\t"UserConfig"\n\t{\n\t\t"language"\t\t"english"\n\t}\n'
+           '\t"InstalledDepots" // comentario\n\t{\n\t\t"373301"\n\t\t{\n\t\t\t"manifest"\t\t"1"\n\t\t}\n\t}\n}\n')
+    parsed = loads(acf)
+    print(f"Parsed: name={parsed['AppState']['name']!r} depots={parsed['AppState']['InstalledDepots']}")
+    print(f"find_keys: {find_keys(acf, ['appid', 'name', 'installdir'])}")
+    assert loads(dumps(parsed)) == parsed
+
+    shortcuts = {'shortcuts': {'0': {'appid': -1234567, 'AppName': 'Emulator',
+                                     'Exe': '"/usr/bin/retroarch"', 'StartDir': '"/usr/bin/"'}}}
+    blob = binary_dumps(shortcuts)
+    print(f"Binary round-trip: {binary_loads(blob)[0] == shortcuts} ({len(blob)} bytes)")
+
+    library = {'libraryfolders': {str(i): {'path': f'/mnt/disk{i}/SteamLibrary', 'apps': {
+        str(100 + j): str(j * 1000) for j in range(50)}} for i in range(200)}}
+    text = dumps(library)
+    start = time.perf_counter()
+    loads(text)
+    print(f"libraryfolders with 200 libraries / 10000 apps ({len(text) / 1024:.0f} KB): "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms")
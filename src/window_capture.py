@@ -16,6 +16,10 @@ from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QHBoxLa
 from PySide6.QtCore import QTimer, Qt
 from PySide6.QtGui import QImage, QPainter, QPixmap
 
+from process_registry import get_process_registry
+from process_supervisor import get_process_supervisor
+from memory_profiler import get_memory_accounting
+
 # Detectar sistema operativo
 IS_WINDOWS = platform.system() == "Windows"
 IS_LINUX = platform.system() == "Linux"
@@ -29,7 +33,7 @@ class CapturedAppWindow(QWidget):
     """
     Ventana que captura y muestra una aplicación externa dentro de Neuro-OS
     """
-    def __init__(self, app_path, app_name="Application", parent=None):
+    def __init__(self, app_path, app_name="Application", parent=None, spawn_settings=None):
         super().__init__(parent, Qt.Window)
         self.setWindowTitle(f"🪟 {app_name} - Neuro-OS")
         self.resize(1200, 800)
@@ -46,6 +50,7 @@ class CapturedAppWindow(QWidget):
         
         self.app_path = app_path
         self.app_name = app_name
+        self.spawn_settings = spawn_settings  # SpawnSettings: lanzar como juego supervisado
         self.process = None
         self.hwnd = None
         self.captured_image = None
@@ -163,7 +168,14 @@ class CapturedAppWindow(QWidget):
     def launch_app(self):
         """Lanzar la aplicación externa"""
         try:
-            self.process = subprocess.Popen([self.app_path])
+            if self.spawn_settings is not None:
+                # Juego: nace con prioridad/afinidad aplicadas y se vigila su árbol
+                cwd = str(Path(self.app_path).parent)
+                self.process = get_process_supervisor().spawn([self.app_path], cwd=cwd,
+                                                              settings=self.spawn_settings)
+            else:
+                self.process = subprocess.Popen([self.app_path])
+                get_process_registry().register_helper(self.process.pid, "captured_app")
             self.status_label.setText(f"Searching for {self.app_name} window...")
             
             # Timer para buscar la ventana
@@ -353,6 +365,11 @@ class CapturedAppWindow(QWidget):
             # Actualizar la imagen
             pixmap = QPixmap.fromImage(self.captured_image)
             self.image_label.setPixmap(pixmap)
+            
+            # Contabilidad de memoria (no-op si el profiler está desactivado)
+            accounting = get_memory_accounting()
+            accounting.register_buffer("capture", f"{id(self)}:image", self.captured_image)
+            accounting.register_buffer("capture", f"{id(self)}:pixmap", pixmap)
             self.image_label.setGeometry(self.capture_container.rect())
     
     def resizeEvent(self, event):
@@ -378,4 +395,8 @@ class CapturedAppWindow(QWidget):
                 self.process.terminate()
             except:
                 pass
+            get_process_registry().unregister(self.process.pid)
+        accounting = get_memory_accounting()
+        accounting.release_buffer("capture", f"{id(self)}:image")
+        accounting.release_buffer("capture", f"{id(self)}:pixmap")
         event.accept()
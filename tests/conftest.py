@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Los módulos de Neuro-OS son planos en src/ (igual que al ejecutarlos desde allí)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+# Cachés y datos de la app (app_paths) fuera de la carpeta del usuario durante los tests
+_app_dirs = tempfile.mkdtemp(prefix="neuro_os_tests_")
+os.environ.setdefault("NEURO_OS_CACHE_DIR", os.path.join(_app_dirs, "cache"))
+os.environ.setdefault("NEURO_OS_DATA_DIR", os.path.join(_app_dirs, "data"))
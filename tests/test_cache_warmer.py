@@ -0,0 +1,35 @@
+"""Claves de manifiesto y filtro de rutas del grabador de accesos"""
+
+from cache_warmer import AccessRecorder, CacheWarmer, game_key
+
+
+def test_same_exe_name_in_different_games_does_not_collide(tmp_path):
+    first = tmp_path / "GameA" / "game.exe"
+    second = tmp_path / "GameB" / "game.exe"
+    for exe in (first, second):
+        exe.parent.mkdir()
+        exe.write_bytes(b"MZ")
+    assert game_key(str(first)) != game_key(str(second))
+    assert game_key(str(first)).startswith("gamea_")
+
+
+def test_exe_and_install_dir_share_a_key(tmp_path):
+    exe = tmp_path / "MyGame" / "Binaries" / "Win64" / "MyGame.exe"
+    exe.parent.mkdir(parents=True)
+    exe.write_bytes(b"MZ")
+    assert game_key(str(exe)) == game_key(str(tmp_path / "MyGame"))
+
+
+def test_name_only_key():
+    assert game_key("Dark Souls III") == "dark_souls_iii"
+
+
+def test_root_prefix_requires_separator(tmp_path):
+    recorder = AccessRecorder(1, root_dirs=[str(tmp_path / "foo")])
+    assert recorder._wanted(str(tmp_path / "foo" / "data.pak"))
+    assert not recorder._wanted(str(tmp_path / "foobar" / "data.pak"))
+
+
+def test_default_manifest_dir_is_user_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("NEURO_OS_CACHE_DIR", str(tmp_path))
+    assert CacheWarmer().manifest_dir == tmp_path / "cache_manifests"
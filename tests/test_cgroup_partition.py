@@ -0,0 +1,198 @@
+"""ResourcePartitionManager contra un árbol cgroupfs falso"""
+
+import json
+import subprocess
+import sys
+import threading
+
+import pytest
+
+import cgroup_partition
+from cgroup_partition import PARTITION_NAME, ResourcePartitionManager
+
+
+@pytest.fixture
+def procs():
+    """Procesos reales (psutil necesita create_time) que se pueden mover"""
+    children = [subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"]) for _ in range(3)]
+    yield [child.pid for child in children]
+    for child in children:
+        child.kill()
+        child.wait()
+
+
+@pytest.fixture
+def fake_tree(tmp_path, procs):
+    root = tmp_path / "cgroup"
+    proc = tmp_path / "proc"
+    (root / "app.slice").mkdir(parents=True)
+    (root / "cgroup.controllers").write_text("cpu memory io")
+    for pid in procs:
+        (proc / str(pid)).mkdir(parents=True)
+        (proc / str(pid) / "cgroup").write_text("0::/app.slice\n")
+    return root, proc, tmp_path / "state.json"
+
+
+class RecordingManager(ResourcePartitionManager):
+    """Anota a qué cgroup se movió cada PID (cgroup.procs falso sólo guarda el último)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.location = {}
+
+    def _move(self, pid, target, errors):
+        if super()._move(pid, target, errors):
+            self.location[pid] = target.relative_to(self.cgroup_root).as_posix()
+            return True
+        return False
+
+
+def make_manager(fake_tree):
+    root, proc, state = fake_tree
+    return RecordingManager(cgroup_root=str(root), parent="", proc_root=str(proc), state_file=str(state))
+
+
+def test_partition_applies_limits_and_persists_origin(fake_tree, procs):
+    manager = make_manager(fake_tree)
+    result = manager.partition(game_pids=[procs[0]], background_pids=procs[1:])
+
+    assert result['success'] and result['moved'] == 3
+    assert manager.location[procs[0]] == f"{PARTITION_NAME}/game"
+    assert manager.location[procs[1]] == f"{PARTITION_NAME}/background"
+    background = fake_tree[0] / PARTITION_NAME / "background"
+    assert (background / "cpu.weight").read_text() == "20"
+    assert (background / "io.weight").read_text() == "default 25"
+    assert int((background / "memory.high").read_text()) > 0
+    quota, period = (background / "cpu.max").read_text().split()
+    assert period == "100000" and int(quota) > 0
+
+    state = json.loads(fake_tree[2].read_text())
+    assert state['processes'][str(procs[1])]['origin'] == "/app.slice"
+
+
+def test_restore_returns_processes_and_removes_slices(fake_tree, procs):
+    manager = make_manager(fake_tree)
+    manager.partition(game_pids=[], background_pids=procs)
+    result = manager.restore()
+
+    assert result['restored'] == 3
+    assert all(manager.location[pid] == "app.slice" for pid in procs)
+    assert not (fake_tree[0] / PARTITION_NAME).exists()
+    assert not fake_tree[2].exists()
+
+
+def test_owners_do_not_undo_each_other(fake_tree, procs):
+    manager = make_manager(fake_tree)
+    manager.partition(game_pids=[], background_pids=procs[:2], owner="crash_protection")
+    manager.partition(game_pids=[], background_pids=procs[1:], owner="psi")
+
+    # Liberar un dueño sólo devuelve lo que nadie más reclama
+    manager.restore(owner="crash_protection")
+    assert manager.location[procs[0]] == "app.slice"
+    assert manager.location[procs[1]] == f"{PARTITION_NAME}/background"
+    assert manager.is_claimed("psi") and not manager.is_claimed("crash_protection")
+    assert (fake_tree[0] / PARTITION_NAME / "background").exists()
+
+    manager.restore(owner="psi")
+    assert all(manager.location[pid] == "app.slice" for pid in procs)
+    assert not manager.is_active
+    assert not (fake_tree[0] / PARTITION_NAME).exists()
+
+
+def test_game_is_never_throttled(fake_tree, procs):
+    manager = make_manager(fake_tree)
+    manager.partition(game_pids=[], background_pids=[procs[0]], owner="ram_manager")
+    result = manager.partition(game_pids=[procs[0]], background_pids=[procs[0]], owner="game")
+
+    assert result['skipped'] == 1
+    assert manager.location[procs[0]] == f"{PARTITION_NAME}/game"
+
+
+def test_session_critical_processes_are_skipped(fake_tree, procs, monkeypatch):
+    import psutil
+    name = psutil.Process(procs[0]).name().lower()
+    monkeypatch.setattr(cgroup_partition, "SESSION_CRITICAL_NAMES", {name})
+
+    manager = make_manager(fake_tree)
+    result = manager.partition(game_pids=[], background_pids=procs)
+
+    assert result['skipped'] == 3 and result['moved'] == 0
+    assert manager.location == {}
+
+
+def test_recover_after_crash(fake_tree, procs):
+    make_manager(fake_tree).partition(game_pids=[procs[0]], background_pids=procs[1:], owner="game")
+
+    # Un gestor nuevo (siguiente arranque) encuentra el estado y lo deshace todo
+    recovered = make_manager(fake_tree)
+    result = recovered.recover()
+
+    assert result['restored'] == 3
+    assert all(recovered.location[pid] == "app.slice" for pid in procs)
+    assert not (fake_tree[0] / PARTITION_NAME).exists()
+
+
+def test_corrupt_state_is_ignored(fake_tree):
+    fake_tree[2].write_text("{not json")
+    assert make_manager(fake_tree).recover() is None
+    assert not fake_tree[2].exists()
+
+
+def test_state_defaults_to_user_data_dir(fake_tree, tmp_path, monkeypatch):
+    monkeypatch.setenv("NEURO_OS_DATA_DIR", str(tmp_path / "data"))
+    root, proc, _ = fake_tree
+    manager = ResourcePartitionManager(cgroup_root=str(root), parent="", proc_root=str(proc))
+    assert manager.state_file == tmp_path / "data" / "cgroup_partition_state.json"
+
+
+def test_unwritable_state_is_logged_not_raised(fake_tree, procs, tmp_path):
+    root, proc, _ = fake_tree
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("")
+    manager = RecordingManager(cgroup_root=str(root), parent="", proc_root=str(proc),
+                               state_file=str(blocker / "state.json"))
+    result = manager.partition(game_pids=[], background_pids=procs[:1])
+    assert result['moved'] == 1
+    manager.register_process(procs[1], origin="/app.slice")
+    assert manager.restore()['restored'] == 2
+
+
+def test_concurrent_owners_keep_state_consistent(fake_tree, procs):
+    manager = make_manager(fake_tree)
+    manager.partition(game_pids=[], background_pids=procs[:1], owner="psi")
+    errors = []
+
+    def worker(owner):
+        try:
+            for _ in range(30):
+                manager.register_process(procs[1], origin="/app.slice", owner=owner)
+                manager.partition(game_pids=[], background_pids=procs[2:], owner=owner)
+                manager.restore(owner=owner)
+        except Exception as e:  # noqa: BLE001 - cualquier fallo de un hilo suspende el test
+            errors.append(e)
+    threads = [threading.Thread(target=worker, args=(owner,)) for owner in ("game", "ram_manager", "radar")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+
+    assert errors == []
+    assert manager.is_claimed("psi")
+    state = json.loads(fake_tree[2].read_text())
+    assert state['owners'] == ["psi"]
+    assert not list(fake_tree[2].parent.glob("*.tmp"))
+
+
+def test_background_slice_gets_spare_cpus(fake_tree, procs, monkeypatch):
+    import cpu_topology
+    # 4 núcleos SMT: el juego se queda 2-7, el resto (0-1) es del slice background
+    planner = cpu_topology.AffinityPlanner(cpu_topology.CPUTopology.from_cpu_count(8, 4))
+    monkeypatch.setattr(cpu_topology, "_planner", planner)
+
+    manager = make_manager(fake_tree)
+    manager.partition(game_pids=[procs[0]], background_pids=procs[1:])
+
+    base = fake_tree[0] / PARTITION_NAME
+    assert (base / "background" / "cpuset.cpus").read_text() == "0,1"
+    assert not (base / "game" / "cpuset.cpus").exists()
+    assert "+cpuset" in (base / "cgroup.subtree_control").read_text()
@@ -0,0 +1,94 @@
+"""Lotes con una sola escritura, recarga del fichero con avisos y tipos del esquema"""
+
+import json
+import os
+
+import pytest
+
+from config_manager import ConfigManager
+
+
+@pytest.fixture
+def config(tmp_path):
+    manager = ConfigManager(str(tmp_path / "config.json"))
+    manager.save_config()
+    yield manager
+    manager.store.close()
+
+
+def test_batched_sets_write_once(config):
+    seen = []
+    config.subscribe('performance', lambda key, value, old: seen.append((key, value, old)))
+    writes = config.store.stats['writes']
+
+    with config.batch(flush=True):
+        config.set('performance.enable_radar', False)
+        config.set('performance.radar_interval_ms', 1000)
+        config.set('performance.radar_interval_ms', 1500)
+        assert seen == []  # Nadie se entera hasta cerrar el lote
+    assert config.store.stats['writes'] == writes + 1
+    assert sorted(seen) == [('performance.enable_radar', False, True),
+                            ('performance.radar_interval_ms', 1500, 3000)]
+
+    assert config.update({'ui.theme': 'neon', 'ui.animations': False}, flush=True)
+    assert config.store.stats['writes'] == writes + 2
+    on_disk = json.loads(config.config_file.read_text())
+    assert on_disk['performance']['radar_interval_ms'] == 1500 and on_disk['ui']['theme'] == 'neon'
+
+    # Repetir el mismo valor no escribe ni avisa
+    config.set('ui.theme', 'neon')
+    assert not config.store.dirty and len(seen) == 2
+
+
+def test_external_edit_notifies_observers(config):
+    seen = []
+    config.subscribe('', lambda key, value, old: seen.append((key, value, old)))
+    assert config.reload_if_changed() == []  # Nuestra propia escritura no es un cambio
+
+    data = json.loads(config.config_file.read_text())
+    data['performance']['radar_interval_ms'] = 750
+    data['ui']['theme'] = 'light'
+    config.config_file.write_text(json.dumps(data))
+    stat = config.config_file.stat()
+    os.utime(config.config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert sorted(config.reload_if_changed()) == ['performance.radar_interval_ms', 'ui.theme']
+    assert sorted(seen) == [('performance.radar_interval_ms', 750, 3000), ('ui.theme', 'light', 'dark')]
+    assert config.get('performance.radar_interval_ms') == 750
+    assert not config.store.dirty
+    assert config.reload_if_changed() == []
+
+
+def test_unsaved_local_change_wins_over_reload(config):
+    config.set('ui.theme', 'neon')  # Escritura diferida, aún sin volcar
+    data = json.loads(config.config_file.read_text())
+    data['ui']['theme'] = 'light'
+    data['ui']['animations'] = False
+    config.config_file.write_text(json.dumps(data, indent=1))
+
+    assert config.reload_if_changed() == ['ui.animations']
+    assert config.get('ui.theme') == 'neon'
+
+
+def test_schema_type_mismatch(config):
+    seen = []
+    config.subscribe('performance', lambda key, value, old: seen.append(key))
+
+    assert not config.set('performance.enable_radar', 'maybe')
+    assert not config.set('performance.radar_interval_ms', [1, 2])
+    assert config.get('performance.enable_radar') is True
+    assert config.get('performance.radar_interval_ms') == 3000
+    assert seen == [] and not config.store.dirty
+
+    assert config.set('performance.radar_interval_ms', '5000')
+    assert config.get('performance.radar_interval_ms') == 5000
+    assert config.set('performance.enable_radar', 'off')
+    assert config.get('performance.enable_radar') is False
+
+    # Un valor inválido en el fichero se ignora al recargar
+    config.save_config()
+    data = json.loads(config.config_file.read_text())
+    data['performance']['memory_threshold_mb'] = "lots"
+    config.config_file.write_text(json.dumps(data, indent=1))
+    assert config.reload_if_changed() == []
+    assert config.get('performance.memory_threshold_mb') == 250
@@ -0,0 +1,86 @@
+"""Plan de afinidades sobre topologías sysfs de fixture"""
+
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from cpu_topology import AffinityPlanner, CPUTopology
+
+
+def write_fixture_topology(root: str, cores: List[Dict]) -> None:
+    """
+    Crear un árbol sysfs de fixture
+
+    Args:
+        root: Directorio destino
+        cores: Lista de núcleos físicos: {'threads': n, 'l3': id, 'capacity': int}
+    """
+    base = Path(root)
+    cpu = 0
+    layout = []
+    for core_id, core in enumerate(cores):
+        threads = list(range(cpu, cpu + core.get('threads', 1)))
+        layout.append((core_id, threads, core))
+        cpu += len(threads)
+
+    l3_members: Dict[int, List[int]] = {}
+    for _, threads, core in layout:
+        l3_members.setdefault(core.get('l3', 0), []).extend(threads)
+
+    as_list = lambda cpus: ','.join(str(c) for c in cpus)
+    for core_id, threads, core in layout:
+        for t in threads:
+            cpu_dir = base / f"cpu{t}"
+            (cpu_dir / "topology").mkdir(parents=True, exist_ok=True)
+            (cpu_dir / "topology" / "core_id").write_text(str(core_id))
+            (cpu_dir / "topology" / "physical_package_id").write_text("0")
+            (cpu_dir / "topology" / "core_cpus_list").write_text(as_list(threads))
+            (cpu_dir / "cache" / "index3").mkdir(parents=True, exist_ok=True)
+            (cpu_dir / "cache" / "index3" / "level").write_text("3")
+            (cpu_dir / "cache" / "index3" / "shared_cpu_list").write_text(
+                as_list(l3_members[core.get('l3', 0)]))
+            (cpu_dir / "cpu_capacity").write_text(str(core.get('capacity', 1024)))
+    (base / "online").write_text(f"0-{cpu - 1}")
+
+
+def plan_for(tmp_path, cores, **kwargs):
+    write_fixture_topology(str(tmp_path), cores)
+    return AffinityPlanner(CPUTopology.from_sysfs(str(tmp_path))).plan(**kwargs)
+
+
+def test_smt_desktop_keeps_siblings_together_and_spares_cpu0(tmp_path):
+    plan = plan_for(tmp_path, [{'threads': 2}] * 4)
+    assert plan.game_cpus == [2, 3, 4, 5, 6, 7]
+    assert plan.neuro_cpus == [0, 1]
+    assert plan.background_cpus == [0, 1]
+    assert plan.reason.startswith("uniform")
+
+
+def test_hybrid_game_on_p_cores_rest_on_e_cores(tmp_path):
+    plan = plan_for(tmp_path, [{'threads': 2, 'capacity': 1024}] * 6 + [{'threads': 1, 'capacity': 600}] * 8)
+    assert plan.game_cpus == list(range(12))
+    assert plan.neuro_cpus == [12]
+    assert plan.background_cpus == list(range(12, 20))
+    assert plan.reason == "hybrid: game on 6 P-cores"
+
+
+def test_two_ccx_game_stays_in_one_l3_domain(tmp_path):
+    plan = plan_for(tmp_path, [{'threads': 2, 'l3': 0}] * 4 + [{'threads': 2, 'l3': 1}] * 4)
+    assert plan.game_cpus == list(range(8, 16))  # El CCX sin la CPU0
+    assert plan.background_cpus == list(range(8))
+    assert plan.neuro_cpus == [0, 1]
+    assert plan.reason.startswith("multi-L3")
+
+
+def test_game_cores_limit(tmp_path):
+    plan = plan_for(tmp_path, [{'threads': 2}] * 4, game_cores=2)
+    assert len(plan.game_cpus) == 4
+    assert not set(plan.game_cpus) & set(plan.background_cpus)
+
+
+@pytest.mark.parametrize("cores", [[{'threads': 1}], [{'threads': 1}] * 2, [{'threads': 2}]])
+def test_tiny_boxes_share_every_cpu(tmp_path, cores):
+    plan = plan_for(tmp_path, cores)
+    everything = list(range(sum(core['threads'] for core in cores)))
+    assert plan.game_cpus == plan.neuro_cpus == plan.background_cpus == everything
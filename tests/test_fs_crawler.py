@@ -0,0 +1,28 @@
+"""Límites opcionales, exclusiones y ubicación de la caché del rastreador"""
+
+from fs_crawler import DEFAULT_EXCLUDES, FileCrawler
+
+
+def test_unbounded_crawl_reaches_deep_files(tmp_path):
+    deep = tmp_path.joinpath(*[f"level{i}" for i in range(9)])
+    deep.mkdir(parents=True)
+    (deep / "Smite.exe").touch()
+    assert FileCrawler(names=["Smite.exe"], max_depth=5).crawl([str(tmp_path)]).matches == []
+    result = FileCrawler(names=["Smite.exe"], max_depth=None, time_budget_s=None,
+                         max_dirs=None).crawl([str(tmp_path)])
+    assert result.matches == [str(deep / "Smite.exe")]
+    assert result.budget_hit is None
+
+
+def test_install_dirs_are_not_excluded(tmp_path):
+    for folder in ("Microsoft", "snap", "cache"):
+        assert folder.lower() not in DEFAULT_EXCLUDES
+        (tmp_path / folder / "Game").mkdir(parents=True)
+        (tmp_path / folder / "Game" / "TotalWar.exe").touch()
+    result = FileCrawler(names=["TotalWar.exe"]).crawl([str(tmp_path)])
+    assert len(result.matches) == 3
+
+
+def test_default_cache_file_is_in_user_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("NEURO_OS_CACHE_DIR", str(tmp_path))
+    assert FileCrawler.default_cache_file() == str(tmp_path / "fs_crawler_cache.json")
@@ -0,0 +1,40 @@
+"""Resolución de procesos: las carpetas amplias no identifican a un juego"""
+
+from pathlib import Path
+
+import pytest
+
+from game_catalog import GameCatalog, is_specific_install_dir
+from game_scanner import Game
+
+
+@pytest.fixture
+def catalog():
+    home = str(Path.home())
+    return GameCatalog([
+        Game(name="Retro Emulator", path="steam://rungameid/1", launcher="Steam", install_dir="/usr/bin/"),
+        Game(name="Home Shortcut", path="steam://rungameid/2", launcher="Steam", install_dir=home),
+        Game(name="Library Root", path="steam://rungameid/3", launcher="Steam", install_dir="/games"),
+        Game(name="Real Game", path="steam://rungameid/4", launcher="Steam",
+             install_dir="/games/steamapps/common/Real Game"),
+    ])
+
+
+@pytest.mark.parametrize("exe", ["/usr/bin/bash", "/usr/bin/gnome-shell",
+                                 str(Path.home() / "tools" / "script"), "/games/other/thing"])
+def test_broad_dirs_do_not_match(catalog, exe):
+    assert catalog.by_exe(exe) is None
+
+
+def test_specific_dir_still_matches(catalog):
+    game = catalog.by_exe("/games/steamapps/common/Real Game/bin/x64/real.exe")
+    assert game is not None and game.name == "Real Game"
+
+
+def test_is_specific_install_dir():
+    assert not is_specific_install_dir("/usr/bin/")
+    assert not is_specific_install_dir("/opt")
+    assert not is_specific_install_dir(str(Path.home() / "Games"))
+    assert not is_specific_install_dir("/mnt")
+    assert is_specific_install_dir("/opt/retro")
+    assert is_specific_install_dir(str(Path.home() / "Games" / "Celeste"))
@@ -0,0 +1,105 @@
+"""Validez de la caché del índice y robustez del hilo de vigilancia"""
+
+import time
+
+import pytest
+
+from game_library_index import GameLibraryIndex
+from game_scanner import GameScanner
+
+
+@pytest.fixture
+def steam_root(tmp_path):
+    steamapps = tmp_path / "steamapps"
+    (steamapps / "common").mkdir(parents=True)
+    return tmp_path
+
+
+def write_manifest(root, appid, make_dir=True):
+    steamapps = root / "steamapps"
+    if make_dir:
+        (steamapps / "common" / f"game{appid}").mkdir(exist_ok=True)
+        (steamapps / "common" / f"game{appid}" / f"game{appid}.exe").touch()
+    (steamapps / f"appmanifest_{appid}.acf").write_text(
+        f'"AppState"\n{{\n\t"appid"\t\t"{appid}"\n\t"name"\t\t"Game {appid}"\n'
+        f'\t"installdir"\t\t"game{appid}"\n}}\n')
+
+
+def make_index(root):
+    class Scanner(GameScanner):
+        def get_steam_path(self):
+            return str(root)
+
+        def scan_direct_sources(self):
+            return []
+
+    return GameLibraryIndex(Scanner(home=root), cache_file=str(root / "cache.json"))
+
+
+def test_unchanged_rescan_uses_cache(steam_root):
+    write_manifest(steam_root, 10)
+    make_index(steam_root).scan()
+    index = make_index(steam_root)
+    assert [g.name for g in index.scan()] == ["Game 10"]
+    assert index.last_scan['parsed'] == 0
+
+
+def test_deleted_game_dir_invalidates_cached_entry(steam_root):
+    write_manifest(steam_root, 10)
+    make_index(steam_root).scan()
+    game_dir = steam_root / "steamapps" / "common" / "game10"
+    (game_dir / "game10.exe").unlink()
+    game_dir.rmdir()
+    index = make_index(steam_root)
+    assert index.scan() == []
+    assert index.last_scan['parsed'] == 1
+
+
+def test_game_dir_appearing_revives_manifest(steam_root):
+    write_manifest(steam_root, 20, make_dir=False)
+    index = make_index(steam_root)
+    assert index.scan() == []
+    (steam_root / "steamapps" / "common" / "game20").mkdir()
+    assert [g.name for g in index.scan()] == ["Game 20"]
+
+
+def test_watch_thread_survives_callback_error(steam_root, capsys):
+    index = make_index(steam_root)
+    index.scan()
+    calls = []
+
+    def on_change(diff):
+        calls.append(diff)
+        raise RuntimeError("boom")
+
+    index.watch(on_change=on_change, debounce_s=0.05, poll_s=0.05)
+    write_manifest(steam_root, 30)
+    deadline = time.time() + 3
+    while not calls and time.time() < deadline:
+        time.sleep(0.05)
+    assert index._watch_thread.is_alive()
+    index.stop_watch()
+    assert calls
+    assert "Watch error: RuntimeError: boom" in capsys.readouterr().out
+
+
+def test_direct_sources_bound_the_standalone_crawl(tmp_path):
+    calls = []
+
+    class Scanner(GameScanner):
+        def scan_gog_library(self):
+            return []
+
+        def scan_standalone_games(self, directories=None, max_depth=None, time_budget_s=None):
+            calls.append((max_depth, time_budget_s))
+            return super().scan_standalone_games([str(tmp_path)], max_depth, time_budget_s)
+
+    deep = tmp_path.joinpath(*"abcdefg")
+    deep.mkdir(parents=True)
+    (deep / "Smite.exe").touch()
+
+    scanner = Scanner(home=tmp_path)
+    assert scanner.scan_direct_sources() == []  # Más hondo que el límite por defecto
+    assert calls[-1] == (GameScanner.STANDALONE_MAX_DEPTH, GameScanner.STANDALONE_TIME_BUDGET_S)
+    assert [game.name for game in scanner.scan_direct_sources(max_depth=None, time_budget_s=None)] == ["Smite"]
+    assert calls[-1] == (None, None)
@@ -0,0 +1,79 @@
+"""Un gestor por fichero de perfiles, escrituras que no bloquean mark_dirty y versiones del formato"""
+
+import json
+import threading
+
+import pytest
+
+from game_profile_manager import (PROFILE_SCHEMA_VERSION, GameCategory, GameProfile, GameProfileManager,
+                                  get_game_profile_manager, profiles_from_bytes, profiles_to_bytes)
+from persistence import get_store
+
+
+def test_one_manager_per_profiles_file(tmp_path):
+    path = str(tmp_path / "profiles.json")
+    manager = get_game_profile_manager(path)
+    assert get_game_profile_manager(path) is manager
+    with pytest.raises(ValueError):
+        GameProfileManager(path)
+
+    # El gestor que falló no se ha quedado con el almacén: se guarda lo del dueño
+    manager.create_profile("Owned Game", GameCategory.CASUAL)
+    manager.save_profiles()
+    with open(path, encoding='utf-8') as f:
+        assert "Owned Game" in json.load(f)
+
+
+def test_mark_dirty_does_not_wait_for_disk(tmp_path, monkeypatch):
+    store = get_store(tmp_path / "slow.json", debounce_s=60.0)
+    store.load(default=dict)
+    writing, release = threading.Event(), threading.Event()
+    original = type(store)._write_atomic
+
+    def slow_write(self, payload):
+        writing.set()
+        assert release.wait(5)
+        original(self, payload)
+    monkeypatch.setattr(type(store), "_write_atomic", slow_write)
+
+    store.data["a"] = 1
+    store.mark_dirty()
+    writer = threading.Thread(target=store.flush)
+    writer.start()
+    assert writing.wait(5)
+
+    marked = threading.Event()
+    def edit():
+        store.data["b"] = 2
+        store.mark_dirty()
+        marked.set()
+    threading.Thread(target=edit).start()
+    assert marked.wait(1), "mark_dirty blocked behind the write"
+
+    release.set()
+    writer.join(5)
+    assert store.dirty  # El cambio hecho durante la escritura sigue pendiente
+    assert store.flush() and not store.dirty
+    assert json.loads((tmp_path / "slow.json").read_text()) == {"a": 1, "b": 2}
+
+
+def test_profiles_file_stays_readable(tmp_path):
+    path = tmp_path / "profiles.json"
+    manager = GameProfileManager(str(path))
+    manager.save_profiles()
+    assert len(path.read_text().splitlines()) > len(manager.profiles)
+
+
+def test_unknown_versions_and_priorities_are_rejected():
+    profile = GameProfile("Some Game", GameCategory.RPG, cpu_priority="normal")
+    blob = profiles_to_bytes([profile])
+    assert profiles_from_bytes(blob) == [profile]
+    with pytest.raises(ValueError):
+        profiles_from_bytes(blob[:3] + bytes([PROFILE_SCHEMA_VERSION + 1]) + blob[4:])
+    with pytest.raises(ValueError):
+        GameProfile.from_dict(dict(profile.to_dict(), v=PROFILE_SCHEMA_VERSION + 1))
+    assert GameProfile.from_dict({k: v for k, v in profile.to_dict().items() if k != 'v'}) == profile
+
+    profile.cpu_priority = "turbo"
+    with pytest.raises(ValueError):
+        profiles_to_bytes([profile])
@@ -0,0 +1,33 @@
+"""Raíz del juego para la precarga de caché"""
+
+from launch_pipeline import game_root, prefetch_targets
+
+
+def make_unreal_layout(tmp_path):
+    exe = tmp_path / "MyGame" / "Binaries" / "Win64" / "MyGame.exe"
+    exe.parent.mkdir(parents=True)
+    exe.write_bytes(b"MZ" * 16)
+    paks = tmp_path / "MyGame" / "Content" / "Paks"
+    paks.mkdir(parents=True)
+    (paks / "MyGame-Windows.pak").write_bytes(b"\0" * 4096)
+    return exe
+
+
+def test_game_root_climbs_binary_dirs(tmp_path):
+    exe = make_unreal_layout(tmp_path)
+    assert game_root(str(exe), install_dir=None) == (tmp_path / "MyGame").resolve()
+
+
+def test_game_root_prefers_install_dir(tmp_path):
+    exe = make_unreal_layout(tmp_path)
+    assert game_root(str(exe), install_dir=str(tmp_path)) == tmp_path.resolve()
+    # Una carpeta que no contiene al ejecutable no vale
+    other = tmp_path / "other"
+    other.mkdir()
+    assert game_root(str(exe), install_dir=str(other)) == (tmp_path / "MyGame").resolve()
+
+
+def test_prefetch_finds_assets_outside_exe_dir(tmp_path):
+    exe = make_unreal_layout(tmp_path)
+    names = [path.name for path in prefetch_targets(str(exe), install_dir=str(tmp_path))]
+    assert names == ["MyGame.exe", "MyGame-Windows.pak"]
@@ -0,0 +1,177 @@
+"""
+Backends de launchers contra una carpeta personal sintética (Steam nativo y
+Flatpak, Lutris, Heroic e itch) construida en tmp_path
+"""
+
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+import launchers
+import vdf_parser
+from game_library_index import GameLibraryIndex
+from game_scanner import GameScanner
+from launchers.itch import parse_itch_db
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith('linux'),
+                                reason="backends de Linux y enlaces simbólicos")
+
+
+def _steam_library(steam: Path, games: dict, proton: tuple = ()):
+    steamapps = steam / "steamapps"
+    (steamapps / "common").mkdir(parents=True, exist_ok=True)
+    for appid, name in games.items():
+        (steamapps / "common" / f"dir{appid}").mkdir(exist_ok=True)
+        (steamapps / f"appmanifest_{appid}.acf").write_text(vdf_parser.dumps(
+            {"AppState": {"appid": appid, "name": name, "installdir": f"dir{appid}"}}))
+    for appid in proton:
+        (steamapps / "compatdata" / appid / "pfx").mkdir(parents=True, exist_ok=True)
+
+
+def build_fixture_home(root: Path) -> Path:
+    """
+    Crear una carpeta personal falsa con Steam (nativo y Flatpak), Lutris,
+    Heroic e itch
+
+    Returns:
+        Ruta de la carpeta personal
+    """
+    home = Path(root)
+
+    # Steam nativo, con ~/.steam/steam como enlace (no debe duplicar juegos)
+    steam = home / ".local/share/Steam"
+    _steam_library(steam, {"620": "Portal 2", "1091500": "Cyberpunk 2077",
+                           "1493710": "Proton Experimental"}, proton=("1091500",))
+    (home / ".steam").mkdir(parents=True, exist_ok=True)
+    (home / ".steam/steam").symlink_to(steam)
+    config = steam / "userdata/12345/config"
+    config.mkdir(parents=True)
+    (config / "shortcuts.vdf").write_bytes(vdf_parser.binary_dumps({"shortcuts": {"0": {
+        "appid": -123456789, "AppName": "Emulador Retro", "Exe": '"/opt/retro/retro"',
+        "StartDir": '"/opt/retro/"'}}}))
+
+    # Steam Flatpak
+    _steam_library(home / ".var/app/com.valvesoftware.Steam/.local/share/Steam", {"570": "Dota 2"})
+
+    # Lutris
+    lutris = home / ".local/share/lutris"
+    lutris.mkdir(parents=True)
+    conn = sqlite3.connect(lutris / "pga.db")
+    conn.execute("CREATE TABLE games (id INTEGER PRIMARY KEY, name TEXT, slug TEXT, runner TEXT, "
+                 "directory TEXT, installed INTEGER, service_id TEXT)")
+    conn.executemany("INSERT INTO games (name, slug, runner, directory, installed, service_id) "
+                     "VALUES (?, ?, ?, ?, ?, ?)",
+                     [("Diablo II", "diablo-ii", "wine", "/games/diablo-ii", 1, None),
+                      ("SuperTuxKart", "supertuxkart", "linux", "/games/stk", 1, None),
+                      ("Uninstalled Game", "uninstalled", "wine", None, 0, None)])
+    conn.commit()
+    conn.close()
+
+    # Heroic
+    heroic = home / ".config/heroic"
+    legendary = heroic / "legendaryConfig/legendary"
+    legendary.mkdir(parents=True)
+    (legendary / "installed.json").write_text(json.dumps({
+        "Fortnite": {"title": "Fortnite", "install_path": "/games/Heroic/Fortnite"},
+        "FortniteDLC": {"title": "DLC", "install_path": "/games/Heroic/Fortnite", "is_dlc": True}}))
+    gog = heroic / "gog_store"
+    gog.mkdir(parents=True)
+    (gog / "installed.json").write_text(json.dumps({"installed": [
+        {"appName": "1207658924", "install_path": "/games/Heroic/Witcher"}]}))
+    (gog / "library.json").write_text(json.dumps({"games": [
+        {"app_name": "1207658924", "title": "The Witcher: Enhanced Edition"}]}))
+    sideload = heroic / "sideload_apps"
+    sideload.mkdir(parents=True)
+    (sideload / "library.json").write_text(json.dumps({"games": [
+        {"app_name": "abc123", "title": "Indie Sideload", "is_installed": True}]}))
+
+    # itch
+    itch_db = home / ".config/itch/db"
+    itch_db.mkdir(parents=True)
+    conn = sqlite3.connect(itch_db / "butler.db")
+    conn.executescript(
+        "CREATE TABLE games (id INTEGER PRIMARY KEY, title TEXT);"
+        "CREATE TABLE install_locations (id TEXT PRIMARY KEY, path TEXT);"
+        "CREATE TABLE caves (id TEXT PRIMARY KEY, game_id INTEGER, install_location_id TEXT, "
+        "install_folder_name TEXT, verdict TEXT, custom_install_folder TEXT);"
+        "INSERT INTO games VALUES (1, 'Celeste Classic');"
+        "INSERT INTO games VALUES (2, 'Custom Folder Game');"
+        # Ubicación por defecto de butler: ya termina en apps/
+        "INSERT INTO install_locations VALUES ('loc1', '/home/user/.config/itch/apps');"
+        "INSERT INTO caves VALUES ('cave-1', 1, 'loc1', 'celeste-classic', "
+        "'{\"candidates\": [{\"flavor\": \"linux\"}]}', NULL);"
+        "INSERT INTO caves VALUES ('cave-2', 2, 'loc1', 'custom-game', NULL, '/mnt/games/custom');")
+    conn.commit()
+    conn.close()
+    return home
+
+
+@pytest.fixture
+def home(tmp_path):
+    return build_fixture_home(tmp_path)
+
+
+def test_detects_every_backend(home):
+    detected = launchers.detect_backends(home, platform="linux")
+    assert [backend.name for backend in detected] == ["steam", "lutris", "heroic", "itch"]
+
+
+def test_scan_all_finds_installed_games_once(home):
+    games = {(game.launcher, game.name, game.runner) for game in launchers.scan_all(home)}
+    assert games == {
+        ("Steam", "Portal 2", "native"),
+        ("Steam", "Cyberpunk 2077", "proton"),
+        ("Steam", "Dota 2", "native"),          # Flatpak
+        ("Steam", "Emulador Retro", None),      # shortcuts.vdf
+        ("Lutris", "Diablo II", "wine"),
+        ("Lutris", "SuperTuxKart", "linux"),
+        ("Heroic", "Fortnite", "legendary"),
+        ("Heroic", "The Witcher: Enhanced Edition", "gog"),
+        ("Heroic", "Indie Sideload", "sideload"),
+        ("itch", "Celeste Classic", "linux"),
+        ("itch", "Custom Folder Game", None),
+    }
+    # ~/.steam/steam es un enlace a la misma instalación: sin duplicados
+    assert len(launchers.scan_all(home)) == len(games)
+
+
+def test_skips_tools_dlc_and_uninstalled(home):
+    names = {game.name for game in launchers.scan_all(home)}
+    assert not names & {"Proton Experimental", "DLC", "Uninstalled Game"}
+
+
+def test_itch_install_dir_from_butler_location(home):
+    games = {game.name: game for game in parse_itch_db(home / ".config/itch/db/butler.db")}
+    assert games["Celeste Classic"].install_dir == "/home/user/.config/itch/apps/celeste-classic"
+    assert games["Custom Folder Game"].install_dir == "/mnt/games/custom"
+    assert games["Celeste Classic"].path == "itch://caves/cave-1/launch"
+
+
+def test_itch_db_without_custom_folder_column(tmp_path):
+    db = tmp_path / "butler.db"
+    conn = sqlite3.connect(db)
+    conn.executescript(
+        "CREATE TABLE games (id INTEGER PRIMARY KEY, title TEXT);"
+        "CREATE TABLE install_locations (id TEXT PRIMARY KEY, path TEXT);"
+        "CREATE TABLE caves (id TEXT PRIMARY KEY, game_id INTEGER, install_location_id TEXT, "
+        "install_folder_name TEXT, verdict TEXT);"
+        "INSERT INTO games VALUES (1, 'Old Butler Game');"
+        "INSERT INTO install_locations VALUES ('loc', '/data/itch/apps');"
+        "INSERT INTO caves VALUES ('c', 1, 'loc', 'old-game', NULL);")
+    conn.commit()
+    conn.close()
+    [game] = parse_itch_db(db)
+    assert game.install_dir == "/data/itch/apps/old-game"
+
+
+def test_library_index_over_backends(home, tmp_path):
+    scanner = GameScanner(home)
+    index = GameLibraryIndex(scanner, cache_file=str(tmp_path / "cache.json"))
+    games = index.scan(include_direct=False)
+    assert len(games) == 11
+    again = GameLibraryIndex(scanner, cache_file=str(tmp_path / "cache.json"))
+    assert len(again.scan(include_direct=False)) == 11
+    assert again.last_scan['parsed'] == 0
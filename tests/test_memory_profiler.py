@@ -0,0 +1,77 @@
+"""El modo por defecto (contadores + RSS/PSS) no enciende tracemalloc y cuesta unos pocos %"""
+
+import time
+import tracemalloc
+
+import numpy as np
+
+from memory_profiler import MemoryAccounting
+
+
+def _frame_workload(accounting: MemoryAccounting, frames: int):
+    """Lo que hace la captura por fotograma: buffer NumPy registrado y objetos Python"""
+    for i in range(frames):
+        frame = np.empty((720, 1280, 4), dtype=np.uint8)
+        frame.fill(i & 0xFF)
+        accounting.register_buffer("capture", "frame", frame)
+        meta = [{'index': i, 'size': frame.shape, 'tag': str(i)} for _ in range(20)]
+        accounting.release_buffer("capture", "frame")
+        del meta
+
+
+def _best_time(fn, runs: int = 7) -> float:
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def test_default_enable_does_not_trace():
+    accounting = MemoryAccounting()
+    accounting.enable(periodic=False)
+    try:
+        assert not accounting.tracing
+        assert not tracemalloc.is_tracing()
+        accounting.register_buffer("capture", "frame", nbytes=1024**2)
+        report = accounting.report()
+        assert report['buffers_mb']['capture'] == 1.0
+        assert report['rss_mb'] > 0 and not report['tracing']
+        assert report['top_allocations'] == []
+    finally:
+        accounting.disable()
+
+
+def test_trace_is_explicit():
+    accounting = MemoryAccounting()
+    accounting.enable(periodic=False, trace=True)
+    try:
+        assert accounting.tracing and tracemalloc.is_tracing()
+        assert accounting.report()['tracing']
+    finally:
+        accounting.disable()
+    assert not tracemalloc.is_tracing()
+
+
+def test_default_mode_overhead_is_a_few_percent():
+    # Cronometrar el fotograma entero con y sin contabilidad varía más que el
+    # presupuesto en una máquina cargada: se mide el coste de la capa barata
+    # por fotograma y se compara con lo que cuesta el propio fotograma
+    frames = 60
+    disabled = MemoryAccounting()
+    enabled = MemoryAccounting()
+    enabled.enable(periodic=False)
+    frame = np.empty((720, 1280, 4), dtype=np.uint8)
+
+    def accounting_only():
+        for _ in range(frames):
+            enabled.register_buffer("capture", "frame", frame)
+            enabled.release_buffer("capture", "frame")
+    try:
+        per_frame = _best_time(lambda: _frame_workload(disabled, frames)) / frames
+        overhead = _best_time(accounting_only) / frames
+        _frame_workload(enabled, frames)  # El camino activado también funciona
+    finally:
+        enabled.disable()
+    assert overhead <= per_frame * 0.05, f"{overhead / per_frame * 100:.1f}% of a frame"
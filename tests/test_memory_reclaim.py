@@ -0,0 +1,156 @@
+"""process_madvise parcial y EINVAL, el juego intocable y memory.reclaim sólo en cgroups exclusivos"""
+
+import errno
+import os
+import subprocess
+import sys
+import time
+
+import psutil
+import pytest
+
+import memory_reclaim
+from adaptive_scheduler import get_system_activity
+from memory_reclaim import MADV_COLD, MADV_PAGEOUT, MemoryReclaimer, ReclaimCandidate
+
+PAGE = 4096
+
+
+@pytest.fixture
+def reclaimer(monkeypatch):
+    engine = MemoryReclaimer(min_rss_mb=0, min_idle_seconds=0)
+    monkeypatch.setattr(os, "pidfd_open", lambda pid: os.open(os.devnull, os.O_RDONLY), raising=False)
+    return engine
+
+
+def fake_kernel(monkeypatch, engine, ranges, respond):
+    """VMAs fijos y un process_madvise que responde con respond(lote) y registra las llamadas"""
+    calls = []
+    monkeypatch.setattr(engine, "_read_vmas", lambda pid: list(ranges))
+
+    def madvise_call(pidfd, batch, advice):
+        calls.append(list(batch))
+        return respond(batch)
+    monkeypatch.setattr(engine, "_madvise_call", madvise_call)
+    return calls
+
+
+def test_partial_madvise_resumes_where_the_kernel_stopped(monkeypatch, reclaimer):
+    ranges = [(0x1000, 0x1000 + 4 * PAGE), (0x10000, 0x10000 + 2 * PAGE)]
+    # El kernel sólo acepta 3 páginas por llamada
+    calls = fake_kernel(monkeypatch, reclaimer, ranges,
+                        lambda batch: min(3 * PAGE, sum(end - start for start, end in batch)))
+
+    assert reclaimer._process_madvise(1234, MADV_PAGEOUT) == 6 * PAGE
+    assert calls[0] == ranges
+    assert calls[1] == [(0x1000 + 3 * PAGE, 0x1000 + 4 * PAGE), ranges[1]]
+    assert len(calls) == 2
+
+
+def test_einval_isolates_the_rejected_vma(monkeypatch, reclaimer):
+    locked = (0x20000, 0x20000 + PAGE)
+    ranges = [(0x1000, 0x1000 + PAGE), locked, (0x30000, 0x30000 + 2 * PAGE)]
+
+    def respond(batch):
+        if locked in batch:
+            return -errno.EINVAL
+        return sum(end - start for start, end in batch)
+    calls = fake_kernel(monkeypatch, reclaimer, ranges, respond)
+
+    assert reclaimer._process_madvise(1234, MADV_PAGEOUT) == 3 * PAGE
+    assert calls[0] == ranges  # Lote entero rechazado
+    assert calls[1:] == [[ranges[0]], [locked], [ranges[2]]]
+
+
+def test_madvise_errors_other_than_einval_propagate(monkeypatch, reclaimer):
+    fake_kernel(monkeypatch, reclaimer, [(0x1000, 0x2000)], lambda batch: -errno.EPERM)
+    with pytest.raises(OSError) as info:
+        reclaimer._process_madvise(1234, MADV_PAGEOUT)
+    assert info.value.errno == errno.EPERM
+
+
+def test_game_and_its_children_are_never_candidates(monkeypatch, reclaimer):
+    game = subprocess.Popen([sys.executable, "-c",
+                             "import subprocess, sys, time; "
+                             "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)']); "
+                             "time.sleep(30)"])
+    bystander = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        parent = psutil.Process(game.pid)
+        for _ in range(100):
+            if parent.children():
+                break
+            time.sleep(0.05)
+        game_child = parent.children()[0].pid
+        monkeypatch.setattr(get_system_activity(), "game_pids", {game.pid})
+
+        excluded = reclaimer.excluded_pids()
+        assert {game.pid, game_child, os.getpid()} <= excluded
+        assert bystander.pid not in excluded
+        ranked = {c.pid for c in reclaimer.rank_candidates(limit=10000)}
+        assert not ranked & {game.pid, game_child, os.getpid()}
+
+        reclaimer.protect(bystander.pid)
+        assert bystander.pid in reclaimer.excluded_pids()
+    finally:
+        for proc in parent.children(recursive=True):
+            proc.kill()
+        for proc in (game, bystander):
+            proc.kill()
+            proc.wait()
+
+
+@pytest.fixture
+def cgroup(tmp_path, monkeypatch, reclaimer):
+    directory = tmp_path / "app-game.scope"
+    directory.mkdir()
+    (directory / "memory.reclaim").write_text("")
+    monkeypatch.setattr(reclaimer, "_cgroup_dir", lambda pid: directory)
+    return directory
+
+
+def test_memory_reclaim_only_in_exclusive_cgroup(cgroup, reclaimer):
+    (cgroup / "cgroup.procs").write_text("100\n200\n")
+    with pytest.raises(OSError, match="shared"):
+        reclaimer._cgroup_reclaim(100, 1 << 20)
+    assert (cgroup / "memory.reclaim").read_text() == ""
+
+    (cgroup / "cgroup.procs").write_text("100\n")
+    (cgroup / "child").mkdir()
+    with pytest.raises(OSError, match="child cgroups"):
+        reclaimer._cgroup_reclaim(100, 1 << 20)
+    assert (cgroup / "memory.reclaim").read_text() == ""
+
+    (cgroup / "child").rmdir()
+    reclaimer._cgroup_reclaim(100, 1 << 20)
+    assert (cgroup / "memory.reclaim").read_text() == str(1 << 20)
+
+
+def test_memory_reclaim_missing_or_unreadable(cgroup, reclaimer):
+    with pytest.raises(OSError, match="shared"):  # Sin cgroup.procs legible
+        reclaimer._cgroup_reclaim(100, 1 << 20)
+    (cgroup / "memory.reclaim").unlink()
+    with pytest.raises(OSError) as info:
+        reclaimer._cgroup_reclaim(100, 1 << 20)
+    assert info.value.errno == errno.ENOTSUP
+
+
+def test_fallback_to_memory_reclaim_only_for_pageout(monkeypatch, cgroup, reclaimer):
+    (cgroup / "cgroup.procs").write_text("100\n")
+    status = {'VmRSS': 200 << 20, 'VmSwap': 0, 'RssAnon': 150 << 20, 'RssFile': 50 << 20}
+    monkeypatch.setattr(memory_reclaim, "read_memory_status", lambda pid: dict(status))
+    reclaimer._madvise_supported = True
+
+    def denied(pid, advice):
+        raise OSError(errno.EPERM, "Operation not permitted")
+    monkeypatch.setattr(reclaimer, "_process_madvise", denied)
+    candidate = ReclaimCandidate(pid=100, name="idle", create_time=0.0, rss_bytes=200 << 20, idle_seconds=600)
+
+    result = reclaimer.reclaim_process(candidate, MADV_PAGEOUT)
+    assert result.method == 'memory.reclaim' and result.error is None
+    assert (cgroup / "memory.reclaim").read_text() == str(150 << 20)
+
+    (cgroup / "memory.reclaim").write_text("")
+    result = reclaimer.reclaim_process(candidate, MADV_COLD)
+    assert result.method == 'none' and "process_madvise" in result.error
+    assert (cgroup / "memory.reclaim").read_text() == ""
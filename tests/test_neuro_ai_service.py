@@ -0,0 +1,100 @@
+"""Planificador del servicio: tareas independientes, deadlines, jitter y parada"""
+
+import asyncio
+import time
+
+import pytest
+
+from neuro_ai_service import NeuroAIService
+
+
+@pytest.fixture
+def service():
+    """Servicio con las tareas reales sustituidas por corrutinas de periodo corto"""
+    service = NeuroAIService()
+    service.tasks = {}
+    yield service
+    service.stop(timeout=2)
+
+
+def run_for(service, seconds):
+    service.start()
+    time.sleep(seconds)
+    service.stop(timeout=2)
+
+
+def test_slow_task_does_not_delay_fast_one(service):
+    fast_runs = []
+
+    async def fast():
+        fast_runs.append(time.perf_counter())
+
+    async def slow():
+        # Llamada bloqueante de 150 ms en el executor, como psutil en la telemetría
+        await service._run_blocking(time.sleep, 0.15)
+
+    service._add_task('fast', 0.02, 0.5, fast)
+    service._add_task('slow', 0.05, 1.0, slow)
+    run_for(service, 0.6)
+
+    fast_task, slow_task = service.tasks['fast'], service.tasks['slow']
+    assert fast_task.runs >= 15
+    gaps = [b - a for a, b in zip(fast_runs, fast_runs[1:])]
+    assert max(gaps) < 0.1, "the fast task waited for the slow one"
+    assert fast_task.max_jitter < 0.1
+    # La lenta va con retraso: sus periodos perdidos se saltan, no se encadenan
+    assert slow_task.skipped > 0 and slow_task.overruns == 0
+
+
+def test_overruns_are_counted(service):
+    async def stuck():
+        await asyncio.sleep(1.0)
+
+    service._add_task('stuck', 0.05, 0.02, stuck)
+    run_for(service, 0.4)
+
+    task = service.tasks['stuck']
+    assert task.runs >= 3
+    assert task.overruns == task.runs
+    assert task.max_duration < 0.5  # El deadline cancela la ejecución
+    assert task.errors == 0
+
+
+def test_jitter_metrics(service):
+    async def tick():
+        pass
+
+    service._add_task('tick', 0.02, 0.5, tick)
+    run_for(service, 0.3)
+
+    metrics = service.get_status()['tasks']['tick']
+    assert metrics['runs'] >= 5 and metrics['period_s'] == 0.02
+    assert 0.0 <= metrics['avg_jitter_ms'] <= metrics['max_jitter_ms'] < 100
+    assert 0.0 <= metrics['last_jitter_ms'] <= metrics['max_jitter_ms']
+    assert metrics['overruns'] == metrics['errors'] == 0
+
+
+def test_errors_do_not_stop_the_task(service):
+    async def broken():
+        raise RuntimeError("boom")
+
+    service._add_task('broken', 0.02, 0.5, broken)
+    run_for(service, 0.2)
+    assert service.tasks['broken'].errors == service.tasks['broken'].runs >= 3
+
+
+def test_stop_returns_with_thread_dead(service):
+    async def busy():
+        await service._run_blocking(time.sleep, 0.1)
+
+    service._add_task('busy', 0.01, 1.0, busy)
+    service.start()
+    time.sleep(0.05)
+    thread = service.thread
+
+    start = time.perf_counter()
+    service.stop(timeout=2)
+    assert time.perf_counter() - start < 2
+    assert not thread.is_alive()
+    assert service.thread is None and not service.running
+    assert service.loop is None and service.executor is None
@@ -0,0 +1,47 @@
+"""1% low de la sesión con todas sus muestras y ficheros en la carpeta de datos"""
+
+import json
+import time
+
+from game_profile_manager import default_profiles_file
+from neuro_store import NeuroStore, percentile_low
+
+
+def test_session_p1_low_uses_pooled_samples(tmp_path):
+    store = NeuroStore(str(tmp_path / "neuro_os.db"), window_s=60.0)
+    store.start_session("Stutter Game")
+    # 10 ventanas de 60 muestras; sólo 6 de las 600 son tirones, todos en la primera
+    fps = [30.0] * 6 + [120.0] * 594
+    t0 = time.time()
+    for i, value in enumerate(fps):
+        store.record_sample(cpu=50.0, fps=value, ts=t0 + i)
+    store.end_session()
+
+    session = store.recent_sessions("Stutter Game", 1)[0]
+    assert session['samples'] == 600
+    assert session['p1_low_fps'] == percentile_low(fps) == 30.0
+    summary = store.fps_summary("Stutter Game")
+    assert summary['p1_low_fps'] == 30.0
+    assert summary['avg_fps'] == sum(fps) / len(fps)
+    assert [day['p1_low_fps'] for day in store.daily_fps("Stutter Game")][-1] == 30.0
+    store.close()
+
+
+def test_default_paths_in_user_data_dir(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    monkeypatch.setenv("NEURO_OS_DATA_DIR", str(data))
+    work = tmp_path / "work"
+    work.mkdir()
+    (work / "game_profiles.json").write_text(json.dumps({"Old": {"name": "Old", "category": "casual"}}))
+    monkeypatch.chdir(work)
+
+    # El game_profiles.json relativo de antes se copia una vez y no se toca
+    path = default_profiles_file()
+    assert path == data / "game_profiles.json"
+    assert "Old" in json.loads(path.read_text())
+    assert (work / "game_profiles.json").exists()
+
+    store = NeuroStore()
+    assert store.db_path == data / "neuro_os.db"
+    store.close()
+    assert not list(work.glob("neuro_os.db*"))
@@ -0,0 +1,32 @@
+"""Pasadas concurrentes del muestreador de huella (caché compartida, presupuesto por pasada)"""
+
+import threading
+
+from process_footprint import FootprintSampler
+
+
+def test_passes_have_independent_budgets(tmp_path):
+    sampler = FootprintSampler(scan_budget=2, proc_root=str(tmp_path))  # Sin smaps: fallback a RSS
+    first, second = sampler.begin_pass(), sampler.begin_pass()
+    for pid in (1, 2, 3):
+        first.footprint(pid, 1.0, 4096)
+    assert first.budget_left == 0
+    assert second.budget_left == 2
+
+
+def test_concurrent_passes_share_cache(tmp_path):
+    sampler = FootprintSampler(scan_budget=1000, proc_root=str(tmp_path))
+
+    def worker():
+        footprints = sampler.begin_pass()
+        for pid in range(200):
+            footprints.footprint(pid + 1, 1.0, 4096)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    status = sampler.get_status()
+    assert status['cached'] == 200
+    assert status['reads'] + status['cache_hits'] == 800
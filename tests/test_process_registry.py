@@ -0,0 +1,102 @@
+"""Hijos y nietos en el registro propio, memoria en una pasada y árboles excluidos"""
+
+import subprocess
+import sys
+import time
+from collections import namedtuple
+
+import psutil
+import pytest
+
+from process_registry import SelfProcessRegistry
+
+# Cada nivel lanza el siguiente y espera: raíz -> hijo -> nieto
+TREE_SCRIPT = """
+import subprocess, sys, time
+depth = int(sys.argv[1])
+if depth:
+    subprocess.Popen([sys.executable, __file__, str(depth - 1)])
+time.sleep(30)
+"""
+
+
+@pytest.fixture
+def process_tree(tmp_path):
+    script = tmp_path / "tree.py"
+    script.write_text(TREE_SCRIPT)
+    root = subprocess.Popen([sys.executable, str(script), "2"])
+    try:
+        yield root
+    finally:
+        try:
+            family = psutil.Process(root.pid).children(recursive=True)
+        except psutil.Error:
+            family = []
+        root.kill()
+        root.wait()
+        for proc in family:
+            try:
+                proc.kill()
+            except psutil.Error:
+                pass
+
+
+def wait_for_tree(registry, count, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while registry.refresh() < count:
+        assert time.monotonic() < deadline, "process tree did not start"
+        time.sleep(0.05)
+
+
+def test_children_and_grandchildren_are_tracked(process_tree):
+    registry = SelfProcessRegistry(root_pid=process_tree.pid)
+    wait_for_tree(registry, 3)
+
+    roles = sorted(role for _, role in registry._procs.values())
+    assert roles == ["child", "child", "main"]
+    child = psutil.Process(process_tree.pid).children()[0]
+    grandchild = child.children()[0]
+    assert {proc.pid for proc in registry.processes()} == {process_tree.pid, child.pid, grandchild.pid}
+
+
+def test_memory_totals_in_one_pass(process_tree, monkeypatch):
+    registry = SelfProcessRegistry(root_pid=process_tree.pid)
+    wait_for_tree(registry, 3)
+
+    FullInfo = namedtuple("FullInfo", "rss pss uss")
+    calls = []
+
+    def memory_full_info(proc):
+        calls.append(proc.pid)
+        return FullInfo(rss=300, pss=200, uss=100)
+    monkeypatch.setattr(psutil.Process, "memory_full_info", memory_full_info)
+
+    totals = registry.memory_totals(refresh=False)
+    assert sorted(calls) == sorted(proc.pid for proc in registry.processes(refresh=False))
+    assert totals['processes'] == 3
+    assert (totals['rss'], totals['pss'], totals['uss']) == (900, 600, 300)
+    assert totals['by_role'] == {'main': {'rss': 300, 'uss': 100, 'count': 1},
+                                 'child': {'rss': 600, 'uss': 200, 'count': 2}}
+
+
+def test_excluded_game_tree_is_dropped(process_tree):
+    # El "juego" es el hijo: ni él ni su hijo cuentan como Neuro-OS
+    registry = SelfProcessRegistry(root_pid=process_tree.pid)
+    wait_for_tree(registry, 3)
+    game = psutil.Process(process_tree.pid).children()[0]
+
+    registry.exclude_tree(game.pid)
+    assert {proc.pid for proc in registry.processes()} == {process_tree.pid}
+
+
+def test_leaf_helper_children_are_not_own(process_tree):
+    # Lanzador que cuelga del proceso principal: sus hijos son juegos
+    registry = SelfProcessRegistry(root_pid=process_tree.pid)
+    wait_for_tree(registry, 3)
+    launcher = psutil.Process(process_tree.pid).children()[0]
+    game = launcher.children()[0]
+
+    registry = SelfProcessRegistry(root_pid=process_tree.pid)
+    registry.register_helper(launcher.pid, "gfx_launcher", include_children=False)
+    own = {proc.pid for proc in registry.processes()}
+    assert own == {process_tree.pid, launcher.pid} and game.pid not in own
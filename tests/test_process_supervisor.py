@@ -0,0 +1,89 @@
+"""Supervisor: ajustes desde el arranque, hilo que lanza intacto, árbol y cgroup comprobado"""
+
+import os
+import sys
+import threading
+import time
+
+import psutil
+import pytest
+
+import cgroup_partition
+from cgroup_partition import ResourcePartitionManager
+from process_supervisor import IOPRIO_CLASS_IDLE, ProcessSupervisor, SpawnSettings
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith('linux'), reason="per-thread attributes are Linux-only")
+
+SLEEPER = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+
+@pytest.fixture
+def supervisor():
+    supervisor = ProcessSupervisor(interval_s=0.05, rescan_s=0.05)
+    yield supervisor
+    for tree in supervisor.trees():
+        tree.terminate()
+        tree.wait(5)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def test_child_is_born_with_settings_and_spawner_is_untouched(supervisor):
+    cpu = sorted(os.sched_getaffinity(0))[-1]
+    tid = threading.get_native_id()
+    before = (os.getpriority(os.PRIO_PROCESS, tid), os.getpriority(os.PRIO_PROCESS, 0), os.sched_getaffinity(0))
+
+    settings = SpawnSettings(priority="low", cpus=[cpu], ioprio_class=IOPRIO_CLASS_IDLE)
+    tree = supervisor.spawn(SLEEPER, settings=settings, role="test")
+    child = psutil.Process(tree.pid)
+
+    assert child.nice() == 10
+    assert child.cpu_affinity() == [cpu]
+    assert child.ionice().ioclass == psutil.IOPRIO_CLASS_IDLE
+    assert tree.errors == []
+    assert (os.getpriority(os.PRIO_PROCESS, tid), os.getpriority(os.PRIO_PROCESS, 0),
+            os.sched_getaffinity(0)) == before
+
+
+def test_grandchild_is_tracked(supervisor):
+    launcher = [sys.executable, "-c",
+                "import subprocess, sys, time; "
+                "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)']); time.sleep(30)"]
+    tree = supervisor.spawn(launcher, role="test")
+
+    assert wait_for(lambda: len(tree.pids) == 2)
+    grandchild = next(pid for pid in tree.pids if pid != tree.pid)
+    assert psutil.Process(grandchild).ppid() == tree.pid
+    assert supervisor.owns(grandchild) is tree
+
+    tree.terminate()
+    assert tree.wait(5)
+
+
+def test_failed_cgroup_move_is_an_error_not_applied(supervisor, tmp_path, monkeypatch):
+    # cgroup.procs de un árbol falso: la escritura "funciona" pero el kernel no mueve nada
+    root = tmp_path / "cgroup"
+    (root / "neuro-os" / "game").mkdir(parents=True)
+    procs_file = root / "neuro-os" / "game" / "cgroup.procs"
+    manager = ResourcePartitionManager(cgroup_root=str(root), parent="", state_file=str(tmp_path / "state.json"))
+    monkeypatch.setattr(cgroup_partition, "_partition_manager", manager)
+    registered = []
+    monkeypatch.setattr(manager, "register_process", lambda *args, **kwargs: registered.append(args))
+
+    tree = supervisor.spawn(SLEEPER, settings=SpawnSettings(cgroup_procs=str(procs_file)), role="test")
+    assert "cgroup game slice" not in tree.applied
+    assert any(error.startswith("cgroup game slice") for error in tree.errors)
+    assert registered == []
+
+    # Si /proc dice que entró, cuenta como aplicado y se anota para restore()
+    monkeypatch.setattr(manager, "cgroup_of", lambda pid: "/neuro-os/game")
+    tree = supervisor.spawn(SLEEPER, settings=SpawnSettings(cgroup_procs=str(procs_file)), role="test")
+    assert "cgroup game slice" in tree.applied
+    assert registered == [(tree.pid, "game")]
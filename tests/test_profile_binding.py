@@ -0,0 +1,58 @@
+"""Vínculo proceso -> perfil: sólo ajustes por proceso y re-resolución tras rebuild"""
+
+import os
+import subprocess
+import sys
+
+import psutil
+import pytest
+
+import launch_pipeline
+from game_catalog import GameCatalog
+from game_profile_manager import GameCategory, GameProfileManager
+from game_scanner import Game
+from profile_binding import ProfileBinder
+
+
+@pytest.fixture
+def child():
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    yield psutil.Process(proc.pid)
+    proc.kill()
+    proc.wait()
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = GameProfileManager(str(tmp_path / "profiles.json"))
+    manager.create_profile("Sleepy Game", GameCategory.CASUAL)
+    manager.update_profile("Sleepy Game", cpu_priority="low", ram_cleanup_before_launch=True,
+                           aggressive_ram_cleanup=True)
+    return manager
+
+
+def test_apply_never_runs_prelaunch_pipeline(child, manager, monkeypatch):
+    def forbidden(*args, **kwargs):
+        raise AssertionError("pre-launch pipeline on a running game")
+    monkeypatch.setattr(launch_pipeline, "build_prelaunch_pipeline", forbidden)
+
+    catalog = GameCatalog([Game(name="Sleepy Game", path=child.exe(), launcher="Standalone",
+                                install_dir=os.path.dirname(child.exe()))], profile_manager=manager)
+    binder = ProfileBinder(catalog, manager, partition=False)
+    binding, new = binder.bind_and_apply(child.as_dict(['pid', 'name', 'exe', 'create_time']))
+    assert new and binding.profile is not None
+    assert child.nice() == 10
+    assert not any(step.startswith(("memory_reclaim", "throttle_background")) for step in binding.applied)
+
+
+def test_unapplied_binding_is_resolved_again_after_rebuild(child, manager):
+    catalog = GameCatalog([], profile_manager=manager)
+    binder = ProfileBinder(catalog, manager, partition=False)
+    info = child.as_dict(['pid', 'name', 'exe', 'create_time'])
+    binding, _ = binder.bind(info)
+    assert binding.game is None
+    catalog.rebuild([Game(name="Sleepy Game", path=child.exe(), launcher="Standalone",
+                          install_dir=os.path.dirname(child.exe()))])
+    again, new = binder.bind(info)
+    assert again is binding and not new
+    assert binding.game is not None and binding.game.name == "Sleepy Game"
@@ -0,0 +1,35 @@
+"""El servicio de IA reajusta el perfil al terminar cada sesión (sin FPS no cambia nada)"""
+
+from types import SimpleNamespace
+
+import neuro_store
+import profile_tuner
+from game_profile_manager import GameCategory, GameProfileManager
+from neuro_ai_service import NeuroAIService
+from neuro_store import NeuroStore
+from profile_tuner import ProfileTuner
+
+
+def test_session_end_runs_tuner(tmp_path, monkeypatch):
+    store = NeuroStore(str(tmp_path / "neuro_os.db"))
+    monkeypatch.setattr(neuro_store, "_neuro_store", store)
+    tuner = ProfileTuner(store)
+    monkeypatch.setattr(profile_tuner, "_profile_tuner", tuner)
+    calls, apply = [], tuner.apply
+    monkeypatch.setattr(tuner, "apply", lambda manager, game: calls.append(apply(manager, game)))
+
+    manager = GameProfileManager(str(tmp_path / "profiles.json"))
+    before = manager.create_profile("Tuned Game", GameCategory.RPG).to_dict()
+    service = NeuroAIService()
+    service.attach_profile_manager(manager)
+
+    state = {'cpu_percent': 50.0, 'ram_percent': 40.0}
+    service._record_history(state, SimpleNamespace(game_active=True, game_name="Tuned Game"))
+    service._record_history(state, SimpleNamespace(game_active=False, game_name=None))
+
+    # Sin contador de fotogramas la sesión no tiene FPS: el tuner corre pero no propone
+    assert calls == [None]
+    session = store.recent_sessions("Tuned Game", 1)[0]
+    assert session['ended_at'] is not None and session['samples'] == 0
+    assert manager.get_profile("Tuned Game").to_dict() == before
+    store.close()
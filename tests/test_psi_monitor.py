@@ -0,0 +1,123 @@
+"""PSIMonitor / PSIProtection con ficheros de presión falsos (modo sondeo)"""
+
+import threading
+import time
+
+import pytest
+
+from psi_monitor import PSIMonitor, PSIProtection, PSITrigger, ProtectionStage, read_pressure
+
+
+def write_pressure(root, resource, total_us, avg10=0.0):
+    (root / resource).write_text(
+        f"some avg10={avg10:.2f} avg60=0.00 avg300=0.00 total={total_us}\n"
+        f"full avg10=0.00 avg60=0.00 avg300=0.00 total={total_us // 2}\n")
+
+
+@pytest.fixture
+def pressure_root(tmp_path):
+    for resource in ("memory", "cpu", "io"):
+        write_pressure(tmp_path, resource, 0)
+    return tmp_path
+
+
+def test_read_pressure(pressure_root):
+    write_pressure(pressure_root, "memory", 123456, avg10=4.5)
+    sample = read_pressure(str(pressure_root / "memory"))
+    assert sample.some_avg10 == 4.5
+    assert sample.some_total_us == 123456
+    assert sample.full_total_us == 61728
+
+
+def test_default_triggers_cover_memory_cpu_io():
+    assert [t.resource for t in PSIMonitor().triggers] == ["memory", "cpu", "io"]
+
+
+def test_fake_file_falls_back_to_polling(pressure_root):
+    monitor = PSIMonitor(pressure_root=str(pressure_root))
+    trigger = PSITrigger("memory")
+    monitor._open_trigger(trigger)
+    assert trigger.polling and trigger.fd is None
+
+
+def test_spike_fires_event_and_recovers(pressure_root):
+    events = []
+    recovered = threading.Event()
+    monitor = PSIMonitor(pressure_root=str(pressure_root), recovery_s=0.3, fallback_poll_s=0.02,
+                         on_event=lambda resource, sample: events.append((resource, time.monotonic())),
+                         on_recovered=recovered.set)
+    monitor.start()
+    try:
+        time.sleep(0.15)
+        assert events == []  # Sano: total= no avanza
+
+        # 400ms de bloqueo de CPU de golpe: supera 300ms/1s
+        spike = time.monotonic()
+        write_pressure(pressure_root, "cpu", 400000)
+        deadline = spike + 1.0
+        while not events and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert events and events[0][0] == "cpu"
+        assert events[0][1] - spike < 0.1
+
+        assert recovered.wait(2.0)
+        assert not monitor.under_pressure
+    finally:
+        monitor.stop()
+
+
+def test_below_threshold_does_not_fire(pressure_root):
+    events = []
+    monitor = PSIMonitor(triggers=[PSITrigger("memory", 150000, 1000000)], pressure_root=str(pressure_root),
+                         fallback_poll_s=0.02, on_event=lambda r, s: events.append(r))
+    monitor.start()
+    try:
+        time.sleep(0.1)
+        # 1ms de bloqueo en ~50ms equivale a ~20ms/1s: muy por debajo de 150ms/1s
+        write_pressure(pressure_root, "memory", 1000)
+        time.sleep(0.2)
+    finally:
+        monitor.stop()
+    assert events == []
+
+
+class RecordingProtection(PSIProtection):
+    """Escalado sin tocar el sistema: sólo anota las etapas aplicadas"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.applied = []
+
+    def _apply(self, stage):
+        self.applied.append(stage)
+        return "recorded"
+
+
+def test_escalation_stages(pressure_root):
+    protection = RecordingProtection(escalate_after_s=0.05, pressure_root=str(pressure_root))
+    sample = read_pressure(str(pressure_root / "memory"))
+
+    protection.handle_event("memory", sample)
+    assert protection.stage == ProtectionStage.RECLAIM
+
+    # Dentro de escalate_after_s: dar tiempo a la etapa actual
+    protection.handle_event("memory", sample)
+    assert protection.stage == ProtectionStage.RECLAIM
+
+    time.sleep(0.06)
+    protection.handle_event("memory", sample)
+    time.sleep(0.06)
+    protection.handle_event("memory", sample)
+    time.sleep(0.06)
+    protection.handle_event("memory", sample)  # Ya en la última etapa
+    assert protection.applied == [ProtectionStage.RECLAIM, ProtectionStage.THROTTLE_BACKGROUND,
+                                  ProtectionStage.LIMIT_NEURO]
+
+
+def test_cpu_pressure_skips_reclaim(pressure_root):
+    protection = RecordingProtection(pressure_root=str(pressure_root))
+    protection.handle_event("cpu", read_pressure(str(pressure_root / "cpu")))
+    assert protection.applied == [ProtectionStage.THROTTLE_BACKGROUND]
+
+    protection.handle_recovered()
+    assert protection.stage == ProtectionStage.HEALTHY
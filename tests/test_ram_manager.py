@@ -0,0 +1,38 @@
+"""Sin cgroups, las apps limitadas van a los núcleos que el juego no usa"""
+
+import os
+import subprocess
+import sys
+
+import psutil
+import pytest
+
+import cgroup_partition
+import cpu_topology
+from ram_manager import RAMManager
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "sched_getaffinity"), reason="needs CPU affinity")
+
+
+def test_throttle_fallback_applies_background_cpus(tmp_path, monkeypatch):
+    if 0 not in os.sched_getaffinity(0):
+        pytest.skip("CPU 0 not allowed here")
+    # 4 núcleos: el juego se queda 1-3 y el resto va a la CPU 0 (válida en cualquier máquina)
+    planner = cpu_topology.AffinityPlanner(cpu_topology.CPUTopology.from_cpu_count(4, 4))
+    monkeypatch.setattr(cpu_topology, "_planner", planner)
+    # cgroup v2 no disponible: se usa el camino de prioridad + afinidad
+    unavailable = cgroup_partition.ResourcePartitionManager(
+        cgroup_root=str(tmp_path / "no_cgroup"), parent="", proc_root=str(tmp_path / "proc"),
+        state_file=str(tmp_path / "state.json"))
+    monkeypatch.setattr(cgroup_partition, "_partition_manager", unavailable)
+
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        proc = psutil.Process(child.pid)
+        actions = RAMManager().throttle_background([{'proc': proc, 'name': 'hog'}])
+        assert proc.cpu_affinity() == planner.plan().background_cpus == [0]
+        assert proc.nice() == 10
+        assert any(action.startswith("Background CPUs") for action in actions)
+    finally:
+        child.kill()
+        child.wait()
@@ -0,0 +1,94 @@
+"""LazyModule no importa hasta el primer atributo y el informe que lee benchmark_startup_time"""
+
+import json
+import subprocess
+import sys
+
+from neuro_benchmark import NeuroBenchmark
+from startup_profiler import (STARTUP_REPORT_ENV, LazyModule, StartupProfiler, get_startup_profiler,
+                              lazy_module)
+
+
+def write_module(directory, name, source):
+    (directory / f"{name}.py").write_text(source)
+
+
+def test_lazy_module_imports_on_first_attribute(tmp_path, monkeypatch):
+    write_module(tmp_path, "lazy_probe_heavy", "VALUE = 42\ndef helper():\n    return VALUE\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    lazy = lazy_module("lazy_probe_heavy")
+    assert isinstance(lazy, LazyModule)
+    assert "not loaded" in repr(lazy)
+    assert "lazy_probe_heavy" not in sys.modules
+
+    assert lazy.VALUE == 42
+    assert "lazy_probe_heavy" in sys.modules and "(loaded)" in repr(lazy)
+    assert lazy.helper() == 42
+    phases = [phase for phase in get_startup_profiler().phases if phase.name == "import lazy_probe_heavy"]
+    assert len(phases) == 1 and phases[0].kind == "lazy"  # Medido una sola vez
+    sys.modules.pop("lazy_probe_heavy")
+
+
+def profiled_startup(tmp_path, monkeypatch) -> StartupProfiler:
+    """Arranque simulado: fases anidadas, un import con otro dentro y el login"""
+    write_module(tmp_path, "startup_probe_outer", "import startup_probe_inner\n")
+    write_module(tmp_path, "startup_probe_inner", "import time\ntime.sleep(0.01)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    profiler = StartupProfiler()
+    profiler.track_imports()
+    try:
+        with profiler.phase("boot"):
+            with profiler.window("login window"):
+                import startup_probe_outer  # noqa: F401
+            profiler.mark("window_visible")
+            profiler.mark("login_interactive")
+    finally:
+        profiler.stop_tracking_imports()
+        for name in ("startup_probe_outer", "startup_probe_inner"):
+            sys.modules.pop(name, None)
+    return profiler
+
+
+def test_report_structure(tmp_path, monkeypatch):
+    profiler = profiled_startup(tmp_path, monkeypatch)
+    report = json.loads(open(profiler.save(str(tmp_path / "report.json"))).read())
+
+    assert report['startup_time_ms'] == report['marks']['login_interactive'] > 0
+    assert list(report['marks']) == ['window_visible', 'login_interactive']
+    assert [(p['name'], p['kind'], p['depth']) for p in report['phases']] == \
+        [("boot", "phase", 0), ("login window", "window", 1)]
+    assert all(p['wall_ms'] >= 0 and 'cpu_ms' in p for p in report['phases'])
+
+    imports = report['imports']
+    assert imports['tracked'] and imports['count'] >= 2
+    outer = next(r for r in imports['top_cumulative'] if r['module'] == "startup_probe_outer")
+    inner = next(r for r in imports['top_self'] if r['module'] == "startup_probe_inner")
+    assert outer['depth'] == 0 and inner['depth'] == 1
+    assert outer['cumulative_ms'] >= inner['cumulative_ms'] >= 10
+    assert outer['self_ms'] < inner['cumulative_ms']  # El tiempo del hijo no cuenta como propio
+    assert "startup_probe_inner" not in [r['module'] for r in imports['top_cumulative']]
+    assert imports['total_ms'] >= outer['cumulative_ms'] - 0.1
+
+
+def test_benchmark_reads_the_report(tmp_path, monkeypatch):
+    profiler = profiled_startup(tmp_path, monkeypatch)
+    benchmark = NeuroBenchmark()
+    launched = []
+
+    def fake_run(argv, env=None, **kwargs):
+        # En lugar de arrancar NEURO_OS_MASTER.py, dejar el informe donde lo espera
+        launched.append(argv[-1])
+        profiler.save(env[STARTUP_REPORT_ENV])
+        return subprocess.CompletedProcess(argv, 0, "", "")
+    monkeypatch.setattr(subprocess, "run", fake_run)
+
+    result = benchmark.benchmark_startup_time(runs=2)
+    assert len(launched) == 2 and launched[0].endswith("NEURO_OS_MASTER.py")
+    assert result['startup_time_ms'] == profiler.marks['login_interactive']
+    assert result['runs_ms'] == [profiler.marks['login_interactive']] * 2
+    assert result['marks'] == profiler.marks
+    assert [phase['name'] for phase in result['phases']] == ["boot", "login window"]
+    assert [module for module, _ in result['top_imports']] == ["startup_probe_outer"]
+    assert result['imports_ms'] >= result['top_imports'][0][1] - 0.1
@@ -0,0 +1,118 @@
+"""Lotes de swapfile/zram/zswap con RecordingOps sobre /proc y /sys falsos"""
+
+import pytest
+
+from swap_manager import RecordingOps, SwapManager, SystemOps, cmd
+
+
+@pytest.fixture
+def roots(tmp_path):
+    """(proc_root, sys_root, carpeta del swapfile) con btrfs montado en la carpeta"""
+    proc, sys_root, target = tmp_path / "proc", tmp_path / "sys", tmp_path / "var"
+    proc.mkdir()
+    target.mkdir()
+    (proc / "swaps").write_text("Filename\tType\tSize\tUsed\tPriority\n")
+    (proc / "mounts").write_text(f"/dev/sda2 / ext4 rw 0 0\n/dev/sda3 {target} btrfs rw 0 0\n")
+    return proc, sys_root, target
+
+
+def test_btrfs_disables_cow_before_allocating(roots):
+    proc, sys_root, target = roots
+    ops = RecordingOps()
+    manager = SwapManager(ops=ops, proc_root=str(proc), sys_root=str(sys_root))
+    path = str(target / "swapfile")
+
+    result = manager.provision_swapfile(path, size_gb=1, priority=5)
+    assert result['success'] and result['filesystem'] == "btrfs"
+    programs = [argv[0] for argv in ops.commands]
+    assert programs == ["mkdir", "test", "truncate", "chattr", "fallocate", "chmod", "mkswap", "swapon"]
+    assert ops.commands[3] == ["chattr", "+C", path]
+    assert ops.commands[-1] == ["swapon", "--priority", "5", path]
+    assert ops.batches == 1
+
+
+def test_mkswap_failure_removes_the_new_file(roots):
+    proc, sys_root, target = roots
+    ops = RecordingOps(responses={"mkswap": (1, "", "bad size")})
+    manager = SwapManager(ops=ops, proc_root=str(proc), sys_root=str(sys_root))
+    path = str(target / "swapfile")
+
+    result = manager.provision_swapfile(path, size_gb=1)
+    assert not result['success'] and result['error'] == "mkswap failed: bad size"
+    assert ops.commands[-2:] == [["mkswap", path], ["rm", "-f", path]]
+    assert not any(argv[0] == "swapon" for argv in ops.commands)
+
+
+def test_existing_file_is_never_removed(roots):
+    proc, sys_root, target = roots
+    existing = target / "swapfile"
+    existing.write_text("user data")
+    ops = RecordingOps()
+    manager = SwapManager(ops=ops, proc_root=str(proc), sys_root=str(sys_root))
+
+    result = manager.provision_swapfile(str(existing), size_gb=1)
+    assert not result['success'] and "already exists" in result['error']
+    assert ops.batches == 0 and existing.read_text() == "user data"
+
+    # Fichero que el usuario no ve pero el lote elevado sí: test ! -e falla y no hay rollback
+    ops = RecordingOps(responses={"test": (1, "", "")})
+    manager = SwapManager(ops=ops, proc_root=str(proc), sys_root=str(sys_root))
+    result = manager.provision_swapfile(str(target / "hidden" / "swapfile"), size_gb=1)
+    assert not result['success'] and "already exists" in result['error']
+    assert [argv[0] for argv in ops.commands] == ["mkdir", "test"]
+
+
+def test_active_swapfile_is_left_alone(roots):
+    proc, sys_root, target = roots
+    path = str(target / "swapfile")
+    (proc / "swaps").write_text(f"Filename\tType\tSize\tUsed\tPriority\n{path} file 1048572 0 10\n")
+    ops = RecordingOps()
+    manager = SwapManager(ops=ops, proc_root=str(proc), sys_root=str(sys_root))
+    assert manager.provision_swapfile(path)['note'] == 'already active'
+    assert ops.batches == 0
+
+
+def test_zram_device_is_substituted(roots):
+    proc, sys_root, _ = roots
+    ops = RecordingOps(responses={"zramctl": (0, "/dev/zram0\n", "")})
+    manager = SwapManager(ops=ops, proc_root=str(proc), sys_root=str(sys_root))
+
+    result = manager.setup_zram(size_gb=2, algorithm="lz4", priority=100)
+    assert result['success'] and result['device'] == "/dev/zram0"
+    assert ops.commands[1] == ["zramctl", "--find", "--size", "2048M", "--algorithm", "lz4"]
+    assert ops.commands[2:] == [["mkswap", "/dev/zram0"], ["swapon", "--priority", "100", "/dev/zram0"]]
+
+    # Sin dispositivo no se ejecuta mkswap con un argumento vacío
+    ops = RecordingOps(responses={"zramctl": (0, "", "")})
+    result = SwapManager(ops=ops, proc_root=str(proc), sys_root=str(sys_root)).setup_zram(size_gb=2)
+    assert not result['success'] and result['device'] is None
+    assert not any(argv[0] == "mkswap" for argv in ops.commands)
+
+
+def test_zswap_parameters_are_written_in_order(roots):
+    proc, sys_root, _ = roots
+    ops = RecordingOps()
+    manager = SwapManager(ops=ops, proc_root=str(proc), sys_root=str(sys_root))
+    assert not manager.configure_zswap()['success']  # Kernel sin zswap
+    assert ops.batches == 0
+
+    params = sys_root / "module" / "zswap" / "parameters"
+    params.mkdir(parents=True)
+    (params / "enabled").write_text("N\n")
+    assert manager.get_zswap_status() == {'available': True, 'enabled': "N"}
+    assert manager.configure_zswap(compressor="zstd", max_pool_percent=25)['success']
+    assert ops.writes == [(str(params / "compressor"), "zstd"),
+                          (str(params / "max_pool_percent"), "25"),
+                          (str(params / "enabled"), "Y")]
+
+
+def test_rollback_only_after_rollback_from():
+    ops = RecordingOps(responses={"false": (1, "", "")})
+    ops.run_batch([cmd("false")], rollback=[cmd("rm", "-f", "x")], rollback_from=1)
+    assert ops.commands == [["false"]]
+    ops.run_batch([cmd("true"), cmd("false")], rollback=[cmd("rm", "-f", "x")], rollback_from=1)
+    assert ops.commands[-1] == ["rm", "-f", "x"]
+
+    # El helper real (sin elevación) sigue la misma regla
+    result = SystemOps(elevate=[]).run_batch([cmd("false")], rollback=[cmd("echo", "undo")], rollback_from=1)
+    assert result['failed'] == 0 and result['outputs'] == [""]
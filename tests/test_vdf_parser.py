@@ -0,0 +1,41 @@
+"""VDF binario: todos los tipos y entradas truncadas (siempre VDFError, nunca cuelgue)"""
+
+import struct
+
+import pytest
+
+from vdf_parser import VDFError, binary_loads
+
+ALL_TYPES = (b'\x00root\x00'
+             b'\x04ptr\x00' + struct.pack('<i', 7) +
+             b'\x05wide\x00' + "héllo".encode('utf-16-le') + b'\x00\x00' +
+             b'\x06color\x00' + struct.pack('<i', -1) +
+             b'\x07big\x00' + struct.pack('<Q', 2**64 - 1) +
+             b'\x0asigned\x00' + struct.pack('<q', -2**63) +
+             b'\x03ratio\x00' + struct.pack('<f', 0.5) +
+             b'\x08\x08')
+
+
+def test_all_types():
+    data, pos = binary_loads(ALL_TYPES)
+    assert pos == len(ALL_TYPES)
+    assert data == {'root': {'ptr': 7, 'wide': "héllo", 'color': -1, 'big': 2**64 - 1,
+                             'signed': -2**63, 'ratio': 0.5}}
+
+
+def test_unterminated_wide_string_raises():
+    with pytest.raises(VDFError):
+        binary_loads(b'\x05k\x00a\x00b')
+
+
+@pytest.mark.parametrize("cut", range(len(ALL_TYPES)))
+def test_every_truncation_raises(cut):
+    with pytest.raises(VDFError):
+        binary_loads(ALL_TYPES[:cut])
+
+
+def test_key_table_index_out_of_range():
+    with pytest.raises(VDFError):
+        binary_loads(b'\x01' + struct.pack('<i', 5) + b'x\x00\x08', key_table=["a"])
+    with pytest.raises(VDFError):
+        binary_loads(b'\x01' + struct.pack('<i', -1) + b'x\x00\x08', key_table=["a"])